@@ -0,0 +1,235 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 多账号会话池，每个账号有独立的浏览器上下文和客户端(签名上下文)，请求在健康的账号之间轮换
+import asyncio
+import inspect
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from playwright.async_api import Playwright
+from tenacity import RetryError
+
+import config
+from base.base_crawler import AbstractCrawler
+from tools import utils
+
+__all__ = ["AccountSession", "AccountPool", "AccountPoolClient", "init_account_sessions"]
+
+
+class AccountSession:
+    def __init__(self, name: str, crawler: AbstractCrawler, client: Any):
+        """
+        Args:
+            name: 账号名
+            crawler: 持有该账号浏览器上下文的爬虫实例
+            client: 该账号的api客户端
+        """
+        self.name = name
+        self.crawler = crawler
+        self.client = client
+        self.in_flight = 0
+        self.last_used_at = 0.0
+        self.benched_until = 0.0
+        self.request_count = 0
+        self.block_count = 0
+
+    @property
+    def is_benched(self) -> bool:
+        return self.benched_until > time.monotonic()
+
+
+class AccountPool:
+    def __init__(
+        self,
+        sessions: List[AccountSession],
+        block_exceptions: Tuple[Type[Exception], ...],
+        bench_sec: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """
+        Args:
+            sessions: 已登录的账号会话
+            block_exceptions: 出现这些异常说明账号被要求验证码或被封禁，需要暂停使用
+            bench_sec: 暂停使用的时长，默认 config.ACCOUNT_BENCH_SEC
+            max_concurrency: 单个账号同时进行的请求数，默认 config.ACCOUNT_MAX_CONCURRENCY
+        """
+        self.sessions = sessions
+        self.block_exceptions = block_exceptions
+        self.bench_sec = bench_sec or config.ACCOUNT_BENCH_SEC
+        self.max_concurrency = max_concurrency or config.ACCOUNT_MAX_CONCURRENCY
+        self.condition = asyncio.Condition()
+
+    def pick_session(self) -> Optional[AccountSession]:
+        """
+        选出可用的账号，优先选正在进行的请求最少、最久没有使用的账号
+        """
+        available = [
+            session for session in self.sessions
+            if not session.is_benched and session.in_flight < self.max_concurrency
+        ]
+        if not available:
+            return None
+        return min(available, key=lambda session: (session.in_flight, session.last_used_at))
+
+    async def acquire(self) -> AccountSession:
+        """
+        获取一个可用的账号，所有账号都忙或被暂停时等待
+        """
+        async with self.condition:
+            while True:
+                session = self.pick_session()
+                if session:
+                    session.in_flight += 1
+                    session.request_count += 1
+                    session.last_used_at = time.monotonic()
+                    return session
+
+                timeout = None
+                if all(session.is_benched for session in self.sessions):
+                    timeout = min(session.benched_until for session in self.sessions) - time.monotonic()
+                    utils.logger.warning(
+                        f"[AccountPool.acquire] All accounts are benched, wait {timeout:.0f}s for the first one"
+                    )
+                try:
+                    await asyncio.wait_for(self.condition.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, session: AccountSession) -> None:
+        async with self.condition:
+            session.in_flight -= 1
+            self.condition.notify_all()
+
+    def bench(self, session: AccountSession, reason: Exception) -> None:
+        session.block_count += 1
+        session.benched_until = time.monotonic() + self.bench_sec
+        utils.logger.warning(
+            f"[AccountPool.bench] Account {session.name} is benched for {self.bench_sec}s, reason: {reason}"
+        )
+
+    def stats(self) -> List[Dict]:
+        return [
+            {
+                "name": session.name,
+                "benched": session.is_benched,
+                "in_flight": session.in_flight,
+                "request_count": session.request_count,
+                "block_count": session.block_count,
+            }
+            for session in self.sessions
+        ]
+
+    async def close(self) -> None:
+        for session in self.sessions:
+            browser_context = getattr(session.crawler, "browser_context", None)
+            if browser_context:
+                await browser_context.close()
+
+
+def unwrap_retry_error(error: Exception) -> Exception:
+    """
+    客户端的 request 使用 @retry 重试，重试用完后抛出的是 RetryError，取出最后一次重试的异常
+    """
+    if isinstance(error, RetryError) and error.last_attempt.failed:
+        return error.last_attempt.exception()
+    return error
+
+
+class AccountPoolClient:
+    """
+    替代爬虫的单个api客户端，每次方法调用都分发到账号池中的一个账号上执行，
+    账号触发验证码或封禁时暂停该账号，并换一个账号重试本次调用
+    """
+
+    def __init__(self, pool: AccountPool):
+        self.pool = pool
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.pool.sessions[0].client, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+        if name == "update_cookies":
+            return self.update_cookies
+
+        async def call_with_account(*args, **kwargs):
+            last_error: Optional[Exception] = None
+            for _ in range(len(self.pool.sessions)):
+                session = await self.pool.acquire()
+                try:
+                    return await getattr(session.client, name)(*args, **kwargs)
+                except Exception as e:
+                    error = unwrap_retry_error(e)
+                    if not isinstance(error, self.pool.block_exceptions):
+                        raise
+                    self.pool.bench(session, error)
+                    last_error = error
+                finally:
+                    await self.pool.release(session)
+            raise last_error
+
+        return call_with_account
+
+    async def update_cookies(self, *args, **kwargs) -> None:
+        """
+        每个账号都从自己的浏览器上下文刷新cookie
+        """
+        for session in self.pool.sessions:
+            await session.client.update_cookies(browser_context=session.crawler.browser_context)
+
+
+async def init_account_sessions(
+    crawler: AbstractCrawler,
+    playwright: Playwright,
+    client_attr: str,
+    block_exceptions: Tuple[Type[Exception], ...],
+) -> bool:
+    """
+    当前平台配置了多账号时，为每个账号初始化独立的会话，并把爬虫的api客户端替换成账号池客户端
+    Args:
+        crawler: 爬虫实例
+        playwright: playwright 实例
+        client_attr: 爬虫上api客户端的属性名，如 xhs_client
+        block_exceptions: 需要暂停账号的异常类型
+
+    Returns: 是否启用了多账号
+
+    """
+    accounts: List[Dict] = config.ACCOUNTS.get(config.PLATFORM) or []
+    if not accounts:
+        return False
+    config.enable_config_overrides()
+
+    async def init_session(account: Dict) -> AccountSession:
+        # 每个账号的登录配置只写入自己的上下文，ACCOUNTS 置空避免账号会话再次初始化账号池
+        overrides = dict(config.config_overrides_var.get() or {})
+        overrides.update({
+            "ACCOUNTS": {},
+            "USER_DATA_DIR": f"%s_{account['name']}_user_data_dir",
+        })
+        if account.get("cookies"):
+            overrides.update({"LOGIN_TYPE": "cookie", "COOKIES": account["cookies"]})
+        config.config_overrides_var.set(overrides)
+
+        account_crawler = type(crawler)()
+        await account_crawler.init_session(playwright)
+        utils.logger.info(f"[init_account_sessions] Account {account['name']} session is ready")
+        return AccountSession(account["name"], account_crawler, getattr(account_crawler, client_attr))
+
+    # 登录可能需要扫码，逐个账号初始化
+    sessions = [await asyncio.create_task(init_session(account)) for account in accounts]
+    pool = AccountPool(sessions, block_exceptions)
+    setattr(crawler, client_attr, AccountPoolClient(pool))
+    crawler.account_pool = pool
+    crawler.browser_context = sessions[0].crawler.browser_context
+    crawler.context_page = sessions[0].crawler.context_page
+    return True
@@ -12,7 +12,9 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Optional
 
-from playwright.async_api import BrowserContext, BrowserType
+from playwright.async_api import BrowserContext, BrowserType, Playwright
+
+from tools import metrics, tracing
 
 
 class AbstractCrawler(ABC):
@@ -23,6 +25,21 @@ class AbstractCrawler(ABC):
         """
         pass
 
+    @abstractmethod
+    async def init_session(self, playwright: Playwright):
+        """
+        launch browser, create api client and login, the session can be reused by multiple crawl jobs
+        :param playwright: playwright instance
+        """
+        pass
+
+    @abstractmethod
+    async def crawl(self):
+        """
+        run a crawl job of config.CRAWLER_TYPE with the session created by init_session
+        """
+        pass
+
     @abstractmethod
     async def search(self):
         """
@@ -63,6 +80,28 @@ class AbstractLogin(ABC):
 
 
 class AbstractStore(ABC):
+    # 存储方法 -> 指标里的存储类型
+    METRIC_STORE_TYPES = {
+        "store_content": "contents",
+        "store_comment": "comments",
+        "store_creator": "creators",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        子类实现的存储方法统一包上指标记录，内容的存储还会记录链路追踪的 store 阶段，
+        各平台的 csv / db / json 存储不需要单独处理
+        """
+        super().__init_subclass__(**kwargs)
+        for method_name, store_type in AbstractStore.METRIC_STORE_TYPES.items():
+            method = cls.__dict__.get(method_name)
+            if method is not None and not getattr(method, "__isabstractmethod__", False):
+                if method_name == "store_content":
+                    method = tracing.trace_stage(
+                        "store", lambda store, content_item: tracing.item_content_id(content_item)
+                    )(method)
+                setattr(cls, method_name, metrics.record_store(store_type)(method))
+
     @abstractmethod
     async def store_content(self, content_item: Dict):
         pass
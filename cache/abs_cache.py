@@ -16,7 +16,7 @@
 # @Desc    : 抽象类
 
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 
 class AbstractCache(ABC):
@@ -51,3 +51,59 @@ class AbstractCache(ABC):
         :return:
         """
         raise NotImplementedError
+
+    def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        批量获取键的值，默认逐个调用 get，支持批量查询的子类可以覆盖
+        :param keys: 键列表
+        :return: 只包含命中的键
+        """
+        result: Dict[str, Any] = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+
+
+class AbstractAsyncCache(ABC):
+    """
+    异步缓存接口，在事件循环里使用，网络型的缓存(redis)不会阻塞事件循环
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def mget(self, keys: List[str]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, expire_time: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def keys(self, pattern: str) -> List[str]:
+        raise NotImplementedError
+
+
+class AsyncCacheAdapter(AbstractAsyncCache):
+    """
+    把本地的同步缓存(memory、sqlite)包装成异步接口，本地缓存的读写很快，直接在事件循环里调用
+    """
+
+    def __init__(self, cache: AbstractCache):
+        self.cache = cache
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.cache.get(key)
+
+    async def mget(self, keys: List[str]) -> Dict[str, Any]:
+        return self.cache.mget(keys)
+
+    async def set(self, key: str, value: Any, expire_time: int) -> None:
+        self.cache.set(key, value, expire_time)
+
+    async def keys(self, pattern: str) -> List[str]:
+        return self.cache.keys(pattern)
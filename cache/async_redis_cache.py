@@ -0,0 +1,106 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 异步RedisCache实现，连接池 + SCAN 遍历 + MGET 批量读取，不阻塞事件循环
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from redis.asyncio import ConnectionPool, Redis
+
+from cache.abs_cache import AbstractAsyncCache
+from cache.serializer import get_serializer
+from config import db_config
+
+
+class AsyncRedisCache(AbstractAsyncCache):
+    # SCAN 每次返回的 key 数量提示，MGET 每批的 key 数量
+    SCAN_COUNT = 500
+    MGET_BATCH_SIZE = 500
+
+    def __init__(self, serializer: Optional[str] = None) -> None:
+        """
+        :param serializer: 序列化方式 pickle | json，默认使用 db_config.CACHE_SERIALIZER
+        """
+        self._dumps, self._loads = get_serializer(serializer or db_config.CACHE_SERIALIZER)
+        self._pool = ConnectionPool(
+            host=db_config.REDIS_DB_HOST,
+            port=db_config.REDIS_DB_PORT,
+            db=db_config.REDIS_DB_NUM,
+            password=db_config.REDIS_DB_PWD,
+            max_connections=db_config.REDIS_MAX_CONNECTIONS,
+        )
+        self._redis_client = Redis(connection_pool=self._pool)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        从缓存中获取键的值, 并且反序列化
+        :param key:
+        :return:
+        """
+        value = await self._redis_client.get(key)
+        if value is None:
+            return None
+        return self._loads(value)
+
+    async def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        用 MGET 分批获取键的值，一批只需要一次网络往返
+        :param keys:
+        :return: 只包含命中的键
+        """
+        result: Dict[str, Any] = {}
+        for i in range(0, len(keys), self.MGET_BATCH_SIZE):
+            batch = keys[i:i + self.MGET_BATCH_SIZE]
+            for key, value in zip(batch, await self._redis_client.mget(batch)):
+                if value is not None:
+                    result[key] = self._loads(value)
+        return result
+
+    async def set(self, key: str, value: Any, expire_time: int) -> None:
+        """
+        将键的值设置到缓存中, 并且序列化
+        :param key:
+        :param value:
+        :param expire_time:
+        :return:
+        """
+        await self._redis_client.set(key, self._dumps(value), ex=expire_time)
+
+    async def keys(self, pattern: str) -> List[str]:
+        """
+        用 SCAN 增量遍历符合pattern的key，不会像 KEYS 一样长时间阻塞 redis
+        :param pattern:
+        :return:
+        """
+        return [key.decode() async for key in self._redis_client.scan_iter(match=pattern, count=self.SCAN_COUNT)]
+
+    async def close(self) -> None:
+        """
+        关闭连接池
+        :return:
+        """
+        await self._redis_client.close()
+        await self._pool.disconnect()
+
+
+if __name__ == '__main__':
+    async def main():
+        redis_cache = AsyncRedisCache(serializer="json")
+        await redis_cache.set("name", "程序员阿江-Relakkes", 1)
+        print(await redis_cache.get("name"))  # 程序员阿江-Relakkes
+        print(await redis_cache.keys("*"))  # ['name']
+        print(await redis_cache.mget(["name", "not_exist"]))  # {'name': '程序员阿江-Relakkes'}
+        await asyncio.sleep(2)
+        print(await redis_cache.get("name"))  # None
+        await redis_cache.close()
+
+    asyncio.run(main())
@@ -35,6 +35,24 @@ class CacheFactory:
             return ExpiringLocalCache(*args, **kwargs)
         elif cache_type == 'redis':
             from .redis_cache import RedisCache
-            return RedisCache()
+            return RedisCache(*args, **kwargs)
+        elif cache_type == 'sqlite':
+            from .sqlite_cache import SqliteCache
+            return SqliteCache(*args, **kwargs)
         else:
             raise ValueError(f'Unknown cache type: {cache_type}')
+
+    @staticmethod
+    def create_async_cache(cache_type: str, *args, **kwargs):
+        """
+        创建异步缓存对象，redis 使用异步客户端，本地缓存包装成异步接口
+        :param cache_type: 缓存类型
+        :param args: 参数
+        :param kwargs: 关键字参数
+        :return:
+        """
+        if cache_type == 'redis':
+            from .async_redis_cache import AsyncRedisCache
+            return AsyncRedisCache(*args, **kwargs)
+        from .abs_cache import AsyncCacheAdapter
+        return AsyncCacheAdapter(CacheFactory.create_cache(cache_type, *args, **kwargs))
@@ -0,0 +1,251 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 磁盘上的 HTTP 响应缓存，按 请求方法 + 归一化的URL 缓存 client 请求方法的返回值，
+#            重复爬取时在 TTL 内直接使用缓存，不再发起网络请求
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+import config
+from tools import utils
+
+# 影响 client 请求方法返回值类型的参数，需要参与缓存 key 的计算
+RETURN_TYPE_KWARGS = ("return_response", "return_ori_content")
+
+
+def normalize_request_key(method: str, url: str, params: Optional[Dict] = None, body: Any = None) -> str:
+    """
+    计算请求的缓存 key：去掉每次请求都会变化的签名参数，参数按名字排序
+    :param method: 请求方法
+    :param url: 请求的URL
+    :param params: 单独传入的查询参数
+    :param body: 请求体
+    :return:
+    """
+    split_url = urlsplit(url)
+    query = parse_qsl(split_url.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items())
+    ignore_params = set(config.HTTP_CACHE_IGNORE_PARAMS)
+    query = sorted((k, v) for k, v in query if k not in ignore_params)
+    normalized_url = urlunsplit((split_url.scheme, split_url.netloc, split_url.path, urlencode(query), ""))
+    if isinstance(body, dict):
+        body = urlencode(sorted(body.items()))
+    raw_key = f"{method.upper()} {normalized_url} {body or ''}"
+    return hashlib.sha1(raw_key.encode("utf-8")).hexdigest()
+
+
+def is_per_account_endpoint(url: str) -> bool:
+    """
+    是否是返回内容与登录账号有关的接口
+    :param url:
+    :return:
+    """
+    path = urlsplit(url).path
+    return any(path.startswith(prefix) for prefix in config.HTTP_CACHE_PER_ACCOUNT_PATHS)
+
+
+def get_request_cookie(client: Any, kwargs: Dict) -> str:
+    """
+    本次请求使用的cookie，优先取请求参数里的请求头，其次取 client 的请求头
+    :param client:
+    :param kwargs:
+    :return:
+    """
+    headers = kwargs.get("headers") or getattr(client, "headers", None) or {}
+    return headers.get("Cookie") or headers.get("cookie") or ""
+
+
+def get_endpoint_ttl(url: str) -> int:
+    """
+    根据URL路径查找配置的缓存时间，多个前缀匹配时取最长的那个，没有配置的接口不缓存
+    :param url:
+    :return: 缓存时间，单位秒，0 表示不缓存
+    """
+    path = urlsplit(url).path
+    matched_prefix = ""
+    for prefix in config.HTTP_CACHE_TTLS:
+        if path.startswith(prefix) and len(prefix) > len(matched_prefix):
+            matched_prefix = prefix
+    return config.HTTP_CACHE_TTLS[matched_prefix] if matched_prefix else 0
+
+
+class HttpResponseCache:
+    """
+    sqlite 单文件存储，总大小超过上限时按最近访问时间淘汰
+    """
+
+    def __init__(self, db_path: str, max_bytes: int):
+        self._db_path = db_path
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expire_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_http_cache_accessed_at ON http_cache (accessed_at)")
+        self._conn.execute("DELETE FROM http_cache WHERE expire_at <= ?", (time.time(),))
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        获取缓存的返回值，命中时更新访问时间
+        :param key:
+        :return:
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM http_cache WHERE key = ? AND expire_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._conn.execute("UPDATE http_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        """
+        缓存返回值，超过大小上限时淘汰最久未访问的响应
+        :param key:
+        :param value:
+        :param ttl: 缓存时间，单位秒
+        :return:
+        """
+        data = pickle.dumps(value)
+        now = time.time()
+        with self._lock:
+            old_row = self._conn.execute("SELECT size FROM http_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (key, value, size, expire_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now + ttl, now),
+            )
+            self._total_bytes += len(data) - (old_row[0] if old_row else 0)
+            if self._total_bytes > self._max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """
+        先删除过期的响应，再按访问时间从旧到新删除，直到总大小降到上限的 90%
+        :return:
+        """
+        self._conn.execute("DELETE FROM http_cache WHERE expire_at <= ?", (time.time(),))
+        # 其他进程也可能在写同一个文件，淘汰前重新统计一次总大小
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        target_bytes = self._max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM http_cache ORDER BY accessed_at").fetchall()
+        evict_keys = []
+        for key, size in rows:
+            if self._total_bytes <= target_bytes:
+                break
+            evict_keys.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM http_cache WHERE key = ?", evict_keys)
+        self._evictions += len(evict_keys)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "bytes": self._total_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_http_response_cache: Optional[HttpResponseCache] = None
+
+
+def get_http_response_cache() -> HttpResponseCache:
+    """
+    获取全局的 HTTP 响应缓存，第一次使用时才打开缓存文件
+    :return:
+    """
+    global _http_response_cache
+    if _http_response_cache is None:
+        _http_response_cache = HttpResponseCache(config.HTTP_CACHE_PATH, config.HTTP_CACHE_MAX_BYTES)
+    return _http_response_cache
+
+
+def _dump_result(method: str, url: str, result: Any) -> Any:
+    """httpx.Response 不能直接序列化，只保存状态码、响应头和响应体"""
+    if isinstance(result, httpx.Response):
+        return {"__httpx_response__": (method, url, result.status_code, result.headers.raw, result.content)}
+    return result
+
+
+def _load_result(value: Any) -> Any:
+    if isinstance(value, dict) and "__httpx_response__" in value:
+        method, url, status_code, headers, content = value["__httpx_response__"]
+        return httpx.Response(status_code, headers=headers, content=content, request=httpx.Request(method, url))
+    return value
+
+
+def cache_response(func):
+    """
+    client 请求方法的装饰器，开启 ENABLE_HTTP_CACHE 时缓存 HTTP_CACHE_TTLS 里配置的接口的返回值，
+    只缓存正常返回的结果，请求方法抛出异常(风控、验证码、接口报错)时不会写入缓存，
+    调用时传入 skip_cache=True 可以跳过缓存，例如检查登录状态
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, method, url, skip_cache: bool = False, **kwargs):
+        if not config.ENABLE_HTTP_CACHE or skip_cache:
+            return await func(self, method, url, **kwargs)
+        ttl = get_endpoint_ttl(url)
+        if not ttl:
+            return await func(self, method, url, **kwargs)
+
+        body = kwargs.get("data") or kwargs.get("json") or kwargs.get("content")
+        key = normalize_request_key(method, url, kwargs.get("params"), body)
+        # 同一个请求返回 dict 和返回原始响应时分开缓存
+        return_type = ",".join(name for name in RETURN_TYPE_KWARGS if kwargs.get(name))
+        if return_type:
+            key = f"{key}:{return_type}"
+        if is_per_account_endpoint(url):
+            account = hashlib.sha1(get_request_cookie(self, kwargs).encode("utf-8")).hexdigest()
+            key = f"{key}:{account}"
+        response_cache = get_http_response_cache()
+        cached_value = response_cache.get(key)
+        if cached_value is not None:
+            utils.logger.debug(f"[cache_response] cache hit {method}:{url}")
+            return _load_result(cached_value)
+
+        result = await func(self, method, url, **kwargs)
+        if result is not None:
+            response_cache.set(key, _dump_result(method, url, result), ttl)
+        return result
+
+    return wrapper
@@ -16,22 +16,40 @@
 # @Desc    : 本地缓存
 
 import asyncio
+import heapq
+import sys
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from cache.abs_cache import AbstractCache
 
 
 class ExpiringLocalCache(AbstractCache):
 
-    def __init__(self, cron_interval: int = 10):
+    def __init__(self, cron_interval: int = 10, max_size: Optional[int] = None, max_bytes: Optional[int] = None):
         """
         初始化本地缓存
         :param cron_interval: 定时清楚cache的时间间隔
+        :param max_size: 最多缓存多少个键，超出后按 LRU 淘汰，None 表示不限制
+        :param max_bytes: 缓存值大概占用的最大字节数(sys.getsizeof 浅层估算)，超出后按 LRU 淘汰，None 表示不限制
         :return:
         """
         self._cron_interval = cron_interval
-        self._cache_container: Dict[str, Tuple[Any, float]] = {}
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        # key -> (value, 过期时间, 估算的字节数)，按最近访问顺序排列，队头是最久未访问的
+        self._cache_container: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        # 过期时间小顶堆 (过期时间, key)，覆盖写入后旧的堆元素不会立即删除，弹出时和容器里的过期时间比对
+        self._expire_heap: List[Tuple[float, str]] = []
+        # 前缀索引：key 第一个 _ 之前的部分 -> key 集合，用于 keys("prefix_*") 的前缀查找，例如 kuaidaili_* 的代理
+        self._prefix_index: Dict[str, Set[str]] = {}
+        self._current_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
         self._cron_task: Optional[asyncio.Task] = None
         # 开启定时清理任务
         self._schedule_clear()
@@ -50,15 +68,20 @@ class ExpiringLocalCache(AbstractCache):
         :param key:
         :return:
         """
-        value, expire_time = self._cache_container.get(key, (None, 0))
+        value, expire_time, _ = self._cache_container.get(key, (None, 0, 0))
         if value is None:
+            self._misses += 1
             return None
 
         # 如果键已过期，则删除键并返回None
         if expire_time < time.time():
-            del self._cache_container[key]
+            self._delete(key)
+            self._expirations += 1
+            self._misses += 1
             return None
 
+        self._cache_container.move_to_end(key)
+        self._hits += 1
         return value
 
     def set(self, key: str, value: Any, expire_time: int) -> None:
@@ -69,22 +92,105 @@ class ExpiringLocalCache(AbstractCache):
         :param expire_time:
         :return:
         """
-        self._cache_container[key] = (value, time.time() + expire_time)
+        expire_at = time.time() + expire_time
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        old_item = self._cache_container.get(key)
+        if old_item is None:
+            self._prefix_index.setdefault(self._key_segment(key), set()).add(key)
+        else:
+            self._current_bytes -= old_item[2]
+        self._cache_container[key] = (value, expire_at, size)
+        self._cache_container.move_to_end(key)
+        self._current_bytes += size
+        heapq.heappush(self._expire_heap, (expire_at, key))
+        # 同一个 key 反复覆盖写入时堆里会堆积过时的元素，超过一定比例就重建
+        if len(self._expire_heap) > 2 * len(self._cache_container) + 64:
+            self._rebuild_expire_heap()
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        """
+        删除键
+        :param key:
+        :return:
+        """
+        if key in self._cache_container:
+            self._delete(key)
 
     def keys(self, pattern: str) -> List[str]:
         """
-        获取所有符合pattern的key
+        获取所有符合pattern的key，和 redis 一样支持 * ? [] 通配符，返回顺序不固定
+        形如 prefix_* 的模式只查找前缀索引里对应的 key，其他模式扫描全部 key
         :param pattern: 匹配模式
         :return:
         """
         if pattern == '*':
-            return list(self._cache_container.keys())
+            return list(self._cache_container)
+
+        prefix = pattern[:-1]
+        if pattern.endswith('*') and '_' in prefix and not any(char in prefix for char in '*?['):
+            candidates = self._prefix_index.get(self._key_segment(prefix), ())
+            return [key for key in candidates if key.startswith(prefix)]
 
-        # 本地缓存通配符暂时将*替换为空
-        if '*' in pattern:
-            pattern = pattern.replace('*', '')
+        return [key for key in self._cache_container if fnmatchcase(key, pattern)]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        缓存的命中、未命中、淘汰、过期次数统计
+        :return:
+        """
+        return {
+            "size": len(self._cache_container),
+            "bytes": self._current_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
+
+    def _delete(self, key: str) -> None:
+        """
+        从容器和前缀索引里删除键，堆里的元素留到弹出时再丢弃
+        :param key:
+        :return:
+        """
+        _, _, size = self._cache_container.pop(key)
+        self._current_bytes -= size
+        segment = self._key_segment(key)
+        segment_keys = self._prefix_index[segment]
+        segment_keys.discard(key)
+        if not segment_keys:
+            del self._prefix_index[segment]
 
-        return [key for key in self._cache_container.keys() if pattern in key]
+    @staticmethod
+    def _key_segment(key: str) -> str:
+        """
+        key 第一个 _ 之前的部分，没有 _ 时为整个 key
+        :param key:
+        :return:
+        """
+        return key.split('_', 1)[0]
+
+    def _evict(self) -> None:
+        """
+        超过容量上限时按 LRU 淘汰最久未访问的键
+        :return:
+        """
+        while self._cache_container and (
+                (self._max_size is not None and len(self._cache_container) > self._max_size)
+                or (self._max_bytes is not None and self._current_bytes > self._max_bytes)
+        ):
+            key = next(iter(self._cache_container))
+            self._delete(key)
+            self._evictions += 1
+
+    def _rebuild_expire_heap(self) -> None:
+        """
+        丢掉堆里过时的元素并重建
+        :return:
+        """
+        self._expire_heap = [(expire_time, key) for key, (_, expire_time, _) in self._cache_container.items()]
+        heapq.heapify(self._expire_heap)
 
     def _schedule_clear(self):
         """
@@ -102,12 +208,18 @@ class ExpiringLocalCache(AbstractCache):
 
     def _clear(self):
         """
-        根据过期时间清理缓存
+        根据过期时间清理缓存，只弹出堆顶已过期的元素，耗时和过期的键数量成正比
         :return:
         """
-        for key, (value, expire_time) in self._cache_container.items():
-            if expire_time < time.time():
-                del self._cache_container[key]
+        now = time.time()
+        while self._expire_heap and self._expire_heap[0][0] < now:
+            expire_time, key = heapq.heappop(self._expire_heap)
+            item = self._cache_container.get(key)
+            # 键已经被删除、淘汰或者被覆盖写入了新的过期时间
+            if item is None or item[1] != expire_time:
+                continue
+            self._delete(key)
+            self._expirations += 1
 
     async def _start_clear_cron(self):
         """
@@ -14,19 +14,21 @@
 # @Name    : 程序员阿江-Relakkes
 # @Time    : 2024/5/29 22:57
 # @Desc    : RedisCache实现
-import pickle
 import time
-from typing import Any, List
+from typing import Any, Dict, List, Optional
 
 from redis import Redis
 
 from cache.abs_cache import AbstractCache
+from cache.serializer import get_serializer
 from config import db_config
 
 
 class RedisCache(AbstractCache):
 
-    def __init__(self) -> None:
+    def __init__(self, serializer: Optional[str] = None) -> None:
+        # 序列化方式 pickle | json
+        self._dumps, self._loads = get_serializer(serializer or db_config.CACHE_SERIALIZER)
         # 连接redis, 返回redis客户端
         self._redis_client = self._connet_redis()
 
@@ -52,7 +54,7 @@ class RedisCache(AbstractCache):
         value = self._redis_client.get(key)
         if value is None:
             return None
-        return pickle.loads(value)
+        return self._loads(value)
 
     def set(self, key: str, value: Any, expire_time: int) -> None:
         """
@@ -62,13 +64,23 @@ class RedisCache(AbstractCache):
         :param expire_time:
         :return:
         """
-        self._redis_client.set(key, pickle.dumps(value), ex=expire_time)
+        self._redis_client.set(key, self._dumps(value), ex=expire_time)
 
     def keys(self, pattern: str) -> List[str]:
         """
-        获取所有符合pattern的key
+        获取所有符合pattern的key，用 SCAN 增量遍历，不会像 KEYS 一样长时间阻塞 redis
         """
-        return [key.decode() for key in self._redis_client.keys(pattern)]
+        return [key.decode() for key in self._redis_client.scan_iter(match=pattern, count=500)]
+
+    def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        用 MGET 批量获取键的值
+        :param keys:
+        :return: 只包含命中的键
+        """
+        if not keys:
+            return {}
+        return {key: self._loads(value) for key, value in zip(keys, self._redis_client.mget(keys)) if value is not None}
 
 
 if __name__ == '__main__':
@@ -0,0 +1,41 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 缓存值的序列化方式，pickle 只能给 python 读，json 可以给其他语言的消费者读
+import json
+import pickle
+from typing import Any, Callable, Tuple
+
+SERIALIZER_PICKLE = "pickle"
+SERIALIZER_JSON = "json"
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(data)
+
+
+def get_serializer(name: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    """
+    获取序列化和反序列化函数
+    :param name: pickle | json
+    :return: (dumps, loads)
+    """
+    if name == SERIALIZER_PICKLE:
+        return pickle.dumps, pickle.loads
+    elif name == SERIALIZER_JSON:
+        return _json_dumps, _json_loads
+    else:
+        raise ValueError(f'Unknown cache serializer: {name}')
@@ -0,0 +1,160 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : SqliteCache实现，单文件持久化缓存，多进程安全，不需要额外部署 redis
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from cache.abs_cache import AbstractCache
+from config import db_config
+
+
+class SqliteCache(AbstractCache):
+    # 每写入多少次顺带清理一次过期的键
+    CLEAR_INTERVAL_WRITES = 100
+
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        """
+        初始化 sqlite 缓存
+        :param db_path: 缓存文件路径，默认使用 db_config.SQLITE_CACHE_PATH
+        :return:
+        """
+        self._db_path = db_path or db_config.SQLITE_CACHE_PATH
+        self._lock = threading.Lock()
+        self._write_count = 0
+        self._conn = self._connect_sqlite()
+        self._clear()
+
+    def _connect_sqlite(self) -> sqlite3.Connection:
+        """
+        连接 sqlite, 开启 WAL 模式，多个进程可以同时读写同一个缓存文件
+        :return:
+        """
+        db_dir = os.path.dirname(self._db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(self._db_path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expire_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expire_at ON cache (expire_at)")
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        从缓存中获取键的值, 并且反序列化
+        :param key:
+        :return:
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expire_at > ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        批量获取键的值，一次查询返回所有未过期的键值
+        :param keys:
+        :return: 只包含命中的键
+        """
+        if not keys:
+            return {}
+        result: Dict[str, Any] = {}
+        now = time.time()
+        # sqlite 单条语句的参数个数有上限，分批查询
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM cache WHERE key IN ({','.join('?' * len(batch))}) AND expire_at > ?",
+                    (*batch, now),
+                ).fetchall()
+                for key, value in rows:
+                    result[key] = pickle.loads(value)
+        return result
+
+    def set(self, key: str, value: Any, expire_time: int) -> None:
+        """
+        将键的值设置到缓存中, 并且序列化
+        :param key:
+        :param value:
+        :param expire_time: 过期时间，单位秒
+        :return:
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expire_at) VALUES (?, ?, ?)",
+                (key, pickle.dumps(value), time.time() + expire_time),
+            )
+            self._write_count += 1
+            if self._write_count % self.CLEAR_INTERVAL_WRITES == 0:
+                self._clear_locked()
+
+    def delete(self, key: str) -> None:
+        """
+        删除键
+        :param key:
+        :return:
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def keys(self, pattern: str) -> List[str]:
+        """
+        获取所有符合pattern的未过期key，和 redis 一样支持 * ? [] 通配符
+        :param pattern: 匹配模式
+        :return:
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM cache WHERE key GLOB ? AND expire_at > ?", (pattern, time.time())
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """
+        关闭 sqlite 连接
+        :return:
+        """
+        with self._lock:
+            self._conn.close()
+
+    def _clear(self) -> None:
+        """
+        删除所有过期的键
+        :return:
+        """
+        with self._lock:
+            self._clear_locked()
+
+    def _clear_locked(self) -> None:
+        self._conn.execute("DELETE FROM cache WHERE expire_at <= ?", (time.time(),))
+
+
+if __name__ == '__main__':
+    sqlite_cache = SqliteCache()
+    sqlite_cache.set("name", "程序员阿江-Relakkes", 1)
+    print(sqlite_cache.get("name"))  # 程序员阿江-Relakkes
+    print(sqlite_cache.keys("*"))  # ['name']
+    print(sqlite_cache.mget(["name", "not_exist"]))  # {'name': '程序员阿江-Relakkes'}
+    time.sleep(2)
+    print(sqlite_cache.get("name"))  # None
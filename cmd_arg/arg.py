@@ -36,6 +36,10 @@ async def parse_cmd():
                         help='where to save the data (csv or db or json)', choices=['csv', 'db', 'json'], default=config.SAVE_DATA_OPTION)
     parser.add_argument('--cookies', type=str,
                         help='cookies used for cookie login type', default=config.COOKIES)
+    parser.add_argument('--resume', type=str2bool, nargs='?', const=True,
+                        help='''whether to resume from the checkpoint of the last run, supported values case insensitive ('yes', 'true', 't', 'y', '1', 'no', 'false', 'f', 'n', '0')''', default=config.ENABLE_RESUME)
+    parser.add_argument('--profile', type=str2bool, nargs='?', const=True,
+                        help='''whether to run the crawl under the sampling profiler and write flame graph stacks, supported values case insensitive ('yes', 'true', 't', 'y', '1', 'no', 'false', 'f', 'n', '0')''', default=config.ENABLE_PROFILE)
 
     args = parser.parse_args()
 
@@ -49,3 +53,5 @@ async def parse_cmd():
     config.ENABLE_GET_SUB_COMMENTS = args.get_sub_comment
     config.SAVE_DATA_OPTION = args.save_data_option
     config.COOKIES = args.cookies
+    config.ENABLE_RESUME = args.resume
+    config.ENABLE_PROFILE = args.profile
@@ -24,6 +24,22 @@ CRAWLER_TYPE = (
 # 自定义User Agent（暂时仅对XHS有效）
 UA = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36 Edg/131.0.0.0'
 
+# 多账号配置，key 为平台，value 为账号列表。配置了账号的平台会为每个账号单独启动浏览器上下文和客户端，
+# 请求在健康的账号之间轮换，遇到验证码或封禁的账号会暂停使用一段时间。为空时仍然使用上面的单账号配置
+# name: 账号名，同时作为该账号的浏览器用户数据目录后缀；cookies: 可选，填写后该账号使用cookie登录
+ACCOUNTS = {
+    # "xhs": [
+    #     {"name": "account1", "cookies": ""},
+    #     {"name": "account2", "cookies": ""},
+    # ],
+}
+
+# 账号遇到验证码或封禁后暂停使用的时长，单位秒
+ACCOUNT_BENCH_SEC = 600
+
+# 单个账号同时进行的请求数，整体并发还受 MAX_CONCURRENCY_NUM 控制，多账号时可以相应调大
+ACCOUNT_MAX_CONCURRENCY = 1
+
 # 是否开启 IP 代理
 ENABLE_IP_PROXY = False
 
@@ -36,12 +52,185 @@ IP_PROXY_POOL_COUNT = 2
 # 代理IP提供商名称
 IP_PROXY_PROVIDER_NAME = "kuaidaili"
 
+# 代理IP轮换，每个代理IP连续使用多少次请求后换下一个，1 表示每个请求都换，0 表示不轮换（整个运行过程只用一个代理IP）
+IP_PROXY_ROTATE_REQUESTS = 1
+
+# 代理IP距离过期不足该秒数时不再分配给新的请求
+IP_PROXY_EXPIRE_MARGIN_SEC = 30
+
+# 代理IP连续失败(连接错误、超时)多少次后从代理池中移除
+IP_PROXY_MAX_FAILURES = 3
+
+# 验证代理IP是否可用的地址，可以换成本地或内网的地址
+IP_PROXY_VALIDATE_URL = "https://httpbin.org/ip"
+
+# 验证代理IP的超时时间，单位秒，超时的代理IP视为不可用
+IP_PROXY_VALIDATE_TIMEOUT_SEC = 3
+
 # 设置为True不会打开浏览器（无头浏览器）
 # 设置False会打开一个浏览器
 # 小红书如果一直扫码登录不通过，打开浏览器手动过一下滑动验证码
 # 抖音如果一直提示失败，打开浏览器看下是否扫码登录之后出现了手机号验证，如果出现了手动过一下再试。
 HEADLESS = False
 
+# 是否开启浏览器资源拦截，登录完成后浏览器页面只用于签名和刷新cookie，
+# 开启后会中断图片、视频、字体和统计上报等请求，并把页面固定到一个轻量的同源地址，降低CPU和带宽占用
+ENABLE_RESOURCE_BLOCKING = False
+
+# 开启资源拦截后，把页面固定到同源 robots.txt 的平台。固定后页面上的js不再运行，
+# 抖音的 msToken(localStorage 的 xmst) 和B站的 wbi key(localStorage 的 wbi_img_urls)依赖页面js刷新，
+# 小红书签名依赖页面js，这三个平台不固定页面；快手、微博、知乎的客户端不使用页面，可以固定
+RESOURCE_BLOCKING_PIN_PLATFORMS = ["ks", "wb", "zhihu"]
+
+# 需要拦截的资源类型，取值参考 playwright Request.resource_type
+BLOCK_RESOURCE_TYPES = ["image", "media", "font"]
+
+# 需要拦截的统计上报请求，请求URL中包含以下任意关键字即拦截
+BLOCK_URL_KEYWORDS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "hm.baidu.com",
+    "cnzz.com",
+    "sentry",
+    "apm-fe.xiaohongshu.com",
+    "mcs.snssdk.com",
+    "mon.zijieapi.com",
+    "data.bilibili.com",
+    "log.zhihu.com",
+]
+
+# 是否开启HTTP响应缓存，开启后下面配置了缓存时间的接口在缓存时间内重复请求直接使用磁盘上的缓存，不再发起网络请求
+# 适合重复爬取时变化不频繁的数据，例如创作者主页、视频详情
+ENABLE_HTTP_CACHE = False
+
+# HTTP响应缓存文件路径
+HTTP_CACHE_PATH = "data/http_cache.sqlite3"
+
+# HTTP响应缓存的最大占用空间，单位字节，超出后淘汰最久未访问的响应
+HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# 各接口的缓存时间，单位秒，key 为请求URL路径的前缀，没有配置的接口不缓存
+HTTP_CACHE_TTLS = {
+    "/user/profile/": 24 * 3600,  # 小红书创作者主页
+    "/aweme/v1/web/aweme/detail/": 3600,  # 抖音视频详情
+    "/x/web-interface/view": 3600,  # B站视频详情
+    "/u/": 24 * 3600,  # 微博创作者容器ID
+    "/people/": 24 * 3600,  # 知乎创作者主页
+    "/home/main": 24 * 3600,  # 贴吧创作者主页
+}
+
+# 返回内容与登录账号有关的接口(URL路径前缀)，缓存key会加上请求cookie的摘要，不同账号的缓存互不共用
+# 例如B站 /x/web-interface/nav 返回当前账号的登录状态，如需缓存需要在上面配置缓存时间
+HTTP_CACHE_PER_ACCOUNT_PATHS = ["/x/web-interface/nav"]
+
+# 计算缓存key时忽略的请求参数，这些签名参数每次请求都不一样
+HTTP_CACHE_IGNORE_PARAMS = ["X-S", "X-T", "a_bogus", "w_rid", "wts"]
+
+# 是否录制请求和响应，开启后每次运行把平台接口的请求和响应保存到下面的目录，
+# 文件名为 {平台}_{爬取类型}.jsonl，用于离线回放和性能测试(见 replay/benchmark.py)
+ENABLE_REPLAY_RECORDING = False
+
+# 录制文件保存目录
+REPLAY_FIXTURES_DIR = "data/replay_fixtures"
+
+# 回放服务器地址，例如 http://127.0.0.1:8090，设置后所有平台请求都发到回放服务器(见 replay/server.py)，
+# 不启动浏览器、不登录，依赖浏览器的签名直接跳过。正常爬取时保持为空
+REPLAY_SERVER_URL = ""
+
+# 日志级别 DEBUG | INFO | WARNING | ERROR
+LOG_LEVEL = "INFO"
+
+# 日志输出格式，text 为普通文本，json 为每行一个 JSON 对象(结构化事件的字段展开成 JSON 字段)
+LOG_OUTPUT_FORMAT = "text"
+
+# 日志文件路径，为空时只输出到控制台
+LOG_FILE = ""
+
+# 是否由后台线程写日志，开启后事件循环里打日志只是放进队列，不会因为写控制台或磁盘阻塞
+ENABLE_ASYNC_LOG = True
+
+# 是否在日志中输出完整的接口响应和存储数据，关闭时只输出类型、长度和开头的一小段内容，大批量爬取时建议关闭
+ENABLE_LOG_PAYLOAD = False
+
+# 按事件名采样输出日志，value 为输出比例(0~1]，没有配置的事件全部输出
+# 例如 {"store.xhs.update_xhs_note_comment": 0.01} 表示每 100 条小红书评论只输出 1 条日志
+LOG_SAMPLE_RATES = {}
+
+# 是否开启 Prometheus 格式的 /metrics 接口(请求数、耗时、错误类型、存储条数、媒体下载)，
+# 不开启时指标仍然会记录，并在运行结束时输出汇总。常驻服务模式(daemon.py)直接在服务端口上提供 /metrics
+ENABLE_METRICS_SERVER = False
+
+# /metrics 接口的监听端口
+METRICS_SERVER_PORT = 9091
+
+# 是否用采样分析器运行本次爬取(命令行 --profile)，结束时输出各阶段(sign/request/parse/store/media)耗时汇总，
+# 并保存火焰图用的折叠栈文件；关闭时不启动采样线程，没有额外开销
+ENABLE_PROFILE = False
+
+# 折叠栈文件的保存目录
+PROFILE_SAVE_DIR = "data/profile"
+
+# 采样间隔(秒)，间隔越小结果越细，采样线程占用的 CPU 也越多
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+# 汇总里列出的耗时最多的函数个数
+PROFILE_TOP_N = 20
+
+# 是否按内容 id 记录链路追踪(搜索命中、详情、存储、媒体、评论各阶段的开始结束时间)，
+# 以 JSONL 写入 TRACE_SAVE_DIR，用 python -m tools.trace_report <文件> 查看各阶段耗时分位数和最慢的内容
+ENABLE_TRACE = False
+
+# 链路追踪文件的保存目录
+TRACE_SAVE_DIR = "data/trace"
+
+# 分布式爬取(distributed.py)的工作队列后端 redis | memory，redis 的连接配置见 db_config.py，
+# memory 只在单个进程内有效，用于测试
+WORK_QUEUE_BACKEND = "redis"
+
+# 工作队列名，作为 redis key 的前缀，不同的爬取批次可以使用不同的队列
+WORK_QUEUE_NAME = "media_crawler:work_queue"
+
+# 工作单元的可见性超时(秒)，工作进程每隔三分之一的超时时间续租一次，进程异常退出后超时的单元会被其他进程重新执行
+WORK_QUEUE_VISIBILITY_TIMEOUT = 600
+
+# 单个工作单元最多执行的次数，超过后放入死信队列
+WORK_QUEUE_MAX_ATTEMPTS = 3
+
+# 队列为空时工作进程的轮询间隔(秒)
+WORK_QUEUE_POLL_INTERVAL = 5
+
+# 各平台所有工作进程合计每秒最多发出的请求数，未配置的平台不限制
+WORK_QUEUE_RATE_BUDGETS = {
+    "xhs": 2,
+    "dy": 2,
+    "ks": 2,
+    "bili": 2,
+    "wb": 1,
+    "tieba": 2,
+    "zhihu": 2,
+}
+
+# 编排器(orchestrator.py)同时运行的平台任务，每个任务在独立的进程中运行，拥有自己的配置快照、浏览器和事件循环
+# platform: 平台；name: 可选，任务名，默认为平台名；overrides: 可选，该任务覆盖的配置项，例如 {"CRAWLER_TYPE": "creator"}
+ORCHESTRATOR_JOBS = [
+    {"platform": "xhs"},
+    {"platform": "dy"},
+    {"platform": "bili"},
+    {"platform": "wb"},
+]
+
+# 任务进程异常退出后最多重启的次数，重启时开启 ENABLE_RESUME 从断点继续
+ORCHESTRATOR_MAX_RESTARTS = 2
+
+# 任务进程重启前等待的秒数，每多重启一次等待时间翻倍
+ORCHESTRATOR_RESTART_BACKOFF_SEC = 30
+
+# 各任务进程上报进度和编排器汇总输出进度的间隔(秒)
+ORCHESTRATOR_PROGRESS_INTERVAL = 60
+
+# 所有任务进程合计的数据库连接数上限，平均分给各任务进程的连接池(SAVE_DATA_OPTION 为 db 时生效)
+ORCHESTRATOR_DB_MAX_CONNECTIONS = 20
+
 # 是否保存登录状态
 SAVE_LOGIN_STATE = True
 
@@ -54,6 +243,22 @@ USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
 # 爬取开始页数 默认从第一页开始
 START_PAGE = 1
 
+# 是否从上一次中断的位置继续爬取（断点续爬），开启后会忽略已经完成的关键词/创作者，并从记录的页码、游标处继续
+ENABLE_RESUME = False
+
+# 断点续爬的进度文件保存目录
+CHECKPOINT_SAVE_DIR = "data/checkpoint"
+
+# 常驻服务模式(python daemon.py)下预热并接收任务的平台，以英文逗号分隔
+DAEMON_PLATFORMS = "xhs"
+
+# 常驻服务模式的HTTP监听地址和端口
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8080
+
+# 常驻服务模式保留的已结束(完成或失败)任务数量，超出后最早结束的任务记录被删除，查询不到
+DAEMON_MAX_FINISHED_JOBS = 1000
+
 # 爬取视频/帖子的数量控制
 CRAWLER_MAX_NOTES_COUNT = 1000
 
@@ -192,5 +397,5 @@ END_DAY = '2025-03-20'
 
 # 是否开启按每一天进行爬取的选项，仅支持 bilibili 关键字搜索
 # 若为 False，则忽略 START_DAY 与 END_DAY 设置的值
-# 若为 True，则按照 START_DAY 至 END_DAY 按照每一天进行筛选，这样能够突破 1000 条视频的限制，最大程度爬取该关键词下的所有视频
+# 若为 True，则按照 START_DAY 至 END_DAY 的发布时间窗口进行筛选，结果数达到 1000 条上限的窗口会自动二分拆小，这样能够突破 1000 条视频的限制，最大程度爬取该关键词下的所有视频
 ALL_DAY = True
\ No newline at end of file
@@ -17,6 +17,7 @@ RELATION_DB_USER = os.getenv("RELATION_DB_USER", "nkuwiki")
 RELATION_DB_HOST = os.getenv("RELATION_DB_HOST", "113.44.175.112")
 RELATION_DB_PORT = os.getenv("RELATION_DB_PORT", 3306)
 RELATION_DB_NAME = os.getenv("RELATION_DB_NAME", "xhs")
+RELATION_DB_POOL_MAX_SIZE = int(os.getenv("RELATION_DB_POOL_MAX_SIZE", 10))  # mysql connection pool size
 
 
 # redis config
@@ -24,7 +25,19 @@ REDIS_DB_HOST = "127.0.0.1"  # your redis host
 REDIS_DB_PWD = os.getenv("REDIS_DB_PWD", "123456")  # your redis password
 REDIS_DB_PORT = os.getenv("REDIS_DB_PORT", 6379)  # your redis port
 REDIS_DB_NUM = os.getenv("REDIS_DB_NUM", 0)  # your redis db num
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 20))  # async redis connection pool size
 
 # cache type
 CACHE_TYPE_REDIS = "redis"
-CACHE_TYPE_MEMORY = "memory"
\ No newline at end of file
+CACHE_TYPE_MEMORY = "memory"
+CACHE_TYPE_SQLITE = "sqlite"
+
+# 代理IP、短信验证码等使用的缓存类型，可选 memory | sqlite | redis
+# memory 进程退出就丢失，sqlite 是单文件持久化缓存，多个进程可以共享，不需要部署 redis
+CACHE_TYPE = os.getenv("CACHE_TYPE", CACHE_TYPE_MEMORY)
+
+# sqlite 缓存文件路径
+SQLITE_CACHE_PATH = os.getenv("SQLITE_CACHE_PATH", "data/cache.sqlite3")
+
+# redis 缓存值的序列化方式，可选 pickle | json，json 方便其他语言的程序读取缓存
+CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "pickle")
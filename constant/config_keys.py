@@ -0,0 +1,46 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 按平台区分的配置项名称和搜索分页大小，常驻服务和分布式工作队列据此生成任务的配置覆盖项
+
+# detail 类型任务的 ids 对应的配置项
+SPECIFIED_ID_CONFIGS = {
+    "xhs": "XHS_SPECIFIED_NOTE_URL_LIST",
+    "dy": "DY_SPECIFIED_ID_LIST",
+    "ks": "KS_SPECIFIED_ID_LIST",
+    "bili": "BILI_SPECIFIED_ID_LIST",
+    "wb": "WEIBO_SPECIFIED_ID_LIST",
+    "tieba": "TIEBA_SPECIFIED_ID_LIST",
+    "zhihu": "ZHIHU_SPECIFIED_ID_LIST",
+}
+
+# creator 类型任务的 ids 对应的配置项
+CREATOR_ID_CONFIGS = {
+    "xhs": "XHS_CREATOR_ID_LIST",
+    "dy": "DY_CREATOR_ID_LIST",
+    "ks": "KS_CREATOR_ID_LIST",
+    "bili": "BILI_CREATOR_ID_LIST",
+    "wb": "WEIBO_CREATOR_ID_LIST",
+    "tieba": "TIEBA_CREATOR_URL_LIST",
+    "zhihu": "ZHIHU_CREATOR_URL_LIST",
+}
+
+# 各平台搜索接口每页的条数，与 media_platform 下各平台 search 中的 *_limit_count 一致
+SEARCH_PAGE_SIZES = {
+    "xhs": 20,
+    "dy": 10,
+    "ks": 20,
+    "bili": 20,
+    "wb": 10,
+    "tieba": 10,
+    "zhihu": 20,
+}
@@ -0,0 +1,326 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 常驻爬虫服务，各平台的浏览器上下文和客户端只初始化一次并保持预热，
+#            通过HTTP接口提交爬取任务，省去每次运行 main.py 时启动浏览器、登录的耗时
+#
+#            启动: python daemon.py --platforms xhs,dy --port 8080
+#            提交任务: curl -X POST http://127.0.0.1:8080/jobs -H 'Content-Type: application/json' \
+#                          -d '{"platform": "xhs", "crawler_type": "search", "keywords": ["编程副业"]}'
+#            查询任务: curl http://127.0.0.1:8080/jobs/<job_id>
+#
+#            同一平台共用一个登录会话，任务按提交顺序逐个执行；不同平台的任务并发执行。
+#            每个任务的参数只写入该任务自己的配置上下文(config.config_overrides_var)，互不影响。
+
+import argparse
+import asyncio
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from playwright.async_api import Playwright, async_playwright
+from pydantic import BaseModel, Field
+
+import config
+import db
+from base.base_crawler import AbstractCrawler
+from constant.config_keys import CREATOR_ID_CONFIGS, SPECIFIED_ID_CONFIGS
+from main import CrawlerFactory
+from tools import metrics, utils
+
+# 各平台数据保存目录，与 store 下各平台的存储实现保持一致
+PLATFORM_DATA_DIRS = {
+    "xhs": "data/xhs",
+    "dy": "data/douyin",
+    "ks": "data/kuaishou",
+    "bili": "data/bilibili",
+    "wb": "data/weibo",
+    "tieba": "data/tieba",
+    "zhihu": "data/zhihu",
+}
+
+
+class JobStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+
+class CrawlJobRequest(BaseModel):
+    platform: str = Field(title="平台, xhs | dy | ks | bili | wb | tieba | zhihu")
+    crawler_type: str = Field(default="search", title="爬取类型, search | detail | creator")
+    keywords: List[str] = Field(default_factory=list, title="search 类型的搜索关键词")
+    ids: List[str] = Field(default_factory=list, title="detail 类型的帖子ID/URL，或 creator 类型的创作者ID/URL")
+    max_notes_count: Optional[int] = Field(default=None, title="爬取帖子数量上限")
+    max_comments_count: Optional[int] = Field(default=None, title="单个帖子的一级评论数量上限")
+    enable_comments: Optional[bool] = Field(default=None, title="是否爬取评论")
+    enable_sub_comments: Optional[bool] = Field(default=None, title="是否爬取二级评论")
+    start_page: Optional[int] = Field(default=None, title="开始页数")
+
+
+class CrawlJob(BaseModel):
+    job_id: str
+    request: CrawlJobRequest
+    status: str = JobStatus.PENDING
+    error: str = ""
+    results_location: str = ""
+    created_at: int = 0
+    started_at: Optional[int] = None
+    finished_at: Optional[int] = None
+
+
+def build_config_overrides(request: CrawlJobRequest) -> Dict:
+    """
+    把任务参数转换成该任务上下文中的配置覆盖项
+    Args:
+        request: 任务参数
+
+    Returns:
+
+    """
+    overrides = {
+        "PLATFORM": request.platform,
+        "CRAWLER_TYPE": request.crawler_type,
+    }
+    if request.keywords:
+        overrides["KEYWORDS"] = ",".join(request.keywords)
+    if request.ids:
+        id_configs = SPECIFIED_ID_CONFIGS if request.crawler_type == "detail" else CREATOR_ID_CONFIGS
+        overrides[id_configs[request.platform]] = list(request.ids)
+    optional_fields = {
+        "CRAWLER_MAX_NOTES_COUNT": request.max_notes_count,
+        "CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES": request.max_comments_count,
+        "ENABLE_GET_COMMENTS": request.enable_comments,
+        "ENABLE_GET_SUB_COMMENTS": request.enable_sub_comments,
+        "START_PAGE": request.start_page,
+    }
+    for name, value in optional_fields.items():
+        if value is not None:
+            overrides[name] = value
+    return overrides
+
+
+def get_results_location(platform: str) -> str:
+    if config.SAVE_DATA_OPTION == "db":
+        return f"mysql://{config.RELATION_DB_HOST}:{config.RELATION_DB_PORT}/{config.RELATION_DB_NAME}"
+    if config.SAVE_DATA_OPTION == "json":
+        return f"{PLATFORM_DATA_DIRS[platform]}/json"
+    return PLATFORM_DATA_DIRS[platform]
+
+
+class PlatformWorker:
+    """
+    单个平台的常驻会话，浏览器上下文和客户端只初始化一次，队列中的任务依次复用该会话
+    """
+
+    def __init__(self, platform: str, playwright: Playwright):
+        self.platform = platform
+        self.playwright = playwright
+        self.crawler: AbstractCrawler = CrawlerFactory.create_crawler(platform)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.session_ready = False
+        self.current_job_id: Optional[str] = None
+
+    async def init_session(self) -> None:
+        utils.logger.info(f"[PlatformWorker.init_session] Begin init {self.platform} session ...")
+        await self.close_session()
+        await self.crawler.init_session(self.playwright)
+        self.session_ready = True
+        utils.logger.info(f"[PlatformWorker.init_session] {self.platform} session is ready")
+
+    async def close_session(self) -> None:
+        self.session_ready = False
+        account_pool = getattr(self.crawler, "account_pool", None)
+        if account_pool:
+            await account_pool.close()
+            self.crawler.account_pool = None
+            self.crawler.browser_context = None
+        browser_context = getattr(self.crawler, "browser_context", None)
+        if browser_context:
+            await browser_context.close()
+            self.crawler.browser_context = None
+
+    async def run(self) -> None:
+        # 会话初始化时读取的 config.PLATFORM 等配置只对本平台生效
+        config.enable_config_overrides()
+        config.config_overrides_var.set({"PLATFORM": self.platform})
+        try:
+            await self.init_session()
+        except Exception as e:
+            utils.logger.error(f"[PlatformWorker.run] Init {self.platform} session error: {e}, retry on next job")
+
+        while True:
+            job: CrawlJob = await self.queue.get()
+            try:
+                # 每个任务在独立的 task 中运行，任务内的配置修改和上下文变量不会带到下一个任务
+                await asyncio.create_task(self.run_job(job))
+            finally:
+                self.queue.task_done()
+
+    async def run_job(self, job: CrawlJob) -> None:
+        overrides = build_config_overrides(job.request)
+        # 断点续爬文件按任务隔离，同平台、同类型的任务不会互相覆盖或误续爬别的任务的进度
+        overrides["CHECKPOINT_SAVE_DIR"] = os.path.join(config.CHECKPOINT_SAVE_DIR, "daemon", job.job_id)
+        config.config_overrides_var.set(overrides)
+        self.current_job_id = job.job_id
+        job.status = JobStatus.RUNNING
+        job.started_at = utils.get_current_timestamp()
+        utils.logger.info(f"[PlatformWorker.run_job] Begin job {job.job_id}: {job.request}")
+        try:
+            if not self.session_ready:
+                await self.init_session()
+            await self.crawler.crawl()
+            job.status = JobStatus.FINISHED
+        except Exception as e:
+            utils.logger.error(f"[PlatformWorker.run_job] Job {job.job_id} error: {e}")
+            job.status = JobStatus.FAILED
+            job.error = repr(e)
+        finally:
+            job.finished_at = utils.get_current_timestamp()
+            self.current_job_id = None
+        utils.logger.info(f"[PlatformWorker.run_job] Job {job.job_id} {job.status}")
+
+
+class CrawlerDaemon:
+    def __init__(self, platforms: List[str]):
+        self.platforms = platforms
+        self.playwright: Optional[Playwright] = None
+        self.workers: Dict[str, PlatformWorker] = {}
+        self.worker_tasks: List[asyncio.Task] = []
+        self.jobs: Dict[str, CrawlJob] = {}
+
+    async def start(self) -> None:
+        if config.SAVE_DATA_OPTION == "db":
+            await db.init_db()
+        self.playwright = await async_playwright().start()
+        for platform in self.platforms:
+            worker = PlatformWorker(platform, self.playwright)
+            self.workers[platform] = worker
+            # worker 在这里创建，继承上面初始化的数据库连接等上下文变量
+            self.worker_tasks.append(asyncio.create_task(worker.run()))
+
+    async def stop(self) -> None:
+        for task in self.worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self.worker_tasks, return_exceptions=True)
+        for worker in self.workers.values():
+            try:
+                await worker.close_session()
+            except Exception as e:
+                utils.logger.error(f"[CrawlerDaemon.stop] Close {worker.platform} session error: {e}")
+        if self.playwright:
+            await self.playwright.stop()
+        if config.SAVE_DATA_OPTION == "db":
+            await db.close()
+
+    def submit(self, request: CrawlJobRequest) -> CrawlJob:
+        worker = self.workers.get(request.platform)
+        if not worker:
+            raise ValueError(f"Platform {request.platform} is not served by this daemon, served: {self.platforms}")
+        if request.crawler_type not in ("search", "detail", "creator"):
+            raise ValueError(f"Invalid crawler type: {request.crawler_type}")
+        if request.crawler_type != "search" and not request.ids:
+            raise ValueError(f"Crawler type {request.crawler_type} requires ids")
+
+        job = CrawlJob(
+            job_id=uuid.uuid4().hex,
+            request=request,
+            results_location=get_results_location(request.platform),
+            created_at=utils.get_current_timestamp(),
+        )
+        self.jobs[job.job_id] = job
+        worker.queue.put_nowait(job)
+        self.prune_jobs()
+        return job
+
+    def prune_jobs(self) -> None:
+        """
+        已结束的任务超过 DAEMON_MAX_FINISHED_JOBS 时，删除最早结束的任务记录，排队和运行中的任务不删除
+        """
+        finished_jobs = [job for job in self.jobs.values() if job.status in (JobStatus.FINISHED, JobStatus.FAILED)]
+        prune_count = len(finished_jobs) - config.DAEMON_MAX_FINISHED_JOBS
+        if prune_count <= 0:
+            return
+        finished_jobs.sort(key=lambda job: job.finished_at or 0)
+        for job in finished_jobs[:prune_count]:
+            del self.jobs[job.job_id]
+
+
+crawler_daemon = CrawlerDaemon(config.DAEMON_PLATFORMS.split(","))
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await crawler_daemon.start()
+    yield
+    await crawler_daemon.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.post("/jobs", status_code=status.HTTP_201_CREATED)
+async def submit_job(request: CrawlJobRequest) -> CrawlJob:
+    try:
+        return crawler_daemon.submit(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/jobs")
+async def list_jobs(job_status: Optional[str] = None) -> List[CrawlJob]:
+    return [job for job in crawler_daemon.jobs.values() if not job_status or job.status == job_status]
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> CrawlJob:
+    job = crawler_daemon.jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job Not Found")
+    return job
+
+
+@app.get("/platforms")
+async def list_platforms() -> Dict[str, Dict]:
+    return {
+        platform: {
+            "session_ready": worker.session_ready,
+            "current_job_id": worker.current_job_id,
+            "queued_jobs": worker.queue.qsize(),
+            "resource_blocking": worker.crawler.resource_blocker.stats() if getattr(
+                worker.crawler, "resource_blocker", None) else None,
+            "accounts": worker.crawler.account_pool.stats() if getattr(
+                worker.crawler, "account_pool", None) else None,
+        }
+        for platform, worker in crawler_daemon.workers.items()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Media crawler daemon.')
+    parser.add_argument('--platforms', type=str, default=config.DAEMON_PLATFORMS,
+                        help='Platforms to keep warm, separated by commas, e.g. xhs,dy')
+    parser.add_argument('--host', type=str, default=config.DAEMON_HOST, help='HTTP listen host')
+    parser.add_argument('--port', type=int, default=config.DAEMON_PORT, help='HTTP listen port')
+    args = parser.parse_args()
+    crawler_daemon.platforms = args.platforms.split(",")
+    uvicorn.run(app, port=args.port, host=args.host)
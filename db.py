@@ -38,6 +38,7 @@ async def init_mediacrawler_db():
         user=config.RELATION_DB_USER,
         password=config.RELATION_DB_PWD,
         db=config.RELATION_DB_NAME,
+        maxsize=config.RELATION_DB_POOL_MAX_SIZE,
         autocommit=True,
     )
     async_db_obj = AsyncMysqlDB(pool)
@@ -0,0 +1,164 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 分布式爬取，把一次大的爬取拆成工作单元放进共享的工作队列(默认 Redis)，由多台机器上的工作进程分摊
+#
+#            入队(协调进程): python distributed.py enqueue --platform xhs --type search_page --keywords 编程副业,编程兼职 --pages 5
+#                            python distributed.py enqueue --platform dy --type content --ids 7280854932641664319
+#            执行(每台机器可以启动多个): python distributed.py work --platform xhs [--exit_when_empty]
+#            查看进度: python distributed.py stats --platform xhs
+#
+#            同一个工作单元(同一关键词的同一页、同一条内容、同一个创作者)只会入队一次，
+#            工作进程异常退出后，它租用的单元在可见性超时后由其他进程重新执行；
+#            同一平台所有工作进程的请求共用 WORK_QUEUE_RATE_BUDGETS 中的速率预算
+
+import argparse
+import asyncio
+import os
+import socket
+from typing import List
+
+from playwright.async_api import async_playwright
+
+import config
+import db
+from constant.config_keys import CREATOR_ID_CONFIGS, SEARCH_PAGE_SIZES, SPECIFIED_ID_CONFIGS
+from main import CrawlerFactory
+from tools import metrics, utils
+from work_queue import AbstractWorkQueue, UnitType, WorkQueueFactory, WorkUnit
+from work_queue.worker import QueueWorker
+
+
+def create_work_queue() -> AbstractWorkQueue:
+    return WorkQueueFactory.create_work_queue(
+        config.WORK_QUEUE_BACKEND, config.WORK_QUEUE_MAX_ATTEMPTS, config.WORK_QUEUE_NAME
+    )
+
+
+def build_work_units(platform: str, unit_type: str, targets: List[str], pages: int = 1,
+                     start_page: int = 1) -> List[WorkUnit]:
+    """
+    生成工作单元，search_page 类型每个关键词拆成 pages 页
+    Args:
+        platform: 平台
+        unit_type: 工作单元类型
+        targets: 关键词，或内容、创作者的ID/URL
+        pages: 每个关键词爬取的页数
+        start_page: 开始页数
+
+    Returns:
+
+    """
+    if unit_type == UnitType.SEARCH_PAGE:
+        return [
+            WorkUnit(platform=platform, unit_type=unit_type, target=keyword, page=page)
+            for keyword in targets
+            for page in range(start_page, start_page + pages)
+        ]
+    return [WorkUnit(platform=platform, unit_type=unit_type, target=target) for target in targets]
+
+
+def get_default_targets(platform: str, unit_type: str) -> List[str]:
+    """
+    命令行没有指定关键词或ID时，使用配置文件中的关键词和ID列表
+    """
+    if unit_type == UnitType.SEARCH_PAGE:
+        return config.KEYWORDS.split(",")
+    if unit_type == UnitType.CREATOR:
+        return list(getattr(config, CREATOR_ID_CONFIGS[platform]))
+    return list(getattr(config, SPECIFIED_ID_CONFIGS[platform]))
+
+
+async def enqueue(args: argparse.Namespace) -> None:
+    targets = (args.keywords if args.type == UnitType.SEARCH_PAGE else args.ids) or \
+        get_default_targets(args.platform, args.type)
+    pages = args.pages or max(config.CRAWLER_MAX_NOTES_COUNT // SEARCH_PAGE_SIZES[args.platform], 1)
+    units = build_work_units(args.platform, args.type, targets, pages, args.start)
+    work_queue = create_work_queue()
+    try:
+        added = await work_queue.enqueue(units)
+        utils.logger.info(
+            f"[distributed.enqueue] Enqueued {added} of {len(units)} work units, "
+            f"the others were enqueued before, queue stats: {await work_queue.stats(args.platform)}"
+        )
+    finally:
+        await work_queue.close()
+
+
+async def work(args: argparse.Namespace) -> None:
+    config.PLATFORM = args.platform
+    if config.SAVE_DATA_OPTION == "db":
+        await db.init_db()
+    if config.ENABLE_METRICS_SERVER:
+        metrics.start_metrics_server(config.METRICS_SERVER_PORT)
+
+    work_queue = create_work_queue()
+    crawler = CrawlerFactory.create_crawler(platform=args.platform)
+    async with async_playwright() as playwright:
+        await crawler.init_session(playwright)
+        worker = QueueWorker(work_queue, args.platform, crawler, args.worker_id)
+        try:
+            await worker.run(exit_when_empty=args.exit_when_empty)
+        finally:
+            await work_queue.close()
+            if getattr(crawler, "browser_context", None):
+                await crawler.browser_context.close()
+            if config.SAVE_DATA_OPTION == "db":
+                await db.close()
+
+    for line in metrics.format_summary():
+        utils.logger.info(line)
+
+
+async def show_stats(args: argparse.Namespace) -> None:
+    work_queue = create_work_queue()
+    try:
+        utils.logger.info(f"[distributed.stats] {args.platform}: {await work_queue.stats(args.platform)}")
+    finally:
+        await work_queue.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Media crawler distributed work queue.')
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    platform_choices = list(CrawlerFactory.CRAWLERS)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="split the crawl into work units and enqueue them")
+    enqueue_parser.add_argument('--platform', type=str, choices=platform_choices, default=config.PLATFORM)
+    enqueue_parser.add_argument('--type', type=str, choices=UnitType.ALL, default=UnitType.SEARCH_PAGE,
+                                help='work unit type')
+    enqueue_parser.add_argument('--keywords', type=lambda value: value.split(","), default=None,
+                                help='keywords separated by commas, default config.KEYWORDS')
+    enqueue_parser.add_argument('--ids', type=lambda value: value.split(","), default=None,
+                                help='content or creator ids/urls separated by commas, default the id list in config')
+    enqueue_parser.add_argument('--pages', type=int, default=None,
+                                help='pages of each keyword, default CRAWLER_MAX_NOTES_COUNT / page size')
+    enqueue_parser.add_argument('--start', type=int, default=config.START_PAGE, help='number of start page')
+
+    work_parser = subparsers.add_parser("work", help="lease and execute work units of a platform")
+    work_parser.add_argument('--platform', type=str, choices=platform_choices, default=config.PLATFORM)
+    work_parser.add_argument('--worker_id', type=str, default=f"{socket.gethostname()}-{os.getpid()}")
+    work_parser.add_argument('--exit_when_empty', action='store_true',
+                             help='exit when no work unit of the platform is pending or leased')
+
+    stats_parser = subparsers.add_parser("stats", help="show the queue stats of a platform")
+    stats_parser.add_argument('--platform', type=str, choices=platform_choices, default=config.PLATFORM)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    cmd_args = parse_args()
+    commands = {"enqueue": enqueue, "work": work, "stats": show_stats}
+    try:
+        asyncio.get_event_loop().run_until_complete(commands[cmd_args.command](cmd_args))
+    except KeyboardInterrupt:
+        pass
@@ -10,37 +10,40 @@
 
 
 import asyncio
+import importlib
 import sys
+from typing import Type
 
 import cmd_arg
 import config
 import db
 from base.base_crawler import AbstractCrawler
-from media_platform.bilibili import BilibiliCrawler
-from media_platform.douyin import DouYinCrawler
-from media_platform.kuaishou import KuaishouCrawler
-from media_platform.tieba import TieBaCrawler
-from media_platform.weibo import WeiboCrawler
-from media_platform.xhs import XiaoHongShuCrawler
-from media_platform.zhihu import ZhihuCrawler
+from tools import metrics, utils
 
 
 class CrawlerFactory:
+    # 平台 -> (模块路径, 爬虫类名)，只在创建爬虫时导入所选平台，避免启动时加载全部平台及其依赖
     CRAWLERS = {
-        "xhs": XiaoHongShuCrawler,
-        "dy": DouYinCrawler,
-        "ks": KuaishouCrawler,
-        "bili": BilibiliCrawler,
-        "wb": WeiboCrawler,
-        "tieba": TieBaCrawler,
-        "zhihu": ZhihuCrawler
+        "xhs": ("media_platform.xhs", "XiaoHongShuCrawler"),
+        "dy": ("media_platform.douyin", "DouYinCrawler"),
+        "ks": ("media_platform.kuaishou", "KuaishouCrawler"),
+        "bili": ("media_platform.bilibili", "BilibiliCrawler"),
+        "wb": ("media_platform.weibo", "WeiboCrawler"),
+        "tieba": ("media_platform.tieba", "TieBaCrawler"),
+        "zhihu": ("media_platform.zhihu", "ZhihuCrawler")
     }
 
     @staticmethod
-    def create_crawler(platform: str) -> AbstractCrawler:
-        crawler_class = CrawlerFactory.CRAWLERS.get(platform)
-        if not crawler_class:
+    def get_crawler_class(platform: str) -> Type[AbstractCrawler]:
+        crawler_path = CrawlerFactory.CRAWLERS.get(platform)
+        if not crawler_path:
             raise ValueError("Invalid Media Platform Currently only supported xhs or dy or ks or bili ...")
+        module_path, class_name = crawler_path
+        return getattr(importlib.import_module(module_path), class_name)
+
+    @staticmethod
+    def create_crawler(platform: str) -> AbstractCrawler:
+        crawler_class = CrawlerFactory.get_crawler_class(platform)
         return crawler_class()
 
 
@@ -52,12 +55,40 @@ async def main():
     if config.SAVE_DATA_OPTION == "db":
         await db.init_db()
 
+    if config.ENABLE_METRICS_SERVER:
+        metrics.start_metrics_server(config.METRICS_SERVER_PORT)
+
+    if config.ENABLE_REPLAY_RECORDING:
+        import replay
+        replay.start_recording(replay.get_fixture_path(config.PLATFORM, config.CRAWLER_TYPE))
+
+    profiler = None
+    if config.ENABLE_PROFILE:
+        from tools.profiler import AsyncioProfiler
+        profiler = AsyncioProfiler(interval=config.PROFILE_SAMPLE_INTERVAL)
+        profiler.start()
+
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
-    await crawler.start()
+    try:
+        await crawler.start()
+    finally:
+        if profiler:
+            profiler.stop()
+            prefix = f"{config.PLATFORM}_{config.CRAWLER_TYPE}_{utils.get_current_date()}_{utils.get_current_timestamp()}"
+            cpu_file, wall_file = profiler.save(config.PROFILE_SAVE_DIR, prefix)
+            for line in profiler.format_summary(config.PROFILE_TOP_N):
+                utils.logger.info(line)
+            utils.logger.info(f"[profile] flame graph stacks saved to {cpu_file} and {wall_file}")
+
+    if config.ENABLE_REPLAY_RECORDING:
+        replay.stop_recording()
 
     if config.SAVE_DATA_OPTION == "db":
         await db.close()
 
+    for line in metrics.format_summary():
+        utils.logger.info(line)
+
     
 
 if __name__ == '__main__':
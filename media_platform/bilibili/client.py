@@ -22,9 +22,12 @@ import httpx
 from playwright.async_api import BrowserContext, Page
 
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from cache.http_response_cache import cache_response
+from proxy.proxy_ip_pool import ProxyIpPool, rotate_proxy
+from tools import metrics, utils
+from work_queue.rate_budget import limit_request_rate
 
-from .exception import DataFetchError
+from .exception import DataFetchError, RiskControlError
 from .field import CommentOrderType, SearchOrderType
 from .help import BilibiliSign
 
@@ -40,19 +43,29 @@ class BilibiliClient(AbstractApiClient):
             cookie_dict: Dict[str, str],
     ):
         self.proxies = proxies
+        # 设置后每个请求从代理池轮换代理IP
+        self.ip_pool: Optional[ProxyIpPool] = None
         self.timeout = timeout
         self.headers = headers
         self._host = "https://api.bilibili.com"
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict
+        self.RISK_CONTROL_CODES = (-352, -412)
 
+    @cache_response
+    @rotate_proxy(ban_exceptions=(RiskControlError,))
+    @limit_request_rate
+    @metrics.record_request
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        proxies = kwargs.pop("proxies", None) or self.proxies
+        async with httpx.AsyncClient(proxies=proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 **kwargs
             )
         data: Dict = response.json()
+        if data.get("code") in self.RISK_CONTROL_CODES:
+            raise RiskControlError(data.get("message", "risk control"))
         if data.get("code") != 0:
             raise DataFetchError(data.get("message", "unkonw error"))
         else:
@@ -110,7 +123,9 @@ class BilibiliClient(AbstractApiClient):
         ping_flag = False
         try:
             check_login_uri = "/x/web-interface/nav"
-            response = await self.get(check_login_uri)
+            # 登录状态不能使用缓存，cookie 过期后缓存里仍然是已登录
+            response = await self.request(method="GET", url=f"{self._host}{check_login_uri}",
+                                          headers=self.headers, skip_cache=True)
             if response.get("isLogin"):
                 utils.logger.info(
                     "[BilibiliClient.pong] Use cache login state get web interface successfull!")
@@ -191,6 +206,7 @@ class BilibiliClient(AbstractApiClient):
 
         return await self.get(uri, params, enable_params_sign=True)
 
+    @metrics.record_media_download("video")
     async def get_video_media(self, url: str) -> Union[bytes, None]:
         async with httpx.AsyncClient(proxies=self.proxies) as client:
             response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
@@ -20,20 +20,25 @@ import random
 from asyncio import Task
 from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
-import pandas as pd
 
-from playwright.async_api import (BrowserContext, BrowserType, Page, async_playwright)
+from playwright.async_api import (BrowserContext, BrowserType, Page, Playwright, async_playwright)
 
 import config
+from account import AccountPool, init_account_sessions
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from replay import init_replay_session
 from store import bilibili as bilibili_store
-from tools import utils
+from tools import tracing, utils
+from tools.checkpoint import CrawlerCheckpoint
+from tools.resource_blocker import BrowserResourceBlocker, block_browser_resources
 from var import crawler_type_var, source_keyword_var
 
 from .client import BilibiliClient
-from .exception import DataFetchError
+from .exception import DataFetchError, RiskControlError
 from .field import SearchOrderType
+from .help import (BILI_MIN_TIME_WINDOW_SEC, BILI_SEARCH_PAGE_SIZE,
+                   BILI_SEARCH_RESULT_CAP, split_time_window)
 from .login import BilibiliLogin
 
 
@@ -41,12 +46,37 @@ class BilibiliCrawler(AbstractCrawler):
     context_page: Page
     bili_client: BilibiliClient
     browser_context: BrowserContext
+    checkpoint: CrawlerCheckpoint
+    resource_blocker: Optional[BrowserResourceBlocker] = None
+    account_pool: Optional[AccountPool] = None
 
     def __init__(self):
         self.index_url = "https://www.bilibili.com"
         self.user_agent = utils.get_user_agent()
 
     async def start(self):
+        async with async_playwright() as playwright:
+            await self.init_session(playwright)
+            await self.crawl()
+
+    async def init_session(self, playwright: Playwright) -> None:
+        """
+        Launch the browser context, create the api client and login if needed,
+        the session can be reused by multiple crawl jobs (see daemon.py)
+        Args:
+            playwright: playwright instance
+
+        Returns:
+
+        """
+        if await init_account_sessions(self, playwright, "bili_client", (RiskControlError,)):
+            # 配置了多账号，每个账号的会话已经单独初始化
+            return
+
+        if await init_replay_session(self, "bili_client", self.create_bilibili_client):
+            # 回放模式，请求发到本地回放服务器，不启动浏览器
+            return
+
         playwright_proxy_format, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
@@ -54,47 +84,62 @@ class BilibiliCrawler(AbstractCrawler):
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(
                 ip_proxy_info)
 
-        async with async_playwright() as playwright:
-            # Launch a browser context.
-            chromium = playwright.chromium
-            self.browser_context = await self.launch_browser(
-                chromium,
-                None,
-                self.user_agent,
-                headless=config.HEADLESS
+        # Launch a browser context.
+        chromium = playwright.chromium
+        self.browser_context = await self.launch_browser(
+            chromium,
+            None,
+            self.user_agent,
+            headless=config.HEADLESS
+        )
+        # stealth.min.js is a js script to prevent the website from detecting the crawler.
+        await self.browser_context.add_init_script(path="libs/stealth.min.js")
+        self.context_page = await self.browser_context.new_page()
+        await self.context_page.goto(self.index_url)
+
+        # Create a client to interact with the xiaohongshu website.
+        self.bili_client = await self.create_bilibili_client(httpx_proxy_format)
+        if config.ENABLE_IP_PROXY:
+            # 每个请求(或每N个请求)从代理池中轮换代理IP
+            self.bili_client.ip_pool = ip_proxy_pool
+        if not await self.bili_client.pong():
+            login_obj = BilibiliLogin(
+                login_type=config.LOGIN_TYPE,
+                login_phone="",  # your phone number
+                browser_context=self.browser_context,
+                context_page=self.context_page,
+                cookie_str=config.COOKIES
             )
-            # stealth.min.js is a js script to prevent the website from detecting the crawler.
-            await self.browser_context.add_init_script(path="libs/stealth.min.js")
-            self.context_page = await self.browser_context.new_page()
-            await self.context_page.goto(self.index_url)
-
-            # Create a client to interact with the xiaohongshu website.
-            self.bili_client = await self.create_bilibili_client(httpx_proxy_format)
-            if not await self.bili_client.pong():
-                login_obj = BilibiliLogin(
-                    login_type=config.LOGIN_TYPE,
-                    login_phone="",  # your phone number
-                    browser_context=self.browser_context,
-                    context_page=self.context_page,
-                    cookie_str=config.COOKIES
-                )
-                await login_obj.begin()
-                await self.bili_client.update_cookies(browser_context=self.browser_context)
-
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for video and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_videos(config.BILI_SPECIFIED_ID_LIST)
-            elif config.CRAWLER_TYPE == "creator":
-                for creator_id in config.BILI_CREATOR_ID_LIST:
-                    await self.get_creator_videos(int(creator_id))
-            else:
-                pass
-            utils.logger.info(
-                "[BilibiliCrawler.start] Bilibili Crawler finished ...")
+            await login_obj.begin()
+            await self.bili_client.update_cookies(browser_context=self.browser_context)
+
+        if config.ENABLE_RESOURCE_BLOCKING:
+            # 登录后页面只用于读取localStorage和刷新cookie，固定到同源的轻量页面即可
+            self.resource_blocker = await block_browser_resources(
+                self.browser_context, self.context_page, pin_url=f"{self.index_url}/robots.txt"
+            )
+
+    async def crawl(self) -> None:
+        """
+        Run a crawl job of config.CRAWLER_TYPE with the current session
+        Returns:
+
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        self.checkpoint = CrawlerCheckpoint(config.PLATFORM, config.CRAWLER_TYPE)
+        if config.CRAWLER_TYPE == "search":
+            # Search for video and retrieve their comment information.
+            await self.search()
+        elif config.CRAWLER_TYPE == "detail":
+            # Get the information and comments of the specified post
+            await self.get_specified_videos(config.BILI_SPECIFIED_ID_LIST)
+        elif config.CRAWLER_TYPE == "creator":
+            for creator_id in config.BILI_CREATOR_ID_LIST:
+                await self.get_creator_videos(int(creator_id))
+        else:
+            pass
+
+        utils.logger.info("[BilibiliCrawler.crawl] Bilibili Crawler finished ...")
 
     @staticmethod
     async def get_pubtime_datetime(start: str = config.START_DAY, end: str = config.END_DAY) -> Tuple[str, str]:
@@ -138,10 +183,16 @@ class BilibiliCrawler(AbstractCrawler):
         start_page = config.START_PAGE  # start page number
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
+            checkpoint_key = f"keyword:{keyword}"
+            if self.checkpoint.is_finished(checkpoint_key):
+                utils.logger.info(f"[BilibiliCrawler.search] Keyword {keyword} finished in the last run, skip it")
+                continue
             utils.logger.info(f"[BilibiliCrawler.search] Current search keyword: {keyword}")
+            await self.resume_pending_comments(checkpoint_key)
+            progress = self.checkpoint.get(checkpoint_key)
             # 每个关键词最多返回 1000 条数据
             if not config.ALL_DAY:
-                page = 1
+                page = progress.get("page", 1)
                 while (page - start_page + 1) * bili_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
                     if page < start_page:
                         utils.logger.info(f"[BilibiliCrawler.search] Skip page: {page}")
@@ -149,7 +200,6 @@ class BilibiliCrawler(AbstractCrawler):
                         continue
 
                     utils.logger.info(f"[BilibiliCrawler.search] search bilibili keyword: {keyword}, page: {page}")
-                    video_id_list: List[str] = []
                     videos_res = await self.bili_client.search_video_by_keyword(
                         keyword=keyword,
                         page=page,
@@ -161,63 +211,182 @@ class BilibiliCrawler(AbstractCrawler):
                     video_list: List[Dict] = videos_res.get("result")
 
                     semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-                    task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
-                    video_items = await asyncio.gather(*task_list)
-                    for video_item in video_items:
-                        if video_item:
-                            video_id_list.append(video_item.get("View").get("aid"))
-                            await bilibili_store.update_bilibili_video(video_item)
-                            await bilibili_store.update_up_info(video_item)
-                            await self.get_bilibili_video(video_item, semaphore)
+                    video_id_list = await self.store_search_videos(video_list, semaphore)
                     page += 1
+                    self.checkpoint.save(checkpoint_key, page=page, pending=video_id_list)
                     await self.batch_get_video_comments(video_id_list)
-            # 按照 START_DAY 至 END_DAY 按照每一天进行筛选，这样能够突破 1000 条视频的限制，最大程度爬取该关键词下的所有视频
+                    self.checkpoint.save(checkpoint_key, pending=[])
+                self.checkpoint.finish(checkpoint_key)
+            # 按照 START_DAY 至 END_DAY 的发布时间窗口进行筛选，这样能够突破 1000 条视频的限制，最大程度爬取该关键词下的所有视频
             else:
-                for day in pd.date_range(start=config.START_DAY, end=config.END_DAY, freq='D'):
-                    # 按照每一天进行爬取的时间戳参数
-                    pubtime_begin_s, pubtime_end_s = await self.get_pubtime_datetime(start=day.strftime('%Y-%m-%d'), end=day.strftime('%Y-%m-%d'))
-                    page = 1
-                    while (page - start_page + 1) * bili_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
-                        # ! Catch any error if response return nothing, go to next day
-                        try:
-                            # ! Don't skip any page, to make sure gather all video in one day
-                            # if page < start_page:
-                            #     utils.logger.info(f"[BilibiliCrawler.search] Skip page: {page}")
-                            #     page += 1
-                            #     continue
-
-                            utils.logger.info(f"[BilibiliCrawler.search] search bilibili keyword: {keyword}, date: {day.ctime()}, page: {page}")
-                            video_id_list: List[str] = []
-                            videos_res = await self.bili_client.search_video_by_keyword(
-                                keyword=keyword,
-                                page=page,
-                                page_size=bili_limit_count,
-                                order=SearchOrderType.DEFAULT,
-                                pubtime_begin_s=pubtime_begin_s,  # 作品发布日期起始时间戳
-                                pubtime_end_s=pubtime_end_s  # 作品发布日期结束日期时间戳
-                            )
-                            video_list: List[Dict] = videos_res.get("result")
-
-                            semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-                            task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
-                            video_items = await asyncio.gather(*task_list)
-                            for video_item in video_items:
-                                if video_item:
-                                    video_id_list.append(video_item.get("View").get("aid"))
-                                    await bilibili_store.update_bilibili_video(video_item)
-                                    await bilibili_store.update_up_info(video_item)
-                                    await self.get_bilibili_video(video_item, semaphore)
-                            page += 1
-                            await self.batch_get_video_comments(video_id_list)
-                        # go to next day
-                        except Exception as e:
-                            print(e)
-                            break
-
-    async def batch_get_video_comments(self, video_id_list: List[str]):
+                if await self.search_by_time_window(keyword, checkpoint_key):
+                    self.checkpoint.finish(checkpoint_key)
+
+    async def store_search_videos(self, video_list: List[Dict], semaphore: asyncio.Semaphore) -> List[str]:
+        """
+        get the detail of the searched videos and store them
+        :param video_list: video list of the search result
+        :param semaphore:
+        :return: aid list of the stored videos
+        """
+        video_id_list: List[str] = []
+        for video_item in video_list:
+            tracing.event("discovered", video_item.get("aid"), keyword=source_keyword_var.get())
+        task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
+        video_items = await asyncio.gather(*task_list)
+        for video_item in video_items:
+            if video_item:
+                video_id_list.append(video_item.get("View").get("aid"))
+                await bilibili_store.update_bilibili_video(video_item)
+                await bilibili_store.update_up_info(video_item)
+                await self.get_bilibili_video(video_item, semaphore)
+        return video_id_list
+
+    async def search_by_time_window(self, keyword: str, checkpoint_key: str) -> bool:
+        """
+        search videos published between START_DAY and END_DAY
+        先查询整个时间范围，只有结果数达到 1000 条上限的时间窗口才二分拆成更小的窗口继续查询，
+        结果数很少甚至为 0 的时间段只需要一次请求，互不重叠的窗口并发爬取
+        每个窗口的结果数会缓存到断点文件中，断点续爬时不需要重新探测
+        :param keyword:
+        :param checkpoint_key: checkpoint key of the keyword
+        :return: whether all time windows are finished
+        """
+        pubtime_begin_s, pubtime_end_s = await self.get_pubtime_datetime(start=config.START_DAY, end=config.END_DAY)
+        window_counts: Dict[str, int] = self.checkpoint.get(checkpoint_key).get("window_counts", {})
+        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        return await self.search_time_window(
+            keyword, int(pubtime_begin_s), int(pubtime_end_s), window_counts, checkpoint_key, semaphore
+        )
+
+    async def search_time_window(self, keyword: str, begin_ts: int, end_ts: int, window_counts: Dict[str, int],
+                                 checkpoint_key: str, semaphore: asyncio.Semaphore) -> bool:
+        """
+        search one publish time window, bisect it when the result count hits the cap
+        :param keyword:
+        :param begin_ts: 发布时间起始时间戳（包含）
+        :param end_ts: 发布时间结束时间戳（包含）
+        :param window_counts: 时间窗口 -> 结果数 的缓存
+        :param checkpoint_key: checkpoint key of the keyword
+        :param semaphore:
+        :return: whether the window is finished
+        """
+        window_key = f"{begin_ts}-{end_ts}"
+        window_checkpoint_key = f"{checkpoint_key}:window:{window_key}"
+        if self.checkpoint.is_finished(window_checkpoint_key):
+            return True
+
+        first_page_res: Optional[Dict] = None
+        result_count = window_counts.get(window_key)
+        if result_count is None:
+            try:
+                first_page_res = await self.search_window_page(keyword, begin_ts, end_ts, 1, semaphore)
+            except Exception as e:
+                utils.logger.error(f"[BilibiliCrawler.search_time_window] probe window {window_key} err: {e}")
+                return False
+            result_count = first_page_res.get("numResults", 0)
+            window_counts[window_key] = result_count
+            self.checkpoint.save(checkpoint_key, window_counts=window_counts)
+
+        utils.logger.info(f"[BilibiliCrawler.search_time_window] keyword: {keyword}, window: "
+                          f"{utils.get_time_str_from_unix_time(begin_ts)} - {utils.get_time_str_from_unix_time(end_ts)}, "
+                          f"result count: {result_count}")
+        if result_count >= BILI_SEARCH_RESULT_CAP and end_ts - begin_ts + 1 > BILI_MIN_TIME_WINDOW_SEC:
+            (left_begin, left_end), (right_begin, right_end) = split_time_window(begin_ts, end_ts)
+            results = await asyncio.gather(
+                self.search_time_window(keyword, left_begin, left_end, window_counts, checkpoint_key, semaphore),
+                self.search_time_window(keyword, right_begin, right_end, window_counts, checkpoint_key, semaphore),
+            )
+            return all(results)
+
+        if result_count > 0:
+            if not await self.crawl_time_window(keyword, begin_ts, end_ts, window_checkpoint_key, first_page_res,
+                                                semaphore):
+                return False
+        self.checkpoint.finish(window_checkpoint_key)
+        return True
+
+    async def search_window_page(self, keyword: str, begin_ts: int, end_ts: int, page: int,
+                                 semaphore: asyncio.Semaphore) -> Dict:
+        """
+        search one page of a publish time window
+        :param keyword:
+        :param begin_ts:
+        :param end_ts:
+        :param page:
+        :param semaphore:
+        :return:
+        """
+        async with semaphore:
+            utils.logger.info(f"[BilibiliCrawler.search_window_page] search bilibili keyword: {keyword}, "
+                              f"window: {begin_ts}-{end_ts}, page: {page}")
+            return await self.bili_client.search_video_by_keyword(
+                keyword=keyword,
+                page=page,
+                page_size=BILI_SEARCH_PAGE_SIZE,
+                order=SearchOrderType.DEFAULT,
+                pubtime_begin_s=begin_ts,  # 作品发布日期起始时间戳
+                pubtime_end_s=end_ts  # 作品发布日期结束日期时间戳
+            )
+
+    async def crawl_time_window(self, keyword: str, begin_ts: int, end_ts: int, window_checkpoint_key: str,
+                                first_page_res: Optional[Dict], semaphore: asyncio.Semaphore) -> bool:
+        """
+        crawl all pages of a publish time window whose result count is under the cap
+        :param keyword:
+        :param begin_ts:
+        :param end_ts:
+        :param window_checkpoint_key:
+        :param first_page_res: 探测窗口时已经拿到的第一页结果，避免重复请求
+        :param semaphore:
+        :return: whether the window is finished
+        """
+        await self.resume_pending_comments(window_checkpoint_key, semaphore)
+        page = self.checkpoint.get(window_checkpoint_key).get("page", 1)
+        while page * BILI_SEARCH_PAGE_SIZE <= config.CRAWLER_MAX_NOTES_COUNT:
+            try:
+                if page == 1 and first_page_res is not None:
+                    videos_res = first_page_res
+                else:
+                    videos_res = await self.search_window_page(keyword, begin_ts, end_ts, page, semaphore)
+                video_list: List[Dict] = videos_res.get("result") or []
+                if not video_list:
+                    break
+                video_id_list = await self.store_search_videos(video_list, semaphore)
+                page += 1
+                self.checkpoint.save(window_checkpoint_key, page=page, pending=video_id_list)
+                # 并发爬取的窗口共用同一个信号量，评论请求的总并发数不超过 MAX_CONCURRENCY_NUM
+                await self.batch_get_video_comments(video_id_list, semaphore)
+                self.checkpoint.save(window_checkpoint_key, pending=[])
+                if page > videos_res.get("numPages", 0):
+                    break
+            except Exception as e:
+                utils.logger.error(f"[BilibiliCrawler.crawl_time_window] crawl window {begin_ts}-{end_ts} "
+                                   f"page: {page} err: {e}")
+                return False
+        return True
+
+    async def resume_pending_comments(self, checkpoint_key: str, semaphore: Optional[asyncio.Semaphore] = None):
+        """
+        get comments of the videos which were stored in the last run but whose comments were not finished
+        :param checkpoint_key:
+        :param semaphore: 调用方共用的信号量，默认新建一个
+        :return:
+        """
+        pending = self.checkpoint.get_pending(checkpoint_key)
+        if not pending:
+            return
+        utils.logger.info(
+            f"[BilibiliCrawler.resume_pending_comments] Resume {len(pending)} pending videos of {checkpoint_key}")
+        await self.batch_get_video_comments(pending, semaphore)
+        self.checkpoint.save(checkpoint_key, pending=[])
+
+    async def batch_get_video_comments(self, video_id_list: List[str],
+                                       semaphore: Optional[asyncio.Semaphore] = None):
         """
         batch get video comments
         :param video_id_list:
+        :param semaphore: 调用方共用的信号量，默认新建一个
         :return:
         """
         if not config.ENABLE_GET_COMMENTS:
@@ -227,7 +396,7 @@ class BilibiliCrawler(AbstractCrawler):
 
         utils.logger.info(
             f"[BilibiliCrawler.batch_get_video_comments] video ids:{video_id_list}")
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = semaphore or asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
         for video_id in video_id_list:
             task = asyncio.create_task(self.get_comments(
@@ -235,6 +404,7 @@ class BilibiliCrawler(AbstractCrawler):
             task_list.append(task)
         await asyncio.gather(*task_list)
 
+    @tracing.trace_stage("comments", "video_id")
     async def get_comments(self, video_id: str, semaphore: asyncio.Semaphore):
         """
         get comment for video id
@@ -302,6 +472,7 @@ class BilibiliCrawler(AbstractCrawler):
                 await self.get_bilibili_video(video_detail, semaphore)
         await self.batch_get_video_comments(video_aids_list)
 
+    @tracing.trace_stage("detail", lambda self, aid, bvid, semaphore: aid or bvid)
     async def get_video_info_task(self, aid: int, bvid: str, semaphore: asyncio.Semaphore) -> Optional[Dict]:
         """
         Get video detail task
@@ -424,6 +595,7 @@ class BilibiliCrawler(AbstractCrawler):
             )
             return browser_context
 
+    @tracing.trace_stage("media", "video_item.View.aid")
     async def get_bilibili_video(self, video_item: Dict, semaphore: asyncio.Semaphore):
         """
         download bilibili video
@@ -23,3 +23,7 @@ class DataFetchError(RequestError):
 
 class IPBlockError(RequestError):
     """fetch so fast that the server block us ip"""
+
+
+class RiskControlError(DataFetchError):
+    """the request is intercepted by risk control (code -352 / -412)"""
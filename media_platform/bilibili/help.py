@@ -16,10 +16,17 @@
 # 逆向实现参考：https://socialsisteryi.github.io/bilibili-API-collect/docs/misc/sign/wbi.html#wbi%E7%AD%BE%E5%90%8D%E7%AE%97%E6%B3%95
 import urllib.parse
 from hashlib import md5
-from typing import Dict
+from typing import Dict, Tuple
 
 from tools import utils
 
+# 关键词搜索接口单个查询条件最多返回的结果数
+BILI_SEARCH_RESULT_CAP = 1000
+# 关键词搜索接口每页的数量
+BILI_SEARCH_PAGE_SIZE = 20
+# 按发布时间窗口搜索时，窗口拆分的最小粒度（秒），小于该粒度的窗口即使结果数达到上限也不再拆分
+BILI_MIN_TIME_WINDOW_SEC = 60 * 60
+
 
 class BilibiliSign:
     def __init__(self, img_key: str, sub_key: str):
@@ -66,6 +73,17 @@ class BilibiliSign:
         return req_data
 
 
+def split_time_window(begin_ts: int, end_ts: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    将发布时间窗口 [begin_ts, end_ts] 二分为两个互不重叠的窗口，两端均为闭区间
+    :param begin_ts: 起始时间戳（秒）
+    :param end_ts: 结束时间戳（秒）
+    :return:
+    """
+    mid_ts = begin_ts + (end_ts - begin_ts) // 2
+    return (begin_ts, mid_ts), (mid_ts + 1, end_ts)
+
+
 if __name__ == '__main__':
     _img_key = "7cd084941338484aae1ad9425b84077c"
     _sub_key = "4932caff0ff746eab6f01bf08b70ac45"
@@ -19,8 +19,10 @@ import requests
 from playwright.async_api import BrowserContext
 
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from cache.http_response_cache import cache_response
+from tools import metrics, utils
 from var import request_keyword_var
+from work_queue.rate_budget import limit_request_rate
 
 from .exception import *
 from .field import *
@@ -91,16 +93,19 @@ class DOUYINClient(AbstractApiClient):
         a_bogus = await get_a_bogus(uri, query_string, post_data, headers["User-Agent"], self.playwright_page)
         params["a_bogus"] = a_bogus
 
+    @cache_response
+    @limit_request_rate
+    @metrics.record_request
     async def request(self, method, url, **kwargs):
         response = None
         if method == "GET":
             response = requests.request(method, url, **kwargs)
         elif method == "POST":
             response = requests.request(method, url, **kwargs)
+        if response.text == "" or response.text == "blocked":
+            utils.logger.error(f"request params incrr, response.text: {response.text}")
+            raise AccountBlockedError(f"account blocked, {response.text}")
         try:
-            if response.text == "" or response.text == "blocked":
-                utils.logger.error(f"request params incrr, response.text: {response.text}")
-                raise Exception("account blocked")
             return response.json()
         except Exception as e:
             raise DataFetchError(f"{e}, {response.text}")
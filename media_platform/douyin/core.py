@@ -16,17 +16,20 @@ from asyncio import Task
 from typing import Any, Dict, List, Optional, Tuple
 
 from playwright.async_api import (BrowserContext, BrowserType, Page,
-                                  async_playwright)
+                                  Playwright, async_playwright)
 
 import config
+from account import AccountPool, init_account_sessions
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from replay import init_replay_session
 from store import douyin as douyin_store
-from tools import utils
+from tools import tracing, utils
+from tools.resource_blocker import BrowserResourceBlocker, block_browser_resources
 from var import crawler_type_var, source_keyword_var
 
 from .client import DOUYINClient
-from .exception import DataFetchError
+from .exception import AccountBlockedError, DataFetchError
 from .field import PublishTimeType
 from .login import DouYinLogin
 
@@ -35,54 +38,90 @@ class DouYinCrawler(AbstractCrawler):
     context_page: Page
     dy_client: DOUYINClient
     browser_context: BrowserContext
+    resource_blocker: Optional[BrowserResourceBlocker] = None
+    account_pool: Optional[AccountPool] = None
 
     def __init__(self) -> None:
         self.index_url = "https://www.douyin.com"
 
     async def start(self) -> None:
+        async with async_playwright() as playwright:
+            await self.init_session(playwright)
+            await self.crawl()
+
+    async def init_session(self, playwright: Playwright) -> None:
+        """
+        Launch the browser context, create the api client and login if needed,
+        the session can be reused by multiple crawl jobs (see daemon.py)
+        Args:
+            playwright: playwright instance
+
+        Returns:
+
+        """
+        if await init_account_sessions(self, playwright, "dy_client", (AccountBlockedError,)):
+            # 配置了多账号，每个账号的会话已经单独初始化
+            return
+
+        if await init_replay_session(self, "dy_client", self.create_douyin_client):
+            # 回放模式，请求发到本地回放服务器，不启动浏览器
+            return
+
         playwright_proxy_format, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(ip_proxy_info)
 
-        async with async_playwright() as playwright:
-            # Launch a browser context.
-            chromium = playwright.chromium
-            self.browser_context = await self.launch_browser(
-                chromium,
-                None,
-                user_agent=None,
-                headless=config.HEADLESS
+        # Launch a browser context.
+        chromium = playwright.chromium
+        self.browser_context = await self.launch_browser(
+            chromium,
+            None,
+            user_agent=None,
+            headless=config.HEADLESS
+        )
+        # stealth.min.js is a js script to prevent the website from detecting the crawler.
+        await self.browser_context.add_init_script(path="libs/stealth.min.js")
+        self.context_page = await self.browser_context.new_page()
+        await self.context_page.goto(self.index_url)
+
+        self.dy_client = await self.create_douyin_client(httpx_proxy_format)
+        if not await self.dy_client.pong(browser_context=self.browser_context):
+            login_obj = DouYinLogin(
+                login_type=config.LOGIN_TYPE,
+                login_phone="",  # you phone number
+                browser_context=self.browser_context,
+                context_page=self.context_page,
+                cookie_str=config.COOKIES
             )
-            # stealth.min.js is a js script to prevent the website from detecting the crawler.
-            await self.browser_context.add_init_script(path="libs/stealth.min.js")
-            self.context_page = await self.browser_context.new_page()
-            await self.context_page.goto(self.index_url)
-
-            self.dy_client = await self.create_douyin_client(httpx_proxy_format)
-            if not await self.dy_client.pong(browser_context=self.browser_context):
-                login_obj = DouYinLogin(
-                    login_type=config.LOGIN_TYPE,
-                    login_phone="",  # you phone number
-                    browser_context=self.browser_context,
-                    context_page=self.context_page,
-                    cookie_str=config.COOKIES
-                )
-                await login_obj.begin()
-                await self.dy_client.update_cookies(browser_context=self.browser_context)
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for notes and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_awemes()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get the information and comments of the specified creator
-                await self.get_creators_and_videos()
-
-            utils.logger.info("[DouYinCrawler.start] Douyin Crawler finished ...")
+            await login_obj.begin()
+            await self.dy_client.update_cookies(browser_context=self.browser_context)
+
+        if config.ENABLE_RESOURCE_BLOCKING:
+            # 登录后页面只用于读取localStorage和刷新cookie，固定到同源的轻量页面即可
+            self.resource_blocker = await block_browser_resources(
+                self.browser_context, self.context_page, pin_url=f"{self.index_url}/robots.txt"
+            )
+
+    async def crawl(self) -> None:
+        """
+        Run a crawl job of config.CRAWLER_TYPE with the current session
+        Returns:
+
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        if config.CRAWLER_TYPE == "search":
+            # Search for notes and retrieve their comment information.
+            await self.search()
+        elif config.CRAWLER_TYPE == "detail":
+            # Get the information and comments of the specified post
+            await self.get_specified_awemes()
+        elif config.CRAWLER_TYPE == "creator":
+            # Get the information and comments of the specified creator
+            await self.get_creators_and_videos()
+
+        utils.logger.info("[DouYinCrawler.crawl] Douyin Crawler finished ...")
 
     async def search(self) -> None:
         utils.logger.info("[DouYinCrawler.search] Begin search douyin keywords")
@@ -125,8 +164,9 @@ class DouYinCrawler(AbstractCrawler):
                     except TypeError:
                         continue
                     aweme_list.append(aweme_info.get("aweme_id", ""))
+                    tracing.event("discovered", aweme_info.get("aweme_id"), keyword=keyword, page=page)
                     await douyin_store.update_douyin_aweme(aweme_item=aweme_info)
-            utils.logger.info(f"[DouYinCrawler.search] keyword:{keyword}, aweme_list:{aweme_list}")
+            utils.logger.info("[DouYinCrawler.search] keyword:%s, aweme_list:%s", keyword, utils.log_payload(aweme_list))
             await self.batch_get_note_comments(aweme_list)
 
     async def get_specified_awemes(self):
@@ -141,6 +181,7 @@ class DouYinCrawler(AbstractCrawler):
                 await douyin_store.update_douyin_aweme(aweme_detail)
         await self.batch_get_note_comments(config.DY_SPECIFIED_ID_LIST)
 
+    @tracing.trace_stage("detail", "aweme_id")
     async def get_aweme_detail(self, aweme_id: str, semaphore: asyncio.Semaphore) -> Any:
         """Get note detail"""
         async with semaphore:
@@ -171,6 +212,7 @@ class DouYinCrawler(AbstractCrawler):
         if len(task_list) > 0:
             await asyncio.wait(task_list)
 
+    @tracing.trace_stage("comments", "aweme_id")
     async def get_comments(self, aweme_id: str, semaphore: asyncio.Semaphore) -> None:
         async with semaphore:
             try:
@@ -18,3 +18,7 @@ class DataFetchError(RequestError):
 
 class IPBlockError(RequestError):
     """fetch so fast that the server block us ip"""
+
+
+class AccountBlockedError(DataFetchError):
+    """the server returns an empty or blocked response for the account"""
@@ -20,7 +20,7 @@ import random
 import execjs
 from playwright.async_api import Page
 
-douyin_sign_obj = execjs.compile(open('libs/douyin.js', encoding='utf-8-sig').read())
+douyin_sign_obj = None
 
 def get_web_id():
     """
@@ -64,6 +64,13 @@ def get_a_bogus_from_js(url: str, params: str, user_agent: str):
     sign_js_name = "sign_datail"
     if "/reply" in url:
         sign_js_name = "sign_reply"
+
+    # 签名js体积较大，首次使用时再编译，避免导入抖音模块时的启动开销
+    global douyin_sign_obj
+    if not douyin_sign_obj:
+        with open("libs/douyin.js", mode="r", encoding="utf-8-sig") as f:
+            douyin_sign_obj = execjs.compile(f.read())
+
     return douyin_sign_obj.call(sign_js_name, params, user_agent)
 
 
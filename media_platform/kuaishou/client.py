@@ -20,9 +20,12 @@ from playwright.async_api import BrowserContext, Page
 
 import config
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from cache.http_response_cache import cache_response
+from proxy.proxy_ip_pool import ProxyIpPool, rotate_proxy
+from tools import metrics, utils
+from work_queue.rate_budget import limit_request_rate
 
-from .exception import DataFetchError
+from .exception import DataFetchError, IPBlockError
 from .graphql import KuaiShouGraphQL
 
 
@@ -37,6 +40,8 @@ class KuaiShouClient(AbstractApiClient):
             cookie_dict: Dict[str, str],
     ):
         self.proxies = proxies
+        # 设置后每个请求从代理池轮换代理IP
+        self.ip_pool: Optional[ProxyIpPool] = None
         self.timeout = timeout
         self.headers = headers
         self._host = "https://www.kuaishou.com/graphql"
@@ -44,8 +49,13 @@ class KuaiShouClient(AbstractApiClient):
         self.cookie_dict = cookie_dict
         self.graphql = KuaiShouGraphQL()
 
+    @cache_response
+    @rotate_proxy(ban_exceptions=(IPBlockError,))
+    @limit_request_rate
+    @metrics.record_request
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        proxies = kwargs.pop("proxies", None) or self.proxies
+        async with httpx.AsyncClient(proxies=proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 **kwargs
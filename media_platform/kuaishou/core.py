@@ -17,17 +17,20 @@ from asyncio import Task
 from typing import Dict, List, Optional, Tuple
 
 from playwright.async_api import (BrowserContext, BrowserType, Page,
-                                  async_playwright)
+                                  Playwright, async_playwright)
 
 import config
+from account import AccountPool, init_account_sessions
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from replay import init_replay_session
 from store import kuaishou as kuaishou_store
-from tools import utils
+from tools import tracing, utils
+from tools.resource_blocker import BrowserResourceBlocker, block_browser_resources
 from var import comment_tasks_var, crawler_type_var, source_keyword_var
 
 from .client import KuaiShouClient
-from .exception import DataFetchError
+from .exception import DataFetchError, IPBlockError
 from .login import KuaishouLogin
 
 
@@ -35,59 +38,97 @@ class KuaishouCrawler(AbstractCrawler):
     context_page: Page
     ks_client: KuaiShouClient
     browser_context: BrowserContext
+    resource_blocker: Optional[BrowserResourceBlocker] = None
+    account_pool: Optional[AccountPool] = None
 
     def __init__(self):
         self.index_url = "https://www.kuaishou.com"
         self.user_agent = utils.get_user_agent()
 
     async def start(self):
+        async with async_playwright() as playwright:
+            await self.init_session(playwright)
+            await self.crawl()
+
+    async def init_session(self, playwright: Playwright) -> None:
+        """
+        Launch the browser context, create the api client and login if needed,
+        the session can be reused by multiple crawl jobs (see daemon.py)
+        Args:
+            playwright: playwright instance
+
+        Returns:
+
+        """
+        if await init_account_sessions(self, playwright, "ks_client", (IPBlockError,)):
+            # 配置了多账号，每个账号的会话已经单独初始化
+            return
+
+        if await init_replay_session(self, "ks_client", self.create_ks_client):
+            # 回放模式，请求发到本地回放服务器，不启动浏览器
+            return
+
         playwright_proxy_format, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(ip_proxy_info)
 
-        async with async_playwright() as playwright:
-            # Launch a browser context.
-            chromium = playwright.chromium
-            self.browser_context = await self.launch_browser(
-                chromium,
-                None,
-                self.user_agent,
-                headless=config.HEADLESS
+        # Launch a browser context.
+        chromium = playwright.chromium
+        self.browser_context = await self.launch_browser(
+            chromium,
+            None,
+            self.user_agent,
+            headless=config.HEADLESS
+        )
+        # stealth.min.js is a js script to prevent the website from detecting the crawler.
+        await self.browser_context.add_init_script(path="libs/stealth.min.js")
+        self.context_page = await self.browser_context.new_page()
+        await self.context_page.goto(f"{self.index_url}?isHome=1")
+
+        # Create a client to interact with the kuaishou website.
+        self.ks_client = await self.create_ks_client(httpx_proxy_format)
+        if config.ENABLE_IP_PROXY:
+            # 每个请求(或每N个请求)从代理池中轮换代理IP
+            self.ks_client.ip_pool = ip_proxy_pool
+        if not await self.ks_client.pong():
+            login_obj = KuaishouLogin(
+                login_type=config.LOGIN_TYPE,
+                login_phone=httpx_proxy_format,
+                browser_context=self.browser_context,
+                context_page=self.context_page,
+                cookie_str=config.COOKIES
             )
-            # stealth.min.js is a js script to prevent the website from detecting the crawler.
-            await self.browser_context.add_init_script(path="libs/stealth.min.js")
-            self.context_page = await self.browser_context.new_page()
-            await self.context_page.goto(f"{self.index_url}?isHome=1")
-
-            # Create a client to interact with the kuaishou website.
-            self.ks_client = await self.create_ks_client(httpx_proxy_format)
-            if not await self.ks_client.pong():
-                login_obj = KuaishouLogin(
-                    login_type=config.LOGIN_TYPE,
-                    login_phone=httpx_proxy_format,
-                    browser_context=self.browser_context,
-                    context_page=self.context_page,
-                    cookie_str=config.COOKIES
-                )
-                await login_obj.begin()
-                await self.ks_client.update_cookies(browser_context=self.browser_context)
+            await login_obj.begin()
+            await self.ks_client.update_cookies(browser_context=self.browser_context)
+
+        if config.ENABLE_RESOURCE_BLOCKING:
+            # 登录后页面只用于读取localStorage和刷新cookie，固定到同源的轻量页面即可
+            self.resource_blocker = await block_browser_resources(
+                self.browser_context, self.context_page, pin_url=f"{self.index_url}/robots.txt"
+            )
+
+    async def crawl(self) -> None:
+        """
+        Run a crawl job of config.CRAWLER_TYPE with the current session
+        Returns:
+
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        if config.CRAWLER_TYPE == "search":
+            # Search for videos and retrieve their comment information.
+            await self.search()
+        elif config.CRAWLER_TYPE == "detail":
+            # Get the information and comments of the specified post
+            await self.get_specified_videos()
+        elif config.CRAWLER_TYPE == "creator":
+            # Get creator's information and their videos and comments
+            await self.get_creators_and_videos()
+        else:
+            pass
 
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for videos and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_videos()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get creator's information and their videos and comments
-                await self.get_creators_and_videos()
-            else:
-                pass
-
-            utils.logger.info("[KuaishouCrawler.start] Kuaishou Crawler finished ...")
+        utils.logger.info("[KuaishouCrawler.crawl] Kuaishou Crawler finished ...")
 
     async def search(self):
         utils.logger.info("[KuaishouCrawler.search] Begin search kuaishou keywords")
@@ -121,6 +162,7 @@ class KuaishouCrawler(AbstractCrawler):
 
                 for video_detail in vision_search_photo.get("feeds"):
                     video_id_list.append(video_detail.get("photo", {}).get("id"))
+                    tracing.event("discovered", video_detail.get("photo", {}).get("id"), keyword=keyword, page=page)
                     await kuaishou_store.update_kuaishou_video(video_item=video_detail)
 
                 # batch fetch video comments
@@ -139,12 +181,13 @@ class KuaishouCrawler(AbstractCrawler):
                 await kuaishou_store.update_kuaishou_video(video_detail)
         await self.batch_get_video_comments(config.KS_SPECIFIED_ID_LIST)
 
+    @tracing.trace_stage("detail", "video_id")
     async def get_video_info_task(self, video_id: str, semaphore: asyncio.Semaphore) -> Optional[Dict]:
         """Get video detail task"""
         async with semaphore:
             try:
                 result = await self.ks_client.get_video_info(video_id)
-                utils.logger.info(f"[KuaishouCrawler.get_video_info_task] Get video_id:{video_id} info result: {result} ...")
+                utils.logger.info("[KuaishouCrawler.get_video_info_task] Get video_id:%s info result: %s ...", video_id, utils.log_payload(result))
                 return result.get("visionVideoDetail")
             except DataFetchError as ex:
                 utils.logger.error(f"[KuaishouCrawler.get_video_info_task] Get video detail error: {ex}")
@@ -173,6 +216,7 @@ class KuaishouCrawler(AbstractCrawler):
         comment_tasks_var.set(task_list)
         await asyncio.gather(*task_list)
 
+    @tracing.trace_stage("comments", "video_id")
     async def get_comments(self, video_id: str, semaphore: asyncio.Semaphore):
         """
         get comment for video id
@@ -20,9 +20,11 @@ from tenacity import RetryError, retry, stop_after_attempt, wait_fixed
 
 import config
 from base.base_crawler import AbstractApiClient
+from cache.http_response_cache import cache_response
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
-from proxy.proxy_ip_pool import ProxyIpPool
-from tools import utils
+from proxy.proxy_ip_pool import ProxyIpPool, rotate_proxy
+from tools import metrics, utils
+from work_queue.rate_budget import limit_request_rate
 
 from .field import SearchNoteType, SearchSortType
 from .help import TieBaExtractor
@@ -45,7 +47,11 @@ class BaiduTieBaClient(AbstractApiClient):
         self._page_extractor = TieBaExtractor()
         self.default_ip_proxy = default_ip_proxy
 
+    @cache_response
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @rotate_proxy()
+    @limit_request_rate
+    @metrics.record_request
     async def request(self, method, url, return_ori_content=False, proxies=None, **kwargs) -> Union[str, Any]:
         """
         封装httpx的公共请求方法，对请求响应做一些处理
@@ -16,14 +16,15 @@ from asyncio import Task
 from typing import Dict, List, Optional, Tuple
 
 from playwright.async_api import (BrowserContext, BrowserType, Page,
-                                  async_playwright)
+                                  Playwright, async_playwright)
 
 import config
 from base.base_crawler import AbstractCrawler
 from model.m_baidu_tieba import TiebaCreator, TiebaNote
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from replay import init_replay_session
 from store import tieba as tieba_store
-from tools import utils
+from tools import tracing, utils
 from tools.crawler_util import format_proxy_info
 from var import crawler_type_var, source_keyword_var
 
@@ -49,19 +50,54 @@ class TieBaCrawler(AbstractCrawler):
         Returns:
 
         """
+        await self.init_session()
+        await self.crawl()
+
+    async def init_session(self, playwright: Optional[Playwright] = None) -> None:
+        """
+        Create the api client, tieba does not need a browser so playwright is unused
+        Args:
+            playwright: playwright instance
+
+        Returns:
+
+        """
+        if await init_replay_session(self, "tieba_client", self.create_tieba_client):
+            # 回放模式，请求发到本地回放服务器
+            return
+
         ip_proxy_pool, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
-            utils.logger.info("[BaiduTieBaCrawler.start] Begin create ip proxy pool ...")
+            utils.logger.info("[BaiduTieBaCrawler.init_session] Begin create ip proxy pool ...")
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
             _, httpx_proxy_format = format_proxy_info(ip_proxy_info)
-            utils.logger.info(f"[BaiduTieBaCrawler.start] Init default ip proxy, value: {httpx_proxy_format}")
+            utils.logger.info(f"[BaiduTieBaCrawler.init_session] Init default ip proxy, value: {httpx_proxy_format}")
 
         # Create a client to interact with the baidutieba website.
-        self.tieba_client = BaiduTieBaClient(
-            ip_pool=ip_proxy_pool,
-            default_ip_proxy=httpx_proxy_format,
+        self.tieba_client = await self.create_tieba_client(httpx_proxy_format, ip_proxy_pool)
+
+    async def create_tieba_client(self, httpx_proxy: Optional[Dict], ip_pool=None) -> BaiduTieBaClient:
+        """
+        create tieba client
+        Args:
+            httpx_proxy: httpx proxy
+            ip_pool: ip proxy pool
+
+        Returns:
+
+        """
+        return BaiduTieBaClient(
+            ip_pool=ip_pool,
+            default_ip_proxy=httpx_proxy,
         )
+
+    async def crawl(self) -> None:
+        """
+        Run a crawl job of config.CRAWLER_TYPE with the current session
+        Returns:
+
+        """
         crawler_type_var.set(config.CRAWLER_TYPE)
         if config.CRAWLER_TYPE == "search":
             # Search for notes and retrieve their comment information.
@@ -76,7 +112,7 @@ class TieBaCrawler(AbstractCrawler):
         else:
             pass
 
-        utils.logger.info("[BaiduTieBaCrawler.start] Tieba Crawler finished ...")
+        utils.logger.info("[BaiduTieBaCrawler.crawl] Tieba Crawler finished ...")
 
     async def search(self) -> None:
         """
@@ -111,6 +147,8 @@ class TieBaCrawler(AbstractCrawler):
                         utils.logger.info(f"[BaiduTieBaCrawler.search] Search note list is empty")
                         break
                     utils.logger.info(f"[BaiduTieBaCrawler.search] Note list len: {len(notes_list)}")
+                    for note_detail in notes_list:
+                        tracing.event("discovered", note_detail.note_id, keyword=keyword, page=page)
                     await self.get_specified_notes(note_id_list=[note_detail.note_id for note_detail in notes_list])
                     page += 1
                 except Exception as ex:
@@ -167,6 +205,7 @@ class TieBaCrawler(AbstractCrawler):
                 await tieba_store.update_tieba_note(note_detail)
         await self.batch_get_note_comments(note_details_model)
 
+    @tracing.trace_stage("detail", "note_id")
     async def get_note_detail_async_task(self, note_id: str, semaphore: asyncio.Semaphore) -> Optional[TiebaNote]:
         """
         Get note detail
@@ -213,6 +252,7 @@ class TieBaCrawler(AbstractCrawler):
             task_list.append(task)
         await asyncio.gather(*task_list)
 
+    @tracing.trace_stage("comments", "note_detail.note_id")
     async def get_comments_async_task(self, note_detail: TiebaNote, semaphore: asyncio.Semaphore):
         """
         Get comments async task
@@ -243,7 +283,7 @@ class TieBaCrawler(AbstractCrawler):
             creator_page_html_content = await self.tieba_client.get_creator_info_by_url(creator_url=creator_url)
             creator_info: TiebaCreator = self._page_extractor.extract_creator_info(creator_page_html_content)
             if creator_info:
-                utils.logger.info(f"[WeiboCrawler.get_creators_and_notes] creator info: {creator_info}")
+                utils.logger.info("[WeiboCrawler.get_creators_and_notes] creator info: %s", utils.log_payload(creator_info))
                 if not creator_info:
                     raise Exception("Get creator info error")
 
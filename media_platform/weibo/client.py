@@ -17,7 +17,6 @@
 import asyncio
 import copy
 import json
-import re
 from typing import Callable, Dict, List, Optional, Union
 from urllib.parse import parse_qs, unquote, urlencode
 
@@ -26,9 +25,13 @@ from httpx import Response
 from playwright.async_api import BrowserContext, Page
 
 import config
-from tools import utils
+from cache.http_response_cache import cache_response
+from proxy.proxy_ip_pool import ProxyIpPool, rotate_proxy
+from tools import metrics, utils
+from tools.page_state import extract_page_state
+from work_queue.rate_budget import limit_request_rate
 
-from .exception import DataFetchError
+from .exception import DataFetchError, IPBlockError
 from .field import SearchType
 
 
@@ -43,6 +46,8 @@ class WeiboClient:
             cookie_dict: Dict[str, str],
     ):
         self.proxies = proxies
+        # 设置后每个请求从代理池轮换代理IP
+        self.ip_pool: Optional[ProxyIpPool] = None
         self.timeout = timeout
         self.headers = headers
         self._host = "https://m.weibo.cn"
@@ -50,9 +55,14 @@ class WeiboClient:
         self.cookie_dict = cookie_dict
         self._image_agent_host = "https://i1.wp.com/"
 
+    @cache_response
+    @rotate_proxy(ban_exceptions=(IPBlockError,))
+    @limit_request_rate
+    @metrics.record_request
     async def request(self, method, url, **kwargs) -> Union[Response, Dict]:
         enable_return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        proxies = kwargs.pop("proxies", None) or self.proxies
+        async with httpx.AsyncClient(proxies=proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 **kwargs
@@ -225,11 +235,9 @@ class WeiboClient:
             )
             if response.status_code != 200:
                 raise DataFetchError(f"get weibo detail err: {response.text}")
-            match = re.search(r'var \$render_data = (\[.*?\])\[0\]', response.text, re.DOTALL)
-            if match:
-                render_data_json = match.group(1)
-                render_data_dict = json.loads(render_data_json)
-                note_detail = render_data_dict[0].get("status")
+            render_data = extract_page_state(response.text, "var $render_data = ")
+            if render_data:
+                note_detail = render_data[0].get("status")
                 note_item = {
                     "mblog": note_detail
                 }
@@ -238,6 +246,7 @@ class WeiboClient:
                 utils.logger.info(f"[WeiboClient.get_note_info_by_id] 未找到$render_data的值")
                 return dict()
 
+    @metrics.record_media_download("image")
     async def get_note_image(self, image_url: str) -> bytes:
         image_url = image_url[8:]  # 去掉 https://
         sub_url = image_url.split("/")
@@ -363,7 +372,7 @@ class WeiboClient:
             since_id = notes_res.get("cardlistInfo", {}).get("since_id", "0")
             if "cards" not in notes_res:
                 utils.logger.info(
-                    f"[WeiboClient.get_all_notes_by_creator] No 'notes' key found in response: {notes_res}")
+                    "[WeiboClient.get_all_notes_by_creator] No 'notes' key found in response: %s", utils.log_payload(notes_res))
                 break
 
             notes = notes_res["cards"]
@@ -22,17 +22,20 @@ from asyncio import Task
 from typing import Dict, List, Optional, Tuple
 
 from playwright.async_api import (BrowserContext, BrowserType, Page,
-                                  async_playwright)
+                                  Playwright, async_playwright)
 
 import config
+from account import AccountPool, init_account_sessions
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from replay import init_replay_session
 from store import weibo as weibo_store
-from tools import utils
+from tools import tracing, utils
+from tools.resource_blocker import BrowserResourceBlocker, block_browser_resources
 from var import crawler_type_var, source_keyword_var
 
 from .client import WeiboClient
-from .exception import DataFetchError
+from .exception import DataFetchError, IPBlockError
 from .field import SearchType
 from .help import filter_search_result_card
 from .login import WeiboLogin
@@ -42,6 +45,8 @@ class WeiboCrawler(AbstractCrawler):
     context_page: Page
     wb_client: WeiboClient
     browser_context: BrowserContext
+    resource_blocker: Optional[BrowserResourceBlocker] = None
+    account_pool: Optional[AccountPool] = None
 
     def __init__(self):
         self.index_url = "https://www.weibo.com"
@@ -50,57 +55,94 @@ class WeiboCrawler(AbstractCrawler):
         self.mobile_user_agent = utils.get_mobile_user_agent()
 
     async def start(self):
+        async with async_playwright() as playwright:
+            await self.init_session(playwright)
+            await self.crawl()
+
+    async def init_session(self, playwright: Playwright) -> None:
+        """
+        Launch the browser context, create the api client and login if needed,
+        the session can be reused by multiple crawl jobs (see daemon.py)
+        Args:
+            playwright: playwright instance
+
+        Returns:
+
+        """
+        if await init_account_sessions(self, playwright, "wb_client", (IPBlockError,)):
+            # 配置了多账号，每个账号的会话已经单独初始化
+            return
+
+        if await init_replay_session(self, "wb_client", self.create_weibo_client):
+            # 回放模式，请求发到本地回放服务器，不启动浏览器
+            return
+
         playwright_proxy_format, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(ip_proxy_info)
 
-        async with async_playwright() as playwright:
-            # Launch a browser context.
-            chromium = playwright.chromium
-            self.browser_context = await self.launch_browser(
-                chromium,
-                None,
-                self.mobile_user_agent,
-                headless=config.HEADLESS
+        # Launch a browser context.
+        chromium = playwright.chromium
+        self.browser_context = await self.launch_browser(
+            chromium,
+            None,
+            self.mobile_user_agent,
+            headless=config.HEADLESS
+        )
+        # stealth.min.js is a js script to prevent the website from detecting the crawler.
+        await self.browser_context.add_init_script(path="libs/stealth.min.js")
+        self.context_page = await self.browser_context.new_page()
+        await self.context_page.goto(self.mobile_index_url)
+
+        # Create a client to interact with the xiaohongshu website.
+        self.wb_client = await self.create_weibo_client(httpx_proxy_format)
+        if config.ENABLE_IP_PROXY:
+            # 每个请求(或每N个请求)从代理池中轮换代理IP
+            self.wb_client.ip_pool = ip_proxy_pool
+        if not await self.wb_client.pong():
+            login_obj = WeiboLogin(
+                login_type=config.LOGIN_TYPE,
+                login_phone="",  # your phone number
+                browser_context=self.browser_context,
+                context_page=self.context_page,
+                cookie_str=config.COOKIES
             )
-            # stealth.min.js is a js script to prevent the website from detecting the crawler.
-            await self.browser_context.add_init_script(path="libs/stealth.min.js")
-            self.context_page = await self.browser_context.new_page()
+            await login_obj.begin()
+
+            # 登录成功后重定向到手机端的网站，再更新手机端登录成功的cookie
+            utils.logger.info("[WeiboCrawler.init_session] redirect weibo mobile homepage and update cookies on mobile platform")
             await self.context_page.goto(self.mobile_index_url)
+            await asyncio.sleep(2)
+            await self.wb_client.update_cookies(browser_context=self.browser_context)
 
-            # Create a client to interact with the xiaohongshu website.
-            self.wb_client = await self.create_weibo_client(httpx_proxy_format)
-            if not await self.wb_client.pong():
-                login_obj = WeiboLogin(
-                    login_type=config.LOGIN_TYPE,
-                    login_phone="",  # your phone number
-                    browser_context=self.browser_context,
-                    context_page=self.context_page,
-                    cookie_str=config.COOKIES
-                )
-                await login_obj.begin()
-
-                # 登录成功后重定向到手机端的网站，再更新手机端登录成功的cookie
-                utils.logger.info("[WeiboCrawler.start] redirect weibo mobile homepage and update cookies on mobile platform")
-                await self.context_page.goto(self.mobile_index_url)
-                await asyncio.sleep(2)
-                await self.wb_client.update_cookies(browser_context=self.browser_context)
-
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for video and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_notes()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get creator's information and their notes and comments
-                await self.get_creators_and_notes()
-            else:
-                pass
-            utils.logger.info("[WeiboCrawler.start] Weibo Crawler finished ...")
+        if config.ENABLE_RESOURCE_BLOCKING:
+            # 登录后页面只用于读取localStorage和刷新cookie，固定到同源的轻量页面即可
+            self.resource_blocker = await block_browser_resources(
+                self.browser_context, self.context_page, pin_url=f"{self.mobile_index_url}/robots.txt"
+            )
+
+    async def crawl(self) -> None:
+        """
+        Run a crawl job of config.CRAWLER_TYPE with the current session
+        Returns:
+
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        if config.CRAWLER_TYPE == "search":
+            # Search for video and retrieve their comment information.
+            await self.search()
+        elif config.CRAWLER_TYPE == "detail":
+            # Get the information and comments of the specified post
+            await self.get_specified_notes()
+        elif config.CRAWLER_TYPE == "creator":
+            # Get creator's information and their notes and comments
+            await self.get_creators_and_notes()
+        else:
+            pass
+
+        utils.logger.info("[WeiboCrawler.crawl] Weibo Crawler finished ...")
 
     async def search(self):
         """
@@ -134,6 +176,7 @@ class WeiboCrawler(AbstractCrawler):
                         mblog: Dict = note_item.get("mblog")
                         if mblog:
                             note_id_list.append(mblog.get("id"))
+                            tracing.event("discovered", mblog.get("id"), keyword=keyword, page=page)
                             await weibo_store.update_weibo_note(note_item)
                             await self.get_note_images(mblog)
 
@@ -156,6 +199,7 @@ class WeiboCrawler(AbstractCrawler):
                 await weibo_store.update_weibo_note(note_item)
         await self.batch_get_notes_comments(config.WEIBO_SPECIFIED_ID_LIST)
 
+    @tracing.trace_stage("detail", "note_id")
     async def get_note_info_task(self, note_id: str, semaphore: asyncio.Semaphore) -> Optional[Dict]:
         """
         Get note detail task
@@ -193,6 +237,7 @@ class WeiboCrawler(AbstractCrawler):
             task_list.append(task)
         await asyncio.gather(*task_list)
 
+    @tracing.trace_stage("comments", "note_id")
     async def get_note_comments(self, note_id: str, semaphore: asyncio.Semaphore):
         """
         get comment for note id
@@ -214,6 +259,7 @@ class WeiboCrawler(AbstractCrawler):
             except Exception as e:
                 utils.logger.error(f"[WeiboCrawler.get_note_comments] may be been blocked, err:{e}")
 
+    @tracing.trace_stage("media", "mblog.id")
     async def get_note_images(self, mblog: Dict):
         """
         get note images
@@ -248,7 +294,7 @@ class WeiboCrawler(AbstractCrawler):
             createor_info_res: Dict = await self.wb_client.get_creator_info_by_id(creator_id=user_id)
             if createor_info_res:
                 createor_info: Dict = createor_info_res.get("userInfo", {})
-                utils.logger.info(f"[WeiboCrawler.get_creators_and_notes] creator info: {createor_info}")
+                utils.logger.info("[WeiboCrawler.get_creators_and_notes] creator info: %s", utils.log_payload(createor_info))
                 if not createor_info:
                     raise DataFetchError("Get creator info error")
                 await weibo_store.save_creator(user_id, user_info=createor_info)
@@ -11,7 +11,6 @@
 
 import asyncio
 import json
-import re
 from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
@@ -21,12 +20,19 @@ from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_result
 
 import config
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from cache.http_response_cache import cache_response
+from proxy.proxy_ip_pool import ProxyIpPool, rotate_proxy
+from tools import metrics, utils
+from tools.page_state import extract_page_state
+from work_queue.rate_budget import limit_request_rate
 from html import unescape
 
-from .exception import DataFetchError, IPBlockError
+from .exception import CaptchaError, DataFetchError, IPBlockError
 from .field import SearchNoteType, SearchSortType
-from .help import get_search_id, sign
+from .help import get_search_id, sign, transform_json_keys
+
+# 网页版页面状态的赋值语句
+XHS_PAGE_STATE_MARKER = "window.__INITIAL_STATE__="
 
 
 class XiaoHongShuClient(AbstractApiClient):
@@ -40,6 +46,8 @@ class XiaoHongShuClient(AbstractApiClient):
         cookie_dict: Dict[str, str],
     ):
         self.proxies = proxies
+        # 设置后每个请求从代理池轮换代理IP
+        self.ip_pool: Optional[ProxyIpPool] = None
         self.timeout = timeout
         self.headers = headers
         self._host = "https://edith.xiaohongshu.com"
@@ -81,7 +89,11 @@ class XiaoHongShuClient(AbstractApiClient):
         self.headers.update(headers)
         return self.headers
 
+    @cache_response
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @rotate_proxy(ban_exceptions=(IPBlockError, CaptchaError))
+    @limit_request_rate
+    @metrics.record_request
     async def request(self, method, url, **kwargs) -> Union[str, Any]:
         """
         封装httpx的公共请求方法，对请求响应做一些处理
@@ -96,14 +108,15 @@ class XiaoHongShuClient(AbstractApiClient):
         # return response.text
         return_response = kwargs.pop("return_response", False)
 
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        proxies = kwargs.pop("proxies", None) or self.proxies
+        async with httpx.AsyncClient(proxies=proxies) as client:
             response = await client.request(method, url, timeout=self.timeout, **kwargs)
 
         if response.status_code == 471 or response.status_code == 461:
             # someday someone maybe will bypass captcha
             verify_type = response.headers["Verifytype"]
             verify_uuid = response.headers["Verifyuuid"]
-            raise Exception(
+            raise CaptchaError(
                 f"出现验证码，请求失败，Verifytype: {verify_type}，Verifyuuid: {verify_uuid}, Response: {response}"
             )
 
@@ -155,6 +168,7 @@ class XiaoHongShuClient(AbstractApiClient):
             **kwargs,
         )
 
+    @metrics.record_media_download("media")
     async def get_note_media(self, url: str) -> Union[bytes, None]:
         async with httpx.AsyncClient(proxies=self.proxies) as client:
             response = await client.request("GET", url, timeout=self.timeout)
@@ -350,7 +364,7 @@ class XiaoHongShuClient(AbstractApiClient):
             comments_cursor = comments_res.get("cursor", "")
             if "comments" not in comments_res:
                 utils.logger.info(
-                    f"[XiaoHongShuClient.get_note_all_comments] No 'comments' key found in response: {comments_res}"
+                    "[XiaoHongShuClient.get_note_all_comments] No 'comments' key found in response: %s", utils.log_payload(comments_res)
                 )
                 break
             comments = comments_res["comments"]
@@ -419,7 +433,7 @@ class XiaoHongShuClient(AbstractApiClient):
                 sub_comment_cursor = comments_res.get("cursor", "")
                 if "comments" not in comments_res:
                     utils.logger.info(
-                        f"[XiaoHongShuClient.get_comments_all_sub_comments] No 'comments' key found in response: {comments_res}"
+                        "[XiaoHongShuClient.get_comments_all_sub_comments] No 'comments' key found in response: %s", utils.log_payload(comments_res)
                     )
                     break
                 comments = comments_res["comments"]
@@ -439,14 +453,7 @@ class XiaoHongShuClient(AbstractApiClient):
         html_content = await self.request(
             "GET", self._domain + uri, return_response=True, headers=self.headers
         )
-        match = re.search(
-            r"<script>window.__INITIAL_STATE__=(.+)<\/script>", html_content, re.M
-        )
-
-        if match is None:
-            return {}
-
-        info = json.loads(match.group(1).replace(":undefined", ":null"), strict=False)
+        info = extract_page_state(html_content, XHS_PAGE_STATE_MARKER)
         if info is None:
             return {}
         return info.get("user").get("userPageData")
@@ -478,6 +485,8 @@ class XiaoHongShuClient(AbstractApiClient):
         user_id: str,
         crawl_interval: float = 1.0,
         callback: Optional[Callable] = None,
+        cursor: str = "",
+        cursor_callback: Optional[Callable] = None,
     ) -> List[Dict]:
         """
         获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
@@ -485,13 +494,15 @@ class XiaoHongShuClient(AbstractApiClient):
             user_id: 用户ID
             crawl_interval: 爬取一次的延迟单位（秒）
             callback: 一次分页爬取结束后的更新回调函数
+            cursor: 起始分页游标，断点续爬时传入上一次记录的游标
+            cursor_callback: 一次分页爬取结束后回调下一页的游标以及当前页的帖子，用于记录断点
 
         Returns:
 
         """
         result = []
         notes_has_more = True
-        notes_cursor = ""
+        notes_cursor = cursor
         while notes_has_more:
             notes_res = await self.get_notes_by_creator(user_id, notes_cursor)
             if not notes_res:
@@ -504,7 +515,7 @@ class XiaoHongShuClient(AbstractApiClient):
             notes_cursor = notes_res.get("cursor", "")
             if "notes" not in notes_res:
                 utils.logger.info(
-                    f"[XiaoHongShuClient.get_all_notes_by_creator] No 'notes' key found in response: {notes_res}"
+                    "[XiaoHongShuClient.get_all_notes_by_creator] No 'notes' key found in response: %s", utils.log_payload(notes_res)
                 )
                 break
 
@@ -514,6 +525,8 @@ class XiaoHongShuClient(AbstractApiClient):
             )
             if callback:
                 await callback(notes)
+            if cursor_callback:
+                await cursor_callback(notes_cursor, notes)
             await asyncio.sleep(crawl_interval)
             result.extend(notes)
         return result
@@ -553,31 +566,6 @@ class XiaoHongShuClient(AbstractApiClient):
 
         """
 
-        def camel_to_underscore(key):
-            return re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower()
-
-        def transform_json_keys(json_data):
-            data_dict = json.loads(json_data)
-            dict_new = {}
-            for key, value in data_dict.items():
-                new_key = camel_to_underscore(key)
-                if not value:
-                    dict_new[new_key] = value
-                elif isinstance(value, dict):
-                    dict_new[new_key] = transform_json_keys(json.dumps(value))
-                elif isinstance(value, list):
-                    dict_new[new_key] = [
-                        (
-                            transform_json_keys(json.dumps(item))
-                            if (item and isinstance(item, dict))
-                            else item
-                        )
-                        for item in value
-                    ]
-                else:
-                    dict_new[new_key] = value
-            return dict_new
-
         url = (
             "https://www.xiaohongshu.com/explore/"
             + note_id
@@ -592,11 +580,11 @@ class XiaoHongShuClient(AbstractApiClient):
         )
 
         def get_note_dict(html):
-            state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[
-                0
-            ].replace("undefined", '""')
-
-            if state != "{}":
+            # 笔记详情里 undefined 的字段一直按空字符串处理，下游存储依赖这一点
+            state = extract_page_state(html, XHS_PAGE_STATE_MARKER, undefined='""')
+            if state is None:
+                return None
+            if state:
                 note_dict = transform_json_keys(state)
                 return note_dict["note"]["note_detail_map"][note_id]["note"]
             return {}
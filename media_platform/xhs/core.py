@@ -16,20 +16,23 @@ import time
 from asyncio import Task
 from typing import Dict, List, Optional, Tuple
 
-from playwright.async_api import BrowserContext, BrowserType, Page, async_playwright
+from playwright.async_api import BrowserContext, BrowserType, Page, Playwright, async_playwright
 from tenacity import RetryError
 
 import config
+from account import AccountPool, init_account_sessions
 from base.base_crawler import AbstractCrawler
-from config import CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES
 from model.m_xiaohongshu import NoteUrlInfo
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from replay import init_replay_session
 from store import xhs as xhs_store
-from tools import utils
+from tools import tracing, utils
+from tools.checkpoint import CrawlerCheckpoint
+from tools.resource_blocker import BrowserResourceBlocker, block_browser_resources
 from var import crawler_type_var, source_keyword_var
 
 from .client import XiaoHongShuClient
-from .exception import DataFetchError
+from .exception import CaptchaError, DataFetchError, IPBlockError
 from .field import SearchSortType
 from .help import parse_note_info_from_note_url, get_search_id
 from .login import XiaoHongShuLogin
@@ -39,6 +42,9 @@ class XiaoHongShuCrawler(AbstractCrawler):
     context_page: Page
     xhs_client: XiaoHongShuClient
     browser_context: BrowserContext
+    checkpoint: CrawlerCheckpoint
+    resource_blocker: Optional[BrowserResourceBlocker] = None
+    account_pool: Optional[AccountPool] = None
 
     def __init__(self) -> None:
         self.index_url = "https://www.xiaohongshu.com"
@@ -46,6 +52,28 @@ class XiaoHongShuCrawler(AbstractCrawler):
         self.user_agent = config.UA if config.UA else "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
 
     async def start(self) -> None:
+        async with async_playwright() as playwright:
+            await self.init_session(playwright)
+            await self.crawl()
+
+    async def init_session(self, playwright: Playwright) -> None:
+        """
+        Launch the browser context, create the api client and login if needed,
+        the session can be reused by multiple crawl jobs (see daemon.py)
+        Args:
+            playwright: playwright instance
+
+        Returns:
+
+        """
+        if await init_account_sessions(self, playwright, "xhs_client", (CaptchaError, IPBlockError)):
+            # 配置了多账号，每个账号的会话已经单独初始化
+            return
+
+        if await init_replay_session(self, "xhs_client", self.create_xhs_client):
+            # 回放模式，请求发到本地回放服务器，不启动浏览器
+            return
+
         playwright_proxy_format, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(
@@ -56,57 +84,70 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 ip_proxy_info
             )
 
-        async with async_playwright() as playwright:
-            # Launch a browser context.
-            chromium = playwright.chromium
-            self.browser_context = await self.launch_browser(
-                chromium, None, self.user_agent, headless=config.HEADLESS
+        # Launch a browser context.
+        chromium = playwright.chromium
+        self.browser_context = await self.launch_browser(
+            chromium, None, self.user_agent, headless=config.HEADLESS
+        )
+        # stealth.min.js is a js script to prevent the website from detecting the crawler.
+        await self.browser_context.add_init_script(path="libs/stealth.min.js")
+        # add a cookie attribute webId to avoid the appearance of a sliding captcha on the webpage
+        await self.browser_context.add_cookies(
+            [
+                {
+                    "name": "webId",
+                    "value": "xxx123",  # any value
+                    "domain": ".xiaohongshu.com",
+                    "path": "/",
+                }
+            ]
+        )
+        self.context_page = await self.browser_context.new_page()
+        await self.context_page.goto(self.index_url)
+
+        # Create a client to interact with the xiaohongshu website.
+        self.xhs_client = await self.create_xhs_client(httpx_proxy_format)
+        if config.ENABLE_IP_PROXY:
+            # 每个请求(或每N个请求)从代理池中轮换代理IP
+            self.xhs_client.ip_pool = ip_proxy_pool
+        if not await self.xhs_client.pong():
+            login_obj = XiaoHongShuLogin(
+                login_type=config.LOGIN_TYPE,
+                login_phone="",  # input your phone number
+                browser_context=self.browser_context,
+                context_page=self.context_page,
+                cookie_str=config.COOKIES,
             )
-            # stealth.min.js is a js script to prevent the website from detecting the crawler.
-            await self.browser_context.add_init_script(path="libs/stealth.min.js")
-            # add a cookie attribute webId to avoid the appearance of a sliding captcha on the webpage
-            await self.browser_context.add_cookies(
-                [
-                    {
-                        "name": "webId",
-                        "value": "xxx123",  # any value
-                        "domain": ".xiaohongshu.com",
-                        "path": "/",
-                    }
-                ]
+            await login_obj.begin()
+            await self.xhs_client.update_cookies(
+                browser_context=self.browser_context
             )
-            self.context_page = await self.browser_context.new_page()
-            await self.context_page.goto(self.index_url)
-
-            # Create a client to interact with the xiaohongshu website.
-            self.xhs_client = await self.create_xhs_client(httpx_proxy_format)
-            if not await self.xhs_client.pong():
-                login_obj = XiaoHongShuLogin(
-                    login_type=config.LOGIN_TYPE,
-                    login_phone="",  # input your phone number
-                    browser_context=self.browser_context,
-                    context_page=self.context_page,
-                    cookie_str=config.COOKIES,
-                )
-                await login_obj.begin()
-                await self.xhs_client.update_cookies(
-                    browser_context=self.browser_context
-                )
 
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for notes and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_notes()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get creator's information and their notes and comments
-                await self.get_creators_and_notes()
-            else:
-                pass
+        if config.ENABLE_RESOURCE_BLOCKING:
+            # 签名依赖首页加载的js(window._webmsxyw)，页面保持在首页，只拦截资源请求
+            self.resource_blocker = await block_browser_resources(self.browser_context, self.context_page)
+
+    async def crawl(self) -> None:
+        """
+        Run a crawl job of config.CRAWLER_TYPE with the current session
+        Returns:
 
-            utils.logger.info("[XiaoHongShuCrawler.start] Xhs Crawler finished ...")
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        self.checkpoint = CrawlerCheckpoint(config.PLATFORM, config.CRAWLER_TYPE)
+        if config.CRAWLER_TYPE == "search":
+            # Search for notes and retrieve their comment information.
+            await self.search()
+        elif config.CRAWLER_TYPE == "detail":
+            # Get the information and comments of the specified post
+            await self.get_specified_notes()
+        elif config.CRAWLER_TYPE == "creator":
+            # Get creator's information and their notes and comments
+            await self.get_creators_and_notes()
+        else:
+            pass
+
+        utils.logger.info("[XiaoHongShuCrawler.crawl] Xhs Crawler finished ...")
 
     async def search(self) -> None:
         """Search for notes and retrieve their comment information."""
@@ -119,11 +160,20 @@ class XiaoHongShuCrawler(AbstractCrawler):
         start_page = config.START_PAGE
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
+            checkpoint_key = f"keyword:{keyword}"
+            if self.checkpoint.is_finished(checkpoint_key):
+                utils.logger.info(
+                    f"[XiaoHongShuCrawler.search] Keyword {keyword} finished in the last run, skip it"
+                )
+                continue
             utils.logger.info(
                 f"[XiaoHongShuCrawler.search] Current search keyword: {keyword}"
             )
-            page = 1
-            search_id = get_search_id()
+            await self.resume_pending_comments(checkpoint_key)
+            progress = self.checkpoint.get(checkpoint_key)
+            page = progress.get("page", 1)
+            search_id = progress.get("search_id") or get_search_id()
+            fetch_error = False
             while (
                 page - start_page + 1
             ) * xhs_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
@@ -149,11 +199,14 @@ class XiaoHongShuCrawler(AbstractCrawler):
                         ),
                     )
                     utils.logger.info(
-                        f"[XiaoHongShuCrawler.search] Search notes res:{notes_res}"
+                        "[XiaoHongShuCrawler.search] Search notes res:%s", utils.log_payload(notes_res)
                     )
                     if not notes_res or not notes_res.get("has_more", False):
                         utils.logger.info("No more content!")
                         break
+                    for post_item in notes_res.get("items", {}):
+                        if post_item.get("model_type") not in ("rec_query", "hot_query"):
+                            tracing.event("discovered", post_item.get("id"), keyword=keyword, page=page)
                     semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
                     task_list = [
                         self.get_note_detail_async_task(
@@ -174,14 +227,24 @@ class XiaoHongShuCrawler(AbstractCrawler):
                             xsec_tokens.append(note_detail.get("xsec_token"))
                     page += 1
                     utils.logger.info(
-                        f"[XiaoHongShuCrawler.search] Note details: {note_details}"
+                        "[XiaoHongShuCrawler.search] Note details: %s", utils.log_payload(note_details)
+                    )
+                    self.checkpoint.save(
+                        checkpoint_key,
+                        page=page,
+                        search_id=search_id,
+                        pending=list(zip(note_ids, xsec_tokens)),
                     )
                     await self.batch_get_note_comments(note_ids, xsec_tokens)
+                    self.checkpoint.save(checkpoint_key, pending=[])
                 except DataFetchError:
                     utils.logger.error(
                         "[XiaoHongShuCrawler.search] Get note detail error"
                     )
+                    fetch_error = True
                     break
+            if not fetch_error:
+                self.checkpoint.finish(checkpoint_key)
 
     async def get_creators_and_notes(self) -> None:
         """Get creator's notes and retrieve their comment information."""
@@ -189,31 +252,65 @@ class XiaoHongShuCrawler(AbstractCrawler):
             "[XiaoHongShuCrawler.get_creators_and_notes] Begin get xiaohongshu creators"
         )
         for user_id in config.XHS_CREATOR_ID_LIST:
-            # get creator detail info from web html content
-            createor_info: Dict = await self.xhs_client.get_creator_info(
-                user_id=user_id
-            )
-            if createor_info:
-                await xhs_store.save_creator(user_id, creator=createor_info)
-
-            # When proxy is not enabled, increase the crawling interval
-            if config.ENABLE_IP_PROXY:
-                crawl_interval = random.random()
-            else:
-                crawl_interval = random.uniform(1, config.CRAWLER_MAX_SLEEP_SEC)
-            # Get all note information of the creator
-            all_notes_list = await self.xhs_client.get_all_notes_by_creator(
-                user_id=user_id,
-                crawl_interval=crawl_interval,
-                callback=self.fetch_creator_notes_detail,
-            )
+            checkpoint_key = f"creator:{user_id}"
+            if self.checkpoint.is_finished(checkpoint_key):
+                utils.logger.info(
+                    f"[XiaoHongShuCrawler.get_creators_and_notes] Creator {user_id} finished in the last run, skip it"
+                )
+                continue
+            progress = self.checkpoint.get(checkpoint_key)
+            if not progress.get("notes_finished"):
+                # get creator detail info from web html content
+                createor_info: Dict = await self.xhs_client.get_creator_info(
+                    user_id=user_id
+                )
+                if createor_info:
+                    await xhs_store.save_creator(user_id, creator=createor_info)
+
+                # When proxy is not enabled, increase the crawling interval
+                if config.ENABLE_IP_PROXY:
+                    crawl_interval = random.random()
+                else:
+                    crawl_interval = random.uniform(1, config.CRAWLER_MAX_SLEEP_SEC)
+                # Get all note information of the creator
+                await self.xhs_client.get_all_notes_by_creator(
+                    user_id=user_id,
+                    crawl_interval=crawl_interval,
+                    callback=self.fetch_creator_notes_detail,
+                    cursor=progress.get("cursor", ""),
+                    cursor_callback=lambda cursor, notes: self.save_creator_notes_progress(
+                        checkpoint_key, cursor, notes
+                    ),
+                )
+                self.checkpoint.save(checkpoint_key, notes_finished=True)
+
+            # the pending list holds every note of the creator, including those fetched before a restart
+            await self.resume_pending_comments(checkpoint_key)
+            self.checkpoint.finish(checkpoint_key)
+
+    async def save_creator_notes_progress(
+        self, checkpoint_key: str, cursor: str, notes: List[Dict]
+    ) -> None:
+        """Record the creator notes cursor and the notes waiting for comments"""
+        pending = self.checkpoint.get_pending(checkpoint_key)
+        pending.extend(
+            [note_item.get("note_id"), note_item.get("xsec_token")]
+            for note_item in notes
+        )
+        self.checkpoint.save(checkpoint_key, cursor=cursor, pending=pending)
 
-            note_ids = []
-            xsec_tokens = []
-            for note_item in all_notes_list:
-                note_ids.append(note_item.get("note_id"))
-                xsec_tokens.append(note_item.get("xsec_token"))
-            await self.batch_get_note_comments(note_ids, xsec_tokens)
+    async def resume_pending_comments(self, checkpoint_key: str) -> None:
+        """Get comments of the notes which were stored but whose comments were not finished"""
+        pending = self.checkpoint.get_pending(checkpoint_key)
+        if not pending:
+            return
+        utils.logger.info(
+            f"[XiaoHongShuCrawler.resume_pending_comments] Resume {len(pending)} pending notes of {checkpoint_key}"
+        )
+        await self.batch_get_note_comments(
+            [note_id for note_id, _ in pending], [xsec_token for _, xsec_token in pending]
+        )
+        self.checkpoint.save(checkpoint_key, pending=[])
 
     async def fetch_creator_notes_detail(self, note_list: List[Dict]):
         """
@@ -266,6 +363,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 await xhs_store.update_xhs_note(note_detail)
         await self.batch_get_note_comments(need_get_comment_note_ids, xsec_tokens)
 
+    @tracing.trace_stage("detail", "note_id")
     async def get_note_detail_async_task(
         self,
         note_id: str,
@@ -358,6 +456,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
             task_list.append(task)
         await asyncio.gather(*task_list)
 
+    @tracing.trace_stage("comments", "note_id")
     async def get_comments(
         self, note_id: str, xsec_token: str, semaphore: asyncio.Semaphore
     ):
@@ -376,7 +475,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 xsec_token=xsec_token,
                 crawl_interval=crawl_interval,
                 callback=xhs_store.batch_update_xhs_note_comments,
-                max_count=CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
+                max_count=config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
             )
 
     @staticmethod
@@ -454,6 +553,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
         await self.browser_context.close()
         utils.logger.info("[XiaoHongShuCrawler.close] Browser context closed ...")
 
+    @tracing.trace_stage("media", "note_detail.note_id")
     async def get_notice_media(self, note_detail: Dict):
         if not config.ENABLE_GET_IMAGES:
             utils.logger.info(
@@ -18,3 +18,7 @@ class DataFetchError(RequestError):
 
 class IPBlockError(RequestError):
     """fetch so fast that the server block us ip"""
+
+
+class CaptchaError(RequestError):
+    """the server requires a captcha verification for the account"""
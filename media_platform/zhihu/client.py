@@ -22,9 +22,12 @@ from tenacity import retry, stop_after_attempt, wait_fixed
 
 import config
 from base.base_crawler import AbstractApiClient
+from cache.http_response_cache import cache_response
 from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
-from tools import utils
+from proxy.proxy_ip_pool import ProxyIpPool, rotate_proxy
+from tools import metrics, utils
+from work_queue.rate_budget import limit_request_rate
 
 from .exception import DataFetchError, ForbiddenError
 from .field import SearchSort, SearchTime, SearchType
@@ -42,6 +45,8 @@ class ZhiHuClient(AbstractApiClient):
             cookie_dict: Dict[str, str],
     ):
         self.proxies = proxies
+        # 设置后每个请求从代理池轮换代理IP
+        self.ip_pool: Optional[ProxyIpPool] = None
         self.timeout = timeout
         self.default_headers = headers
         self.cookie_dict = cookie_dict
@@ -64,7 +69,11 @@ class ZhiHuClient(AbstractApiClient):
         headers['x-zse-96'] = sign_res["x-zse-96"]
         return headers
 
+    @cache_response
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @rotate_proxy(ban_exceptions=(ForbiddenError,))
+    @limit_request_rate
+    @metrics.record_request
     async def request(self, method, url, **kwargs) -> Union[str, Any]:
         """
         封装httpx的公共请求方法，对请求响应做一些处理
@@ -79,7 +88,8 @@ class ZhiHuClient(AbstractApiClient):
         # return response.text
         return_response = kwargs.pop('return_response', False)
 
-        async with httpx.AsyncClient(proxies=self.proxies, ) as client:
+        proxies = kwargs.pop("proxies", None) or self.proxies
+        async with httpx.AsyncClient(proxies=proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 **kwargs
@@ -210,7 +220,7 @@ class ZhiHuClient(AbstractApiClient):
             "vertical": note_type.value,
         }
         search_res = await self.get(uri, params)
-        utils.logger.info(f"[ZhiHuClient.get_note_by_keyword] Search result: {search_res}")
+        utils.logger.info("[ZhiHuClient.get_note_by_keyword] Search result: %s", utils.log_payload(search_res))
         return self._extractor.extract_contents_from_search(search_res)
 
     async def get_root_comments(self, content_id: str, content_type: str, offset: str = "", limit: int = 10,
@@ -432,7 +442,7 @@ class ZhiHuClient(AbstractApiClient):
             res = await self.get_creator_answers(creator.url_token, offset, limit)
             if not res:
                 break
-            utils.logger.info(f"[ZhiHuClient.get_all_anwser_by_creator] Get creator {creator.url_token} answers: {res}")
+            utils.logger.info("[ZhiHuClient.get_all_anwser_by_creator] Get creator %s answers: %s", creator.url_token, utils.log_payload(res))
             paging_info = res.get("paging", {})
             is_end = paging_info.get("is_end")
             contents = self._extractor.extract_content_list_from_creator(res.get("data"))
@@ -17,19 +17,22 @@ from asyncio import Task
 from typing import Dict, List, Optional, Tuple, cast
 
 from playwright.async_api import (BrowserContext, BrowserType, Page,
-                                  async_playwright)
+                                  Playwright, async_playwright)
 
 import config
+from account import AccountPool, init_account_sessions
 from constant import zhihu as constant
 from base.base_crawler import AbstractCrawler
 from model.m_zhihu import ZhihuContent, ZhihuCreator
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from replay import init_replay_session
 from store import zhihu as zhihu_store
-from tools import utils
+from tools import tracing, utils
+from tools.resource_blocker import BrowserResourceBlocker, block_browser_resources
 from var import crawler_type_var, source_keyword_var
 
 from .client import ZhiHuClient
-from .exception import DataFetchError
+from .exception import DataFetchError, ForbiddenError
 from .help import ZhihuExtractor, judge_zhihu_url
 from .login import ZhiHuLogin
 
@@ -38,6 +41,8 @@ class ZhihuCrawler(AbstractCrawler):
     context_page: Page
     zhihu_client: ZhiHuClient
     browser_context: BrowserContext
+    resource_blocker: Optional[BrowserResourceBlocker] = None
+    account_pool: Optional[AccountPool] = None
 
     def __init__(self) -> None:
         self.index_url = "https://www.zhihu.com"
@@ -51,60 +56,96 @@ class ZhihuCrawler(AbstractCrawler):
         Returns:
 
         """
+        async with async_playwright() as playwright:
+            await self.init_session(playwright)
+            await self.crawl()
+
+    async def init_session(self, playwright: Playwright) -> None:
+        """
+        Launch the browser context, create the api client and login if needed,
+        the session can be reused by multiple crawl jobs (see daemon.py)
+        Args:
+            playwright: playwright instance
+
+        Returns:
+
+        """
+        if await init_account_sessions(self, playwright, "zhihu_client", (ForbiddenError,)):
+            # 配置了多账号，每个账号的会话已经单独初始化
+            return
+
+        if await init_replay_session(self, "zhihu_client", self.create_zhihu_client):
+            # 回放模式，请求发到本地回放服务器，不启动浏览器
+            return
+
         playwright_proxy_format, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
             ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
             playwright_proxy_format, httpx_proxy_format = self.format_proxy_info(ip_proxy_info)
 
-        async with async_playwright() as playwright:
-            # Launch a browser context.
-            chromium = playwright.chromium
-            self.browser_context = await self.launch_browser(
-                chromium,
-                None,
-                self.user_agent,
-                headless=config.HEADLESS
-            )
-            # stealth.min.js is a js script to prevent the website from detecting the crawler.
-            await self.browser_context.add_init_script(path="libs/stealth.min.js")
-
-            self.context_page = await self.browser_context.new_page()
-            await self.context_page.goto(self.index_url, wait_until="domcontentloaded")
-
-            # Create a client to interact with the zhihu website.
-            self.zhihu_client = await self.create_zhihu_client(httpx_proxy_format)
-            if not await self.zhihu_client.pong():
-                login_obj = ZhiHuLogin(
-                    login_type=config.LOGIN_TYPE,
-                    login_phone="",  # input your phone number
-                    browser_context=self.browser_context,
-                    context_page=self.context_page,
-                    cookie_str=config.COOKIES
-                )
-                await login_obj.begin()
-                await self.zhihu_client.update_cookies(browser_context=self.browser_context)
+        # Launch a browser context.
+        chromium = playwright.chromium
+        self.browser_context = await self.launch_browser(
+            chromium,
+            None,
+            self.user_agent,
+            headless=config.HEADLESS
+        )
+        # stealth.min.js is a js script to prevent the website from detecting the crawler.
+        await self.browser_context.add_init_script(path="libs/stealth.min.js")
+
+        self.context_page = await self.browser_context.new_page()
+        await self.context_page.goto(self.index_url, wait_until="domcontentloaded")
 
-            # 知乎的搜索接口需要打开搜索页面之后cookies才能访问API，单独的首页不行
-            utils.logger.info("[ZhihuCrawler.start] Zhihu跳转到搜索页面获取搜索页面的Cookies，该过程需要5秒左右")
-            await self.context_page.goto(f"{self.index_url}/search?q=python&search_source=Guess&utm_content=search_hot&type=content")
-            await asyncio.sleep(5)
+        # Create a client to interact with the zhihu website.
+        self.zhihu_client = await self.create_zhihu_client(httpx_proxy_format)
+        if config.ENABLE_IP_PROXY:
+            # 每个请求(或每N个请求)从代理池中轮换代理IP
+            self.zhihu_client.ip_pool = ip_proxy_pool
+        if not await self.zhihu_client.pong():
+            login_obj = ZhiHuLogin(
+                login_type=config.LOGIN_TYPE,
+                login_phone="",  # input your phone number
+                browser_context=self.browser_context,
+                context_page=self.context_page,
+                cookie_str=config.COOKIES
+            )
+            await login_obj.begin()
             await self.zhihu_client.update_cookies(browser_context=self.browser_context)
 
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for notes and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_notes()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get creator's information and their notes and comments
-                await self.get_creators_and_notes()
-            else:
-                pass
-
-            utils.logger.info("[ZhihuCrawler.start] Zhihu Crawler finished ...")
+        # 知乎的搜索接口需要打开搜索页面之后cookies才能访问API，单独的首页不行
+        utils.logger.info("[ZhihuCrawler.init_session] Zhihu跳转到搜索页面获取搜索页面的Cookies，该过程需要5秒左右")
+        await self.context_page.goto(f"{self.index_url}/search?q=python&search_source=Guess&utm_content=search_hot&type=content")
+        await asyncio.sleep(5)
+        await self.zhihu_client.update_cookies(browser_context=self.browser_context)
+
+        if config.ENABLE_RESOURCE_BLOCKING:
+            # 登录后页面只用于读取localStorage和刷新cookie，固定到同源的轻量页面即可
+            self.resource_blocker = await block_browser_resources(
+                self.browser_context, self.context_page, pin_url=f"{self.index_url}/robots.txt"
+            )
+
+    async def crawl(self) -> None:
+        """
+        Run a crawl job of config.CRAWLER_TYPE with the current session
+        Returns:
+
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        if config.CRAWLER_TYPE == "search":
+            # Search for notes and retrieve their comment information.
+            await self.search()
+        elif config.CRAWLER_TYPE == "detail":
+            # Get the information and comments of the specified post
+            await self.get_specified_notes()
+        elif config.CRAWLER_TYPE == "creator":
+            # Get creator's information and their notes and comments
+            await self.get_creators_and_notes()
+        else:
+            pass
+
+        utils.logger.info("[ZhihuCrawler.crawl] Zhihu Crawler finished ...")
 
     async def search(self) -> None:
         """Search for notes and retrieve their comment information."""
@@ -129,11 +170,13 @@ class ZhihuCrawler(AbstractCrawler):
                         keyword=keyword,
                         page=page,
                     )
-                    utils.logger.info(f"[ZhihuCrawler.search] Search contents :{content_list}")
+                    utils.logger.info("[ZhihuCrawler.search] Search contents :%s", utils.log_payload(content_list))
                     if not content_list:
                         utils.logger.info("No more content!")
                         break
 
+                    for content in content_list:
+                        tracing.event("discovered", content.content_id, keyword=keyword, page=page)
                     page += 1
                     for content in content_list:
                         await zhihu_store.update_zhihu_content(content)
@@ -163,6 +206,7 @@ class ZhihuCrawler(AbstractCrawler):
             task_list.append(task)
         await asyncio.gather(*task_list)
 
+    @tracing.trace_stage("comments", "content_item.content_id")
     async def get_comments(self, content_item: ZhihuContent, semaphore: asyncio.Semaphore):
         """
         Get note comments with keyword filtering and quantity limitation
@@ -197,7 +241,7 @@ class ZhihuCrawler(AbstractCrawler):
                 utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator {user_url_token} not found")
                 continue
 
-            utils.logger.info(f"[ZhihuCrawler.get_creators_and_notes] Creator info: {createor_info}")
+            utils.logger.info("[ZhihuCrawler.get_creators_and_notes] Creator info: %s", utils.log_payload(createor_info))
             await zhihu_store.save_creator(creator=createor_info)
 
             # 默认只提取回答信息，如果需要文章和视频，把下面的注释打开即可
@@ -10,18 +10,19 @@
 
 
 # -*- coding: utf-8 -*-
-import json
 from typing import Dict, List, Optional
 from urllib.parse import parse_qs, urlparse
 
 import execjs
-from parsel import Selector
 
 from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from tools.crawler_util import extract_text_from_html
+from tools.page_state import extract_script_json_by_id
 
 ZHIHU_SGIN_JS = None
+# 网页内嵌页面状态的 script 标签 id
+ZHIHU_INITIAL_DATA_ID = "js-initialData"
 
 
 def sign(url: str, cookies: str) -> Dict:
@@ -322,11 +323,10 @@ class ZhihuExtractor:
         if not html_content:
             return None
 
-        js_init_data = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="").strip()
-        if not js_init_data:
+        js_init_data_dict: Optional[Dict] = extract_script_json_by_id(html_content, ZHIHU_INITIAL_DATA_ID)
+        if not js_init_data_dict:
             return None
 
-        js_init_data_dict: Dict = json.loads(js_init_data)
         users_info: Dict = js_init_data_dict.get("initialState", {}).get("entities", {}).get("users", {})
         if not users_info:
             return None
@@ -380,10 +380,9 @@ class ZhihuExtractor:
         Returns:
 
         """
-        js_init_data: str = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="")
-        if not js_init_data:
+        json_data: Optional[Dict] = extract_script_json_by_id(html_content, ZHIHU_INITIAL_DATA_ID)
+        if not json_data:
             return None
-        json_data: Dict = json.loads(js_init_data)
         answer_info: Dict = json_data.get("initialState", {}).get("entities", {}).get("answers", {})
         if not answer_info:
             return None
@@ -399,10 +398,9 @@ class ZhihuExtractor:
         Returns:
 
         """
-        js_init_data: str = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="")
-        if not js_init_data:
+        json_data: Optional[Dict] = extract_script_json_by_id(html_content, ZHIHU_INITIAL_DATA_ID)
+        if not json_data:
             return None
-        json_data: Dict = json.loads(js_init_data)
         article_info: Dict = json_data.get("initialState", {}).get("entities", {}).get("articles", {})
         if not article_info:
             return None
@@ -418,10 +416,9 @@ class ZhihuExtractor:
         Returns:
 
         """
-        js_init_data: str = Selector(text=html_content).xpath("//script[@id='js-initialData']/text()").get(default="")
-        if not js_init_data:
+        json_data: Optional[Dict] = extract_script_json_by_id(html_content, ZHIHU_INITIAL_DATA_ID)
+        if not json_data:
             return None
-        json_data: Dict = json.loads(js_init_data)
         zvideo_info: Dict = json_data.get("initialState", {}).get("entities", {}).get("zvideos", {})
         users: Dict = json_data.get("initialState", {}).get("entities", {}).get("users", {})
         if not zvideo_info:
@@ -0,0 +1,338 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 多平台编排器，同时运行多个平台的爬取任务
+#            每个任务在独立的进程中运行(spawn)，拥有自己的配置快照、浏览器和事件循环，
+#            任务进程异常退出后按退避时间重启并从该任务自己的断点继续，所有任务的数据库连接数合计不超过上限，
+#            各任务定时上报请求数和存储条数，编排器汇总输出进度
+#
+#            启动: python orchestrator.py                          # 运行 config.ORCHESTRATOR_JOBS
+#                  python orchestrator.py --platforms xhs,dy,bili,wb --type search
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import queue
+import shutil
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+import config
+import db
+from main import CrawlerFactory
+from tools import metrics, utils
+
+# 传给任务进程的配置快照只包含这些类型的值
+SNAPSHOT_TYPES = (str, int, float, bool, list, tuple, dict, type(None))
+
+
+class JobStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    RESTARTING = "restarting"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+
+class JobSpec(BaseModel):
+    name: str = Field(title="任务名")
+    platform: str = Field(title="平台, xhs | dy | ks | bili | wb | tieba | zhihu")
+    overrides: Dict[str, Any] = Field(default_factory=dict, title="该任务覆盖的配置项")
+
+
+class JobState:
+    def __init__(self, spec: JobSpec):
+        self.spec = spec
+        # 每个任务使用自己的断点目录，同一平台的多个任务、以及前一天的运行不会互相影响
+        self.checkpoint_dir = os.path.join(config.CHECKPOINT_SAVE_DIR, "orchestrator", spec.name)
+        # 同一平台的第二个及以后的任务使用自己的浏览器用户目录，None 表示使用默认目录
+        self.user_data_dir: Optional[str] = None
+        self.status = JobStatus.PENDING
+        self.process: Optional[multiprocessing.Process] = None
+        self.restarts = 0
+        self.restart_at = 0.0
+        self.exit_codes: List[int] = []
+        # 任务进程最近一次上报的进度
+        self.progress: Dict = {}
+
+
+def build_job_specs(jobs: List[Dict]) -> List[JobSpec]:
+    """
+    把 ORCHESTRATOR_JOBS 形式的配置转换成任务，同一平台有多个任务时用序号区分任务名
+    """
+    specs = []
+    names = set()
+    for job in jobs:
+        name = job.get("name") or job["platform"]
+        if name in names:
+            name = f"{name}-{len(specs)}"
+        names.add(name)
+        specs.append(JobSpec(name=name, platform=job["platform"], overrides=job.get("overrides", {})))
+    return specs
+
+
+def snapshot_config() -> Dict[str, Any]:
+    """
+    当前进程中生效的配置，包括命令行参数修改过的值
+    """
+    snapshot = {}
+    for name in dir(config):
+        if name.isupper():
+            value = getattr(config, name)
+            if isinstance(value, SNAPSHOT_TYPES):
+                snapshot[name] = value
+    return snapshot
+
+
+def progress_snapshot(job_name: str) -> Dict:
+    """
+    任务进程的进度，来自本进程的运行指标
+    """
+    platform = config.PLATFORM
+    requests, errors = 0, 0
+    for (metric_platform, _, request_status), count in metrics.requests_total.values.items():
+        if metric_platform == platform:
+            requests += int(count)
+            errors += int(count) if request_status != "ok" else 0
+    stored: Dict[str, int] = {}
+    for (metric_platform, store_type, _), count in metrics.items_stored_total.values.items():
+        if metric_platform == platform:
+            stored[store_type] = stored.get(store_type, 0) + int(count)
+    return {"job": job_name, "pid": os.getpid(), "requests": requests, "errors": errors, "stored": stored,
+            "reported_at": int(time.time())}
+
+
+async def report_progress(job_name: str, progress_queue: multiprocessing.Queue) -> None:
+    while True:
+        await asyncio.sleep(config.ORCHESTRATOR_PROGRESS_INTERVAL)
+        progress_queue.put(progress_snapshot(job_name))
+
+
+async def run_job(job_name: str, progress_queue: multiprocessing.Queue) -> None:
+    """
+    在任务进程中执行一次完整的爬取，流程与 main.py 相同
+    """
+    if config.SAVE_DATA_OPTION == "db":
+        await db.init_db()
+    reporter = asyncio.create_task(report_progress(job_name, progress_queue))
+    try:
+        crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
+        await crawler.start()
+    finally:
+        reporter.cancel()
+        progress_queue.put(progress_snapshot(job_name))
+        if config.SAVE_DATA_OPTION == "db":
+            await db.close()
+
+
+def run_job_process(spec: JobSpec, config_snapshot: Dict[str, Any], progress_queue: multiprocessing.Queue) -> None:
+    """
+    任务进程的入口，先用编排器传来的配置快照覆盖本进程的配置，再在新的事件循环中运行爬取
+    """
+    for name, value in config_snapshot.items():
+        setattr(config, name, value)
+    try:
+        asyncio.run(run_job(spec.name, progress_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+class Orchestrator:
+    def __init__(self, specs: List[JobSpec], target: Callable = run_job_process):
+        """
+        Args:
+            specs: 要运行的任务
+            target: 任务进程的入口函数，参数为 (任务, 配置快照, 进度队列)
+        """
+        self.jobs = [JobState(spec) for spec in specs]
+        platforms = set()
+        for job in self.jobs:
+            if job.spec.platform in platforms:
+                job.user_data_dir = f"%s_{job.spec.name}_user_data_dir"
+            platforms.add(job.spec.platform)
+        self.target = target
+        self.max_restarts = config.ORCHESTRATOR_MAX_RESTARTS
+        self.restart_backoff = config.ORCHESTRATOR_RESTART_BACKOFF_SEC
+        self.progress_interval = config.ORCHESTRATOR_PROGRESS_INTERVAL
+        # spawn 启动的进程不继承父进程的事件循环、浏览器和日志线程
+        self.mp_context = multiprocessing.get_context("spawn")
+        self.progress_queue = self.mp_context.Queue()
+        self.db_pool_size = self.get_db_pool_size(len(specs))
+
+    @staticmethod
+    def get_db_pool_size(job_count: int) -> Optional[int]:
+        """
+        每个任务进程的数据库连接池大小，合计不超过 ORCHESTRATOR_DB_MAX_CONNECTIONS
+        """
+        if config.SAVE_DATA_OPTION != "db" or not job_count:
+            return None
+        pool_size = config.ORCHESTRATOR_DB_MAX_CONNECTIONS // job_count
+        if pool_size < 1:
+            utils.logger.warning(
+                f"[Orchestrator.get_db_pool_size] ORCHESTRATOR_DB_MAX_CONNECTIONS "
+                f"{config.ORCHESTRATOR_DB_MAX_CONNECTIONS} is less than the job count {job_count}, use 1 per job"
+            )
+        return max(pool_size, 1)
+
+    def build_job_config(self, job: JobState) -> Dict[str, Any]:
+        job_config = snapshot_config()
+        job_config.update({"PLATFORM": job.spec.platform, **job.spec.overrides})
+        if self.db_pool_size:
+            job_config["RELATION_DB_POOL_MAX_SIZE"] = self.db_pool_size
+        if job.user_data_dir:
+            job_config["USER_DATA_DIR"] = job.user_data_dir
+        job_config["CHECKPOINT_SAVE_DIR"] = job.checkpoint_dir
+        # 只有本任务之前的运行已经保存过断点时，重启的任务才从断点继续
+        job_config["ENABLE_RESUME"] = bool(job.restarts) and self.has_checkpoint(job)
+        return job_config
+
+    @staticmethod
+    def has_checkpoint(job: JobState) -> bool:
+        return os.path.isdir(job.checkpoint_dir) and any(
+            file_name.endswith(".json") for file_name in os.listdir(job.checkpoint_dir)
+        )
+
+    def start_job(self, job: JobState) -> None:
+        if not job.restarts:
+            # 第一次运行从头开始，删除本任务上一次运行(例如前一天的批次)留下的断点
+            shutil.rmtree(job.checkpoint_dir, ignore_errors=True)
+        job.process = self.mp_context.Process(
+            target=self.target,
+            args=(job.spec, self.build_job_config(job), self.progress_queue),
+            name=f"crawler-{job.spec.name}",
+        )
+        job.process.start()
+        job.status = JobStatus.RUNNING
+        utils.logger.info(
+            f"[Orchestrator.start_job] Job {job.spec.name} started, pid: {job.process.pid}, restarts: {job.restarts}"
+        )
+
+    def check_job(self, job: JobState) -> None:
+        """
+        检查任务进程是否退出，异常退出时安排重启
+        """
+        if job.status == JobStatus.RUNNING and not job.process.is_alive():
+            job.process.join()
+            exit_code = job.process.exitcode
+            job.exit_codes.append(exit_code)
+            if exit_code == 0:
+                job.status = JobStatus.FINISHED
+                utils.logger.info(f"[Orchestrator.check_job] Job {job.spec.name} finished")
+            elif job.restarts < self.max_restarts:
+                job.status = JobStatus.RESTARTING
+                backoff = self.restart_backoff * 2 ** job.restarts
+                job.restart_at = time.monotonic() + backoff
+                utils.logger.warning(
+                    f"[Orchestrator.check_job] Job {job.spec.name} exited with code {exit_code}, restart in {backoff}s"
+                )
+            else:
+                job.status = JobStatus.FAILED
+                utils.logger.error(
+                    f"[Orchestrator.check_job] Job {job.spec.name} exited with code {exit_code}, "
+                    f"gave up after {job.restarts} restarts"
+                )
+        elif job.status == JobStatus.RESTARTING and time.monotonic() >= job.restart_at:
+            job.restarts += 1
+            self.start_job(job)
+
+    def drain_progress(self, timeout: float) -> None:
+        """
+        读取任务进程上报的进度，最多等待 timeout 秒
+        """
+        jobs = {job.spec.name: job for job in self.jobs}
+        try:
+            progress = self.progress_queue.get(timeout=timeout)
+            while True:
+                jobs[progress["job"]].progress = progress
+                progress = self.progress_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def format_progress(self) -> List[str]:
+        lines = []
+        total_requests, total_errors, total_stored = 0, 0, {}
+        for job in self.jobs:
+            progress = job.progress
+            stored = progress.get("stored", {})
+            total_requests += progress.get("requests", 0)
+            total_errors += progress.get("errors", 0)
+            for store_type, count in stored.items():
+                total_stored[store_type] = total_stored.get(store_type, 0) + count
+            lines.append(f"[orchestrator] job={job.spec.name} status={job.status} restarts={job.restarts} "
+                         f"requests={progress.get('requests', 0)} errors={progress.get('errors', 0)} stored={stored}")
+        lines.append(f"[orchestrator] total requests={total_requests} errors={total_errors} stored={total_stored}")
+        return lines
+
+    def run(self) -> bool:
+        """
+        启动所有任务并监控，直到全部完成或放弃重启
+        Returns: 是否所有任务都成功完成
+
+        """
+        for job in self.jobs:
+            self.start_job(job)
+        last_report_at = time.monotonic()
+        try:
+            while any(job.status in (JobStatus.RUNNING, JobStatus.RESTARTING) for job in self.jobs):
+                self.drain_progress(timeout=0.5)
+                for job in self.jobs:
+                    self.check_job(job)
+                if time.monotonic() - last_report_at >= self.progress_interval:
+                    last_report_at = time.monotonic()
+                    for line in self.format_progress():
+                        utils.logger.info(line)
+        finally:
+            self.stop()
+        # 任务进程退出前上报的最终进度
+        self.drain_progress(timeout=0)
+        for line in self.format_progress():
+            utils.logger.info(line)
+        return all(job.status == JobStatus.FINISHED for job in self.jobs)
+
+    def stop(self) -> None:
+        for job in self.jobs:
+            if job.process is not None and job.process.is_alive():
+                job.process.terminate()
+                job.process.join()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Run several platform crawls concurrently, one process each.')
+    parser.add_argument('--platforms', type=str, default=None,
+                        help='platforms separated by commas, e.g. xhs,dy,bili,wb, default config.ORCHESTRATOR_JOBS')
+    parser.add_argument('--type', type=str, choices=["search", "detail", "creator"], default=config.CRAWLER_TYPE,
+                        help='crawler type of the jobs given by --platforms')
+    parser.add_argument('--save_data_option', type=str, choices=['csv', 'db', 'json'],
+                        default=config.SAVE_DATA_OPTION, help='where to save the data (csv or db or json)')
+    parser.add_argument('--get_comment', type=utils.str2bool, default=config.ENABLE_GET_COMMENTS,
+                        help='whether to crawl level one comment')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    cmd_args = parse_args()
+    config.SAVE_DATA_OPTION = cmd_args.save_data_option
+    config.ENABLE_GET_COMMENTS = cmd_args.get_comment
+    if cmd_args.platforms:
+        job_configs = [{"platform": platform, "overrides": {"CRAWLER_TYPE": cmd_args.type}}
+                       for platform in cmd_args.platforms.split(",")]
+    else:
+        job_configs = config.ORCHESTRATOR_JOBS
+    orchestrator = Orchestrator(build_job_specs(job_configs))
+    try:
+        success = orchestrator.run()
+    except KeyboardInterrupt:
+        success = False
+    raise SystemExit(0 if success else 1)
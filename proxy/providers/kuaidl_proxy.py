@@ -92,7 +92,7 @@ class KuaiDaiLiProxy(ProxyProvider):
         uri = "/api/getdps/"
 
         # 优先从缓存中拿 IP
-        ip_cache_list = self.ip_cache.load_all_ip(proxy_brand_name=self.proxy_brand_name)
+        ip_cache_list = await self.ip_cache.load_all_ip(proxy_brand_name=self.proxy_brand_name)
         if len(ip_cache_list) >= num:
             return ip_cache_list[:num]
 
@@ -114,18 +114,20 @@ class KuaiDaiLiProxy(ProxyProvider):
                 raise Exception("get ip error from proxy provider and  code not 0 ...")
 
             proxy_list: List[str] = ip_response.get("data", {}).get("proxy_list")
+            current_ts = utils.get_unix_timestamp()
             for proxy in proxy_list:
                 proxy_model = parse_kuaidaili_proxy(proxy)
+                # f_et=1 时快代理返回的是剩余有效秒数，统一转换成过期时间戳
                 ip_info_model = IpInfoModel(
                     ip=proxy_model.ip,
                     port=proxy_model.port,
                     user=self.kdl_user_name,
                     password=self.kdl_user_pwd,
-                    expired_time_ts=proxy_model.expire_ts,
+                    expired_time_ts=current_ts + proxy_model.expire_ts,
 
                 )
                 ip_key = f"{self.proxy_brand_name}_{ip_info_model.ip}_{ip_info_model.port}"
-                self.ip_cache.set_ip(ip_key, ip_info_model.model_dump_json(), ex=ip_info_model.expired_time_ts)
+                await self.ip_cache.set_ip(ip_key, ip_info_model.model_dump_json(), ex=proxy_model.expire_ts)
                 ip_infos.append(ip_info_model)
 
         return ip_cache_list + ip_infos
@@ -13,8 +13,12 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2023/12/2 13:45
 # @Desc    : ip代理池实现
+import asyncio
+import functools
 import random
-from typing import Dict, List
+import ssl
+import time
+from typing import Dict, List, Optional, Tuple, Type
 
 import httpx
 from tenacity import retry, stop_after_attempt, wait_fixed
@@ -23,10 +27,36 @@ import config
 from proxy.providers import new_jisu_http_proxy, new_kuai_daili_proxy
 from tools import utils
 
-from .base_proxy import ProxyProvider
+from .base_proxy import IpGetError, ProxyProvider
 from .types import IpInfoModel, ProviderNameEnum
 
 
+class ProxyStats:
+    """单个代理IP的使用统计，用于给代理IP打分"""
+
+    def __init__(self):
+        self.success_count = 0
+        self.failure_count = 0
+        self.consecutive_failures = 0
+        self.total_latency = 0.0
+        # 验证代理IP时测得的延迟，还没有请求成功过时用它来打分
+        self.validate_latency = 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.success_count if self.success_count else self.validate_latency
+
+    @property
+    def score(self) -> float:
+        # 成功率(带平滑) / 平均延迟，新的代理IP也有机会被选中
+        success_rate = (self.success_count + 1) / (self.success_count + self.failure_count + 2)
+        return success_rate / (1 + self.avg_latency)
+
+
+def get_proxy_key(proxy: IpInfoModel) -> str:
+    return f"{proxy.ip}:{proxy.port}"
+
+
 class ProxyIpPool:
     def __init__(self, ip_pool_count: int, enable_validate_ip: bool, ip_provider: ProxyProvider) -> None:
         """
@@ -36,55 +66,86 @@ class ProxyIpPool:
             enable_validate_ip:
             ip_provider:
         """
-        self.valid_ip_url = "https://httpbin.org/ip"  # 验证 IP 是否有效的地址
+        self.valid_ip_url = config.IP_PROXY_VALIDATE_URL  # 验证 IP 是否有效的地址
+        self.validate_ssl_context: Optional[ssl.SSLContext] = None
         self.ip_pool_count = ip_pool_count
         self.enable_validate_ip = enable_validate_ip
         self.proxy_list: List[IpInfoModel] = []
         self.ip_provider: ProxyProvider = ip_provider
+        # 轮换相关的状态
+        self.proxy_stats: Dict[str, ProxyStats] = {}
+        self.banned_keys: set = set()
+        self.current_proxy: Optional[IpInfoModel] = None
+        self.current_proxy_uses = 0
+        self.refill_task: Optional[asyncio.Task] = None
+        self.refill_threshold = max(1, ip_pool_count // 2)
 
     async def load_proxies(self) -> None:
         """
-        加载IP代理
+        加载IP代理，开启验证时并发验证并按延迟从低到高排序
         Returns:
 
         """
-        self.proxy_list = await self.ip_provider.get_proxies(self.ip_pool_count)
+        proxies = await self.ip_provider.get_proxies(self.ip_pool_count)
+        if self.enable_validate_ip:
+            proxies = await self.validate_proxies(proxies)
+        self.proxy_list = proxies
 
     async def _is_valid_proxy(self, proxy: IpInfoModel) -> bool:
         """
-        验证代理IP是否有效
+        验证代理IP是否有效，并记录验证时的延迟
         :param proxy:
         :return:
         """
-        utils.logger.info(f"[ProxyIpPool._is_valid_proxy] testing {proxy.ip} is it valid ")
+        _, httpx_proxy = utils.format_proxy_info(proxy)
+        # 每个 AsyncClient 默认都会重新加载一遍证书，并发验证时共用同一个 SSL 上下文
+        if self.validate_ssl_context is None:
+            self.validate_ssl_context = httpx.create_ssl_context()
+        start = time.monotonic()
         try:
-            httpx_proxy = {
-                f"{proxy.protocol}": f"http://{proxy.user}:{proxy.password}@{proxy.ip}:{proxy.port}"
-            }
-            async with httpx.AsyncClient(proxies=httpx_proxy) as client:
+            async with httpx.AsyncClient(proxies=httpx_proxy, verify=self.validate_ssl_context,
+                                         timeout=config.IP_PROXY_VALIDATE_TIMEOUT_SEC) as client:
                 response = await client.get(self.valid_ip_url)
-            if response.status_code == 200:
-                return True
-            else:
-                return False
         except Exception as e:
             utils.logger.info(f"[ProxyIpPool._is_valid_proxy] testing {proxy.ip} err: {e}")
-            raise e
+            return False
+        if response.status_code != 200:
+            return False
+        self.proxy_stats.setdefault(get_proxy_key(proxy), ProxyStats()).validate_latency = time.monotonic() - start
+        return True
+
+    async def validate_proxies(self, proxies: List[IpInfoModel]) -> List[IpInfoModel]:
+        """
+        并发验证一批代理IP，返回可用的代理IP，按验证延迟从低到高排序
+        :param proxies:
+        :return:
+        """
+        results = await asyncio.gather(*[self._is_valid_proxy(proxy) for proxy in proxies])
+        valid_proxies = [proxy for proxy, is_valid in zip(proxies, results) if is_valid]
+        valid_proxies.sort(key=lambda proxy: self.proxy_stats[get_proxy_key(proxy)].validate_latency)
+        utils.logger.info(f"[ProxyIpPool.validate_proxies] {len(valid_proxies)}/{len(proxies)} proxies are valid")
+        return valid_proxies
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
     async def get_proxy(self) -> IpInfoModel:
         """
-        从代理池中随机提取一个代理IP
+        从代理池中提取一个代理IP，开启验证时池子里都是验证过的代理IP，直接取延迟最低的
         :return:
         """
         if len(self.proxy_list) == 0:
             await self._reload_proxies()
+        if len(self.proxy_list) == 0:
+            raise IpGetError("[ProxyIpPool.get_proxy] no valid proxy, get it again")
 
-        proxy = random.choice(self.proxy_list)
-        self.proxy_list.remove(proxy) # 取出来一个IP就应该移出掉
         if self.enable_validate_ip:
-            if not await self._is_valid_proxy(proxy):
-                raise Exception("[ProxyIpPool.get_proxy] current ip invalid and again get it")
+            proxy = self.proxy_list.pop(0)
+        else:
+            proxy = random.choice(self.proxy_list)
+            self.proxy_list.remove(proxy) # 取出来一个IP就应该移出掉
+
+        # 剩余的代理IP不多时在后台补充，保证下次提取时有验证好的代理IP可用
+        if len(self.proxy_list) <= self.refill_threshold:
+            self.schedule_refill()
         return proxy
 
     async def _reload_proxies(self):
@@ -95,6 +156,143 @@ class ProxyIpPool:
         self.proxy_list = []
         await self.load_proxies()
 
+    def is_expiring(self, proxy: IpInfoModel) -> bool:
+        """
+        代理IP是否已经过期或即将过期
+        """
+        if not proxy.expired_time_ts:
+            return False
+        return proxy.expired_time_ts - utils.get_unix_timestamp() <= config.IP_PROXY_EXPIRE_MARGIN_SEC
+
+    def remove_proxy(self, proxy: IpInfoModel) -> None:
+        key = get_proxy_key(proxy)
+        self.proxy_list = [item for item in self.proxy_list if get_proxy_key(item) != key]
+        if self.current_proxy and get_proxy_key(self.current_proxy) == key:
+            self.current_proxy = None
+
+    async def refill_proxies(self) -> None:
+        """
+        从代理商补充代理IP，跳过已经在池子里的和被封禁的
+        """
+        try:
+            new_proxies = await self.ip_provider.get_proxies(self.ip_pool_count)
+        except Exception as e:
+            utils.logger.error(f"[ProxyIpPool.refill_proxies] get proxies from provider error: {e}")
+            return
+        exist_keys = {get_proxy_key(proxy) for proxy in self.proxy_list}
+        new_proxies = [
+            proxy for proxy in new_proxies
+            if get_proxy_key(proxy) not in exist_keys
+            and get_proxy_key(proxy) not in self.banned_keys
+            and not self.is_expiring(proxy)
+        ]
+        if self.enable_validate_ip:
+            new_proxies = await self.validate_proxies(new_proxies)
+        self.proxy_list.extend(new_proxies)
+        if self.enable_validate_ip:
+            self.proxy_list.sort(key=lambda proxy: self.proxy_stats[get_proxy_key(proxy)].validate_latency)
+        utils.logger.info(f"[ProxyIpPool.refill_proxies] pool size after refill: {len(self.proxy_list)}")
+
+    def schedule_refill(self) -> None:
+        """
+        可用代理IP不多时在后台补充，避免代理池耗尽时请求被阻塞
+        """
+        if self.refill_task and not self.refill_task.done():
+            return
+        self.refill_task = asyncio.create_task(self.refill_proxies())
+
+    def pick_proxy(self) -> IpInfoModel:
+        """
+        按评分加权随机选择代理IP，尽量不连续选中同一个
+        """
+        candidates = self.proxy_list
+        if self.current_proxy and len(candidates) > 1:
+            current_key = get_proxy_key(self.current_proxy)
+            candidates = [proxy for proxy in candidates if get_proxy_key(proxy) != current_key]
+        weights = [self.proxy_stats.setdefault(get_proxy_key(proxy), ProxyStats()).score for proxy in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+    async def get_rotating_proxy(self) -> IpInfoModel:
+        """
+        给一个请求分配代理IP，每个代理IP连续使用 config.IP_PROXY_ROTATE_REQUESTS 次后换下一个
+        :return:
+        """
+        for proxy in list(self.proxy_list):
+            if self.is_expiring(proxy):
+                self.remove_proxy(proxy)
+
+        if (self.current_proxy and self.current_proxy_uses < config.IP_PROXY_ROTATE_REQUESTS
+                and not self.is_expiring(self.current_proxy)):
+            self.current_proxy_uses += 1
+            return self.current_proxy
+
+        if len(self.proxy_list) <= self.refill_threshold:
+            self.schedule_refill()
+        if not self.proxy_list:
+            await self.refill_task
+        if not self.proxy_list:
+            raise IpGetError("[ProxyIpPool.get_rotating_proxy] no proxy available in the pool")
+
+        self.current_proxy = self.pick_proxy()
+        self.current_proxy_uses = 1
+        return self.current_proxy
+
+    def mark_success(self, proxy: IpInfoModel, latency: float) -> None:
+        stats = self.proxy_stats.setdefault(get_proxy_key(proxy), ProxyStats())
+        stats.success_count += 1
+        stats.consecutive_failures = 0
+        stats.total_latency += latency
+
+    def mark_failure(self, proxy: IpInfoModel, reason: Exception) -> None:
+        stats = self.proxy_stats.setdefault(get_proxy_key(proxy), ProxyStats())
+        stats.failure_count += 1
+        stats.consecutive_failures += 1
+        if stats.consecutive_failures >= config.IP_PROXY_MAX_FAILURES:
+            utils.logger.info(f"[ProxyIpPool.mark_failure] remove proxy {proxy.ip}, too many failures: {reason}")
+            self.remove_proxy(proxy)
+
+    def mark_banned(self, proxy: IpInfoModel, reason: Exception) -> None:
+        utils.logger.info(f"[ProxyIpPool.mark_banned] proxy {proxy.ip} is banned: {reason}")
+        self.banned_keys.add(get_proxy_key(proxy))
+        self.remove_proxy(proxy)
+
+
+def rotate_proxy(ban_exceptions: Tuple[Type[Exception], ...] = ()):
+    """
+    client 请求方法的装饰器，client 设置了 ip_pool 时每个请求从代理池轮换代理IP(通过 proxies 参数传入)，
+    并根据请求结果更新代理IP的评分：连接错误、超时记为失败，ban_exceptions 里的异常(封禁、验证码)直接移除该代理IP
+    Args:
+        ban_exceptions: 代理IP被封禁时请求方法抛出的异常
+
+    Returns:
+
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            ip_pool: Optional[ProxyIpPool] = getattr(self, "ip_pool", None)
+            if not ip_pool or config.IP_PROXY_ROTATE_REQUESTS <= 0 or kwargs.get("proxies"):
+                return await func(self, *args, **kwargs)
+
+            proxy = await ip_pool.get_rotating_proxy()
+            _, kwargs["proxies"] = utils.format_proxy_info(proxy)
+            start = time.monotonic()
+            try:
+                result = await func(self, *args, **kwargs)
+            except ban_exceptions as e:
+                ip_pool.mark_banned(proxy, e)
+                raise
+            except httpx.TransportError as e:
+                ip_pool.mark_failure(proxy, e)
+                raise
+            ip_pool.mark_success(proxy, time.monotonic() - start)
+            return result
+
+        return wrapper
+
+    return decorator
+
 
 IpProxyProvider: Dict[str, ProxyProvider] = {
     ProviderNameEnum.JISHU_HTTP_PROVIDER.value: new_jisu_http_proxy(),
@@ -23,7 +23,7 @@ from tools import utils
 
 app = FastAPI()
 
-cache_client : AbstractCache = CacheFactory.create_cache(cache_type=config.CACHE_TYPE_MEMORY)
+cache_client : AbstractCache = CacheFactory.create_cache(cache_type=config.CACHE_TYPE)
 
 
 class SmsNotification(BaseModel):
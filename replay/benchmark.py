@@ -0,0 +1,180 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 端到端性能测试，用回放服务器代替真实平台，跑完整的 search/detail/creator 爬取流程并统计 items/sec
+#
+#            1. 先开启 config.ENABLE_REPLAY_RECORDING 正常运行一次 main.py，录制各平台、各爬取类型的请求
+#            2. 使用和录制时相同的关键词、ID配置运行: python -m replay.benchmark --platforms xhs bili --latency-ms 50
+#
+#            数据不会写入 csv/json/db，只统计各平台 store 收到的内容、评论、创作者数量
+
+import argparse
+import asyncio
+import importlib
+import os
+import socket
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+import uvicorn
+
+import config
+from base.base_crawler import AbstractStore
+from main import CrawlerFactory
+
+from .recorder import get_fixture_path, stop_replay_redirect
+from .server import create_app
+
+# 各平台的存储工厂: 平台 -> (模块路径, 工厂类名)
+STORE_FACTORIES = {
+    "xhs": ("store.xhs", "XhsStoreFactory"),
+    "dy": ("store.douyin", "DouyinStoreFactory"),
+    "ks": ("store.kuaishou", "KuaishouStoreFactory"),
+    "bili": ("store.bilibili", "BiliStoreFactory"),
+    "wb": ("store.weibo", "WeibostoreFactory"),
+    "tieba": ("store.tieba", "TieBaStoreFactory"),
+    "zhihu": ("store.zhihu", "ZhihuStoreFactory"),
+}
+
+# 注册到各平台存储工厂里的存储类型名
+BENCHMARK_SAVE_OPTION = "benchmark"
+
+
+class CountingStore(AbstractStore):
+    """只计数不保存的存储实现"""
+    counter: Counter = Counter()
+
+    async def store_content(self, content_item: Dict):
+        self.counter["contents"] += 1
+
+    async def store_comment(self, comment_item: Dict):
+        self.counter["comments"] += 1
+
+    async def store_creator(self, creator: Dict):
+        self.counter["creators"] += 1
+
+
+class ReplayServer:
+    """在单独的线程里运行回放服务器，避免和爬虫抢同一个事件循环"""
+
+    def __init__(self, app):
+        self.app = app
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "ReplayServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def run_benchmark(platform: str, crawler_type: str, fixture_paths: List[str], latency_ms: float = 0,
+                        error_rate: float = 0, captcha_rate: float = 0, seed: int = 0) -> Dict:
+    """
+    用回放服务器跑一次完整的爬取流程
+    Args:
+        platform: 平台
+        crawler_type: 爬取类型 search | detail | creator
+        fixture_paths: 录制文件路径
+        latency_ms: 回放服务器每个请求的模拟延迟
+        error_rate: 回放服务器返回 500 错误的概率
+        captcha_rate: 回放服务器返回验证码响应的概率
+        seed: 随机数种子
+
+    Returns: 统计结果
+
+    """
+    module_path, factory_name = STORE_FACTORIES[platform]
+    store_factory = getattr(importlib.import_module(module_path), factory_name)
+    store_factory.STORES[BENCHMARK_SAVE_OPTION] = CountingStore
+    CountingStore.counter = Counter()
+
+    app = create_app(platform, fixture_paths, latency_ms, error_rate, captcha_rate, seed)
+    config.enable_config_overrides()
+    with ReplayServer(app) as server:
+        overrides = dict(config.config_overrides_var.get() or {})
+        overrides.update({
+            "PLATFORM": platform,
+            "CRAWLER_TYPE": crawler_type,
+            "REPLAY_SERVER_URL": server.url,
+            "SAVE_DATA_OPTION": BENCHMARK_SAVE_OPTION,
+            "ENABLE_IP_PROXY": False,
+            "ENABLE_HTTP_CACHE": False,
+            "ENABLE_RESUME": False,
+            # 图片、视频下载不计入吞吐量
+            "ENABLE_GET_IMAGES": False,
+            "ACCOUNTS": {},
+        })
+        token = config.config_overrides_var.set(overrides)
+        try:
+            crawler = CrawlerFactory.create_crawler(platform)
+            await crawler.init_session(None)
+            start = time.perf_counter()
+            await crawler.crawl()
+            elapsed = time.perf_counter() - start
+        finally:
+            config.config_overrides_var.reset(token)
+            stop_replay_redirect()
+
+    items = sum(CountingStore.counter.values())
+    return {
+        "platform": platform,
+        "crawler_type": crawler_type,
+        "items": items,
+        **{name: CountingStore.counter[name] for name in ("contents", "comments", "creators")},
+        **{name: app.state.stats[name] for name in ("requests", "misses", "errors", "captchas")},
+        "elapsed": elapsed,
+        "items_per_sec": items / elapsed if elapsed else 0.0,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-end crawler benchmark against recorded responses")
+    parser.add_argument("--platforms", nargs="+", default=list(STORE_FACTORIES))
+    parser.add_argument("--types", nargs="+", default=["search", "detail", "creator"])
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--captcha-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    print(f"{'platform':<8} {'type':<8} {'items':>7} {'requests':>9} {'misses':>7} {'elapsed':>9} {'items/sec':>10}")
+    for platform in args.platforms:
+        for crawler_type in args.types:
+            fixture_path = get_fixture_path(platform, crawler_type)
+            if not os.path.exists(fixture_path):
+                continue
+            result = await run_benchmark(platform, crawler_type, [fixture_path], args.latency_ms,
+                                         args.error_rate, args.captcha_rate, args.seed)
+            print(f"{platform:<8} {crawler_type:<8} {result['items']:>7} {result['requests']:>9} "
+                  f"{result['misses']:>7} {result['elapsed']:>8.2f}s {result['items_per_sec']:>10.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
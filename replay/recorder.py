@@ -0,0 +1,170 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 录制平台接口的请求和响应，以及回放模式下把请求转发到回放服务器
+#            httpx 和 requests(抖音)的请求最终都经过 send 方法，在这里统一拦截，不需要改动各平台的 client
+import base64
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import requests
+
+import config
+from tools import utils
+
+# 响应体保存的是解压后的内容，这些响应头回放时不再适用
+SKIP_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+_original_httpx_send = httpx.AsyncClient.send
+_original_requests_send = requests.Session.send
+_recorder: Optional["HttpRecorder"] = None
+_replay_server_url: Optional[httpx.URL] = None
+
+
+def get_fixture_path(platform: str, crawler_type: str) -> str:
+    """
+    录制文件路径
+    :param platform: 平台
+    :param crawler_type: 爬取类型
+    :return:
+    """
+    return os.path.join(config.REPLAY_FIXTURES_DIR, f"{platform}_{crawler_type}.jsonl")
+
+
+class HttpRecorder:
+    """把请求和响应逐行追加写入 jsonl 录制文件"""
+
+    def __init__(self, fixture_path: str):
+        self.fixture_path = fixture_path
+        self.record_count = 0
+        self._lock = threading.Lock()
+        fixture_dir = os.path.dirname(fixture_path)
+        if fixture_dir:
+            os.makedirs(fixture_dir, exist_ok=True)
+
+    def record(self, method: str, url: str, body: Optional[bytes], status_code: int,
+               headers: List[Tuple[str, str]], content: bytes) -> None:
+        """
+        保存一对请求和响应
+        :param method: 请求方法
+        :param url: 请求URL
+        :param body: 请求体
+        :param status_code: 响应状态码
+        :param headers: 响应头
+        :param content: 响应体
+        :return:
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        line = json.dumps({
+            "method": method,
+            "url": url,
+            "body": (body or b"").decode("utf-8", errors="replace"),
+            "status_code": status_code,
+            "headers": [[k, v] for k, v in headers if k.lower() not in SKIP_RESPONSE_HEADERS],
+            "content": base64.b64encode(content).decode(),
+        }, ensure_ascii=False)
+        with self._lock:
+            with open(self.fixture_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.record_count += 1
+
+
+def _rewrite_url(url: str) -> str:
+    """把请求的协议、域名、端口替换成回放服务器的，路径和参数不变"""
+    return str(httpx.URL(url).copy_with(
+        scheme=_replay_server_url.scheme, host=_replay_server_url.host, port=_replay_server_url.port
+    ))
+
+
+async def _httpx_send(client: httpx.AsyncClient, request: httpx.Request, **kwargs) -> httpx.Response:
+    if _replay_server_url is not None:
+        request.url = httpx.URL(_rewrite_url(str(request.url)))
+        request.headers["Host"] = request.url.netloc.decode("ascii")
+    response = await _original_httpx_send(client, request, **kwargs)
+    if _recorder is not None:
+        await response.aread()
+        _recorder.record(request.method, str(request.url), request.content, response.status_code,
+                         response.headers.multi_items(), response.content)
+    return response
+
+
+def _requests_send(session: requests.Session, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+    if _replay_server_url is not None:
+        request.url = _rewrite_url(request.url)
+    response = _original_requests_send(session, request, **kwargs)
+    if _recorder is not None:
+        _recorder.record(request.method, request.url, request.body, response.status_code,
+                         list(response.headers.items()), response.content)
+    return response
+
+
+def _install_hooks() -> None:
+    httpx.AsyncClient.send = _httpx_send
+    requests.Session.send = _requests_send
+
+
+def _uninstall_hooks() -> None:
+    if _recorder is None and _replay_server_url is None:
+        httpx.AsyncClient.send = _original_httpx_send
+        requests.Session.send = _original_requests_send
+
+
+def start_recording(fixture_path: str) -> HttpRecorder:
+    """
+    开始录制，之后所有的 httpx、requests 请求和响应都会写入录制文件
+    :param fixture_path: 录制文件路径
+    :return:
+    """
+    global _recorder
+    _recorder = HttpRecorder(fixture_path)
+    _install_hooks()
+    utils.logger.info(f"[start_recording] Recording requests to {fixture_path}")
+    return _recorder
+
+
+def stop_recording() -> None:
+    global _recorder
+    if _recorder is not None:
+        utils.logger.info(f"[stop_recording] Recorded {_recorder.record_count} requests to {_recorder.fixture_path}")
+    _recorder = None
+    _uninstall_hooks()
+
+
+def start_replay_redirect(server_url: str) -> None:
+    """
+    把所有请求转发到回放服务器，client 的 _host 之外的完整URL请求(例如小红书的笔记详情页)也会被转发
+    :param server_url: 回放服务器地址
+    :return:
+    """
+    global _replay_server_url
+    _replay_server_url = httpx.URL(server_url)
+    _install_hooks()
+
+
+def stop_replay_redirect() -> None:
+    global _replay_server_url
+    _replay_server_url = None
+    _uninstall_hooks()
+
+
+def load_fixtures(fixture_path: str) -> List[Dict]:
+    """
+    读取录制文件
+    :param fixture_path:
+    :return:
+    """
+    with open(fixture_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,156 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 本地回放服务器，按录制文件返回平台接口的响应，可以模拟网络延迟、接口报错和验证码
+#
+#            启动: python -m replay.server --platform bili --fixtures data/replay_fixtures/bili_detail.jsonl \
+#                      --port 8090 --latency-ms 50 --error-rate 0.01 --captcha-rate 0.005
+#            然后把 config.REPLAY_SERVER_URL 设置为 http://127.0.0.1:8090 运行爬虫
+
+import argparse
+import asyncio
+import base64
+import random
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from cache.http_response_cache import normalize_request_key
+
+from .recorder import load_fixtures
+
+# 注入验证码时各平台返回的响应: (状态码, 响应头, 响应体)，和各平台 client 识别验证码、封禁的逻辑一致
+CAPTCHA_RESPONSES: Dict[str, Tuple[int, Dict[str, str], bytes]] = {
+    "xhs": (461, {"Verifytype": "102", "Verifyuuid": "replay"}, b""),
+    "dy": (200, {}, b"blocked"),
+    "ks": (200, {"Content-Type": "application/json"}, b'{"errors": [{"message": "captcha"}]}'),
+    "bili": (200, {"Content-Type": "application/json"}, b'{"code": -352, "message": "risk control"}'),
+    "wb": (200, {"Content-Type": "application/json"}, b'{"ok": 0, "msg": "captcha"}'),
+    "tieba": (200, {}, b"blocked"),
+    "zhihu": (403, {"Content-Type": "application/json"}, b'{"error": {"message": "captcha"}}'),
+}
+
+# 用于计算匹配 key 的固定域名，录制时的域名和回放时的请求域名不同，只比较路径、参数和请求体
+KEY_HOST = "http://replay"
+
+
+class FixtureIndex:
+    """
+    录制的响应索引：先按 请求方法 + 路径 + 参数(去掉签名参数) + 请求体 精确匹配，
+    匹配不到再按 请求方法 + 路径 匹配；同一个 key 有多个响应时轮流返回
+    """
+
+    def __init__(self, fixtures: List[Dict]):
+        self.exact_index: Dict[str, List[Dict]] = defaultdict(list)
+        self.path_index: Dict[str, List[Dict]] = defaultdict(list)
+        self._cursors: Counter = Counter()
+        for fixture in fixtures:
+            path_with_query = fixture["url"].split("://", 1)[-1].partition("/")[2]
+            self.exact_index[self.make_key(fixture["method"], "/" + path_with_query, fixture["body"])].append(fixture)
+            self.path_index[f"{fixture['method']} /{path_with_query.partition('?')[0]}"].append(fixture)
+
+    @staticmethod
+    def make_key(method: str, path_with_query: str, body: str) -> str:
+        return normalize_request_key(method, KEY_HOST + path_with_query, body=body or None)
+
+    def match(self, method: str, path: str, query: str, body: str) -> Optional[Dict]:
+        """
+        查找录制的响应
+        :param method: 请求方法
+        :param path: 请求路径
+        :param query: 查询参数
+        :param body: 请求体
+        :return:
+        """
+        key = self.make_key(method, f"{path}?{query}" if query else path, body)
+        candidates = self.exact_index.get(key)
+        if not candidates:
+            key = f"{method} {path}"
+            candidates = self.path_index.get(key)
+        if not candidates:
+            return None
+        fixture = candidates[self._cursors[key] % len(candidates)]
+        self._cursors[key] += 1
+        return fixture
+
+
+def create_app(platform: str, fixture_paths: List[str], latency_ms: float = 0, error_rate: float = 0,
+               captcha_rate: float = 0, seed: Optional[int] = None) -> FastAPI:
+    """
+    创建回放服务器
+    Args:
+        platform: 平台，决定注入验证码时的响应格式
+        fixture_paths: 录制文件路径
+        latency_ms: 每个请求的模拟延迟，单位毫秒
+        error_rate: 返回 500 错误的概率
+        captcha_rate: 返回验证码响应的概率
+        seed: 随机数种子，相同的种子注入错误的顺序相同
+
+    Returns:
+
+    """
+    fixtures = []
+    for fixture_path in fixture_paths:
+        fixtures.extend(load_fixtures(fixture_path))
+    fixture_index = FixtureIndex(fixtures)
+    rand = random.Random(seed)
+    app = FastAPI()
+    # 请求总数、未匹配、注入的错误和验证码次数
+    app.state.stats = Counter()
+
+    @app.api_route("/{path:path}", methods=["GET", "POST"])
+    async def replay(request: Request, path: str) -> Response:
+        app.state.stats["requests"] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if error_rate and rand.random() < error_rate:
+            app.state.stats["errors"] += 1
+            return Response(status_code=500, content=b"replay injected error")
+        if captcha_rate and rand.random() < captcha_rate:
+            app.state.stats["captchas"] += 1
+            status_code, headers, content = CAPTCHA_RESPONSES.get(platform, (429, {}, b""))
+            return Response(status_code=status_code, headers=headers, content=content)
+
+        body = (await request.body()).decode("utf-8", errors="replace")
+        fixture = fixture_index.match(request.method, request.url.path, request.url.query, body)
+        if fixture is None:
+            app.state.stats["misses"] += 1
+            return Response(status_code=404, content=b"no recorded response")
+        response = Response(status_code=fixture["status_code"], content=base64.b64decode(fixture["content"]))
+        for header_name, header_value in fixture["headers"]:
+            response.headers.append(header_name, header_value)
+        return response
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded platform responses")
+    parser.add_argument("--platform", required=True, help="platform of the fixtures, e.g. xhs, bili")
+    parser.add_argument("--fixtures", nargs="+", required=True, help="recorded jsonl fixture files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--captcha-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    uvicorn.run(
+        create_app(args.platform, args.fixtures, args.latency_ms, args.error_rate, args.captcha_rate, args.seed),
+        host=args.host, port=args.port, log_level="warning",
+    )
@@ -0,0 +1,89 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 回放模式的会话初始化，不启动浏览器、不登录，client 直接请求回放服务器
+from typing import Any, Callable, Dict, List, Optional
+
+import config
+from base.base_crawler import AbstractCrawler
+from tools import utils
+
+from .recorder import start_replay_redirect
+
+
+# 回放模式下页面的 localStorage，只提供签名需要的字段，回放服务器不校验签名，值是什么都可以
+REPLAY_LOCAL_STORAGE = {
+    "b1": "",
+    "wbi_img_urls": "https://i0.hdslb.com/bfs/wbi/00000000000000000000000000000000.png-"
+                    "https://i0.hdslb.com/bfs/wbi/11111111111111111111111111111111.png",
+}
+
+
+class ReplayPage:
+    """
+    回放模式下代替 playwright 的 Page，client 的签名代码照常运行，读取页面状态的调用返回空值或占位值
+    """
+
+    async def evaluate(self, expression: str, arg: Any = None) -> Any:
+        if "navigator.userAgent" in expression:
+            return utils.get_user_agent()
+        if "localStorage" in expression:
+            return dict(REPLAY_LOCAL_STORAGE)
+        return {}
+
+    async def goto(self, url: str, **kwargs) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class ReplayBrowserContext:
+    """
+    回放模式下代替 playwright 的 BrowserContext，没有任何 cookie
+    """
+
+    async def cookies(self, urls: Optional[List[str]] = None) -> List[Dict]:
+        return []
+
+    async def add_cookies(self, cookies: List[Dict]) -> None:
+        pass
+
+    async def new_page(self) -> ReplayPage:
+        return ReplayPage()
+
+    async def close(self) -> None:
+        pass
+
+
+async def init_replay_session(crawler: AbstractCrawler, client_attr: str, create_client: Callable) -> bool:
+    """
+    设置了 REPLAY_SERVER_URL 时初始化回放会话：用空的浏览器上下文创建 client，client 的 _host 指向回放服务器
+    Args:
+        crawler: 爬虫实例
+        client_attr: 爬虫上api客户端的属性名，如 xhs_client
+        create_client: 爬虫创建api客户端的方法，参数为 httpx 代理
+
+    Returns: 是否启用了回放模式
+
+    """
+    if not config.REPLAY_SERVER_URL:
+        return False
+
+    start_replay_redirect(config.REPLAY_SERVER_URL)
+    crawler.browser_context = ReplayBrowserContext()
+    crawler.context_page = ReplayPage()
+    client = await create_client(None)
+    client._host = config.REPLAY_SERVER_URL.rstrip("/")
+    setattr(crawler, client_attr, client)
+    utils.logger.info(f"[init_replay_session] Replay session is ready, server: {config.REPLAY_SERVER_URL}")
+    return True
@@ -20,6 +20,9 @@ import config
 from var import source_keyword_var
 
 from .bilibili_store_impl import *
+from .bilibili_store_record import (BilibiliUpInfoRecord,
+                                    BilibiliVideoCommentRecord,
+                                    BilibiliVideoRecord)
 from .bilibilli_store_video import *
 
 
@@ -44,44 +47,43 @@ async def update_bilibili_video(video_item: Dict):
     video_user_info: Dict = video_item_view.get("owner")
     video_item_stat: Dict = video_item_view.get("stat")
     video_id = str(video_item_view.get("aid"))
-    save_content_item = {
-        "video_id": video_id,
-        "video_type": "video",
-        "title": video_item_view.get("title", "")[:500],
-        "desc": video_item_view.get("desc", "")[:500],
-        "create_time": video_item_view.get("pubdate"),
-        "user_id": str(video_user_info.get("mid")),
-        "nickname": video_user_info.get("name"),
-        "avatar": video_user_info.get("face", ""),
-        "liked_count": str(video_item_stat.get("like", "")),
-        "video_play_count": str(video_item_stat.get("view", "")),
-        "video_danmaku": str(video_item_stat.get("danmaku", "")),
-        "video_comment": str(video_item_stat.get("reply", "")),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "video_url": f"https://www.bilibili.com/video/av{video_id}",
-        "video_cover_url": video_item_view.get("pic", ""),
-        "source_keyword": source_keyword_var.get(),
-    }
-    utils.logger.info(
-        f"[store.bilibili.update_bilibili_video] bilibili video id:{video_id}, title:{save_content_item.get('title')}")
+    save_content_item = BilibiliVideoRecord(
+        video_id=video_id,
+        video_type="video",
+        title=video_item_view.get("title", "")[:500],
+        desc=video_item_view.get("desc", "")[:500],
+        create_time=video_item_view.get("pubdate"),
+        user_id=str(video_user_info.get("mid")),
+        nickname=video_user_info.get("name"),
+        avatar=video_user_info.get("face", ""),
+        liked_count=str(video_item_stat.get("like", "")),
+        video_play_count=str(video_item_stat.get("view", "")),
+        video_danmaku=str(video_item_stat.get("danmaku", "")),
+        video_comment=str(video_item_stat.get("reply", "")),
+        last_modify_ts=utils.get_current_timestamp(),
+        video_url=f"https://www.bilibili.com/video/av{video_id}",
+        video_cover_url=video_item_view.get("pic", ""),
+        source_keyword=source_keyword_var.get(),
+    )
+    utils.log_event("store.bilibili.update_bilibili_video", video_id=video_id,
+                    title=utils.log_payload(save_content_item.title))
     await BiliStoreFactory.create_store().store_content(content_item=save_content_item)
 
 
 async def update_up_info(video_item: Dict):  
     video_item_card_list: Dict = video_item.get("Card")
     video_item_card: Dict = video_item_card_list.get("card") 
-    saver_up_info = {
-        "user_id": str(video_item_card.get("mid")), 
-        "nickname": video_item_card.get("name"),  
-        "avatar": video_item_card.get("face"), 
-        "last_modify_ts": utils.get_current_timestamp(),  
-        "total_fans": video_item_card.get("fans"), 
-        "total_liked": video_item_card_list.get("like_num"), 
-        "user_rank": video_item_card.get("level_info").get("current_level"),  
-        "is_official": video_item_card.get("official_verify").get("type"), 
-    }
-    utils.logger.info(
-        f"[store.bilibili.update_up_info] bilibili user_id:{video_item_card.get('mid')}")
+    saver_up_info = BilibiliUpInfoRecord(
+        user_id=str(video_item_card.get("mid")), 
+        nickname=video_item_card.get("name"),  
+        avatar=video_item_card.get("face"), 
+        last_modify_ts=utils.get_current_timestamp(),  
+        total_fans=video_item_card.get("fans"), 
+        total_liked=video_item_card_list.get("like_num"), 
+        user_rank=video_item_card.get("level_info").get("current_level"),  
+        is_official=video_item_card.get("official_verify").get("type"), 
+    )
+    utils.log_event("store.bilibili.update_up_info", user_id=saver_up_info.user_id)
     await BiliStoreFactory.create_store().store_creator(creator=saver_up_info)
     
 
@@ -97,20 +99,20 @@ async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
     parent_comment_id = str(comment_item.get("parent", 0))
     content: Dict = comment_item.get("content")
     user_info: Dict = comment_item.get("member")
-    save_comment_item = {
-        "comment_id": comment_id,
-        "parent_comment_id": parent_comment_id,
-        "create_time": comment_item.get("ctime"),
-        "video_id": str(video_id),
-        "content": content.get("message"),
-        "user_id": user_info.get("mid"),
-        "nickname": user_info.get("uname"),
-        "avatar": user_info.get("avatar"),
-        "sub_comment_count": str(comment_item.get("rcount", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
-    utils.logger.info(
-        f"[store.bilibili.update_bilibili_video_comment] Bilibili video comment: {comment_id}, content: {save_comment_item.get('content')}")
+    save_comment_item = BilibiliVideoCommentRecord(
+        comment_id=comment_id,
+        parent_comment_id=parent_comment_id,
+        create_time=comment_item.get("ctime"),
+        video_id=str(video_id),
+        content=content.get("message"),
+        user_id=user_info.get("mid"),
+        nickname=user_info.get("uname"),
+        avatar=user_info.get("avatar"),
+        sub_comment_count=str(comment_item.get("rcount", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    utils.log_event("store.bilibili.update_bilibili_video_comment", comment_id=comment_id,
+                    content=utils.log_payload(save_comment_item.content))
     await BiliStoreFactory.create_store().store_comment(comment_item=save_comment_item)
 
 
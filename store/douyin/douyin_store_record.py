@@ -0,0 +1,46 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 抖音存储记录，字段顺序即列顺序
+from store.record import StoreRecord
+
+
+class DouyinAwemeRecord(StoreRecord):
+    """
+    抖音视频，对应 douyin_aweme 表
+    """
+    __slots__ = (
+        "aweme_id", "aweme_type", "title", "desc", "create_time", "user_id", "sec_uid", "short_user_id",
+        "user_unique_id", "user_signature", "nickname", "avatar", "liked_count", "collected_count",
+        "comment_count", "share_count", "ip_location", "last_modify_ts", "aweme_url", "source_keyword",
+    )
+
+
+class DouyinAwemeCommentRecord(StoreRecord):
+    """
+    抖音视频评论，对应 douyin_aweme_comment 表
+    """
+    __slots__ = (
+        "comment_id", "create_time", "ip_location", "aweme_id", "content", "user_id", "sec_uid", "short_user_id",
+        "user_unique_id", "user_signature", "nickname", "avatar", "sub_comment_count", "like_count",
+        "last_modify_ts", "parent_comment_id", "pictures",
+    )
+
+
+class DouyinCreatorRecord(StoreRecord):
+    """
+    抖音创作者，对应 dy_creator 表
+    """
+    __slots__ = (
+        "user_id", "nickname", "gender", "avatar", "desc", "ip_location", "follows", "fans", "interaction",
+        "videos_count", "last_modify_ts",
+    )
@@ -19,6 +19,9 @@ import config
 from var import source_keyword_var
 
 from .kuaishou_store_impl import *
+from .kuaishou_store_record import (KuaishouCreatorRecord,
+                                    KuaishouVideoCommentRecord,
+                                    KuaishouVideoRecord)
 
 
 class KuaishouStoreFactory:
@@ -43,30 +46,31 @@ async def update_kuaishou_video(video_item: Dict):
     if not video_id:
         return
     user_info = video_item.get("author", {})
-    save_content_item = {
-        "video_id": video_id,
-        "video_type": str(video_item.get("type")),
-        "title": photo_info.get("caption", "")[:500],
-        "desc": photo_info.get("caption", "")[:500],
-        "create_time": photo_info.get("timestamp"),
-        "user_id": user_info.get("id"),
-        "nickname": user_info.get("name"),
-        "avatar": user_info.get("headerUrl", ""),
-        "liked_count": str(photo_info.get("realLikeCount")),
-        "viewd_count": str(photo_info.get("viewCount")),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "video_url": f"https://www.kuaishou.com/short-video/{video_id}",
-        "video_cover_url": photo_info.get("coverUrl", ""),
-        "video_play_url": photo_info.get("photoUrl", ""),
-        "source_keyword": source_keyword_var.get(),
-    }
-    utils.logger.info(
-        f"[store.kuaishou.update_kuaishou_video] Kuaishou video id:{video_id}, title:{save_content_item.get('title')}")
+    save_content_item = KuaishouVideoRecord(
+        video_id=video_id,
+        video_type=str(video_item.get("type")),
+        title=photo_info.get("caption", "")[:500],
+        desc=photo_info.get("caption", "")[:500],
+        create_time=photo_info.get("timestamp"),
+        user_id=user_info.get("id"),
+        nickname=user_info.get("name"),
+        avatar=user_info.get("headerUrl", ""),
+        liked_count=str(photo_info.get("realLikeCount")),
+        viewd_count=str(photo_info.get("viewCount")),
+        last_modify_ts=utils.get_current_timestamp(),
+        video_url=f"https://www.kuaishou.com/short-video/{video_id}",
+        video_cover_url=photo_info.get("coverUrl", ""),
+        video_play_url=photo_info.get("photoUrl", ""),
+        source_keyword=source_keyword_var.get(),
+    )
+    utils.log_event("store.kuaishou.update_kuaishou_video", video_id=video_id,
+                    title=utils.log_payload(save_content_item.title))
     await KuaishouStoreFactory.create_store().store_content(content_item=save_content_item)
 
 
 async def batch_update_ks_video_comments(video_id: str, comments: List[Dict]):
-    utils.logger.info(f"[store.kuaishou.batch_update_ks_video_comments] video_id:{video_id}, comments:{comments}")
+    utils.log_event("store.kuaishou.batch_update_ks_video_comments", video_id=video_id,
+                    comments=utils.log_payload(comments))
     if not comments:
         return
     for comment_item in comments:
@@ -75,36 +79,36 @@ async def batch_update_ks_video_comments(video_id: str, comments: List[Dict]):
 
 async def update_ks_video_comment(video_id: str, comment_item: Dict):
     comment_id = comment_item.get("commentId")
-    save_comment_item = {
-        "comment_id": comment_id,
-        "create_time": comment_item.get("timestamp"),
-        "video_id": video_id,
-        "content": comment_item.get("content"),
-        "user_id": comment_item.get("authorId"),
-        "nickname": comment_item.get("authorName"),
-        "avatar": comment_item.get("headurl"),
-        "sub_comment_count": str(comment_item.get("subCommentCount", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
-    utils.logger.info(
-        f"[store.kuaishou.update_ks_video_comment] Kuaishou video comment: {comment_id}, content: {save_comment_item.get('content')}")
+    save_comment_item = KuaishouVideoCommentRecord(
+        comment_id=comment_id,
+        create_time=comment_item.get("timestamp"),
+        video_id=video_id,
+        content=comment_item.get("content"),
+        user_id=comment_item.get("authorId"),
+        nickname=comment_item.get("authorName"),
+        avatar=comment_item.get("headurl"),
+        sub_comment_count=str(comment_item.get("subCommentCount", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    utils.log_event("store.kuaishou.update_ks_video_comment", comment_id=comment_id,
+                    content=utils.log_payload(save_comment_item.content))
     await KuaishouStoreFactory.create_store().store_comment(comment_item=save_comment_item)
 
 async def save_creator(user_id: str, creator: Dict):
     ownerCount = creator.get('ownerCount', {})
     profile = creator.get('profile', {})
 
-    local_db_item = {
-        'user_id': user_id,
-        'nickname': profile.get('user_name'),
-        'gender': '女' if profile.get('gender') == "F" else '男',
-        'avatar': profile.get('headurl'),
-        'desc': profile.get('user_text'),
-        'ip_location': "",
-        'follows': ownerCount.get("follow"),
-        'fans': ownerCount.get("fan"),
-        'interaction': ownerCount.get("photo_public"),
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
-    utils.logger.info(f"[store.kuaishou.save_creator] creator:{local_db_item}")
+    local_db_item = KuaishouCreatorRecord(
+        user_id=user_id,
+        nickname=profile.get('user_name'),
+        gender='女' if profile.get('gender') == "F" else '男',
+        avatar=profile.get('headurl'),
+        desc=profile.get('user_text'),
+        ip_location="",
+        follows=ownerCount.get("follow"),
+        fans=ownerCount.get("fan"),
+        interaction=ownerCount.get("photo_public"),
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    utils.log_event("store.kuaishou.save_creator", user_id=user_id, creator=utils.log_payload(local_db_item))
     await KuaishouStoreFactory.create_store().store_creator(local_db_item)
\ No newline at end of file
@@ -24,7 +24,7 @@ import aiofiles
 
 import config
 from base.base_crawler import AbstractStore
-from tools import utils, words
+from tools import utils
 from var import crawler_type_var
 
 
@@ -122,8 +122,7 @@ class KuaishouDbStoreImplement(AbstractStore):
         video_id = content_item.get("video_id")
         video_detail: Dict = await query_content_by_content_id(content_id=video_id)
         if not video_detail:
-            content_item["add_ts"] = utils.get_current_timestamp()
-            await add_new_content(content_item)
+            await add_new_content(dict(content_item, add_ts=utils.get_current_timestamp()))
         else:
             await update_content_by_content_id(video_id, content_item=content_item)
 
@@ -142,8 +141,7 @@ class KuaishouDbStoreImplement(AbstractStore):
         comment_id = comment_item.get("comment_id")
         comment_detail: Dict = await query_comment_by_comment_id(comment_id=comment_id)
         if not comment_detail:
-            comment_item["add_ts"] = utils.get_current_timestamp()
-            await add_new_comment(comment_item)
+            await add_new_comment(dict(comment_item, add_ts=utils.get_current_timestamp()))
         else:
             await update_comment_by_comment_id(comment_id, comment_item=comment_item)
 
@@ -153,7 +151,6 @@ class KuaishouJsonStoreImplement(AbstractStore):
     words_store_path: str = "data/kuaishou/words"
     lock = asyncio.Lock()
     file_count:int=calculate_number_of_files(json_store_path)
-    WordCloud = words.AsyncWordCloudGenerator()
 
 
 
@@ -192,13 +189,15 @@ class KuaishouJsonStoreImplement(AbstractStore):
                 async with aiofiles.open(save_file_name, 'r', encoding='utf-8') as file:
                     save_data = json.loads(await file.read())
 
-            save_data.append(save_item)
+            save_data.append(dict(save_item))
             async with aiofiles.open(save_file_name, 'w', encoding='utf-8') as file:
                 await file.write(json.dumps(save_data, ensure_ascii=False))
 
             if config.ENABLE_GET_COMMENTS and config.ENABLE_GET_WORDCLOUD:
+                # 词云依赖 jieba、matplotlib 等较重的库，开启时才导入
+                from tools import words
                 try:
-                    await self.WordCloud.generate_word_frequency_and_cloud(save_data, words_file_name_prefix)
+                    await words.get_word_cloud_generator().generate_word_frequency_and_cloud(save_data, words_file_name_prefix)
                 except:
                     pass
 
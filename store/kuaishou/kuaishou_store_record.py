@@ -0,0 +1,44 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 快手存储记录，字段顺序即列顺序
+from store.record import StoreRecord
+
+
+class KuaishouVideoRecord(StoreRecord):
+    """
+    快手视频，对应 kuaishou_video 表
+    """
+    __slots__ = (
+        "video_id", "video_type", "title", "desc", "create_time", "user_id", "nickname", "avatar", "liked_count",
+        "viewd_count", "last_modify_ts", "video_url", "video_cover_url", "video_play_url", "source_keyword",
+    )
+
+
+class KuaishouVideoCommentRecord(StoreRecord):
+    """
+    快手视频评论，对应 kuaishou_video_comment 表
+    """
+    __slots__ = (
+        "comment_id", "create_time", "video_id", "content", "user_id", "nickname", "avatar", "sub_comment_count",
+        "last_modify_ts",
+    )
+
+
+class KuaishouCreatorRecord(StoreRecord):
+    """
+    快手创作者
+    """
+    __slots__ = (
+        "user_id", "nickname", "gender", "avatar", "desc", "ip_location", "follows", "fans", "interaction",
+        "last_modify_ts",
+    )
@@ -0,0 +1,121 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 存储层记录类型的基类
+import operator
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+def _make_init(fields: Tuple[str, ...]):
+    """
+    按字段生成只接受关键字参数的 __init__，构造时只做属性赋值，不做任何校验
+    Args:
+        fields: 字段名，顺序即列顺序
+
+    Returns:
+
+    """
+    body = "".join(f"    self.{field} = {field}\n" for field in fields) or "    pass\n"
+    source = f"def __init__(self, *, {', '.join(fields)}):\n{body}" if fields else f"def __init__(self):\n{body}"
+    namespace: Dict[str, Any] = {}
+    exec(source, {}, namespace)
+    return namespace["__init__"]
+
+
+class StoreRecord:
+    """
+    一张表的一条记录，子类只需要声明 __slots__，__slots__ 的顺序就是列的顺序（CSV 表头、JSON 的 key 顺序、DB 插入的字段顺序）
+
+    记录实现了字典的只读接口（keys / values / items / get / []），原来按字典处理存储数据的代码不用修改，
+    其中 keys() 返回类上固定的字段元组，values() 直接返回一行数据的元组
+    """
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = tuple(cls.__slots__)
+        if len(cls.FIELDS) == 1:
+            getter = operator.attrgetter(cls.FIELDS[0])
+            cls._row_getter = staticmethod(lambda record: (getter(record),))
+        else:
+            cls._row_getter = staticmethod(operator.attrgetter(*cls.FIELDS))
+        cls.__init__ = _make_init(cls.FIELDS)
+
+    @classmethod
+    def from_model(cls, model, **extra):
+        """
+        从 pydantic 模型构造记录，直接取模型已经校验过的字段值，不再 model_dump
+        Args:
+            model: pydantic 模型，字段需要是记录字段的子集
+            **extra: 模型之外的字段，比如 last_modify_ts
+
+        Returns:
+
+        """
+        return cls(**model.__dict__, **extra)
+
+    def to_row(self) -> Tuple:
+        """
+        按列顺序返回一行数据
+        """
+        return self._row_getter(self)
+
+    def to_dict(self, **extra) -> Dict[str, Any]:
+        """
+        按列顺序转成字典，extra 追加在最后，比如 DB 插入时的 add_ts
+        """
+        data = dict(zip(self.FIELDS, self._row_getter(self)))
+        if extra:
+            data.update(extra)
+        return data
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.FIELDS
+
+    def values(self) -> Tuple:
+        return self._row_getter(self)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self.FIELDS, self._row_getter(self))
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, StoreRecord):
+            return type(self) is type(other) and self.to_row() == other.to_row()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.items())
+        return f"{type(self).__name__}({fields})"
@@ -17,6 +17,8 @@ from var import source_keyword_var
 
 from . import tieba_store_impl
 from .tieba_store_impl import *
+from .tieba_store_record import (TiebaCommentRecord, TiebaCreatorRecord,
+                                 TiebaNoteRecord)
 
 
 class TieBaStoreFactory:
@@ -60,9 +62,8 @@ async def update_tieba_note(note_item: TiebaNote):
 
     """
     note_item.source_keyword = source_keyword_var.get()
-    save_note_item = note_item.model_dump()
-    save_note_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.tieba.update_tieba_note] tieba note: {save_note_item}")
+    save_note_item = TiebaNoteRecord.from_model(note_item, last_modify_ts=utils.get_current_timestamp())
+    utils.log_event("store.tieba.update_tieba_note", note_id=note_item.note_id, note=utils.log_payload(save_note_item))
 
     await TieBaStoreFactory.create_store().store_content(save_note_item)
 
@@ -93,9 +94,9 @@ async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
     Returns:
 
     """
-    save_comment_item = comment_item.model_dump()
-    save_comment_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.tieba.update_tieba_note_comment] tieba note id: {note_id} comment:{save_comment_item}")
+    save_comment_item = TiebaCommentRecord.from_model(comment_item, last_modify_ts=utils.get_current_timestamp())
+    utils.log_event("store.tieba.update_tieba_note_comment", note_id=note_id,
+                    comment=utils.log_payload(save_comment_item))
     await TieBaStoreFactory.create_store().store_comment(save_comment_item)
 
 
@@ -108,7 +109,6 @@ async def save_creator(user_info: TiebaCreator):
     Returns:
 
     """
-    local_db_item = user_info.model_dump()
-    local_db_item["last_modify_ts"] = utils.get_current_timestamp()
-    utils.logger.info(f"[store.tieba.save_creator] creator:{local_db_item}")
+    local_db_item = TiebaCreatorRecord.from_model(user_info, last_modify_ts=utils.get_current_timestamp())
+    utils.log_event("store.tieba.save_creator", user_id=user_info.user_id, creator=utils.log_payload(local_db_item))
     await TieBaStoreFactory.create_store().store_creator(local_db_item)
@@ -21,7 +21,7 @@ import aiofiles
 
 import config
 from base.base_crawler import AbstractStore
-from tools import utils, words
+from tools import utils
 from var import crawler_type_var
 
 
@@ -124,8 +124,7 @@ class TieBaDbStoreImplement(AbstractStore):
         note_id = content_item.get("note_id")
         note_detail: Dict = await query_content_by_content_id(content_id=note_id)
         if not note_detail:
-            content_item["add_ts"] = utils.get_current_timestamp()
-            await add_new_content(content_item)
+            await add_new_content(dict(content_item, add_ts=utils.get_current_timestamp()))
         else:
             await update_content_by_content_id(note_id, content_item=content_item)
 
@@ -144,8 +143,7 @@ class TieBaDbStoreImplement(AbstractStore):
         comment_id = comment_item.get("comment_id")
         comment_detail: Dict = await query_comment_by_comment_id(comment_id=comment_id)
         if not comment_detail:
-            comment_item["add_ts"] = utils.get_current_timestamp()
-            await add_new_comment(comment_item)
+            await add_new_comment(dict(comment_item, add_ts=utils.get_current_timestamp()))
         else:
             await update_comment_by_comment_id(comment_id, comment_item=comment_item)
 
@@ -164,8 +162,7 @@ class TieBaDbStoreImplement(AbstractStore):
         user_id = creator.get("user_id")
         user_detail: Dict = await query_creator_by_user_id(user_id)
         if not user_detail:
-            creator["add_ts"] = utils.get_current_timestamp()
-            await add_new_creator(creator)
+            await add_new_creator(dict(creator, add_ts=utils.get_current_timestamp()))
         else:
             await update_creator_by_user_id(user_id, creator)
 
@@ -175,7 +172,6 @@ class TieBaJsonStoreImplement(AbstractStore):
     words_store_path: str = "data/tieba/words"
     lock = asyncio.Lock()
     file_count: int = calculate_number_of_files(json_store_path)
-    WordCloud = words.AsyncWordCloudGenerator()
 
     def make_save_file_name(self, store_type: str) -> (str, str):
         """
@@ -212,13 +208,15 @@ class TieBaJsonStoreImplement(AbstractStore):
                 async with aiofiles.open(save_file_name, 'r', encoding='utf-8') as file:
                     save_data = json.loads(await file.read())
 
-            save_data.append(save_item)
+            save_data.append(dict(save_item))
             async with aiofiles.open(save_file_name, 'w', encoding='utf-8') as file:
                 await file.write(json.dumps(save_data, ensure_ascii=False))
 
             if config.ENABLE_GET_COMMENTS and config.ENABLE_GET_WORDCLOUD:
+                # 词云依赖 jieba、matplotlib 等较重的库，开启时才导入
+                from tools import words
                 try:
-                    await self.WordCloud.generate_word_frequency_and_cloud(save_data, words_file_name_prefix)
+                    await words.get_word_cloud_generator().generate_word_frequency_and_cloud(save_data, words_file_name_prefix)
                 except:
                     pass
 
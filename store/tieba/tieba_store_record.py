@@ -0,0 +1,36 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 贴吧存储记录，字段和模型一致，末尾加上 last_modify_ts
+from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
+from store.record import StoreRecord
+
+
+class TiebaNoteRecord(StoreRecord):
+    """
+    贴吧帖子，对应 tieba_note 表
+    """
+    __slots__ = tuple(TiebaNote.model_fields) + ("last_modify_ts",)
+
+
+class TiebaCommentRecord(StoreRecord):
+    """
+    贴吧评论，对应 tieba_comment 表
+    """
+    __slots__ = tuple(TiebaComment.model_fields) + ("last_modify_ts",)
+
+
+class TiebaCreatorRecord(StoreRecord):
+    """
+    贴吧创作者，对应 tieba_creator 表
+    """
+    __slots__ = tuple(TiebaCreator.model_fields) + ("last_modify_ts",)
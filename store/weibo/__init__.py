@@ -21,6 +21,8 @@ from var import source_keyword_var
 
 from .weibo_store_image import *
 from .weibo_store_impl import *
+from .weibo_store_record import (WeiboCreatorRecord, WeiboNoteCommentRecord,
+                                 WeiboNoteRecord)
 
 
 class WeibostoreFactory:
@@ -71,30 +73,30 @@ async def update_weibo_note(note_item: Dict):
     note_id = mblog.get("id")
     content_text = mblog.get("text")
     clean_text = re.sub(r"<.*?>", "", content_text)
-    save_content_item = {
+    save_content_item = WeiboNoteRecord(
         # 微博信息
-        "note_id": note_id,
-        "content": clean_text,
-        "create_time": utils.rfc2822_to_timestamp(mblog.get("created_at")),
-        "create_date_time": str(utils.rfc2822_to_china_datetime(mblog.get("created_at"))),
-        "liked_count": str(mblog.get("attitudes_count", 0)),
-        "comments_count": str(mblog.get("comments_count", 0)),
-        "shared_count": str(mblog.get("reposts_count", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "note_url": f"https://m.weibo.cn/detail/{note_id}",
-        "ip_location": mblog.get("region_name", "").replace("发布于 ", ""),
+        note_id=note_id,
+        content=clean_text,
+        create_time=utils.rfc2822_to_timestamp(mblog.get("created_at")),
+        create_date_time=str(utils.rfc2822_to_china_datetime(mblog.get("created_at"))),
+        liked_count=str(mblog.get("attitudes_count", 0)),
+        comments_count=str(mblog.get("comments_count", 0)),
+        shared_count=str(mblog.get("reposts_count", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+        note_url=f"https://m.weibo.cn/detail/{note_id}",
+        ip_location=mblog.get("region_name", "").replace("发布于 ", ""),
 
         # 用户信息
-        "user_id": str(user_info.get("id")),
-        "nickname": user_info.get("screen_name", ""),
-        "gender": user_info.get("gender", ""),
-        "profile_url": user_info.get("profile_url", ""),
-        "avatar": user_info.get("profile_image_url", ""),
-
-        "source_keyword": source_keyword_var.get(),
-    }
-    utils.logger.info(
-        f"[store.weibo.update_weibo_note] weibo note id:{note_id}, title:{save_content_item.get('content')[:24]} ...")
+        user_id=str(user_info.get("id")),
+        nickname=user_info.get("screen_name", ""),
+        gender=user_info.get("gender", ""),
+        profile_url=user_info.get("profile_url", ""),
+        avatar=user_info.get("profile_image_url", ""),
+
+        source_keyword=source_keyword_var.get(),
+    )
+    utils.log_event("store.weibo.update_weibo_note", note_id=note_id,
+                    title=utils.log_payload(save_content_item.content))
     await WeibostoreFactory.create_store().store_content(content_item=save_content_item)
 
 
@@ -130,27 +132,27 @@ async def update_weibo_note_comment(note_id: str, comment_item: Dict):
     user_info: Dict = comment_item.get("user")
     content_text = comment_item.get("text")
     clean_text = re.sub(r"<.*?>", "", content_text)
-    save_comment_item = {
-        "comment_id": comment_id,
-        "create_time": utils.rfc2822_to_timestamp(comment_item.get("created_at")),
-        "create_date_time": str(utils.rfc2822_to_china_datetime(comment_item.get("created_at"))),
-        "note_id": note_id,
-        "content": clean_text,
-        "sub_comment_count": str(comment_item.get("total_number", 0)),
-        "comment_like_count": str(comment_item.get("like_count", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "ip_location": comment_item.get("source", "").replace("来自", ""),
-        "parent_comment_id": comment_item.get("rootid", ""),
+    save_comment_item = WeiboNoteCommentRecord(
+        comment_id=comment_id,
+        create_time=utils.rfc2822_to_timestamp(comment_item.get("created_at")),
+        create_date_time=str(utils.rfc2822_to_china_datetime(comment_item.get("created_at"))),
+        note_id=note_id,
+        content=clean_text,
+        sub_comment_count=str(comment_item.get("total_number", 0)),
+        comment_like_count=str(comment_item.get("like_count", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+        ip_location=comment_item.get("source", "").replace("来自", ""),
+        parent_comment_id=comment_item.get("rootid", ""),
 
         # 用户信息
-        "user_id": str(user_info.get("id")),
-        "nickname": user_info.get("screen_name", ""),
-        "gender": user_info.get("gender", ""),
-        "profile_url": user_info.get("profile_url", ""),
-        "avatar": user_info.get("profile_image_url", ""),
-    }
-    utils.logger.info(
-        f"[store.weibo.update_weibo_note_comment] Weibo note comment: {comment_id}, content: {save_comment_item.get('content', '')[:24]} ...")
+        user_id=str(user_info.get("id")),
+        nickname=user_info.get("screen_name", ""),
+        gender=user_info.get("gender", ""),
+        profile_url=user_info.get("profile_url", ""),
+        avatar=user_info.get("profile_image_url", ""),
+    )
+    utils.log_event("store.weibo.update_weibo_note_comment", comment_id=comment_id,
+                    content=utils.log_payload(save_comment_item.content))
     await WeibostoreFactory.create_store().store_comment(comment_item=save_comment_item)
 
 
@@ -179,17 +181,17 @@ async def save_creator(user_id: str, user_info: Dict):
     Returns:
 
     """
-    local_db_item = {
-        'user_id': user_id,
-        'nickname': user_info.get('screen_name'),
-        'gender': '女' if user_info.get('gender') == "f" else '男',
-        'avatar': user_info.get('avatar_hd'),
-        'desc': user_info.get('description'),
-        'ip_location': user_info.get("source", "").replace("来自", ""),
-        'follows': user_info.get('follow_count', ''),
-        'fans': user_info.get('followers_count', ''),
-        'tag_list': '',
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
-    utils.logger.info(f"[store.weibo.save_creator] creator:{local_db_item}")
+    local_db_item = WeiboCreatorRecord(
+        user_id=user_id,
+        nickname=user_info.get('screen_name'),
+        gender='女' if user_info.get('gender') == "f" else '男',
+        avatar=user_info.get('avatar_hd'),
+        desc=user_info.get('description'),
+        ip_location=user_info.get("source", "").replace("来自", ""),
+        follows=user_info.get('follow_count', ''),
+        fans=user_info.get('followers_count', ''),
+        tag_list='',
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    utils.log_event("store.weibo.save_creator", user_id=user_id, creator=utils.log_payload(local_db_item))
     await WeibostoreFactory.create_store().store_creator(local_db_item)
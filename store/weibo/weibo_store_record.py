@@ -0,0 +1,50 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 微博存储记录，字段顺序即列顺序
+from store.record import StoreRecord
+
+
+class WeiboNoteRecord(StoreRecord):
+    """
+    微博帖子，对应 weibo_note 表
+    """
+    __slots__ = (
+        # 微博信息
+        "note_id", "content", "create_time", "create_date_time", "liked_count", "comments_count", "shared_count",
+        "last_modify_ts", "note_url", "ip_location",
+        # 用户信息
+        "user_id", "nickname", "gender", "profile_url", "avatar",
+        "source_keyword",
+    )
+
+
+class WeiboNoteCommentRecord(StoreRecord):
+    """
+    微博评论，对应 weibo_note_comment 表
+    """
+    __slots__ = (
+        "comment_id", "create_time", "create_date_time", "note_id", "content", "sub_comment_count",
+        "comment_like_count", "last_modify_ts", "ip_location", "parent_comment_id",
+        # 用户信息
+        "user_id", "nickname", "gender", "profile_url", "avatar",
+    )
+
+
+class WeiboCreatorRecord(StoreRecord):
+    """
+    微博创作者，对应 weibo_creator 表
+    """
+    __slots__ = (
+        "user_id", "nickname", "gender", "avatar", "desc", "ip_location", "follows", "fans", "tag_list",
+        "last_modify_ts",
+    )
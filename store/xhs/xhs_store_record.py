@@ -0,0 +1,45 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 小红书存储记录，字段顺序即列顺序
+from store.record import StoreRecord
+
+
+class XhsNoteRecord(StoreRecord):
+    """
+    小红书笔记，对应 xhs_note 表
+    """
+    __slots__ = (
+        "note_id", "type", "title", "desc", "video_url", "time", "last_update_time", "user_id", "nickname",
+        "avatar", "liked_count", "collected_count", "comment_count", "share_count", "ip_location", "image_list",
+        "tag_list", "last_modify_ts", "note_url", "source_keyword", "xsec_token",
+    )
+
+
+class XhsNoteCommentRecord(StoreRecord):
+    """
+    小红书笔记评论，对应 xhs_note_comment 表
+    """
+    __slots__ = (
+        "comment_id", "create_time", "ip_location", "note_id", "content", "user_id", "nickname", "avatar",
+        "sub_comment_count", "pictures", "parent_comment_id", "last_modify_ts", "like_count",
+    )
+
+
+class XhsCreatorRecord(StoreRecord):
+    """
+    小红书创作者，对应 xhs_creator 表
+    """
+    __slots__ = (
+        "user_id", "nickname", "gender", "avatar", "desc", "ip_location", "follows", "fans", "interaction",
+        "tag_list", "last_modify_ts",
+    )
@@ -18,6 +18,9 @@ from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from store.zhihu.zhihu_store_impl import (ZhihuCsvStoreImplement,
                                           ZhihuDbStoreImplement,
                                           ZhihuJsonStoreImplement)
+from store.zhihu.zhihu_store_record import (ZhihuCommentRecord,
+                                            ZhihuContentRecord,
+                                            ZhihuCreatorRecord)
 from tools import utils
 from var import source_keyword_var
 
@@ -61,9 +64,9 @@ async def update_zhihu_content(content_item: ZhihuContent):
 
     """
     content_item.source_keyword = source_keyword_var.get()
-    local_db_item = content_item.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_content] zhihu content: {local_db_item}")
+    local_db_item = ZhihuContentRecord.from_model(content_item, last_modify_ts=utils.get_current_timestamp())
+    utils.log_event("store.zhihu.update_zhihu_content", content_id=content_item.content_id,
+                    content=utils.log_payload(local_db_item))
     await ZhihuStoreFactory.create_store().store_content(local_db_item)
 
 
@@ -93,9 +96,9 @@ async def update_zhihu_content_comment(comment_item: ZhihuComment):
     Returns:
 
     """
-    local_db_item = comment_item.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_note_comment] zhihu content comment:{local_db_item}")
+    local_db_item = ZhihuCommentRecord.from_model(comment_item, last_modify_ts=utils.get_current_timestamp())
+    utils.log_event("store.zhihu.update_zhihu_note_comment", comment_id=comment_item.comment_id,
+                    comment=utils.log_payload(local_db_item))
     await ZhihuStoreFactory.create_store().store_comment(local_db_item)
 
 
@@ -110,6 +113,5 @@ async def save_creator(creator: ZhihuCreator):
     """
     if not creator:
         return
-    local_db_item = creator.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
+    local_db_item = ZhihuCreatorRecord.from_model(creator, last_modify_ts=utils.get_current_timestamp())
     await ZhihuStoreFactory.create_store().store_creator(local_db_item)
\ No newline at end of file
@@ -0,0 +1,103 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+
+import asyncio
+import unittest
+from collections import Counter
+
+from tenacity import retry, stop_after_attempt, wait_none
+
+from account import AccountPool, AccountPoolClient, AccountSession
+
+
+class BlockedError(Exception):
+    pass
+
+
+class FakeClient:
+    def __init__(self, name: str, blocked: bool = False):
+        self.name = name
+        self.blocked = blocked
+        self.calls = 0
+
+    async def get_note_by_id(self, note_id: str):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.blocked:
+            raise BlockedError(self.name)
+        return {"note_id": note_id, "account": self.name}
+
+
+class RetryingFakeClient(FakeClient):
+    """
+    与 xhs、zhihu 客户端一样，request 使用不带 reraise 的 @retry，重试用完后抛出 RetryError
+    """
+
+    @retry(stop=stop_after_attempt(3), wait=wait_none())
+    async def request(self, note_id: str):
+        return await super().get_note_by_id(note_id)
+
+    async def get_note_by_id(self, note_id: str):
+        return await self.request(note_id)
+
+
+def create_pool_client(*clients: FakeClient) -> AccountPoolClient:
+    sessions = [AccountSession(client.name, None, client) for client in clients]
+    return AccountPoolClient(AccountPool(sessions, (BlockedError,), bench_sec=60, max_concurrency=1))
+
+
+class TestAccountPool(unittest.TestCase):
+
+    def test_requests_spread_across_accounts(self):
+        pool_client = create_pool_client(FakeClient("a"), FakeClient("b"), FakeClient("c"))
+
+        async def run():
+            return await asyncio.gather(*[pool_client.get_note_by_id(str(i)) for i in range(9)])
+
+        results = asyncio.run(run())
+        self.assertEqual(Counter(result["account"] for result in results), {"a": 3, "b": 3, "c": 3})
+
+    def test_blocked_account_is_benched(self):
+        blocked_client = FakeClient("a", blocked=True)
+        pool_client = create_pool_client(blocked_client, FakeClient("b"))
+
+        async def run():
+            return [await pool_client.get_note_by_id(str(i)) for i in range(4)]
+
+        results = asyncio.run(run())
+        self.assertTrue(all(result["account"] == "b" for result in results))
+        self.assertEqual(blocked_client.calls, 1)
+        self.assertEqual(pool_client.pool.stats()[0]["block_count"], 1)
+        self.assertTrue(pool_client.pool.stats()[0]["benched"])
+
+    def test_blocked_account_is_benched_through_retry(self):
+        blocked_client = RetryingFakeClient("a", blocked=True)
+        other_client = RetryingFakeClient("b")
+        pool_client = create_pool_client(blocked_client, other_client)
+
+        async def run():
+            return [await pool_client.get_note_by_id(str(i)) for i in range(2)]
+
+        results = asyncio.run(run())
+        self.assertTrue(all(result["account"] == "b" for result in results))
+        self.assertEqual((blocked_client.calls, other_client.calls), (3, 2))
+        self.assertEqual(pool_client.pool.stats()[0]["block_count"], 1)
+
+    def test_all_accounts_blocked_raises_original_error(self):
+        pool_client = create_pool_client(RetryingFakeClient("a", blocked=True))
+        with self.assertRaises(BlockedError):
+            asyncio.run(pool_client.get_note_by_id("1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : B站按发布时间窗口搜索的测试：结果数达到上限时二分拆分窗口、最小窗口停止拆分、窗口断点续爬
+import asyncio
+import math
+import tempfile
+import unittest
+from typing import Dict, List
+from unittest import mock
+
+import config
+from media_platform.bilibili.core import BilibiliCrawler
+from media_platform.bilibili.help import (BILI_MIN_TIME_WINDOW_SEC, BILI_SEARCH_PAGE_SIZE,
+                                          BILI_SEARCH_RESULT_CAP, split_time_window)
+from tools.checkpoint import CrawlerCheckpoint
+
+DAY_SEC = 24 * 3600
+
+
+class FakeSearchClient:
+    """
+    按发布时间过滤视频的假搜索接口，和B站一样每个窗口最多返回 BILI_SEARCH_RESULT_CAP 条
+    """
+
+    def __init__(self, publish_times: List[int]):
+        self.videos = [{"aid": aid, "pubdate": pubdate} for aid, pubdate in enumerate(publish_times)]
+        self.requests = []
+        self.comments_in_flight = 0
+        self.max_comments_in_flight = 0
+
+    async def search_video_by_keyword(self, keyword: str, page: int, page_size: int, order, pubtime_begin_s: int,
+                                      pubtime_end_s: int) -> Dict:
+        self.requests.append((pubtime_begin_s, pubtime_end_s, page))
+        videos = [video for video in self.videos if pubtime_begin_s <= video["pubdate"] <= pubtime_end_s]
+        num_results = min(len(videos), BILI_SEARCH_RESULT_CAP)
+        return {
+            "numResults": num_results,
+            "numPages": math.ceil(num_results / page_size),
+            "result": videos[(page - 1) * page_size:min(page * page_size, num_results)],
+        }
+
+    async def get_video_all_comments(self, video_id: int, **kwargs):
+        self.comments_in_flight += 1
+        self.max_comments_in_flight = max(self.max_comments_in_flight, self.comments_in_flight)
+        await asyncio.sleep(0.001)
+        self.comments_in_flight -= 1
+
+
+class TestBilibiliTimeWindow(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patch = mock.patch.object(config, "CRAWLER_MAX_NOTES_COUNT", 100 * BILI_SEARCH_RESULT_CAP)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.stored_aids = []
+        self.fail_on_page = None
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def create_crawler(self, client: FakeSearchClient, resume: bool = False,
+                       fetch_comments: bool = False) -> BilibiliCrawler:
+        crawler = BilibiliCrawler()
+        crawler.bili_client = client
+        crawler.checkpoint = CrawlerCheckpoint("bili", "search", resume=resume, save_dir=self.tmp_dir.name)
+
+        async def store_search_videos(video_list: List[Dict], semaphore: asyncio.Semaphore) -> List[int]:
+            aids = [video["aid"] for video in video_list]
+            if self.fail_on_page is not None and aids[0] // BILI_SEARCH_PAGE_SIZE + 1 == self.fail_on_page:
+                raise RuntimeError("risk control")
+            self.stored_aids.extend(aids)
+            return aids
+
+        async def batch_get_video_comments(video_id_list: List[int], semaphore: asyncio.Semaphore = None):
+            pass
+
+        crawler.store_search_videos = store_search_videos
+        if not fetch_comments:
+            crawler.batch_get_video_comments = batch_get_video_comments
+        return crawler
+
+    def search(self, crawler: BilibiliCrawler, begin_ts: int, end_ts: int, concurrency: int = 4) -> bool:
+        checkpoint_key = "keyword:python"
+        window_counts = crawler.checkpoint.get(checkpoint_key).get("window_counts", {})
+        return asyncio.run(crawler.search_time_window(
+            "python", begin_ts, end_ts, window_counts, checkpoint_key, asyncio.Semaphore(concurrency)
+        ))
+
+    def test_split_time_window(self):
+        self.assertEqual(split_time_window(0, 9), ((0, 4), (5, 9)))
+        self.assertEqual(split_time_window(0, 10), ((0, 5), (6, 10)))
+
+    def test_split_windows_at_result_cap(self):
+        # 第 1、3 天各 600 条，整个范围 1200 条达到上限，拆分一次后两个窗口都不到上限
+        publish_times = [day * DAY_SEC + i * 100 for day in (0, 2) for i in range(600)]
+        client = FakeSearchClient(publish_times)
+        self.assertTrue(self.search(self.create_crawler(client), 0, 4 * DAY_SEC - 1))
+
+        probed_windows = {(begin, end) for begin, end, page in client.requests if page == 1}
+        self.assertEqual(probed_windows, {(0, 4 * DAY_SEC - 1), (0, 2 * DAY_SEC - 1), (2 * DAY_SEC, 4 * DAY_SEC - 1)})
+        self.assertEqual(sorted(self.stored_aids), list(range(len(publish_times))))
+
+    def test_windows_share_comment_concurrency(self):
+        # 8 个并发爬取的窗口，评论请求的总并发数仍然不超过信号量的大小
+        publish_times = [day * DAY_SEC + i * 1000 for day in range(8) for i in range(80)]
+        client = FakeSearchClient(publish_times)
+        with mock.patch.object(config, "ENABLE_GET_COMMENTS", True):
+            self.assertTrue(self.search(self.create_crawler(client, fetch_comments=True), 0, 8 * DAY_SEC - 1,
+                                        concurrency=2))
+        self.assertEqual(len(self.stored_aids), len(publish_times))
+        self.assertEqual(client.max_comments_in_flight, 2)
+
+    def test_stop_splitting_at_min_window(self):
+        # 同一秒发布了超过上限的视频，拆分到最小窗口后不再拆分，只爬取能拿到的部分
+        client = FakeSearchClient([0] * (BILI_SEARCH_RESULT_CAP + 500))
+        self.assertTrue(self.search(self.create_crawler(client), 0, 2 * BILI_MIN_TIME_WINDOW_SEC - 1))
+
+        probed_windows = {(begin, end) for begin, end, page in client.requests if page == 1}
+        self.assertEqual(probed_windows, {(0, 2 * BILI_MIN_TIME_WINDOW_SEC - 1), (0, BILI_MIN_TIME_WINDOW_SEC - 1),
+                                          (BILI_MIN_TIME_WINDOW_SEC, 2 * BILI_MIN_TIME_WINDOW_SEC - 1)})
+        self.assertEqual(len(self.stored_aids), BILI_SEARCH_RESULT_CAP)
+
+    def test_resume_partially_crawled_window(self):
+        client = FakeSearchClient(list(range(100)))
+        self.fail_on_page = 3
+        self.assertFalse(self.search(self.create_crawler(client), 0, DAY_SEC))
+        self.assertEqual(len(self.stored_aids), 2 * BILI_SEARCH_PAGE_SIZE)
+
+        # 续爬时不重新探测窗口的结果数，从失败的第 3 页开始
+        self.fail_on_page = None
+        client.requests.clear()
+        self.assertTrue(self.search(self.create_crawler(client, resume=True), 0, DAY_SEC))
+        self.assertEqual([page for _, _, page in client.requests], [3, 4, 5])
+        self.assertEqual(sorted(self.stored_aids), list(range(100)))
+
+        # 已完成的窗口不再请求
+        client.requests.clear()
+        self.assertTrue(self.search(self.create_crawler(client, resume=True), 0, DAY_SEC))
+        self.assertEqual(client.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
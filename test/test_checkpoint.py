@@ -0,0 +1,55 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+
+from tools.checkpoint import CrawlerCheckpoint
+
+
+class TestCrawlerCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def test_resume(self):
+        checkpoint = CrawlerCheckpoint("xhs", "search", resume=False, save_dir=self.tmp_dir.name)
+        checkpoint.save("keyword:python", page=3, search_id="abc", pending=[["note_1", "token_1"]])
+        checkpoint.finish("keyword:java")
+
+        resumed = CrawlerCheckpoint("xhs", "search", resume=True, save_dir=self.tmp_dir.name)
+        self.assertEqual(resumed.get("keyword:python").get("page"), 3)
+        self.assertEqual(resumed.get_pending("keyword:python"), [["note_1", "token_1"]])
+        self.assertTrue(resumed.is_finished("keyword:java"))
+        self.assertFalse(resumed.is_finished("keyword:python"))
+
+    def test_without_resume(self):
+        checkpoint = CrawlerCheckpoint("xhs", "search", resume=False, save_dir=self.tmp_dir.name)
+        checkpoint.save("keyword:python", page=3)
+
+        fresh = CrawlerCheckpoint("xhs", "search", resume=False, save_dir=self.tmp_dir.name)
+        self.assertEqual(fresh.get("keyword:python"), {})
+
+    def test_no_temp_file_left(self):
+        checkpoint = CrawlerCheckpoint("bili", "search", resume=False, save_dir=self.tmp_dir.name)
+        for page in range(5):
+            checkpoint.save("keyword:python", page=page)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["bili_search.json"])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+
+import asyncio
+import unittest
+
+import config
+
+
+class TestConfigOverrides(unittest.TestCase):
+
+    def setUp(self):
+        config.enable_config_overrides()
+
+    def test_overrides_are_isolated_per_task(self):
+        default_max_notes_count = config.CRAWLER_MAX_NOTES_COUNT
+
+        async def job(keywords: str):
+            config.config_overrides_var.set({"KEYWORDS": keywords})
+            await asyncio.sleep(0.01)
+            config.CRAWLER_MAX_NOTES_COUNT = len(keywords)
+            await asyncio.sleep(0.01)
+            return config.KEYWORDS, config.CRAWLER_MAX_NOTES_COUNT
+
+        async def run_jobs():
+            return await asyncio.gather(job("a"), job("bbb"))
+
+        self.assertEqual(asyncio.run(run_jobs()), [("a", 1), ("bbb", 3)])
+        self.assertEqual(config.CRAWLER_MAX_NOTES_COUNT, default_max_notes_count)
+        self.assertNotIn(config.KEYWORDS, ("a", "bbb"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 常驻服务的任务管理，不启动浏览器
+import asyncio
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+import config
+from daemon import CrawlerDaemon, CrawlJob, CrawlJobRequest, JobStatus, PlatformWorker
+
+
+class FakeWorker:
+    def __init__(self):
+        self.queue = asyncio.Queue()
+
+
+class FakeCrawler:
+    def __init__(self):
+        self.checkpoint_dirs = []
+
+    async def crawl(self):
+        self.checkpoint_dirs.append(config.CHECKPOINT_SAVE_DIR)
+
+
+class TestCrawlerDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.daemon = CrawlerDaemon(["xhs"])
+        self.daemon.workers["xhs"] = FakeWorker()
+
+    def submit_finished_job(self, finished_at: int):
+        job = self.daemon.submit(CrawlJobRequest(platform="xhs", keywords=["python"]))
+        job.status = JobStatus.FINISHED
+        job.finished_at = finished_at
+        return job
+
+    def test_submit_validation(self):
+        with self.assertRaises(ValueError):
+            self.daemon.submit(CrawlJobRequest(platform="dy", keywords=["python"]))
+        with self.assertRaises(ValueError):
+            self.daemon.submit(CrawlJobRequest(platform="xhs", crawler_type="detail"))
+
+    def test_prune_finished_jobs(self):
+        with mock.patch.object(config, "DAEMON_MAX_FINISHED_JOBS", 2):
+            finished_jobs = [self.submit_finished_job(finished_at) for finished_at in (3, 1, 2)]
+            pending_job = self.daemon.submit(CrawlJobRequest(platform="xhs", keywords=["java"]))
+        # 最早结束的任务被删除，排队中的任务保留
+        self.assertEqual(set(self.daemon.jobs),
+                         {finished_jobs[0].job_id, finished_jobs[2].job_id, pending_job.job_id})
+
+    def test_jobs_use_own_checkpoint_dir(self):
+        config.enable_config_overrides()
+        with mock.patch("daemon.CrawlerFactory.create_crawler", return_value=FakeCrawler()):
+            worker = PlatformWorker("xhs", None)
+        worker.session_ready = True
+        request = CrawlJobRequest(platform="xhs", keywords=["python"])
+        for job_id in ("job1", "job2"):
+            asyncio.run(worker.run_job(CrawlJob(job_id=job_id, request=request)))
+        self.assertEqual(worker.crawler.checkpoint_dirs, [
+            os.path.join(config.CHECKPOINT_SAVE_DIR, "daemon", "job1"),
+            os.path.join(config.CHECKPOINT_SAVE_DIR, "daemon", "job2"),
+        ])
+
+    def test_config_overrides_disabled_by_default(self):
+        # 普通的 main.py 运行不启用配置覆盖，config 仍是普通模块
+        output = subprocess.check_output(
+            [sys.executable, "-c", "import config, types; print(type(config) is types.ModuleType)"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), text=True,
+        )
+        self.assertEqual(output.strip(), "True")
+
+
+if __name__ == '__main__':
+    unittest.main()
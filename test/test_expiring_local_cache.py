@@ -42,6 +42,90 @@ class TestExpiringLocalCache(unittest.TestCase):
         time.sleep(12)
         self.assertIsNone(self.cache.get('key'))
 
+    def test_clear_only_expired(self):
+        self.cache.set('expired_1', 'value', 0)
+        self.cache.set('expired_2', 'value', 0)
+        self.cache.set('alive', 'value', 10)
+        time.sleep(0.01)
+        self.cache._clear()
+        self.assertEqual(self.cache.keys('*'), ['alive'])
+        self.assertEqual(self.cache.stats()['expirations'], 2)
+
+    def test_overwrite_extends_expire(self):
+        self.cache.set('key', 'old', 0)
+        self.cache.set('key', 'new', 10)
+        time.sleep(0.01)
+        self.cache._clear()
+        self.assertEqual(self.cache.get('key'), 'new')
+
+    def test_keys_pattern(self):
+        self.cache.set('kuaidaili_1', 'value', 10)
+        self.cache.set('kuaidaili_2', 'value', 10)
+        self.cache.set('jishuhttp_1', 'value', 10)
+        self.assertCountEqual(self.cache.keys('kuaidaili_*'), ['kuaidaili_1', 'kuaidaili_2'])
+        self.assertCountEqual(self.cache.keys('*_1'), ['jishuhttp_1', 'kuaidaili_1'])
+        self.assertEqual(self.cache.keys('kuaidaili_1*'), ['kuaidaili_1'])
+        self.assertCountEqual(self.cache.keys('kuai*'), ['kuaidaili_1', 'kuaidaili_2'])
+        self.assertEqual(self.cache.keys('kuaidaili_[2]'), ['kuaidaili_2'])
+        self.cache.delete('kuaidaili_1')
+        self.cache.delete('kuaidaili_2')
+        self.assertEqual(self.cache.keys('kuaidaili_*'), [])
+        self.assertNotIn('kuaidaili', self.cache._prefix_index)
+
+    def test_lru_max_size(self):
+        cache = ExpiringLocalCache(max_size=2)
+        cache.set('a', 1, 10)
+        cache.set('b', 2, 10)
+        cache.get('a')
+        cache.set('c', 3, 10)
+        self.assertIsNone(cache.get('b'))
+        self.assertCountEqual(cache.keys('*'), ['a', 'c'])
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_lru_max_bytes(self):
+        cache = ExpiringLocalCache(max_bytes=1000)
+        for i in range(100):
+            cache.set(f'key{i}', 'x' * 100, 10)
+        self.assertLessEqual(cache.stats()['bytes'], 1000)
+        self.assertIsNotNone(cache.get('key99'))
+        self.assertIsNone(cache.get('key0'))
+
+    def test_stats(self):
+        self.cache.set('key', 'value', 10)
+        self.cache.get('key')
+        self.cache.get('not_exist')
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+
+    def tearDown(self):
+        del self.cache
+
+
+class TestExpiringLocalCacheLargeClear(unittest.TestCase):
+    """
+    大缓存下的定时清理只处理已过期的键
+    """
+    KEY_COUNT = 100_000
+
+    def setUp(self):
+        self.cache = ExpiringLocalCache(cron_interval=10)
+        for i in range(self.KEY_COUNT):
+            self.cache.set(f'key_{i}', i, 3600)
+        for i in range(100):
+            self.cache.set(f'expired_{i}', i, 0)
+        time.sleep(0.01)
+
+    def test_clear_touches_only_expired(self):
+        self.cache._clear()
+        # 只弹出了 100 个过期键的堆元素，其余键没有被访问
+        self.assertEqual(len(self.cache._expire_heap), self.KEY_COUNT)
+        self.assertEqual(self.cache.stats()['expirations'], 100)
+        self.assertEqual(self.cache.stats()['size'], self.KEY_COUNT)
+        self.assertEqual(self.cache.keys('expired_*'), [])
+        # 前缀查找只访问前缀索引里同一段的 key
+        self.assertNotIn('expired', self.cache._prefix_index)
+        self.assertEqual(len(self.cache._prefix_index['key']), self.KEY_COUNT)
+
     def tearDown(self):
         del self.cache
 
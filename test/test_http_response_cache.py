@@ -0,0 +1,133 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+import os
+import tempfile
+import unittest
+from unittest import IsolatedAsyncioTestCase, mock
+
+import httpx
+
+import config
+from cache import http_response_cache
+from cache.http_response_cache import (HttpResponseCache, cache_response,
+                                       get_endpoint_ttl, normalize_request_key)
+
+
+class FakeClient:
+    def __init__(self):
+        self.request_count = 0
+        self.headers = {"Cookie": "SESSDATA=a"}
+
+    @cache_response
+    async def request(self, method, url, **kwargs):
+        self.request_count += 1
+        if kwargs.get("return_response"):
+            return httpx.Response(200, headers={"Set-Cookie": "M_WEIBOCN_PARAMS=fid%3D1; Path=/"},
+                                  content=b"ok", request=httpx.Request(method, url))
+        if "error" in url:
+            raise ValueError("risk control")
+        return {"url": url, "count": self.request_count}
+
+
+class TestHttpResponseCache(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.response_cache = HttpResponseCache(os.path.join(self.tmp_dir.name, "http_cache.sqlite3"), 10 * 1024)
+        patches = [
+            mock.patch.object(config, "ENABLE_HTTP_CACHE", True),
+            mock.patch.object(config, "HTTP_CACHE_TTLS", {"/x/web-interface/view": 60, "/u/": 60,
+                                                             "/x/web-interface/nav": 60}),
+            mock.patch.object(config, "HTTP_CACHE_PER_ACCOUNT_PATHS", ["/x/web-interface/nav"]),
+            mock.patch.object(http_response_cache, "_http_response_cache", self.response_cache),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.response_cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_normalize_request_key(self):
+        self.assertEqual(
+            normalize_request_key("GET", "https://api.bilibili.com/x/web-interface/view?bvid=1&w_rid=a&wts=1"),
+            normalize_request_key("get", "https://api.bilibili.com/x/web-interface/view?wts=2&w_rid=b", {"bvid": 1}),
+        )
+        self.assertNotEqual(
+            normalize_request_key("GET", "https://api.bilibili.com/x/web-interface/view?bvid=1"),
+            normalize_request_key("GET", "https://api.bilibili.com/x/web-interface/view?bvid=2"),
+        )
+
+    def test_endpoint_ttl(self):
+        self.assertEqual(get_endpoint_ttl("https://api.bilibili.com/x/web-interface/view?bvid=1"), 60)
+        self.assertEqual(get_endpoint_ttl("https://api.bilibili.com/x/v2/reply/wbi/main"), 0)
+
+    async def test_cache_hit_skips_request(self):
+        client = FakeClient()
+        url = "https://api.bilibili.com/x/web-interface/view?bvid=1&w_rid={}"
+        first = await client.request("GET", url.format("a"))
+        second = await client.request(method="GET", url=url.format("b"))
+        self.assertEqual(first, second)
+        self.assertEqual(client.request_count, 1)
+        await client.request("GET", "https://api.bilibili.com/x/v2/reply/wbi/main")
+        await client.request("GET", "https://api.bilibili.com/x/v2/reply/wbi/main")
+        self.assertEqual(client.request_count, 3)
+
+    async def test_error_not_cached(self):
+        client = FakeClient()
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                await client.request("GET", "https://api.bilibili.com/x/web-interface/view?error=1")
+        self.assertEqual(client.request_count, 2)
+
+    async def test_cache_httpx_response(self):
+        client = FakeClient()
+        await client.request("GET", "https://m.weibo.cn/u/1", return_response=True)
+        response = await client.request("GET", "https://m.weibo.cn/u/1", return_response=True)
+        self.assertEqual(client.request_count, 1)
+        self.assertEqual(response.content, b"ok")
+        self.assertEqual(response.cookies.get("M_WEIBOCN_PARAMS"), "fid%3D1")
+
+    async def test_skip_cache(self):
+        client = FakeClient()
+        url = "https://api.bilibili.com/x/web-interface/view?bvid=1"
+        await client.request("GET", url)
+        await client.request("GET", url, skip_cache=True)
+        self.assertEqual(client.request_count, 2)
+
+    async def test_per_account_endpoint(self):
+        client = FakeClient()
+        url = "https://api.bilibili.com/x/web-interface/nav"
+        await client.request("GET", url)
+        await client.request("GET", url)
+        self.assertEqual(client.request_count, 1)
+        # 换账号后不能使用其他账号的缓存
+        client.headers = {"Cookie": "SESSDATA=b"}
+        await client.request("GET", url)
+        await client.request("GET", url, headers={"Cookie": "SESSDATA=a"})
+        self.assertEqual(client.request_count, 2)
+
+    def test_evict_least_recently_used(self):
+        for i in range(20):
+            self.response_cache.set(f"key{i}", "x" * 1024, 60)
+            self.response_cache.get("key0")
+        self.assertLessEqual(self.response_cache.stats()["bytes"], 10 * 1024)
+        self.assertIsNotNone(self.response_cache.get("key0"))
+        self.assertIsNone(self.response_cache.get("key1"))
+        self.assertIsNotNone(self.response_cache.get("key19"))
+
+
+if __name__ == '__main__':
+    unittest.main()
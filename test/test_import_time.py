@@ -0,0 +1,100 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 启动耗时基准，基于 python -X importtime 统计导入开销
+#            单独运行可以看到耗时最高的模块: python -m test.test_import_time
+
+import os
+import subprocess
+import sys
+import unittest
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 只在特定功能开启时才会用到的重量级依赖，启动阶段不应该被导入
+HEAVY_MODULES = ["pandas", "jieba", "matplotlib", "wordcloud", "cv2", "numpy"]
+
+PLATFORM_MODULES = {
+    "xhs": "media_platform.xhs",
+    "dy": "media_platform.douyin",
+    "ks": "media_platform.kuaishou",
+    "bili": "media_platform.bilibili",
+    "wb": "media_platform.weibo",
+    "tieba": "media_platform.tieba",
+    "zhihu": "media_platform.zhihu",
+}
+
+
+def run_importtime(code: str) -> Tuple[Dict[str, int], int, List[str]]:
+    """
+    在子进程中以 -X importtime 执行代码
+    Args:
+        code: 要执行的python代码，标准输出为以逗号分隔的模块名
+
+    Returns: (模块名 -> 累计导入耗时(us), 导入总耗时(us), 代码输出的模块列表)
+
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative, total = {}, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+        # 顶层导入(没有缩进)的累计耗时之和即为总耗时
+        if not name[1:].startswith(" "):
+            total += int(cumulative_us)
+    return cumulative, total, [m for m in result.stdout.strip().split(",") if m]
+
+
+def top_modules(cumulative: Dict[str, int], n: int = 10) -> List[Tuple[str, int]]:
+    return sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_main_import_skips_platforms(self):
+        cumulative, _, loaded = run_importtime(
+            "import sys, main; print(','.join(m for m in sys.modules if m.startswith('media_platform')))"
+        )
+        self.assertEqual(loaded, [])
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, cumulative)
+
+    def test_only_selected_platform_imported(self):
+        for platform, platform_module in PLATFORM_MODULES.items():
+            with self.subTest(platform=platform):
+                cumulative, _, loaded = run_importtime(
+                    "import sys, main; main.CrawlerFactory.get_crawler_class('%s'); "
+                    "print(','.join(m for m in sys.modules if m.count('.') == 1 "
+                    "and m.startswith('media_platform.')))" % platform
+                )
+                self.assertEqual(loaded, [platform_module])
+                for module in HEAVY_MODULES:
+                    self.assertNotIn(module, cumulative)
+
+    def test_invalid_platform(self):
+        from main import CrawlerFactory
+        with self.assertRaises(ValueError):
+            CrawlerFactory.get_crawler_class("unknown")
+
+
+if __name__ == '__main__':
+    for platform in PLATFORM_MODULES:
+        cumulative, total, _ = run_importtime("import main; main.CrawlerFactory.get_crawler_class('%s')" % platform)
+        print(f"[{platform}] total import time: {total / 1000:.1f} ms")
+        for name, cost in top_modules(cumulative, 5):
+            print(f"    {cost / 1000:8.1f} ms  {name}")
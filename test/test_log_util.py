@@ -0,0 +1,134 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 日志工具的测试：数据摘要、结构化事件、采样和队列异步写日志
+import json
+import logging
+import unittest
+
+import config
+from tools import log_util, utils
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+
+class LogUtilTestCase(unittest.TestCase):
+
+    def setUp(self):
+        config.enable_config_overrides()
+        self.overrides_token = config.config_overrides_var.set({"ENABLE_LOG_PAYLOAD": False, "LOG_SAMPLE_RATES": {}})
+        self.handler = ListHandler()
+        utils.logger.addHandler(self.handler)
+        log_util.event_sampler.credits.clear()
+
+    def tearDown(self):
+        utils.logger.removeHandler(self.handler)
+        config.config_overrides_var.reset(self.overrides_token)
+
+
+class TestLogPayload(LogUtilTestCase):
+
+    def test_summary(self):
+        data = {"items": list(range(1000))}
+        text = str(utils.log_payload(data))
+        self.assertTrue(text.startswith("<dict len=1> {'items': [0, 1, 2"))
+        self.assertLess(len(text), log_util.PAYLOAD_PREVIEW_LENGTH + 32)
+        self.assertEqual(str(utils.log_payload({"a": 1})), "{'a': 1}")
+
+    def test_summary_is_bounded(self):
+        class Item:
+            formatted = 0
+
+            def __repr__(self):
+                Item.formatted += 1
+                return "item"
+
+        text = str(utils.log_payload({"body": b"x" * 100000, "items": [Item() for _ in range(1000)]}))
+        self.assertLess(len(text), log_util.PAYLOAD_PREVIEW_LENGTH + 32)
+        self.assertLessEqual(Item.formatted, 8)
+
+    def test_full_payload(self):
+        config.ENABLE_LOG_PAYLOAD = True
+        data = {"items": list(range(1000))}
+        self.assertEqual(str(utils.log_payload(data)), str(data))
+
+    def test_lazy_formatting(self):
+        class Payload:
+            formatted = 0
+
+            def __repr__(self):
+                Payload.formatted += 1
+                return "payload"
+
+        utils.logger.debug("res: %s", utils.log_payload(Payload()))
+        utils.log_event("test.lazy", level=logging.DEBUG, res=utils.log_payload(Payload()))
+        self.assertEqual(Payload.formatted, 0)
+        self.assertEqual(self.handler.records, [])
+
+
+class TestLogEvent(LogUtilTestCase):
+
+    def test_event_message(self):
+        utils.log_event("store.test.update", note_id="n1", count=3)
+        record = self.handler.records[0]
+        self.assertEqual(record.getMessage(), "[store.test.update] note_id=n1 count=3")
+        self.assertEqual(record.event, "store.test.update")
+        self.assertEqual(record.event_fields, {"note_id": "n1", "count": 3})
+        self.assertEqual(record.filename, "test_log_util.py")
+
+    def test_json_formatter(self):
+        utils.log_event("store.test.update", note_id="n1", count=3, item=utils.log_payload({"a": 1}))
+        utils.logger.info("plain %s", "message")
+        lines = [json.loads(log_util.JsonLogFormatter().format(record)) for record in self.handler.records]
+        self.assertEqual(lines[0]["event"], "store.test.update")
+        self.assertEqual((lines[0]["note_id"], lines[0]["count"], lines[0]["item"]), ("n1", 3, "{'a': 1}"))
+        self.assertEqual(lines[1]["message"], "plain message")
+
+    def test_sampling(self):
+        config.LOG_SAMPLE_RATES = {"store.test.sampled": 0.25, "store.test.muted": 0}
+        for index in range(10):
+            utils.log_event("store.test.sampled", index=index)
+            utils.log_event("store.test.muted", index=index)
+            utils.log_event("store.test.other", index=index)
+        sampled = [record.event_fields["index"] for record in self.handler.records
+                   if record.event == "store.test.sampled"]
+        self.assertEqual(sampled, [0, 4, 8])
+        self.assertFalse([record for record in self.handler.records if record.event == "store.test.muted"])
+        self.assertEqual(len([record for record in self.handler.records if record.event == "store.test.other"]), 10)
+
+
+class TestQueueLogging(unittest.TestCase):
+
+    def test_queue_listener_writes_in_background(self):
+        logger = logging.getLogger("MediaCrawler.test_queue")
+        handler = ListHandler()
+        log_util.setup_queue_logging(logger, [handler])
+        try:
+            payload = {"items": [1, 2, 3]}
+            logger.warning("res: %s", payload)
+            payload["items"].append(4)
+        finally:
+            log_util.stop_queue_logging()
+            utils.init_loging_config()
+        self.assertEqual([record.getMessage() for record in handler.records], ["res: {'items': [1, 2, 3]}"])
+        self.assertIsInstance(logger.handlers[0], log_util.EventQueueHandler)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 运行指标的测试：Prometheus 文本格式、请求/存储/媒体下载的装饰器和 /metrics 接口
+import asyncio
+import unittest
+import urllib.request
+from typing import Dict
+
+import config
+from base.base_crawler import AbstractStore
+from tools import metrics
+
+
+class DataFetchError(Exception):
+    pass
+
+
+class FakeClient:
+
+    @metrics.record_request
+    async def request(self, method, url, **kwargs):
+        await asyncio.sleep(0)
+        if kwargs.get("fail"):
+            raise DataFetchError("fail")
+        return {"ok": True}
+
+    @metrics.record_media_download("image")
+    async def get_image(self, url: str):
+        return None if url.endswith("404") else b"12345"
+
+
+class FakeStore(AbstractStore):
+
+    async def store_content(self, content_item: Dict):
+        pass
+
+    async def store_comment(self, comment_item: Dict):
+        pass
+
+    async def store_creator(self, creator: Dict):
+        pass
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        metrics.REGISTRY.clear()
+        config.enable_config_overrides()
+        self.overrides_token = config.config_overrides_var.set({"PLATFORM": "xhs", "SAVE_DATA_OPTION": "json"})
+
+    def tearDown(self):
+        config.config_overrides_var.reset(self.overrides_token)
+        metrics.REGISTRY.clear()
+
+    def test_render(self):
+        registry = metrics.MetricsRegistry()
+        counter = registry.counter("test_total", "test counter", ("platform",))
+        histogram = registry.histogram("test_seconds", "test histogram", ("platform",), buckets=(0.1, 1.0))
+        counter.inc('x"hs')
+        counter.inc('x"hs', amount=2)
+        histogram.observe(0.05, "xhs")
+        histogram.observe(0.5, "xhs")
+        histogram.observe(3, "xhs")
+        self.assertEqual(registry.render().splitlines(), [
+            "# HELP test_total test counter",
+            "# TYPE test_total counter",
+            'test_total{platform="x\\"hs"} 3',
+            "# HELP test_seconds test histogram",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{platform="xhs",le="0.1"} 1',
+            'test_seconds_bucket{platform="xhs",le="1"} 2',
+            'test_seconds_bucket{platform="xhs",le="+Inf"} 3',
+            'test_seconds_sum{platform="xhs"} 3.55',
+            'test_seconds_count{platform="xhs"} 3',
+        ])
+        self.assertEqual(histogram.quantile(0.5, "xhs"), 1.0)
+        self.assertEqual(histogram.quantile(0.95, "xhs"), float("inf"))
+        self.assertIs(registry.counter("test_total", "again"), counter)
+
+    def test_normalize_endpoint(self):
+        self.assertEqual(metrics.normalize_endpoint("https://edith.xiaohongshu.com/api/sns/web/v1/search/notes?a=1"),
+                         "/api/sns/web/v1/search/notes")
+        self.assertEqual(metrics.normalize_endpoint("https://www.zhihu.com/api/v4/answers/123456/root_comments"),
+                         "/api/v4/answers/:id/root_comments")
+        self.assertEqual(metrics.normalize_endpoint("https://www.xiaohongshu.com/explore/66fad51c000000001b0224b8"),
+                         "/explore/:id")
+
+    def test_record_request(self):
+        client = FakeClient()
+        url = "https://edith.xiaohongshu.com/api/sns/web/v1/search/notes"
+        asyncio.run(client.request("POST", url))
+        with self.assertRaises(DataFetchError):
+            asyncio.run(client.request("POST", url, fail=True))
+        endpoint = "/api/sns/web/v1/search/notes"
+        self.assertEqual(metrics.requests_total.get("xhs", endpoint, "ok"), 1)
+        self.assertEqual(metrics.requests_total.get("xhs", endpoint, "DataFetchError"), 1)
+        self.assertEqual(metrics.requests_in_flight.get("xhs"), 0)
+        self.assertEqual(metrics.request_duration_seconds.values[("xhs", endpoint)][2], 2)
+        summary = metrics.format_summary()
+        self.assertTrue(summary[0].startswith(
+            f"[metrics] requests platform=xhs endpoint={endpoint} total=2 DataFetchError=1 ok=1 avg="))
+
+    def test_record_media_download(self):
+        client = FakeClient()
+        asyncio.run(client.get_image("https://img/1"))
+        asyncio.run(client.get_image("https://img/404"))
+        self.assertEqual(metrics.media_downloads_total.get("xhs", "image", "ok"), 1)
+        self.assertEqual(metrics.media_downloads_total.get("xhs", "image", "failed"), 1)
+        self.assertEqual(metrics.media_download_bytes_total.get("xhs", "image"), 5)
+
+    def test_record_store(self):
+        store = FakeStore()
+        asyncio.run(store.store_content({}))
+        asyncio.run(store.store_comment({}))
+        asyncio.run(store.store_comment({}))
+        self.assertEqual(metrics.items_stored_total.get("xhs", "contents", "json"), 1)
+        self.assertEqual(metrics.items_stored_total.get("xhs", "comments", "json"), 2)
+        self.assertIn("[metrics] stored platform=xhs type=comments save_option=json count=2", metrics.format_summary())
+
+    def test_metrics_server(self):
+        metrics.items_stored_total.inc("xhs", "contents", "json")
+        server = metrics.start_metrics_server(0, host="127.0.0.1")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+                body = response.read().decode("utf-8")
+                self.assertEqual(response.headers["Content-Type"], metrics.PROMETHEUS_CONTENT_TYPE)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn('crawler_items_stored_total{platform="xhs",store_type="contents",save_option="json"} 1', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
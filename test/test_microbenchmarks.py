@@ -0,0 +1,435 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 纯 Python 热点函数的微基准测试，使用 test/fixtures 下的固定 HTML/JSON 样本
+#            单元测试只校验每个基准的结果，
+#            python -m test.test_microbenchmarks --json bench.json 输出每秒操作数，
+#            --compare 上一次的 bench.json 对比前后两个提交的变化
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import sys
+import time
+import unittest
+from typing import Any, Callable, Dict, List, Optional
+
+import config
+from media_platform.bilibili.help import BilibiliSign
+from media_platform.tieba.help import TieBaExtractor
+from media_platform.xhs import help as xhs_help
+from media_platform.xhs.client import XiaoHongShuClient
+from media_platform.zhihu.help import ZhihuExtractor
+from model.m_baidu_tieba import TiebaComment
+from replay.benchmark import BENCHMARK_SAVE_OPTION, CountingStore
+from store import tieba as tieba_store
+from store import xhs as xhs_store
+from store import zhihu as zhihu_store
+from test.test_page_state import legacy_weibo_render_data, legacy_xhs_note_state, legacy_zhihu_initial_data
+from test.test_xhs_transform_json_keys import legacy_transform_json_keys, load_note_page_state
+from tools import utils
+from tools.page_state import extract_page_state, extract_script_json_by_id
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+TIEBA_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "media_platform", "tieba", "test_data")
+
+XHS_NOTE_ID = "600000000000000000000001"
+XHS_A1 = "18f2b0a8e6dkzm0k0rfhlqbcxiqs2wjne5m7e5t3z50000123456"
+XHS_X_S = "XYW_eyJzaWduU3ZuIjoiNTEiLCJzaWduVHlwZSI6IngxIiwiYXBwSWQiOiJ4aHMtcGMtd2ViIn0="
+XHS_X_T = "1717000000000"
+XHS_B1 = "I38rHdgsjopgIvesdVwgIC+oIELmBZ5e3VwXLgFTIxS3bqwCgrcxI4jQq0S3bqwCgrcxI4jQq0S3bqwCgrcxI4jQq0S3bqwCgrcxI4jQq0S3"
+
+BENCHMARKS: Dict[str, Callable[[], Any]] = {}
+
+
+def benchmark(name: str):
+    """
+    注册一个基准函数，函数无参数，返回值用于单元测试里的结果校验
+    Args:
+        name: 基准名，平台.函数
+
+    Returns:
+
+    """
+
+    def decorator(func: Callable[[], Any]) -> Callable[[], Any]:
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+def read_fixture(file_name: str, fixtures_dir: str = FIXTURES_DIR) -> str:
+    with open(os.path.join(fixtures_dir, file_name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro):
+    """
+    异步的基准复用同一个事件循环，每次调用的固定开销在提交之间保持一致
+    """
+    global _event_loop
+    if _event_loop is None:
+        _event_loop = asyncio.new_event_loop()
+    return _event_loop.run_until_complete(coro)
+
+
+XHS_NOTE_HTML = read_fixture("xhs_note_detail.html")
+XHS_NOTE_STATE = load_note_page_state()
+XHS_NOTE_JSON = read_fixture("xhs_note.json")
+XHS_COMMENT = {
+    "id": "660000000000000000000001", "create_time": 1717000000000, "ip_location": "上海", "content": "评论内容",
+    "user_info": {"user_id": "5f0000000000000000000001", "nickname": "nickname", "image": "https://sns-avatar/1"},
+    "sub_comment_count": "3", "like_count": "12", "pictures": [{"url_default": "https://sns-img/1"}],
+    "target_comment": {"id": "660000000000000000000000"},
+}
+WEIBO_NOTE_HTML = read_fixture("weibo_note_detail.html")
+ZHIHU_SEARCH = json.loads(read_fixture("zhihu_search.json"))
+ZHIHU_COMMENTS = json.loads(read_fixture("zhihu_comments.json"))
+ZHIHU_CREATOR_HTML = read_fixture("zhihu_creator.html")
+ZHIHU_ANSWER_HTML = read_fixture("zhihu_answer.html")
+TIEBA_SEARCH_HTML = read_fixture("search_keyword_notes.html", TIEBA_FIXTURES_DIR)
+TIEBA_NOTE_LIST_HTML = read_fixture("tieba_note_list.html", TIEBA_FIXTURES_DIR)
+TIEBA_NOTE_DETAIL_HTML = read_fixture("note_detail.html", TIEBA_FIXTURES_DIR)
+TIEBA_COMMENTS_HTML = read_fixture("note_comments.html", TIEBA_FIXTURES_DIR)
+TIEBA_SUB_COMMENTS_HTML = read_fixture("note_sub_comments.html", TIEBA_FIXTURES_DIR)
+TIEBA_CREATOR_HTML = read_fixture("tieba_creator_info.html")
+
+bili_sign = BilibiliSign(img_key="7cd084941338484aae1ad9425b84077c", sub_key="4932caff0ff746eab6f01bf08b70ac45")
+tieba_extractor = TieBaExtractor()
+zhihu_extractor = ZhihuExtractor()
+zhihu_answer = zhihu_extractor.extract_contents_from_search(ZHIHU_SEARCH)[0]
+zhihu_comment = zhihu_extractor.extract_comments(zhihu_answer, ZHIHU_COMMENTS["data"])[0]
+tieba_parent_comment = TiebaComment(comment_id="123456", content="content", user_link="user_link",
+                                    user_nickname="user_nickname", user_avatar="user_avatar",
+                                    publish_time="publish_time", parent_comment_id="parent_comment_id",
+                                    note_id="note_id", note_url="note_url", tieba_id="tieba_id",
+                                    tieba_name="tieba_name", tieba_link="tieba_link")
+
+xhs_client = XiaoHongShuClient(headers={"Cookie": f"a1={XHS_A1}", "User-Agent": "benchmark"},
+                               playwright_page=None, cookie_dict={"a1": XHS_A1})
+
+
+async def _xhs_note_html_request(*args, **kwargs) -> str:
+    return XHS_NOTE_HTML
+
+
+# 替换掉实例上的 request，只测 HTML 解析和 key 转换
+xhs_client.request = _xhs_note_html_request
+
+
+@benchmark("xhs.sign")
+def bench_xhs_sign():
+    return xhs_help.sign(XHS_A1, XHS_B1, XHS_X_S, XHS_X_T)
+
+
+@benchmark("xhs.mrc")
+def bench_xhs_mrc():
+    return xhs_help.mrc(XHS_X_T + XHS_X_S + XHS_B1)
+
+
+@benchmark("xhs.b64Encode")
+def bench_xhs_b64_encode():
+    return xhs_help.b64Encode(xhs_help.encodeUtf8(XHS_B1 + XHS_X_S))
+
+
+@benchmark("xhs.encodeUtf8")
+def bench_xhs_encode_utf8():
+    return xhs_help.encodeUtf8(json.dumps({"x5": XHS_A1, "x7": XHS_X_S, "x8": XHS_B1, "s1": "小红书"}))
+
+
+@benchmark("xhs.get_b3_trace_id")
+def bench_xhs_get_b3_trace_id():
+    return xhs_help.get_b3_trace_id()
+
+
+@benchmark("xhs.get_note_by_id_from_html")
+def bench_xhs_get_note_by_id_from_html():
+    return run_async(xhs_client.get_note_by_id_from_html(XHS_NOTE_ID, "pc_search", "token"))
+
+
+@benchmark("xhs.transform_json_keys")
+def bench_xhs_transform_json_keys():
+    return xhs_help.transform_json_keys(json.loads(XHS_NOTE_STATE))
+
+
+@benchmark("xhs.transform_json_keys_legacy")
+def bench_xhs_transform_json_keys_legacy():
+    return legacy_transform_json_keys(XHS_NOTE_STATE)
+
+
+@benchmark("xhs.update_xhs_note")
+def bench_xhs_update_xhs_note():
+    note_item = json.loads(XHS_NOTE_JSON)
+    run_async(xhs_store.update_xhs_note(note_item))
+    return CountingStore.counter["contents"]
+
+
+@benchmark("xhs.update_xhs_note_comment")
+def bench_xhs_update_xhs_note_comment():
+    run_async(xhs_store.update_xhs_note_comment(XHS_NOTE_ID, XHS_COMMENT))
+    return CountingStore.counter["comments"]
+
+
+@benchmark("page_state.xhs_note")
+def bench_page_state_xhs_note():
+    return extract_page_state(XHS_NOTE_HTML, "window.__INITIAL_STATE__=", undefined='""')
+
+
+@benchmark("page_state.xhs_note_legacy")
+def bench_page_state_xhs_note_legacy():
+    return legacy_xhs_note_state(XHS_NOTE_HTML)
+
+
+@benchmark("page_state.weibo_note")
+def bench_page_state_weibo_note():
+    return extract_page_state(WEIBO_NOTE_HTML, "var $render_data = ")
+
+
+@benchmark("page_state.weibo_note_legacy")
+def bench_page_state_weibo_note_legacy():
+    return legacy_weibo_render_data(WEIBO_NOTE_HTML)
+
+
+@benchmark("page_state.zhihu_creator")
+def bench_page_state_zhihu_creator():
+    return extract_script_json_by_id(ZHIHU_CREATOR_HTML, "js-initialData")
+
+
+@benchmark("page_state.zhihu_creator_legacy")
+def bench_page_state_zhihu_creator_legacy():
+    return legacy_zhihu_initial_data(ZHIHU_CREATOR_HTML)
+
+
+@benchmark("bili.BilibiliSign.sign")
+def bench_bili_sign():
+    return bili_sign.sign({"mid": 123456, "pn": 1, "ps": 30, "keyword": "python(性能)!", "order": "pubdate"})
+
+
+@benchmark("tieba.extract_search_note_list")
+def bench_tieba_extract_search_note_list():
+    return tieba_extractor.extract_search_note_list(TIEBA_SEARCH_HTML)
+
+
+@benchmark("tieba.extract_tieba_note_list")
+def bench_tieba_extract_tieba_note_list():
+    return tieba_extractor.extract_tieba_note_list(TIEBA_NOTE_LIST_HTML)
+
+
+@benchmark("tieba.extract_note_detail")
+def bench_tieba_extract_note_detail():
+    return tieba_extractor.extract_note_detail(TIEBA_NOTE_DETAIL_HTML)
+
+
+@benchmark("tieba.extract_tieba_note_parment_comments")
+def bench_tieba_extract_parment_comments():
+    return tieba_extractor.extract_tieba_note_parment_comments(TIEBA_COMMENTS_HTML, "123456")
+
+
+@benchmark("tieba.extract_tieba_note_sub_comments")
+def bench_tieba_extract_sub_comments():
+    return tieba_extractor.extract_tieba_note_sub_comments(TIEBA_SUB_COMMENTS_HTML, tieba_parent_comment)
+
+
+@benchmark("tieba.extract_creator_info")
+def bench_tieba_extract_creator_info():
+    return tieba_extractor.extract_creator_info(TIEBA_CREATOR_HTML)
+
+
+@benchmark("tieba.update_tieba_note_comment")
+def bench_tieba_update_tieba_note_comment():
+    run_async(tieba_store.update_tieba_note_comment(tieba_parent_comment.note_id, tieba_parent_comment))
+    return CountingStore.counter["comments"]
+
+
+@benchmark("zhihu.extract_contents_from_search")
+def bench_zhihu_extract_contents_from_search():
+    return zhihu_extractor.extract_contents_from_search(ZHIHU_SEARCH)
+
+
+@benchmark("zhihu.extract_comments")
+def bench_zhihu_extract_comments():
+    return zhihu_extractor.extract_comments(zhihu_answer, ZHIHU_COMMENTS["data"])
+
+
+@benchmark("zhihu.update_zhihu_content_comment")
+def bench_zhihu_update_zhihu_content_comment():
+    run_async(zhihu_store.update_zhihu_content_comment(zhihu_comment))
+    return CountingStore.counter["comments"]
+
+
+@benchmark("zhihu.extract_creator")
+def bench_zhihu_extract_creator():
+    return zhihu_extractor.extract_creator("user-1", ZHIHU_CREATOR_HTML)
+
+
+@benchmark("zhihu.extract_answer_content_from_html")
+def bench_zhihu_extract_answer_content_from_html():
+    return zhihu_extractor.extract_answer_content_from_html(ZHIHU_ANSWER_HTML)
+
+
+class benchmark_environment:
+    """
+    基准运行期间的环境：存储换成只计数的 CountingStore，关掉日志输出
+    """
+
+    def __enter__(self):
+        xhs_store.XhsStoreFactory.STORES[BENCHMARK_SAVE_OPTION] = CountingStore
+        tieba_store.TieBaStoreFactory.STORES[BENCHMARK_SAVE_OPTION] = CountingStore
+        zhihu_store.ZhihuStoreFactory.STORES[BENCHMARK_SAVE_OPTION] = CountingStore
+        CountingStore.counter.clear()
+        config.enable_config_overrides()
+        self.overrides_token = config.config_overrides_var.set({"SAVE_DATA_OPTION": BENCHMARK_SAVE_OPTION})
+        self.logger_disabled = utils.logger.disabled
+        utils.logger.disabled = True
+        return self
+
+    def __exit__(self, *args):
+        utils.logger.disabled = self.logger_disabled
+        config.config_overrides_var.reset(self.overrides_token)
+
+
+def time_benchmark(func: Callable[[], Any], min_time: float = 0.2, repeat: int = 5) -> Dict:
+    """
+    测量一个基准的每秒操作数，先翻倍循环次数直到单轮耗时超过 min_time，再取 repeat 轮中最快的一轮
+    Args:
+        func: 基准函数
+        min_time: 单轮最少耗时（秒）
+        repeat: 轮数
+
+    Returns:
+
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        cost = time.perf_counter() - start
+        if cost >= min_time:
+            break
+        loops *= 2
+
+    best = cost
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return {"loops": loops, "sec_per_op": best / loops, "ops_per_sec": loops / best}
+
+
+def run_benchmarks(pattern: str = "*", min_time: float = 0.2, repeat: int = 5) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    with benchmark_environment():
+        for name, func in BENCHMARKS.items():
+            if fnmatch.fnmatchcase(name, pattern):
+                results[name] = time_benchmark(func, min_time, repeat)
+    return results
+
+
+def format_results(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None) -> List[str]:
+    lines = [f"{'benchmark':<42} {'ops/sec':>12} {'usec/op':>10}" + (f" {'baseline':>12} {'change':>8}" if baseline else "")]
+    for name, result in results.items():
+        line = f"{name:<42} {result['ops_per_sec']:>12.1f} {result['sec_per_op'] * 1e6:>10.2f}"
+        if baseline and name in baseline:
+            base_ops = baseline[name]["ops_per_sec"]
+            line += f" {base_ops:>12.1f} {(result['ops_per_sec'] / base_ops - 1) * 100:>+7.1f}%"
+        lines.append(line)
+    return lines
+
+
+class TestMicrobenchmarks(unittest.TestCase):
+    """
+    每个基准只跑一次校验结果，计时由命令行入口完成
+    """
+
+    def setUp(self):
+        self.environment = benchmark_environment().__enter__()
+
+    def tearDown(self):
+        self.environment.__exit__()
+
+    def test_xhs_sign(self):
+        self.assertIn("x-s-common", bench_xhs_sign())
+        self.assertIsInstance(bench_xhs_mrc(), int)
+        self.assertTrue(bench_xhs_b64_encode())
+        self.assertEqual(len(bench_xhs_get_b3_trace_id()), 16)
+
+    def test_xhs_note_from_html(self):
+        note = bench_xhs_get_note_by_id_from_html()
+        self.assertEqual(note["note_id"], XHS_NOTE_ID)
+        self.assertEqual(note["interact_info"]["liked_count"], "1024")
+        self.assertEqual(len(note["image_list"]), 9)
+        self.assertEqual(bench_xhs_transform_json_keys(), bench_xhs_transform_json_keys_legacy())
+
+    def test_xhs_update_note(self):
+        self.assertEqual(bench_xhs_update_xhs_note(), 1)
+        self.assertEqual(bench_xhs_update_xhs_note_comment(), 1)
+        self.assertEqual(bench_tieba_update_tieba_note_comment(), 2)
+        self.assertEqual(bench_zhihu_update_zhihu_content_comment(), 3)
+
+    def test_bili_sign(self):
+        self.assertEqual(len(bench_bili_sign()["w_rid"]), 32)
+
+    def test_page_state(self):
+        self.assertEqual(bench_page_state_xhs_note(), bench_page_state_xhs_note_legacy())
+        self.assertEqual(bench_page_state_weibo_note(), bench_page_state_weibo_note_legacy())
+        self.assertEqual(bench_page_state_zhihu_creator(), bench_page_state_zhihu_creator_legacy())
+
+    def test_tieba_extractor(self):
+        self.assertTrue(bench_tieba_extract_search_note_list())
+        self.assertTrue(bench_tieba_extract_tieba_note_list())
+        self.assertTrue(bench_tieba_extract_note_detail().note_id)
+        self.assertTrue(bench_tieba_extract_parment_comments())
+        self.assertTrue(bench_tieba_extract_sub_comments())
+        self.assertEqual(bench_tieba_extract_creator_info().fans, 3456)
+
+    def test_zhihu_extractor(self):
+        self.assertEqual(len(bench_zhihu_extract_contents_from_search()), 20)
+        self.assertEqual(len(bench_zhihu_extract_comments()), 20)
+        self.assertEqual(bench_zhihu_extract_creator().fans, 1000)
+        self.assertEqual(bench_zhihu_extract_answer_content_from_html().content_id, zhihu_answer.content_id)
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks("bili.*", min_time=0.001, repeat=1)
+        self.assertEqual(list(results), ["bili.BilibiliSign.sign"])
+        self.assertGreater(results["bili.BilibiliSign.sign"]["ops_per_sec"], 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for pure-Python hot functions")
+    parser.add_argument("--filter", default="*", help="fnmatch pattern of benchmark names, e.g. 'xhs.*'")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="results file of a previous run to compare with")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter, args.min_time, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print("\n".join(format_results(results, baseline)))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 多平台编排器的测试，任务进程使用模拟的入口函数，不启动浏览器
+import os
+import tempfile
+import unittest
+from typing import Any, Dict
+
+import config
+from orchestrator import JobSpec, JobStatus, Orchestrator, build_job_specs
+
+
+def fake_job_process(spec: JobSpec, config_snapshot: Dict[str, Any], progress_queue) -> None:
+    """
+    模拟任务进程: 记录收到的配置，第 FAIL_TIMES 次之前的运行以退出码 1 失败，
+    SAVE_CHECKPOINT 为 True 时失败前先保存断点
+    """
+    attempts_file = config_snapshot["ATTEMPTS_FILE"]
+    with open(attempts_file, "a", encoding="utf-8") as f:
+        f.write(f"{config_snapshot['PLATFORM']} {config_snapshot['ENABLE_RESUME']} "
+                f"{config_snapshot.get('RELATION_DB_POOL_MAX_SIZE')}\n")
+    with open(attempts_file, encoding="utf-8") as f:
+        attempts = len(f.readlines())
+    progress_queue.put({"job": spec.name, "pid": os.getpid(), "requests": 10, "errors": attempts - 1,
+                        "stored": {"content": attempts}, "reported_at": 0})
+    if attempts <= config_snapshot["FAIL_TIMES"]:
+        if config_snapshot["SAVE_CHECKPOINT"]:
+            os.makedirs(config_snapshot["CHECKPOINT_SAVE_DIR"], exist_ok=True)
+            checkpoint_file = os.path.join(config_snapshot["CHECKPOINT_SAVE_DIR"], f"{spec.platform}_search.json")
+            with open(checkpoint_file, "w", encoding="utf-8") as f:
+                f.write("{}")
+        raise SystemExit(1)
+
+
+class TestOrchestrator(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.saved_config = {name: getattr(config, name) for name in (
+            "ORCHESTRATOR_MAX_RESTARTS", "ORCHESTRATOR_RESTART_BACKOFF_SEC", "ORCHESTRATOR_PROGRESS_INTERVAL",
+            "ORCHESTRATOR_DB_MAX_CONNECTIONS", "SAVE_DATA_OPTION", "ENABLE_RESUME", "CHECKPOINT_SAVE_DIR")}
+        config.ORCHESTRATOR_MAX_RESTARTS = 1
+        config.ORCHESTRATOR_RESTART_BACKOFF_SEC = 0
+        config.ORCHESTRATOR_PROGRESS_INTERVAL = 60
+        config.ORCHESTRATOR_DB_MAX_CONNECTIONS = 20
+        config.SAVE_DATA_OPTION = "db"
+        config.ENABLE_RESUME = False
+        config.CHECKPOINT_SAVE_DIR = os.path.join(self.temp_dir.name, "checkpoint")
+
+    def tearDown(self):
+        for name, value in self.saved_config.items():
+            setattr(config, name, value)
+        self.temp_dir.cleanup()
+
+    def job(self, platform: str, fail_times: int, save_checkpoint: bool = False) -> Dict:
+        attempts_file = os.path.join(self.temp_dir.name, f"{platform}.txt")
+        return {"platform": platform, "overrides": {"ATTEMPTS_FILE": attempts_file, "FAIL_TIMES": fail_times,
+                                                    "SAVE_CHECKPOINT": save_checkpoint}}
+
+    def read_attempts(self, platform: str):
+        with open(os.path.join(self.temp_dir.name, f"{platform}.txt"), encoding="utf-8") as f:
+            return [line.split() for line in f.read().splitlines()]
+
+    def test_build_job_specs(self):
+        specs = build_job_specs([{"platform": "xhs"}, {"platform": "xhs", "overrides": {"CRAWLER_TYPE": "detail"}},
+                                 {"name": "dy-creator", "platform": "dy"}])
+        self.assertEqual([spec.name for spec in specs], ["xhs", "xhs-1", "dy-creator"])
+        self.assertEqual(specs[1].overrides, {"CRAWLER_TYPE": "detail"})
+
+    def test_db_pool_size(self):
+        self.assertEqual(Orchestrator.get_db_pool_size(4), 5)
+        self.assertEqual(Orchestrator.get_db_pool_size(30), 1)
+        config.SAVE_DATA_OPTION = "json"
+        self.assertIsNone(Orchestrator.get_db_pool_size(4))
+
+    def test_same_platform_jobs_are_isolated(self):
+        orchestrator = Orchestrator(build_job_specs([{"platform": "xhs"}, {"platform": "xhs"}]))
+        job_configs = [orchestrator.build_job_config(job) for job in orchestrator.jobs]
+        self.assertNotEqual(job_configs[0]["CHECKPOINT_SAVE_DIR"], job_configs[1]["CHECKPOINT_SAVE_DIR"])
+        self.assertEqual(job_configs[0]["USER_DATA_DIR"], config.USER_DATA_DIR)
+        self.assertEqual(job_configs[1]["USER_DATA_DIR"], "%s_xhs-1_user_data_dir")
+
+    def test_restart_and_progress(self):
+        orchestrator = Orchestrator(build_job_specs([self.job("xhs", 0), self.job("dy", 1, save_checkpoint=True),
+                                                     self.job("bili", 2)]), target=fake_job_process)
+        # 前一次运行留下的断点在第一次运行前被删除
+        stale_checkpoint = os.path.join(orchestrator.jobs[0].checkpoint_dir, "xhs_search.json")
+        os.makedirs(orchestrator.jobs[0].checkpoint_dir)
+        open(stale_checkpoint, "w").close()
+        self.assertFalse(orchestrator.run())
+        self.assertFalse(os.path.exists(stale_checkpoint))
+        self.assertEqual([job.status for job in orchestrator.jobs],
+                         [JobStatus.FINISHED, JobStatus.FINISHED, JobStatus.FAILED])
+        self.assertEqual([job.exit_codes for job in orchestrator.jobs], [[0], [1, 0], [1, 1]])
+        # 每个任务使用自己的平台和连接池大小，保存过断点的任务重启后从断点继续
+        self.assertEqual(self.read_attempts("xhs"), [["xhs", "False", "6"]])
+        self.assertEqual(self.read_attempts("dy"), [["dy", "False", "6"], ["dy", "True", "6"]])
+        self.assertEqual(self.read_attempts("bili"), [["bili", "False", "6"]] * 2)
+        self.assertEqual(orchestrator.jobs[1].progress["stored"], {"content": 2})
+        self.assertEqual(orchestrator.format_progress()[-1],
+                         "[orchestrator] total requests=30 errors=2 stored={'content': 5}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 网页内嵌页面状态 JSON 提取的测试，以及和原来整页正则/DOM 解析的结果对比
+import json
+import os
+import re
+import unittest
+
+from parsel import Selector
+
+from tools.page_state import (extract_page_state, extract_script_json_by_id, find_script_text_by_id,
+                              parse_js_literal)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def read_fixture(file_name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, file_name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def legacy_xhs_note_state(html: str):
+    """原 xhs get_note_by_id_from_html 的提取方式"""
+    return json.loads(re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[0].replace("undefined", '""'))
+
+
+def legacy_weibo_render_data(html: str):
+    """原 weibo get_note_info_by_id 的提取方式"""
+    return json.loads(re.search(r'var \$render_data = (\[.*?\])\[0\]', html, re.DOTALL).group(1))
+
+
+def legacy_zhihu_initial_data(html: str):
+    """原 ZhihuExtractor 的提取方式"""
+    return json.loads(Selector(text=html).xpath("//script[@id='js-initialData']/text()").get(default=""))
+
+
+class TestPageState(unittest.TestCase):
+
+    def test_undefined_and_trailing_comma(self):
+        text = '{"a": undefined, "b": "undefined, is a word", "c": [1, 2,], "d": "\\"undefined\\"", "e": "C:\\\\", "f": undefined,}'
+        self.assertEqual(parse_js_literal(text), {"a": None, "b": "undefined, is a word", "c": [1, 2], "d": '"undefined"',
+                                                  "e": "C:\\", "f": None})
+        self.assertEqual(parse_js_literal(text, undefined='""')["a"], "")
+
+    def test_trailing_expression(self):
+        self.assertEqual(parse_js_literal('\n  [{"status": {"id": 1}}][0] || {};\n  var x = 1;'), [{"status": {"id": 1}}])
+
+    def test_bounded_by_first_script_end(self):
+        html = '<script>window.__INITIAL_STATE__={"a":1}</script><script>var b = {"c":2}</script>'
+        self.assertEqual(extract_page_state(html, "window.__INITIAL_STATE__="), {"a": 1})
+        self.assertIsNone(extract_page_state(html, "window.__SSR_STATE__="))
+
+    def test_script_by_id(self):
+        self.assertEqual(find_script_text_by_id("<script type='text/json' id='data'>[1]</script>", "data"), "[1]")
+        self.assertEqual(extract_script_json_by_id('<script id="data" type="text/json">{"a":1}</script>', "data"), {"a": 1})
+        self.assertIsNone(extract_script_json_by_id('<script id="data"> </script>', "data"))
+        self.assertIsNone(extract_script_json_by_id('<script id="other">{}</script>', "data"))
+
+    def test_xhs_note_page(self):
+        html = read_fixture("xhs_note_detail.html")
+        self.assertEqual(extract_page_state(html, "window.__INITIAL_STATE__=", undefined='""'), legacy_xhs_note_state(html))
+
+    def test_xhs_text_containing_undefined(self):
+        html = '<script>window.__INITIAL_STATE__={"desc":"undefined behavior","video":undefined}</script>'
+        self.assertEqual(extract_page_state(html, "window.__INITIAL_STATE__=", undefined='""'),
+                         {"desc": "undefined behavior", "video": ""})
+
+    def test_weibo_note_page(self):
+        html = read_fixture("weibo_note_detail.html")
+        render_data = extract_page_state(html, "var $render_data = ")
+        self.assertEqual(render_data, legacy_weibo_render_data(html))
+        self.assertEqual(render_data[0]["status"]["id"], "5040000000000001")
+
+    def test_zhihu_pages(self):
+        for file_name in ("zhihu_creator.html", "zhihu_answer.html"):
+            html = read_fixture(file_name)
+            self.assertEqual(extract_script_json_by_id(html, "js-initialData"), legacy_zhihu_initial_data(html))
+
+
+if __name__ == '__main__':
+    unittest.main()
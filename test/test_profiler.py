@@ -0,0 +1,89 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 采样分析器的测试：阶段归类、asyncio 任务的 await 链采样和折叠栈输出
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from tools import profiler
+
+
+async def request(delay: float):
+    await asyncio.sleep(delay)
+
+
+def busy_parse(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestClassifyStack(unittest.TestCase):
+
+    def test_stage_rules(self):
+        cases = {
+            ("main.py:main", "media_platform/xhs/core.py:XiaoHongShuCrawler.search",
+             "media_platform/xhs/client.py:XiaoHongShuClient.request", "httpx/_client.py:AsyncClient.request"): "request",
+            ("media_platform/xhs/core.py:XiaoHongShuCrawler.get_note_media",
+             "httpx/_client.py:AsyncClient.request"): "media",
+            ("store/xhs/__init__.py:update_xhs_note", "json/encoder.py:JSONEncoder.encode"): "store",
+            ("store/xhs/xhs_store_impl.py:XhsJsonStoreImplement.save_data_to_json",
+             "tools/words.py:AsyncWordCloudGenerator.generate_word_frequency_and_cloud",
+             "jieba/__init__.py:Tokenizer.cut"): "wordcloud",
+            ("media_platform/xhs/client.py:XiaoHongShuClient._pre_headers", "media_platform/xhs/help.py:sign"): "sign",
+            ("media_platform/tieba/help.py:TieBaExtractor.extract_search_note_list",
+             "parsel/selector.py:Selector.xpath"): "parse",
+            ("media_platform/xhs/core.py:XiaoHongShuCrawler.search", "asyncio/tasks.py:sleep"): "sleep",
+            ("main.py:main",): "other",
+        }
+        for stack, stage in cases.items():
+            self.assertEqual(profiler.classify_stack(stack), stage, stack)
+
+
+class TestAsyncioProfiler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_sample_tasks_and_loop(self):
+        asyncio_profiler = profiler.AsyncioProfiler(interval=0.002)
+        asyncio_profiler.start()
+        tasks = [asyncio.create_task(request(0.1)) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        busy_parse(0.05)
+        await asyncio.gather(*tasks)
+        asyncio_profiler.stop()
+
+        self.assertGreater(asyncio_profiler.samples, 0)
+        self.assertGreater(asyncio_profiler.cpu_time, 0)
+        # 三个任务都在 test_profiler.request 里等待，墙钟时间按任务累加
+        request_stacks = [stack for stack in asyncio_profiler.wall_stacks if "test/test_profiler.py:request" in stack]
+        self.assertTrue(request_stacks)
+        self.assertGreater(sum(asyncio_profiler.wall_stacks[stack] for stack in request_stacks), 0.1)
+        self.assertIn("test/test_profiler.py:busy_parse", [label for label, _, _ in asyncio_profiler.top_functions(5)])
+        self.assertTrue(any(line.startswith("[profile] stage=") for line in asyncio_profiler.format_summary(5)))
+
+    def test_save_collapsed_stacks(self):
+        asyncio_profiler = profiler.AsyncioProfiler()
+        asyncio_profiler.cpu_stacks[("main.py:main", "store/xhs/__init__.py:update_xhs_note")] += 0.25
+        asyncio_profiler.wall_stacks[("main.py:main", "a;b.py:f")] += 0.5
+        with tempfile.TemporaryDirectory() as save_dir:
+            cpu_file, wall_file = asyncio_profiler.save(save_dir, "xhs_search")
+            with open(cpu_file, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "main.py:main;store/xhs/__init__.py:update_xhs_note 250000\n")
+            with open(wall_file, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "main.py:main;a,b.py:f 500000\n")
+            self.assertEqual(os.path.basename(cpu_file), "xhs_search.cpu.collapsed")
+
+
+if __name__ == '__main__':
+    unittest.main()
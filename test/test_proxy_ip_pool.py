@@ -13,10 +13,17 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2023/12/2 14:42
 # @Desc    :
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
 from unittest import IsolatedAsyncioTestCase
 
-from proxy.proxy_ip_pool import create_ip_pool
+from proxy.base_proxy import IpCache, ProxyProvider
+from proxy.proxy_ip_pool import ProxyIpPool, create_ip_pool, get_proxy_key, rotate_proxy
 from proxy.types import IpInfoModel
+from tools import utils
 
 
 class TestIpPool(IsolatedAsyncioTestCase):
@@ -28,3 +35,132 @@ class TestIpPool(IsolatedAsyncioTestCase):
             print(ip_proxy_info)
             self.assertIsNotNone(ip_proxy_info.ip, msg="验证 ip 是否获取成功")
 
+
+
+class FakeProxyProvider(ProxyProvider):
+    def __init__(self):
+        self.batch = 0
+
+    async def get_proxies(self, num: int) -> List[IpInfoModel]:
+        self.batch += 1
+        return [
+            IpInfoModel(ip=f"10.0.{self.batch}.{i}", port=8000, user="u", password="p",
+                        expired_time_ts=utils.get_unix_timestamp() + 3600)
+            for i in range(num)
+        ]
+
+
+class FakeClient:
+    def __init__(self, ip_pool: ProxyIpPool):
+        self.ip_pool = ip_pool
+        self.used_proxies = []
+
+    @rotate_proxy(ban_exceptions=(PermissionError,))
+    async def request(self, banned: bool = False, proxies=None):
+        self.used_proxies.append(proxies)
+        if banned:
+            raise PermissionError("captcha")
+        return proxies
+
+
+class TestRotatingIpPool(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = ProxyIpPool(ip_pool_count=4, enable_validate_ip=False, ip_provider=FakeProxyProvider())
+        await self.pool.load_proxies()
+
+    async def test_rotate_per_request(self):
+        client = FakeClient(self.pool)
+        await client.request()
+        await client.request()
+        self.assertNotEqual(client.used_proxies[0], client.used_proxies[1])
+
+    async def test_banned_proxy_evicted(self):
+        client = FakeClient(self.pool)
+        with self.assertRaises(PermissionError):
+            await client.request(banned=True)
+        banned_key = next(iter(self.pool.banned_keys))
+        self.assertNotIn(banned_key, [get_proxy_key(proxy) for proxy in self.pool.proxy_list])
+
+    async def test_expired_proxy_skipped_and_refilled(self):
+        for proxy in self.pool.proxy_list:
+            proxy.expired_time_ts = utils.get_unix_timestamp()
+        proxy = await self.pool.get_rotating_proxy()
+        self.assertTrue(proxy.ip.startswith("10.0.2."))
+
+
+class FakeProxyHandler(BaseHTTPRequestHandler):
+    """本地的假代理，按服务器上配置的延迟返回 200，记录所有假代理同时处理的最大请求数"""
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def do_GET(self):
+        cls = FakeProxyHandler
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(self.server.delay)
+        with cls.lock:
+            cls.in_flight -= 1
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_proxy(delay: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeProxyHandler)
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestValidateIpPool(IsolatedAsyncioTestCase):
+    def setUp(self):
+        FakeProxyHandler.max_in_flight = 0
+        self.servers = [start_fake_proxy(delay) for delay in (1.0, 0.0, 0.5)]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def create_proxy(self, port: int) -> IpInfoModel:
+        return IpInfoModel(ip="127.0.0.1", port=port, user="u", password="p", protocol="http://",
+                           expired_time_ts=utils.get_unix_timestamp() + 3600)
+
+    async def test_validate_concurrently_sorted_by_latency(self):
+        pool = ProxyIpPool(ip_pool_count=4, enable_validate_ip=True, ip_provider=FakeProxyProvider())
+        pool.valid_ip_url = "http://proxy-validate.test/ip"
+        proxies = [self.create_proxy(server.server_address[1]) for server in self.servers]
+        proxies.append(self.create_proxy(get_free_port()))
+
+        valid_proxies = await pool.validate_proxies(proxies)
+
+        self.assertEqual([proxy.port for proxy in valid_proxies],
+                         [self.servers[i].server_address[1] for i in (1, 2, 0)])
+        # 并发验证，延迟 1s 和 0.5s 的两个代理的验证请求同时进行
+        self.assertGreaterEqual(FakeProxyHandler.max_in_flight, 2)
+
+        pool.proxy_list = valid_proxies
+        proxy = await pool.get_proxy()
+        self.assertEqual(proxy.port, self.servers[1].server_address[1])
+
+
+class TestIpCache(IsolatedAsyncioTestCase):
+    async def test_load_all_ip_skip_invalid_value(self):
+        ip_cache = IpCache()
+        proxy = IpInfoModel(ip="127.0.0.1", port=8000, user="u", password="p", expired_time_ts=0)
+        await ip_cache.set_ip("kuaidaili_127.0.0.1_8000", proxy.model_dump_json(), ex=60)
+        await ip_cache.set_ip("kuaidaili_127.0.0.1_8001", "not json", ex=60)
+        await ip_cache.set_ip("jishuhttp_127.0.0.1_8002", proxy.model_dump_json(), ex=60)
+        self.assertEqual(await ip_cache.load_all_ip("kuaidaili"), [proxy])
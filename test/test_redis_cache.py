@@ -15,10 +15,13 @@
 # @Time    : 2024/6/2 19:54
 # @Desc    :
 
+import asyncio
 import time
 import unittest
 
+from cache.async_redis_cache import AsyncRedisCache
 from cache.redis_cache import RedisCache
+from cache.serializer import get_serializer
 
 
 class TestRedisCache(unittest.TestCase):
@@ -47,5 +50,44 @@ class TestRedisCache(unittest.TestCase):
         pass
 
 
+class TestAsyncRedisCache(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.redis_cache = AsyncRedisCache(serializer="json")
+
+    async def test_set_and_get(self):
+        await self.redis_cache.set('async_key', {'ip': '127.0.0.1'}, 10)
+        self.assertEqual(await self.redis_cache.get('async_key'), {'ip': '127.0.0.1'})
+
+    async def test_expired_key(self):
+        await self.redis_cache.set('async_key', 'value', 1)
+        await asyncio.sleep(2)
+        self.assertIsNone(await self.redis_cache.get('async_key'))
+
+    async def test_scan_keys_and_mget(self):
+        for i in range(1200):
+            await self.redis_cache.set(f'async_scan_{i}', i, 10)
+        keys = await self.redis_cache.keys('async_scan_*')
+        self.assertEqual(len(keys), 1200)
+        values = await self.redis_cache.mget(keys + ['not_exist'])
+        self.assertEqual(sorted(values.values()), list(range(1200)))
+
+    async def asyncTearDown(self):
+        await self.redis_cache.close()
+
+
+class TestCacheSerializer(unittest.TestCase):
+
+    def test_json_serializer(self):
+        dumps, loads = get_serializer('json')
+        value = {'name': '程序员阿江-Relakkes', 'ids': [1, 2, 3]}
+        self.assertEqual(dumps(value), '{"name":"程序员阿江-Relakkes","ids":[1,2,3]}'.encode('utf-8'))
+        self.assertEqual(loads(dumps(value)), value)
+
+    def test_unknown_serializer(self):
+        with self.assertRaises(ValueError):
+            get_serializer('xml')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,86 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+import json
+import os
+import tempfile
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+import httpx
+
+import config
+from replay.benchmark import ReplayServer, run_benchmark
+from replay.recorder import HttpRecorder, start_recording, stop_recording
+from replay.server import create_app
+
+
+def record_bili_video(recorder: HttpRecorder, bvid: str, aid: int) -> None:
+    video_detail = {
+        "View": {"aid": aid, "bvid": bvid, "cid": aid, "title": f"video {aid}", "desc": "", "pubdate": 0,
+                 "owner": {"mid": 1, "name": "up", "face": ""}, "stat": {"like": 1, "view": 1, "danmaku": 1, "reply": 1}},
+        "Card": {"card": {"mid": 1, "name": "up", "face": "", "fans": 1, "level_info": {"current_level": 6},
+                          "sex": "保密", "sign": "", "official_verify": {"type": -1}}, "like_num": 1},
+    }
+    content = json.dumps({"code": 0, "message": "0", "data": video_detail}).encode()
+    recorder.record("GET", f"https://api.bilibili.com/x/web-interface/view/detail?bvid={bvid}", None, 200,
+                    [("Content-Type", "application/json")], content)
+
+
+class TestReplay(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.fixture_path = os.path.join(self.tmp_dir.name, "bili_detail.jsonl")
+        recorder = HttpRecorder(self.fixture_path)
+        self.bvids = [f"BV{i}" for i in range(5)]
+        for i, bvid in enumerate(self.bvids):
+            record_bili_video(recorder, bvid, i + 1)
+        config.config_overrides_var.set({
+            "BILI_SPECIFIED_ID_LIST": self.bvids,
+            "ENABLE_GET_COMMENTS": False,
+        })
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def test_benchmark_detail(self):
+        result = await run_benchmark("bili", "detail", [self.fixture_path])
+        self.assertEqual(result["contents"], 5)
+        self.assertEqual(result["creators"], 5)
+        self.assertEqual(result["misses"], 0)
+        self.assertGreater(result["items_per_sec"], 0)
+
+    async def test_captcha_injection(self):
+        result = await run_benchmark("bili", "detail", [self.fixture_path], captcha_rate=1)
+        self.assertEqual(result["items"], 0)
+        self.assertEqual(result["captchas"], 5)
+
+    async def test_record_from_replay_server(self):
+        record_path = os.path.join(self.tmp_dir.name, "recorded.jsonl")
+        with ReplayServer(create_app("bili", [self.fixture_path])) as server:
+            start_recording(record_path)
+            try:
+                async with httpx.AsyncClient() as client:
+                    response = await client.get(f"{server.url}/x/web-interface/view/detail?bvid=BV3&w_rid=1&wts=2")
+            finally:
+                stop_recording()
+        self.assertEqual(response.json()["data"]["View"]["aid"], 4)
+        with open(record_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["status_code"], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 浏览器资源拦截的测试，使用假的 playwright 请求和页面对象
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import config
+from tools.resource_blocker import BrowserResourceBlocker, block_browser_resources
+
+
+class FakeRoute:
+    def __init__(self, resource_type: str, url: str):
+        self.request = SimpleNamespace(resource_type=resource_type, url=url)
+        self.result = None
+
+    async def abort(self):
+        self.result = "abort"
+
+    async def continue_(self):
+        self.result = "continue"
+
+
+class FakeBrowserContext:
+    def __init__(self):
+        self.routes = []
+
+    async def route(self, url: str, handler):
+        self.routes.append((url, handler))
+
+    def on(self, event: str, handler):
+        pass
+
+
+class FakePage:
+    def __init__(self):
+        self.visited_urls = []
+
+    async def goto(self, url: str, **kwargs):
+        self.visited_urls.append(url)
+
+
+class TestBrowserResourceBlocker(unittest.TestCase):
+
+    def handle(self, blocker: BrowserResourceBlocker, resource_type: str, url: str) -> str:
+        route = FakeRoute(resource_type, url)
+        asyncio.run(blocker.handle_route(route))
+        return route.result
+
+    def test_block_and_allow(self):
+        blocker = BrowserResourceBlocker()
+        cases = [
+            ("image", "https://sns-webpic-qc.xhscdn.com/a.jpg", "abort"),
+            ("media", "https://v.douyinvod.com/a.mp4", "abort"),
+            ("font", "https://s1.hdslb.com/a.woff2", "abort"),
+            ("script", "https://hm.baidu.com/hm.js", "abort"),
+            ("xhr", "https://data.bilibili.com/log/web", "abort"),
+            ("script", "https://lf-security.bytegoofy.com/sdk.js", "continue"),
+            ("document", "https://www.douyin.com/", "continue"),
+            ("xhr", "https://api.bilibili.com/x/web-interface/nav", "continue"),
+        ]
+        for resource_type, url, result in cases:
+            self.assertEqual(self.handle(blocker, resource_type, url), result, url)
+        self.assertEqual(blocker.stats()["blocked_requests"], {"image": 1, "media": 1, "font": 1, "analytics": 2})
+
+    def test_pin_page_only_for_pin_platforms(self):
+        for platform, pinned in (("ks", True), ("wb", True), ("zhihu", True), ("dy", False), ("bili", False)):
+            browser_context, page = FakeBrowserContext(), FakePage()
+            with mock.patch.object(config, "PLATFORM", platform):
+                asyncio.run(block_browser_resources(browser_context, page, pin_url="https://example.com/robots.txt"))
+            self.assertEqual(page.visited_urls, ["https://example.com/robots.txt"] if pinned else [], platform)
+            self.assertEqual(len(browser_context.routes), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    :
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from cache.cache_factory import CacheFactory
+from cache.sqlite_cache import SqliteCache
+
+
+class TestSqliteCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "cache.sqlite3")
+        self.sqlite_cache = SqliteCache(self.db_path)
+
+    def test_set_and_get(self):
+        self.sqlite_cache.set('key', {'ip': '127.0.0.1'}, 10)
+        self.assertEqual(self.sqlite_cache.get('key'), {'ip': '127.0.0.1'})
+        self.assertIsNone(self.sqlite_cache.get('not_exist'))
+
+    def test_expired_key(self):
+        self.sqlite_cache.set('key', 'value', 1)
+        time.sleep(1.1)
+        self.assertIsNone(self.sqlite_cache.get('key'))
+        self.assertEqual(self.sqlite_cache.keys('*'), [])
+
+    def test_keys(self):
+        self.sqlite_cache.set('kuaidaili_1', 'value1', 10)
+        self.sqlite_cache.set('kuaidaili_2', 'value2', 10)
+        self.sqlite_cache.set('jishuhttp_1', 'value3', 10)
+        self.assertCountEqual(self.sqlite_cache.keys('kuaidaili_*'), ['kuaidaili_1', 'kuaidaili_2'])
+        self.assertCountEqual(self.sqlite_cache.keys('*_1'), ['kuaidaili_1', 'jishuhttp_1'])
+
+    def test_mget(self):
+        for i in range(600):
+            self.sqlite_cache.set(f'key{i}', i, 10)
+        result = self.sqlite_cache.mget([f'key{i}' for i in range(600)] + ['not_exist'])
+        self.assertEqual(len(result), 600)
+        self.assertEqual(result['key599'], 599)
+
+    def test_persist_across_processes(self):
+        code = (
+            "from cache.sqlite_cache import SqliteCache;"
+            f"SqliteCache({self.db_path!r}).set('from_other_process', 'value', 10)"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(self.sqlite_cache.get('from_other_process'), 'value')
+
+    def test_factory(self):
+        cache = CacheFactory.create_cache('sqlite', self.db_path)
+        self.assertIsInstance(cache, SqliteCache)
+        cache.close()
+
+    def tearDown(self):
+        self.sqlite_cache.close()
+        self.tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 存储记录类型的测试，以及 CSV / JSON 存储直接使用记录时的输出
+import asyncio
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from model.m_baidu_tieba import TiebaComment
+from model.m_zhihu import ZhihuCreator
+from store.record import StoreRecord
+from store.tieba.tieba_store_record import TiebaCommentRecord
+from store.xhs.xhs_store_impl import XhsCsvStoreImplement, XhsJsonStoreImplement
+from store.xhs.xhs_store_record import XhsNoteCommentRecord
+from store.zhihu.zhihu_store_record import ZhihuCreatorRecord
+from var import crawler_type_var
+
+
+class PointRecord(StoreRecord):
+    __slots__ = ("x", "y")
+
+
+def make_comment_record(**kwargs) -> XhsNoteCommentRecord:
+    item = dict(comment_id="1", create_time=1717000000000, ip_location="上海", note_id="n1", content="评论",
+                user_id="u1", nickname="nickname", avatar="avatar", sub_comment_count="3", pictures="",
+                parent_comment_id=0, last_modify_ts=1717000000001, like_count="12")
+    item.update(kwargs)
+    return XhsNoteCommentRecord(**item)
+
+
+class TestStoreRecord(unittest.TestCase):
+
+    def test_column_order(self):
+        record = PointRecord(y=2, x=1)
+        self.assertEqual(record.FIELDS, ("x", "y"))
+        self.assertEqual(record.to_row(), (1, 2))
+        self.assertEqual(list(record.keys()), ["x", "y"])
+        self.assertEqual(list(record.items()), [("x", 1), ("y", 2)])
+        self.assertEqual(list(record.to_dict(add_ts=3)), ["x", "y", "add_ts"])
+
+    def test_mapping_interface(self):
+        record = PointRecord(x=1, y=2)
+        self.assertEqual(record["x"], 1)
+        self.assertEqual(record.get("y"), 2)
+        self.assertIsNone(record.get("z"))
+        self.assertIsNone(record.get("to_row"))
+        self.assertIn("x", record)
+        self.assertNotIn("keys", record)
+        self.assertEqual(len(record), 2)
+        self.assertEqual(dict(record), {"x": 1, "y": 2})
+        self.assertEqual(dict(record, add_ts=3), {"x": 1, "y": 2, "add_ts": 3})
+        self.assertEqual(record, {"x": 1, "y": 2})
+        self.assertEqual(record, PointRecord(x=1, y=2))
+        self.assertNotEqual(record, PointRecord(x=1, y=3))
+        with self.assertRaises(KeyError):
+            _ = record["keys"]
+
+    def test_missing_field(self):
+        with self.assertRaises(TypeError):
+            PointRecord(x=1)
+        with self.assertRaises(TypeError):
+            PointRecord(x=1, y=2, z=3)
+        with self.assertRaises(AttributeError):
+            PointRecord(x=1, y=2).z = 3
+
+    def test_from_model(self):
+        comment = TiebaComment(comment_id="123456", content="c", user_link="u", user_nickname="n",
+                               user_avatar="a", publish_time="p", parent_comment_id="x", note_id="note",
+                               note_url="url", tieba_id="tid", tieba_name="tn", tieba_link="tl")
+        expected = comment.model_dump()
+        expected["last_modify_ts"] = 1
+        self.assertEqual(TiebaCommentRecord.from_model(comment, last_modify_ts=1).to_dict(), expected)
+        self.assertEqual(list(TiebaCommentRecord.FIELDS), list(expected))
+
+        creator = ZhihuCreator(user_id="u", url_token="t", fans=10)
+        expected = creator.model_dump()
+        expected["last_modify_ts"] = 1
+        self.assertEqual(ZhihuCreatorRecord.from_model(creator, last_modify_ts=1).to_dict(), expected)
+
+
+class TestRecordStores(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.crawler_type_token = crawler_type_var.set("search")
+
+    def tearDown(self):
+        crawler_type_var.reset(self.crawler_type_token)
+        self.temp_dir.cleanup()
+
+    def test_csv_store(self):
+        store = XhsCsvStoreImplement()
+        store.csv_store_path = self.temp_dir.name
+        records = [make_comment_record(comment_id="1"), make_comment_record(comment_id="2", content="a,b")]
+        for record in records:
+            asyncio.run(store.store_comment(record))
+
+        with open(store.make_save_file_name("comments"), "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], list(XhsNoteCommentRecord.FIELDS))
+        self.assertEqual(rows[1:], [[str(value) for value in record.values()] for record in records])
+
+    def test_json_store(self):
+        store = XhsJsonStoreImplement()
+        store.json_store_path = os.path.join(self.temp_dir.name, "json")
+        store.words_store_path = os.path.join(self.temp_dir.name, "words")
+        record = make_comment_record()
+        asyncio.run(store.store_comment(record))
+
+        with open(store.make_save_file_name("comments")[0], "r", encoding="utf-8") as f:
+            save_data = json.load(f)
+        self.assertEqual(save_data, [record.to_dict()])
+        self.assertEqual(list(save_data[0]), list(XhsNoteCommentRecord.FIELDS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 贴吧页面提取，和录制页面上的已知提取结果对比
+import json
+import os
+import unittest
+
+from media_platform.tieba.help import TieBaExtractor
+from model.m_baidu_tieba import TiebaComment
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+TIEBA_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "media_platform", "tieba", "test_data")
+
+
+def read_fixture(file_name: str, fixtures_dir: str = TIEBA_FIXTURES_DIR) -> str:
+    with open(os.path.join(fixtures_dir, file_name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class TestTieBaExtractor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(os.path.join(FIXTURES_DIR, "tieba_extractor_expected.json"), "r", encoding="utf-8") as f:
+            cls.expected = json.load(f)
+        cls.extractor = TieBaExtractor()
+
+    def test_extract_search_note_list(self):
+        notes = self.extractor.extract_search_note_list(read_fixture("search_keyword_notes.html"))
+        self.assertEqual([note.model_dump() for note in notes], self.expected["search"])
+
+    def test_extract_tieba_note_list(self):
+        notes = self.extractor.extract_tieba_note_list(read_fixture("tieba_note_list.html"))
+        self.assertEqual([note.model_dump() for note in notes], self.expected["list"])
+
+    def test_extract_note_detail(self):
+        note = self.extractor.extract_note_detail(read_fixture("note_detail.html"))
+        self.assertEqual(note.model_dump(), self.expected["detail"])
+
+    def test_extract_tieba_note_parment_comments(self):
+        comments = self.extractor.extract_tieba_note_parment_comments(read_fixture("note_comments.html"), "123")
+        self.assertEqual([comment.model_dump() for comment in comments], self.expected["comments"])
+
+    def test_extract_tieba_note_sub_comments(self):
+        parent_comment = TiebaComment(comment_id="123456", content="c", user_link="u", user_nickname="n",
+                                      user_avatar="a", publish_time="p", parent_comment_id="x", note_id="note",
+                                      note_url="url", tieba_id="tid", tieba_name="tn", tieba_link="tl")
+        comments = self.extractor.extract_tieba_note_sub_comments(read_fixture("note_sub_comments.html"), parent_comment)
+        self.assertEqual([comment.model_dump() for comment in comments], self.expected["sub"])
+
+    def test_extract_creator_page(self):
+        html_content = read_fixture("tieba_creator_info.html", FIXTURES_DIR)
+        self.assertEqual(self.extractor.extract_creator_info(html_content).model_dump(), self.expected["creator"])
+        self.assertEqual(self.extractor.extract_tieba_thread_id_list_from_creator_page(html_content),
+                         self.expected["threads"])
+
+
+if __name__ == '__main__':
+    unittest.main()
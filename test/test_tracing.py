@@ -0,0 +1,131 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 链路追踪的测试：span 写入、contextvars 传递内容 id 和父 span、追踪报告
+import asyncio
+import os
+import tempfile
+import unittest
+from typing import Dict
+
+import config
+from tools import trace_report, tracing
+
+
+class FakeCrawler:
+
+    @tracing.trace_stage("detail", "note_id")
+    async def get_note_detail(self, note_id: str, delay: float = 0.0) -> Dict:
+        await asyncio.sleep(delay)
+        return {"note_id": note_id}
+
+    @tracing.trace_stage("media", "note_detail.note_id")
+    async def get_note_media(self, note_detail: Dict):
+        if note_detail.get("fail"):
+            raise ValueError("media fail")
+
+    @tracing.trace_stage("comments", "note_id")
+    async def get_comments(self, note_id: str):
+        # 评论回调里的存储不传内容 id，沿用外层 comments 的内容 id
+        with tracing.span("store", store_type="comments"):
+            await asyncio.sleep(0)
+
+
+class TestTracing(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.save_dir = tempfile.TemporaryDirectory()
+        self.origin = (config.ENABLE_TRACE, config.TRACE_SAVE_DIR, config.PLATFORM)
+        config.ENABLE_TRACE, config.TRACE_SAVE_DIR, config.PLATFORM = True, self.save_dir.name, "xhs"
+
+    def tearDown(self):
+        tracing.close()
+        config.ENABLE_TRACE, config.TRACE_SAVE_DIR, config.PLATFORM = self.origin
+        self.save_dir.cleanup()
+
+    def read_spans(self):
+        tracing.flush()
+        return trace_report.load_spans([tracing.get_trace_file_path("xhs")])
+
+    async def test_spans_of_item(self):
+        crawler = FakeCrawler()
+        tracing.event("discovered", "n1", keyword="python", page=1)
+        note_detail = await crawler.get_note_detail(note_id="n1")
+        await crawler.get_comments("n1")
+        with self.assertRaises(ValueError):
+            await crawler.get_note_media({"note_id": "n1", "fail": True})
+
+        spans = self.read_spans()
+        self.assertEqual([span["name"] for span in spans], ["discovered", "detail", "store", "comments", "media"])
+        self.assertEqual(note_detail, {"note_id": "n1"})
+        self.assertEqual({span["trace_id"] for span in spans}, {tracing.trace_id_of("xhs", "n1")})
+        self.assertEqual(spans[0]["attributes"], {"platform": "xhs", "content_id": "n1", "keyword": "python", "page": 1})
+        store_span, comments_span = spans[2], spans[3]
+        self.assertEqual(store_span["parent_span_id"], comments_span["span_id"])
+        self.assertEqual(comments_span["parent_span_id"], "")
+        self.assertEqual(spans[4]["status"]["code"], "ERROR")
+
+    async def test_concurrent_items_keep_own_context(self):
+        crawler = FakeCrawler()
+        await asyncio.gather(*(crawler.get_comments(note_id) for note_id in ("a", "b", "c")))
+        spans = self.read_spans()
+        comments_spans = {span["span_id"]: span for span in spans if span["name"] == "comments"}
+        for span in spans:
+            if span["name"] == "store":
+                parent = comments_spans[span["parent_span_id"]]
+                self.assertEqual(parent["attributes"]["content_id"], span["attributes"]["content_id"])
+
+    async def test_disabled_writes_nothing(self):
+        config.ENABLE_TRACE = False
+        tracing.event("discovered", "n1")
+        await FakeCrawler().get_note_detail("n1")
+        self.assertFalse(os.path.exists(tracing.get_trace_file_path("xhs")))
+
+
+class TestTraceReport(unittest.TestCase):
+
+    @staticmethod
+    def make_span(name: str, content_id: str, start: float, end: float, parent: str = "") -> Dict:
+        return {"name": name, "span_id": f"{content_id}-{name}", "parent_span_id": parent,
+                "start_time_unix_nano": int(start * 1e9), "end_time_unix_nano": int(end * 1e9),
+                "attributes": {"platform": "xhs", "content_id": content_id}}
+
+    def test_stage_wait_and_slowest_items(self):
+        spans = [
+            self.make_span("discovered", "n1", 0, 0),
+            self.make_span("detail", "n1", 0, 1),
+            self.make_span("store", "n1", 3, 3.5),
+            self.make_span("discovered", "n2", 0, 0),
+            self.make_span("detail", "n2", 0, 3),
+            self.make_span("store", "n2", 3.5, 4),
+            self.make_span("comments", "n2", 4, 6),
+            self.make_span("store", "n2", 5, 5.5, parent="n2-comments"),
+        ]
+        timelines = trace_report.build_timelines(spans)
+        n1 = next(timeline for timeline in timelines if timeline.content_id == "n1")
+        # n1 的详情 1 秒就拿到了，但要等 n2 的详情完成后才存储，等待 2 秒
+        self.assertEqual(n1.stage_timings()[2], ("store", 3.0, 2.0, 0.5))
+
+        stats = trace_report.stage_stats(timelines)
+        self.assertEqual(sorted(stats["store"]["wait"]), [0.5, 2.0])
+        self.assertEqual(len(stats["store"]["duration"]), 2)
+        self.assertEqual(trace_report.percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(trace_report.percentile([1, 2, 3, 4], 99), 4)
+
+        report = trace_report.format_report(timelines, top_n=1)
+        self.assertTrue(report[1].startswith("stage"))
+        self.assertEqual([line.split()[0] for line in report[2:6]], ["discovered", "detail", "store", "comments"])
+        self.assertTrue(report[-1].startswith("xhs:n2 total=6.00s"))
+
+
+if __name__ == '__main__':
+    unittest.main()
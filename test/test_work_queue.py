@@ -0,0 +1,168 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 分布式工作队列的测试，使用进程内的 LocalWorkQueue
+import asyncio
+import time
+import unittest
+from typing import Dict, List
+
+import config
+from work_queue import (LocalWorkQueue, RateBudget, UnitType, WorkUnit, build_unit_overrides,
+                        limit_request_rate, request_rate_budget_var)
+from work_queue.worker import QueueWorker
+
+
+def search_unit(keyword: str, page: int = 1) -> WorkUnit:
+    return WorkUnit(platform="xhs", unit_type=UnitType.SEARCH_PAGE, target=keyword, page=page)
+
+
+class TestLocalWorkQueue(unittest.IsolatedAsyncioTestCase):
+
+    async def test_enqueue_dedup(self):
+        work_queue = LocalWorkQueue(max_attempts=3)
+        self.assertEqual(await work_queue.enqueue([search_unit("a", 1), search_unit("a", 2)]), 2)
+        self.assertEqual(await work_queue.enqueue([search_unit("a", 1), search_unit("b", 1)]), 1)
+        self.assertEqual((await work_queue.stats("xhs"))["pending"], 3)
+        self.assertIsNone(await work_queue.lease("dy", 60))
+
+    async def test_lease_ack(self):
+        work_queue = LocalWorkQueue(max_attempts=3)
+        await work_queue.enqueue([search_unit("a"), search_unit("b")])
+        lease = await work_queue.lease("xhs", 60)
+        self.assertEqual((lease.unit.target, lease.attempts), ("a", 1))
+        self.assertEqual(await work_queue.stats("xhs"), {"pending": 1, "leased": 1, "done": 0, "dead": 0})
+        self.assertTrue(await work_queue.extend(lease, 60))
+        self.assertTrue(await work_queue.ack(lease))
+        self.assertFalse(await work_queue.ack(lease))
+        self.assertEqual(await work_queue.stats("xhs"), {"pending": 1, "leased": 0, "done": 1, "dead": 0})
+        # 完成后再次入队会被去重
+        self.assertEqual(await work_queue.enqueue([search_unit("a")]), 0)
+
+    async def test_expired_lease_is_requeued(self):
+        work_queue = LocalWorkQueue(max_attempts=3)
+        await work_queue.enqueue([search_unit("a")])
+        expired_lease = await work_queue.lease("xhs", 0)
+        lease = await work_queue.lease("xhs", 60)
+        self.assertEqual((lease.unit.target, lease.attempts), ("a", 2))
+        # 超时的旧租用不能再确认或续租
+        self.assertFalse(await work_queue.ack(expired_lease))
+        self.assertFalse(await work_queue.extend(expired_lease, 60))
+        self.assertTrue(await work_queue.ack(lease))
+
+    async def test_nack_retry_then_dead(self):
+        work_queue = LocalWorkQueue(max_attempts=2)
+        await work_queue.enqueue([search_unit("a")])
+        self.assertTrue(await work_queue.nack(await work_queue.lease("xhs", 60)))
+        lease = await work_queue.lease("xhs", 60)
+        self.assertEqual(lease.attempts, 2)
+        self.assertTrue(await work_queue.nack(lease))
+        self.assertIsNone(await work_queue.lease("xhs", 60))
+        self.assertEqual(await work_queue.stats("xhs"), {"pending": 0, "leased": 0, "done": 0, "dead": 1})
+
+    async def test_reserve_rate(self):
+        work_queue = LocalWorkQueue(max_attempts=1)
+        waits = [await work_queue.reserve_rate("xhs", 0.5) for _ in range(3)]
+        self.assertAlmostEqual(waits[0], 0, places=2)
+        self.assertAlmostEqual(waits[1], 0.5, places=2)
+        self.assertAlmostEqual(waits[2], 1.0, places=2)
+        self.assertAlmostEqual(await work_queue.reserve_rate("dy", 0.5), 0, places=2)
+
+
+class TestBuildUnitOverrides(unittest.TestCase):
+
+    def test_unit_types(self):
+        overrides = build_unit_overrides(search_unit("python", 3), enable_comments=False)
+        self.assertEqual(overrides["CRAWLER_TYPE"], "search")
+        self.assertEqual((overrides["KEYWORDS"], overrides["START_PAGE"], overrides["CRAWLER_MAX_NOTES_COUNT"]),
+                         ("python", 3, 20))
+        self.assertFalse(overrides["ENABLE_RESUME"])
+
+        unit = WorkUnit(platform="bili", unit_type=UnitType.SEARCH_PAGE, target="python", page=2)
+        overrides = build_unit_overrides(unit, enable_comments=False)
+        self.assertEqual((overrides["START_PAGE"], overrides["CRAWLER_MAX_NOTES_COUNT"], overrides["ALL_DAY"]),
+                         (2, 20, False))
+
+        overrides = build_unit_overrides(WorkUnit(platform="dy", unit_type=UnitType.CREATOR, target="u1"), True)
+        self.assertEqual((overrides["CRAWLER_TYPE"], overrides["DY_CREATOR_ID_LIST"]), ("creator", ["u1"]))
+
+        overrides = build_unit_overrides(WorkUnit(platform="bili", unit_type=UnitType.COMMENTS, target="BV1"), False)
+        self.assertEqual((overrides["CRAWLER_TYPE"], overrides["BILI_SPECIFIED_ID_LIST"]), ("detail", ["BV1"]))
+        self.assertTrue(overrides["ENABLE_GET_COMMENTS"])
+
+        unit = WorkUnit(platform="bili", unit_type=UnitType.CONTENT, target="BV1")
+        self.assertEqual(unit.unit_id, "bili:content:BV1")
+        self.assertEqual(search_unit("python", 3).unit_id, "xhs:search_page:python:3")
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.request_times: List[float] = []
+
+    @limit_request_rate
+    async def request(self, method, url, **kwargs):
+        self.request_times.append(time.monotonic())
+
+
+class FakeCrawler:
+
+    def __init__(self, client: FakeClient):
+        self.client = client
+        self.crawled: List[Dict] = []
+
+    async def crawl(self):
+        if config.KEYWORDS == "fail":
+            raise RuntimeError("blocked")
+        self.crawled.append({"keywords": config.KEYWORDS, "start_page": config.START_PAGE})
+        await self.client.request("GET", "/search")
+
+
+class TestQueueWorker(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.origin = (config.WORK_QUEUE_RATE_BUDGETS, config.WORK_QUEUE_POLL_INTERVAL)
+        config.WORK_QUEUE_RATE_BUDGETS, config.WORK_QUEUE_POLL_INTERVAL = {"xhs": 20}, 0
+
+    def tearDown(self):
+        config.WORK_QUEUE_RATE_BUDGETS, config.WORK_QUEUE_POLL_INTERVAL = self.origin
+
+    async def test_workers_share_queue_and_rate_budget(self):
+        work_queue = LocalWorkQueue(max_attempts=2)
+        await work_queue.enqueue([search_unit("a", 1), search_unit("a", 2), search_unit("fail"), search_unit("b", 1)])
+        client = FakeClient()
+        crawlers = [FakeCrawler(client), FakeCrawler(client)]
+        workers = [QueueWorker(work_queue, "xhs", crawler, f"worker-{i}") for i, crawler in enumerate(crawlers)]
+        await asyncio.gather(*(worker.run(exit_when_empty=True) for worker in workers))
+
+        crawled = sorted((item["keywords"], item["start_page"]) for crawler in crawlers for item in crawler.crawled)
+        self.assertEqual(crawled, [("a", 1), ("a", 2), ("b", 1)])
+        self.assertEqual(await work_queue.stats("xhs"), {"pending": 0, "leased": 0, "done": 3, "dead": 1})
+        self.assertEqual(sum(worker.failed for worker in workers), 2)
+        # 两个工作进程的请求合计不超过每秒 20 个
+        request_times = sorted(client.request_times)
+        for previous, current in zip(request_times, request_times[1:]):
+            self.assertGreaterEqual(current - previous, 0.04)
+        # 工作单元的配置只在执行该单元的 task 中生效
+        self.assertIsNone(request_rate_budget_var.get())
+
+    async def test_no_rate_budget_outside_worker(self):
+        client = FakeClient()
+        request_rate_budget_var.set(None)
+        await client.request("GET", "/")
+        request_rate_budget_var.set(RateBudget(LocalWorkQueue(max_attempts=1), "xhs", 1000))
+        await client.request("GET", "/")
+        self.assertEqual(len(client.request_times), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : xhs x-s-common 签名基础函数和原纯 Python 实现的输出一致性测试
+import ctypes
+import json
+import random
+import unittest
+import urllib.parse
+
+from media_platform.xhs import help as xhs_help
+
+# 原实现，作为一致性对比的参照
+LEGACY_LOOKUP = list("ZmserbBoHQtNP+wOcza/LpngG8yJq42KWYj0DSfdikx3VT16IlUAFM97hECvuRX5")
+
+
+def legacy_crc_table():
+    table = []
+    for i in range(256):
+        c = i
+        for _ in range(8):
+            c = (c >> 1) ^ 3988292384 if c & 1 else c >> 1
+        table.append(c)
+    return table
+
+
+LEGACY_CRC_TABLE = legacy_crc_table()
+
+
+def legacy_mrc(e):
+    ie = LEGACY_CRC_TABLE
+    o = -1
+
+    def right_without_sign(num: int, bit: int = 0) -> int:
+        val = ctypes.c_uint32(num).value >> bit
+        MAX32INT = 4294967295
+        return (val + (MAX32INT + 1)) % (2 * (MAX32INT + 1)) - MAX32INT - 1
+
+    for n in range(57):
+        o = ie[(o & 255) ^ ord(e[n])] ^ right_without_sign(o, 8)
+    return o ^ -1 ^ 3988292384
+
+
+def legacy_triplet_to_base64(e):
+    return (
+            LEGACY_LOOKUP[63 & (e >> 18)] +
+            LEGACY_LOOKUP[63 & (e >> 12)] +
+            LEGACY_LOOKUP[(e >> 6) & 63] +
+            LEGACY_LOOKUP[e & 63]
+    )
+
+
+def legacy_encode_chunk(e, t, r):
+    m = []
+    for b in range(t, r, 3):
+        n = (16711680 & (e[b] << 16)) + \
+            ((e[b + 1] << 8) & 65280) + (e[b + 2] & 255)
+        m.append(legacy_triplet_to_base64(n))
+    return ''.join(m)
+
+
+def legacy_b64_encode(e):
+    P = len(e)
+    W = P % 3
+    U = []
+    z = 16383
+    H = 0
+    Z = P - W
+    while H < Z:
+        U.append(legacy_encode_chunk(e, H, Z if H + z > Z else H + z))
+        H += z
+    if 1 == W:
+        F = e[P - 1]
+        U.append(LEGACY_LOOKUP[F >> 2] + LEGACY_LOOKUP[(F << 4) & 63] + "==")
+    elif 2 == W:
+        F = (e[P - 2] << 8) + e[P - 1]
+        U.append(LEGACY_LOOKUP[F >> 10] + LEGACY_LOOKUP[63 & (F >> 4)] +
+                 LEGACY_LOOKUP[(F << 2) & 63] + "=")
+    return "".join(U)
+
+
+def legacy_encode_utf8(e):
+    b = []
+    m = urllib.parse.quote(e, safe='~()*!.\'')
+    w = 0
+    while w < len(m):
+        T = m[w]
+        if T == "%":
+            E = m[w + 1] + m[w + 2]
+            S = int(E, 16)
+            b.append(S)
+            w += 2
+        else:
+            b.append(ord(T[0]))
+        w += 1
+    return b
+
+
+def legacy_b64_decode(text: str):
+    bits = "".join(format(LEGACY_LOOKUP.index(ch), "06b") for ch in text.rstrip("="))
+    return [int(bits[i:i + 8], 2) for i in range(0, len(bits) - len(bits) % 8, 8)]
+
+
+# 随机字符串的字符来源：ASCII 可见字符、URL 保留字符、中文和 emoji
+ALPHABETS = [
+    "".join(chr(i) for i in range(32, 127)),
+    "%~()*!.'&=?/#+ ",
+    "小红书笔记签名测试",
+    "😀🚀",
+]
+
+
+class TestXhsSignPrimitives(unittest.TestCase):
+    ROUNDS = 2000
+
+    def setUp(self):
+        self.random = random.Random(40)
+
+    def random_text(self, max_length: int, latin1: bool = False) -> str:
+        alphabets = ALPHABETS[:2] if latin1 else ALPHABETS
+        chars = "".join(alphabets)
+        if latin1:
+            chars += "".join(chr(i) for i in range(256))
+        return "".join(self.random.choice(chars) for _ in range(self.random.randint(0, max_length)))
+
+    def test_legacy_crc_table(self):
+        self.assertEqual(LEGACY_CRC_TABLE[:4], [0, 1996959894, 3993919788, 2567524794])
+        self.assertEqual(LEGACY_CRC_TABLE[-3:], [3272380065, 1510334235, 755167117])
+
+    def test_mrc(self):
+        for _ in range(self.ROUNDS):
+            text = self.random_text(57, latin1=True).ljust(57, "0") + self.random_text(20, latin1=True)
+            self.assertEqual(xhs_help.mrc(text), legacy_mrc(text), text)
+
+    def test_encode_utf8(self):
+        for _ in range(self.ROUNDS):
+            text = self.random_text(200)
+            self.assertEqual(xhs_help.encodeUtf8(text), legacy_encode_utf8(text), text)
+
+    def test_b64_encode(self):
+        for length in range(0, 64):
+            data = [self.random.randrange(256) for _ in range(length)]
+            self.assertEqual(xhs_help.b64Encode(data), legacy_b64_encode(data), data)
+        for _ in range(self.ROUNDS):
+            data = legacy_encode_utf8(self.random_text(300))
+            self.assertEqual(xhs_help.b64Encode(data), legacy_b64_encode(data), data)
+        data = [self.random.randrange(256) for _ in range(16383 * 3 + 2)]
+        self.assertEqual(xhs_help.b64Encode(data), legacy_b64_encode(data))
+
+    def test_sign(self):
+        for _ in range(200):
+            a1, b1, x_s = self.random_text(60), self.random_text(120, latin1=True), self.random_text(100, latin1=True)
+            x_t = str(self.random.randrange(10 ** 13))
+            x_s = x_s.ljust(57, "=")
+            common = json.loads(bytes(legacy_b64_decode(xhs_help.sign(a1, b1, x_s, x_t)["x-s-common"])))
+            self.assertEqual(common["x5"], a1)
+            self.assertEqual(common["x9"], legacy_mrc(x_t + x_s + b1))
+            expected = legacy_b64_encode(legacy_encode_utf8(json.dumps(common, separators=(',', ':'))))
+            self.assertEqual(xhs_help.sign(a1, b1, x_s, x_t)["x-s-common"], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
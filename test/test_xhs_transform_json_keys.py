@@ -0,0 +1,106 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : xhs 网页 __INITIAL_STATE__ key 转换和原 json.dumps/json.loads 逐层递归实现的输出一致性测试
+import json
+import os
+import random
+import re
+import unittest
+
+from media_platform.xhs.help import camel_to_underscore, transform_json_keys
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def legacy_transform_json_keys(json_data):
+    """原 get_note_by_id_from_html 里的实现，作为一致性对比的参照"""
+
+    def camel_to_underscore(key):
+        return re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower()
+
+    data_dict = json.loads(json_data)
+    dict_new = {}
+    for key, value in data_dict.items():
+        new_key = camel_to_underscore(key)
+        if not value:
+            dict_new[new_key] = value
+        elif isinstance(value, dict):
+            dict_new[new_key] = legacy_transform_json_keys(json.dumps(value))
+        elif isinstance(value, list):
+            dict_new[new_key] = [
+                (
+                    legacy_transform_json_keys(json.dumps(item))
+                    if (item and isinstance(item, dict))
+                    else item
+                )
+                for item in value
+            ]
+        else:
+            dict_new[new_key] = value
+    return dict_new
+
+
+def load_note_page_state() -> str:
+    with open(os.path.join(FIXTURES_DIR, "xhs_note_detail.html"), "r", encoding="utf-8") as f:
+        html = f.read()
+    return re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[0].replace("undefined", '""')
+
+
+class TestTransformJsonKeys(unittest.TestCase):
+
+    def setUp(self):
+        self.random = random.Random(41)
+
+    def random_key(self) -> str:
+        return "".join(self.random.choice("aZbYcX_1") for _ in range(self.random.randint(1, 8)))
+
+    def random_value(self, depth: int):
+        kind = self.random.randrange(8 if depth < 4 else 4)
+        if kind == 0:
+            return self.random.choice([0, 1, -2.5, 10 ** 20])
+        if kind == 1:
+            return self.random.choice(["", "camelCase", "小红书"])
+        if kind == 2:
+            return self.random.choice([None, True, False])
+        if kind == 3:
+            return self.random.choice([{}, []])
+        if kind in (4, 5):
+            return {self.random_key(): self.random_value(depth + 1) for _ in range(self.random.randint(1, 5))}
+        # 列表里嵌套列表的字典原实现不转换，这里需要覆盖到
+        return [self.random_value(depth + 1) for _ in range(self.random.randint(1, 4))]
+
+    def test_camel_to_underscore(self):
+        self.assertEqual(camel_to_underscore("noteDetailMap"), "note_detail_map")
+        self.assertEqual(camel_to_underscore("URLDefault"), "u_r_l_default")
+        self.assertEqual(camel_to_underscore("note_id"), "note_id")
+
+    def test_note_page_state(self):
+        state = load_note_page_state()
+        self.assertEqual(transform_json_keys(json.loads(state)), legacy_transform_json_keys(state))
+
+    def test_random_structures(self):
+        for _ in range(500):
+            data = {self.random_key(): self.random_value(0) for _ in range(self.random.randint(1, 6))}
+            # 转换后重名的 key，例如 aZ 和 a_z
+            data["aZ"], data["a_z"] = self.random_value(2), self.random_value(2)
+            state = json.dumps(data)
+            self.assertEqual(transform_json_keys(json.loads(state)), legacy_transform_json_keys(state), state)
+
+    def test_nested_list_is_untouched(self):
+        state = '{"imageList": [[{"urlDefault": 1}], {"urlDefault": 2}]}'
+        self.assertEqual(transform_json_keys(json.loads(state)),
+                         {"image_list": [[{"urlDefault": 1}], {"url_default": 2}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 断点续爬，记录每个关键词/创作者/日期的爬取进度以及未完成的任务
+
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import config
+from tools import utils
+
+
+class CrawlerCheckpoint:
+    """
+    爬取进度检查点，进度以 json 文件的形式保存在 CHECKPOINT_SAVE_DIR 目录下，每个平台+爬取类型一个文件
+    文件内容形如：
+    {
+        "keyword:南开大学": {"page": 3, "search_id": "2e8...", "pending": [...], "finished": false},
+        "creator:63e36c9a000000002703502b": {"cursor": "64f1...", "finished": true}
+    }
+    每次在阶段边界（一页数据入库、评论爬取完成）调用 save 时，先写临时文件再 os.replace 原子替换，
+    进程在任意时刻崩溃都不会留下写了一半的进度文件
+    """
+
+    def __init__(self, platform: str, crawler_type: str, resume: Optional[bool] = None,
+                 save_dir: Optional[str] = None):
+        """
+        Args:
+            platform: 平台名称
+            crawler_type: 爬取类型 search | detail | creator
+            resume: 是否加载上一次的进度，默认取 config.ENABLE_RESUME
+            save_dir: 进度文件保存目录，默认取 config.CHECKPOINT_SAVE_DIR
+        """
+        self._save_dir = save_dir or config.CHECKPOINT_SAVE_DIR
+        self._file_path = os.path.join(self._save_dir, f"{platform}_{crawler_type}.json")
+        self._state: Dict[str, Dict[str, Any]] = {}
+        if config.ENABLE_RESUME if resume is None else resume:
+            self._load()
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    def _load(self) -> None:
+        """
+        加载上一次运行保存的进度
+        Returns:
+
+        """
+        if not os.path.exists(self._file_path):
+            utils.logger.info(f"[CrawlerCheckpoint._load] checkpoint file {self._file_path} not found, start from scratch")
+            return
+        try:
+            with open(self._file_path, "r", encoding="utf-8") as f:
+                self._state = json.load(f)
+            utils.logger.info(f"[CrawlerCheckpoint._load] resume from checkpoint file {self._file_path}, "
+                              f"{len(self._state)} entries loaded")
+        except (OSError, ValueError) as e:
+            utils.logger.error(f"[CrawlerCheckpoint._load] load checkpoint file {self._file_path} err: {e}")
+            self._state = {}
+
+    def _flush(self) -> None:
+        """
+        原子写入进度文件：写临时文件 -> fsync -> os.replace
+        Returns:
+
+        """
+        os.makedirs(self._save_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".checkpoint_", suffix=".tmp", dir=self._save_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._state, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, key: str) -> Dict[str, Any]:
+        """
+        获取某个任务的进度，没有进度时返回空字典
+        Args:
+            key: 任务key，例如 keyword:xxx、creator:xxx
+
+        Returns:
+
+        """
+        return dict(self._state.get(key, {}))
+
+    def is_finished(self, key: str) -> bool:
+        return bool(self._state.get(key, {}).get("finished"))
+
+    def get_pending(self, key: str) -> List[Any]:
+        """
+        获取某个任务已经入库但还未完成后续步骤（例如评论）的数据
+        Args:
+            key:
+
+        Returns:
+
+        """
+        return list(self._state.get(key, {}).get("pending", []))
+
+    def save(self, key: str, **fields: Any) -> None:
+        """
+        更新某个任务的进度并落盘
+        Args:
+            key: 任务key
+            **fields: 需要更新的进度字段，例如 page、cursor、pending
+
+        Returns:
+
+        """
+        self._state.setdefault(key, {}).update(fields)
+        self._flush()
+
+    def finish(self, key: str) -> None:
+        """
+        标记某个任务已经完成
+        Args:
+            key:
+
+        Returns:
+
+        """
+        self._state[key] = {"finished": True}
+        self._flush()
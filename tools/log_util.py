@@ -0,0 +1,252 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 日志相关的工具函数：延迟格式化的数据摘要、结构化事件、按事件采样、队列异步写日志
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import reprlib
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+import config
+
+LOGGER_NAME = "MediaCrawler"
+LOG_FORMAT = "%(asctime)s %(name)s %(levelname)s (%(filename)s:%(lineno)d) - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 关闭数据日志时，摘要里保留的字符数
+PAYLOAD_PREVIEW_LENGTH = 128
+
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class PayloadPreviewRepr(reprlib.Repr):
+    """
+    有长度限制的 repr，只格式化大对象开头的几层、几项，耗时和对象大小无关
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.maxlevel = 3
+        self.maxdict = self.maxlist = self.maxtuple = self.maxset = self.maxfrozenset = 8
+        self.maxstring = self.maxother = PAYLOAD_PREVIEW_LENGTH
+
+    def repr_dict(self, x: dict, level: int) -> str:
+        # reprlib 默认会先对全部 key 排序，这里按插入顺序只取前几项
+        if not x:
+            return "{}"
+        if level <= 0:
+            return "{...}"
+        pieces = [f"{self.repr1(key, level - 1)}: {self.repr1(value, level - 1)}"
+                  for key, value in islice(x.items(), self.maxdict)]
+        if len(x) > self.maxdict:
+            pieces.append("...")
+        return "{" + ", ".join(pieces) + "}"
+
+    # reprlib 对 bytes 没有限制，会格式化整个响应体
+    repr_bytes = reprlib.Repr.repr_str
+
+
+_payload_preview_repr = PayloadPreviewRepr()
+
+
+class LogPayload:
+    """
+    日志里的接口响应、存储数据等大对象，只在日志真正输出时才格式化，
+    关闭 ENABLE_LOG_PAYLOAD 时只输出类型、长度和开头的一小段内容
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data: Any):
+        self.data = data
+
+    def __str__(self) -> str:
+        if config.ENABLE_LOG_PAYLOAD:
+            return str(self.data)
+        text = _payload_preview_repr.repr(self.data)
+        # 内容被省略过的摘要(含 ...)也加上类型和长度
+        if len(text) <= PAYLOAD_PREVIEW_LENGTH and "..." not in text:
+            return text
+        size = f" len={len(self.data)}" if hasattr(self.data, "__len__") else ""
+        return f"<{type(self.data).__name__}{size}> {text[:PAYLOAD_PREVIEW_LENGTH]}..."
+
+    __repr__ = __str__
+
+
+def log_payload(data: Any) -> LogPayload:
+    """
+    包装日志里的大对象，配合 %s 占位符使用：logger.info("res: %s", log_payload(res))
+    Args:
+        data: 接口响应、存储数据等
+
+    Returns:
+
+    """
+    return LogPayload(data)
+
+
+class EventMessage:
+    """
+    结构化事件的日志内容，格式为 [事件名] key=value key=value，同样在输出时才格式化
+    """
+    __slots__ = ("event", "fields")
+
+    def __init__(self, event: str, fields: Dict[str, Any]):
+        self.event = event
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return f"[{self.event}] " + " ".join(f"{key}={value}" for key, value in self.fields.items())
+
+
+class EventSampler:
+    """
+    按事件名采样，采样比例来自 config.LOG_SAMPLE_RATES，没有配置的事件全部输出
+    采样是确定性的：比例为 0.01 时第 1、101、201... 条输出
+    """
+
+    def __init__(self):
+        self.credits: Dict[str, float] = {}
+
+    def should_log(self, event: str) -> bool:
+        rate = config.LOG_SAMPLE_RATES.get(event)
+        if rate is None or rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        credit = self.credits.get(event, 1.0)
+        if credit >= 1:
+            self.credits[event] = credit - 1 + rate
+            return True
+        self.credits[event] = credit + rate
+        return False
+
+
+event_sampler = EventSampler()
+
+
+def log_event(event: str, level: int = logging.INFO, **fields):
+    """
+    输出一条结构化事件日志，级别未开启或者被采样跳过时不做任何格式化
+    字段同时放在 LogRecord 的 event / event_fields 属性上，JSON 格式的日志可以直接输出成字段
+    Args:
+        event: 事件名，沿用日志前缀的写法，例如 store.xhs.update_xhs_note_comment
+        level: 日志级别
+        **fields: 事件字段，大对象用 log_payload 包装
+
+    Returns:
+
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    if not logger.isEnabledFor(level) or not event_sampler.should_log(event):
+        return
+    logger.log(level, EventMessage(event, fields), extra={"event": event, "event_fields": fields}, stacklevel=2)
+
+
+class JsonLogFormatter(logging.Formatter):
+    """
+    每条日志输出一行 JSON，结构化事件的字段展开到顶层
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record, LOG_DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.filename}:{record.lineno}",
+        }
+        event = getattr(record, "event", None)
+        if event:
+            data["event"] = event
+            data.update((key, value if isinstance(value, (int, float, bool)) or value is None else str(value))
+                        for key, value in record.event_fields.items())
+        else:
+            data["message"] = record.getMessage()
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class EventQueueHandler(logging.handlers.QueueHandler):
+    """
+    在调用方线程只把日志内容格式化成字符串，时间格式化和写控制台/文件都在后台线程完成
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        event_fields = getattr(record, "event_fields", None)
+        if event_fields:
+            # 事件字段里可能有 log_payload 包装的大对象，在这里转成字符串，后台线程不再访问原始数据
+            record.event_fields = {key: value if isinstance(value, (int, float, bool)) or value is None
+                                   else str(value) for key, value in event_fields.items()}
+        return record
+
+
+def create_log_handlers(log_format: str = "text", log_file: str = "") -> List[logging.Handler]:
+    """
+    创建实际写日志的 handler，控制台总是输出，配置了日志文件时同时写文件
+    Args:
+        log_format: text 或者 json
+        log_file: 日志文件路径
+
+    Returns:
+
+    """
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    formatter = JsonLogFormatter() if log_format == "json" else logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def setup_queue_logging(logger: logging.Logger, handlers: List[logging.Handler]) -> logging.handlers.QueueListener:
+    """
+    logger 只挂一个写队列的 handler，由后台线程的 QueueListener 把日志交给实际的 handler，
+    事件循环里打日志不会因为写控制台或者磁盘阻塞
+    Args:
+        logger: 日志对象
+        handlers: 实际写日志的 handler
+
+    Returns:
+
+    """
+    global _queue_listener
+    stop_queue_logging()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(EventQueueHandler(log_queue))
+    logger.propagate = False
+    _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+    return _queue_listener
+
+
+def stop_queue_logging():
+    """
+    停止后台写日志的线程，队列里剩余的日志会先写完
+    """
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
+
+
+atexit.register(stop_queue_logging)
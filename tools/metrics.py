@@ -0,0 +1,356 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 运行指标：计数器、仪表、直方图，输出 Prometheus 文本格式和运行结束时的汇总
+#            client 的 request、存储和媒体下载都会记录指标，开启 ENABLE_METRICS_SERVER 后可以通过
+#            http://127.0.0.1:{METRICS_SERVER_PORT}/metrics 抓取，常驻服务模式下 daemon.py 也提供 /metrics
+
+import bisect
+import functools
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import config
+
+# 请求耗时直方图的分桶上限，单位秒
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str], extra: str = "") -> str:
+    labels = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    指标基类，按标签值的元组保存每个序列的值，标签值按 label_names 的顺序传入
+    """
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.values: Dict[Tuple[str, ...], object] = {}
+
+    def clear(self):
+        self.values.clear()
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """
+        返回 (指标名后缀, 标签字符串, 值)
+        """
+        for label_values, value in list(self.values.items()):
+            yield "", _format_labels(self.label_names, label_values), value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_format_value(value)}" for suffix, labels, value in self.samples())
+        return lines
+
+
+class Counter(Metric):
+    """
+    只增不减的计数
+    """
+    metric_type = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def get(self, *label_values: str) -> float:
+        return self.values.get(label_values, 0)
+
+
+class Gauge(Counter):
+    """
+    可增可减的当前值，例如正在进行中的请求数
+    """
+    metric_type = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1):
+        self.values[label_values] = self.values.get(label_values, 0) - amount
+
+    def set(self, value: float, *label_values: str):
+        self.values[label_values] = value
+
+
+class Histogram(Metric):
+    """
+    分桶统计，每个序列保存 [各分桶的计数, 总和, 总次数]，输出时再累加成 Prometheus 的累计分桶
+    """
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str):
+        series = self.values.get(label_values)
+        if series is None:
+            series = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def quantile(self, q: float, *label_values: str) -> Optional[float]:
+        """
+        按分桶估算分位数，返回分位数所在分桶的上限，落在最后一个分桶时返回 inf
+        """
+        series = self.values.get(label_values)
+        if not series or not series[2]:
+            return None
+        rank, cumulative = q * series[2], 0
+        for upper, count in zip(self.buckets + (float("inf"),), series[0]):
+            cumulative += count
+            if cumulative >= rank:
+                return upper
+        return float("inf")
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for label_values, (bucket_counts, total, count) in list(self.values.items()):
+            cumulative = 0
+            for upper, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                yield "_bucket", _format_labels(self.label_names, label_values, f'le="{_format_value(upper)}"'), \
+                    cumulative
+            labels = _format_labels(self.label_names, label_values)
+            yield "_sum", labels, total
+            yield "_count", labels, count
+
+
+class MetricsRegistry:
+    """
+    指标注册表，同名指标只注册一次
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def clear(self):
+        for metric in self.metrics.values():
+            metric.clear()
+
+    def render(self) -> str:
+        """
+        输出 Prometheus 文本格式
+        """
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+requests_total = REGISTRY.counter(
+    "crawler_requests_total", "Platform API requests by endpoint and status (ok or exception class)",
+    ("platform", "endpoint", "status"))
+request_duration_seconds = REGISTRY.histogram(
+    "crawler_request_duration_seconds", "Platform API request latency in seconds", ("platform", "endpoint"))
+requests_in_flight = REGISTRY.gauge(
+    "crawler_requests_in_flight", "Platform API requests in progress", ("platform",))
+items_stored_total = REGISTRY.counter(
+    "crawler_items_stored_total", "Items passed to the store backend", ("platform", "store_type", "save_option"))
+media_downloads_total = REGISTRY.counter(
+    "crawler_media_downloads_total", "Media downloads by kind and status", ("platform", "kind", "status"))
+media_download_bytes_total = REGISTRY.counter(
+    "crawler_media_download_bytes_total", "Downloaded media size in bytes", ("platform", "kind"))
+
+# 路径里的 ID 段(纯数字、长的十六进制/字母数字串)统一替换，避免 endpoint 标签无限增长
+ID_SEGMENT_PATTERN = re.compile(r"^(\d+|[0-9a-fA-F]{16,}|[0-9A-Za-z_-]{20,})$")
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_path(path: str) -> str:
+    return "/".join(":id" if ID_SEGMENT_PATTERN.match(segment) else segment for segment in path.split("/"))
+
+
+def normalize_endpoint(url: str) -> str:
+    """
+    请求 URL 转成 endpoint 标签：只保留路径，路径里的 ID 替换为 :id
+    Args:
+        url: 请求的URL
+
+    Returns:
+
+    """
+    return _normalize_path(urlparse(url).path or "/")
+
+
+def record_request(func):
+    """
+    client 请求方法的装饰器，记录每次实际发出的请求的次数、耗时和结果，
+    放在 cache_response、retry、rotate_proxy 的最里层，重试的每一次都会单独记录，缓存命中不记录
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, method, url, *args, **kwargs):
+        platform = config.PLATFORM
+        endpoint = normalize_endpoint(url)
+        requests_in_flight.inc(platform)
+        start = time.perf_counter()
+        request_status = "ok"
+        try:
+            return await func(self, method, url, *args, **kwargs)
+        except Exception as e:
+            request_status = type(e).__name__
+            raise
+        finally:
+            requests_in_flight.dec(platform)
+            request_duration_seconds.observe(time.perf_counter() - start, platform, endpoint)
+            requests_total.inc(platform, endpoint, request_status)
+
+    return wrapper
+
+
+def record_media_download(kind: str):
+    """
+    媒体下载方法的装饰器，下载方法返回 None 记为 failed，抛出异常记为异常类名
+    Args:
+        kind: 媒体类型，image | video | media
+
+    Returns:
+
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            platform = config.PLATFORM
+            try:
+                content = await func(*args, **kwargs)
+            except Exception as e:
+                media_downloads_total.inc(platform, kind, type(e).__name__)
+                raise
+            if content is None:
+                media_downloads_total.inc(platform, kind, "failed")
+            else:
+                media_downloads_total.inc(platform, kind, "ok")
+                media_download_bytes_total.inc(platform, kind, amount=len(content))
+            return content
+
+        return wrapper
+
+    return decorator
+
+
+def record_store(store_type: str):
+    """
+    存储方法的装饰器，记录交给存储后端的数据条数
+    Args:
+        store_type: contents | comments | creators
+
+    Returns:
+
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            result = await func(*args, **kwargs)
+            items_stored_total.inc(config.PLATFORM, store_type, config.SAVE_DATA_OPTION)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def format_summary(registry: MetricsRegistry = REGISTRY) -> List[str]:
+    """
+    运行结束时输出的指标汇总，每行一个 endpoint / 存储类型 / 媒体类型
+    """
+    lines: List[str] = []
+    endpoints: Dict[Tuple[str, str], Dict[str, float]] = {}
+    for (platform, endpoint, request_status), count in sorted(requests_total.values.items()):
+        endpoints.setdefault((platform, endpoint), {})[request_status] = count
+    for (platform, endpoint), status_counts in endpoints.items():
+        _, total, count = request_duration_seconds.values.get((platform, endpoint), ([], 0.0, 0))
+        p95 = request_duration_seconds.quantile(0.95, platform, endpoint)
+        status_text = " ".join(f"{key}={int(value)}" for key, value in status_counts.items())
+        lines.append(f"[metrics] requests platform={platform} endpoint={endpoint} total={int(count)} {status_text} "
+                     f"avg={total / count if count else 0:.3f}s p95<={_format_value(p95) if p95 else 0}s")
+    for (platform, store_type, save_option), count in sorted(items_stored_total.values.items()):
+        lines.append(f"[metrics] stored platform={platform} type={store_type} save_option={save_option} "
+                     f"count={int(count)}")
+    for (platform, kind, download_status), count in sorted(media_downloads_total.values.items()):
+        line = f"[metrics] media platform={platform} kind={kind} status={download_status} count={int(count)}"
+        if download_status == "ok":
+            line += f" bytes={int(media_download_bytes_total.get(platform, kind))}"
+        lines.append(line)
+    return lines
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    在后台线程启动 /metrics 接口
+    Args:
+        port: 监听端口，0 表示随机端口
+        host: 监听地址
+
+    Returns:
+
+    """
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
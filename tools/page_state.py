@@ -0,0 +1,161 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 从网页 HTML 里提取内嵌的页面状态 JSON
+#            xhs 的 window.__INITIAL_STATE__、微博的 var $render_data、知乎的 <script id="js-initialData">
+#            只做有界的字符串查找定位 script 内容，不构建 DOM，也不对整页跑正则
+import json
+import re
+from typing import Any, Optional
+
+SCRIPT_END_TAG = "</script>"
+
+JS_UNDEFINED = "undefined"
+# 对象/数组结尾多余的逗号
+TRAILING_COMMA_PATTERN = re.compile(r",\s*[}\]]")
+# 连续的反斜杠加引号，反斜杠个数为奇数时引号是转义的
+ESCAPED_QUOTE_PATTERN = re.compile(r'\\+"')
+
+_json_decoder = json.JSONDecoder(strict=False)
+
+
+def find_script_text(html: str, marker: str) -> Optional[str]:
+    """
+    找到 marker 之后到所在 script 结束标签之前的文本
+    Args:
+        html: 网页内容
+        marker: 例如 window.__INITIAL_STATE__=
+
+    Returns: 没找到 marker 时返回 None
+
+    """
+    start = html.find(marker)
+    if start == -1:
+        return None
+    start += len(marker)
+    end = html.find(SCRIPT_END_TAG, start)
+    return html[start:end if end != -1 else len(html)]
+
+
+def find_script_text_by_id(html: str, script_id: str) -> Optional[str]:
+    """
+    找到 <script id="script_id"> 标签的内容
+    Args:
+        html: 网页内容
+        script_id: script 标签的 id
+
+    Returns: 没找到时返回 None
+
+    """
+    for id_attr in (f'id="{script_id}"', f"id='{script_id}'"):
+        attr_start = html.find(id_attr)
+        if attr_start == -1:
+            continue
+        tag_end = html.find(">", attr_start + len(id_attr))
+        if tag_end == -1:
+            return None
+        end = html.find(SCRIPT_END_TAG, tag_end)
+        return html[tag_end + 1:end if end != -1 else len(html)]
+    return None
+
+
+def _count_quotes(text: str, start: int, end: int, has_backslash: bool = True) -> int:
+    """
+    text[start:end] 里未转义的双引号个数
+    has_backslash 为 False 时 text 里没有反斜杠，不需要查找转义的引号
+    """
+    quotes = text.count('"', start, end)
+    if quotes and has_backslash and text.find('\\"', start, end) != -1:
+        quotes -= sum(1 for match in ESCAPED_QUOTE_PATTERN.finditer(text, start, end) if len(match.group(0)) % 2 == 0)
+    return quotes
+
+
+def _fix_js_literal(text: str, undefined: str) -> str:
+    """
+    把字符串外面的 undefined 替换为 undefined 参数的值，去掉对象/数组结尾多余的逗号，字符串里的内容原样保留
+    候选位置用 str.find 和正则在 C 层面找出来（通常只有几十处），是否在字符串里通过前面未转义引号个数的奇偶判断，
+    不需要逐个字符或逐个字符串在 Python 里扫描
+    """
+    candidates = [(match.start(), match.start() + 1, "") for match in TRAILING_COMMA_PATTERN.finditer(text)]
+    position = text.find(JS_UNDEFINED)
+    while position != -1:
+        candidates.append((position, position + len(JS_UNDEFINED), undefined))
+        position = text.find(JS_UNDEFINED, position + len(JS_UNDEFINED))
+    candidates.sort()
+
+    # 单个字符的查找很快，没有反斜杠时(常见情况)省去每一段里查找转义引号
+    has_backslash = "\\" in text
+    parts = []
+    last = 0
+    in_string = False
+    for start, end, replacement in candidates:
+        if _count_quotes(text, last, start, has_backslash) % 2:
+            in_string = not in_string
+        parts.append(text[last:start])
+        parts.append(text[start:end] if in_string else replacement)
+        last = end
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+def parse_js_literal(text: str, undefined: str = "null") -> Any:
+    """
+    解析 JS 对象字面量形式的 JSON，支持 undefined 和结尾多余的逗号，忽略 JSON 值后面的内容（例如 [0] || {};）
+    Args:
+        text: 以 JSON 值开头的文本，前面可以有空白
+        undefined: undefined 替换成的 JSON 值，默认 null
+
+    Returns:
+
+    """
+    text = text.lstrip()
+    # 小红书的页面状态总是含有 undefined，严格解析一定会失败，直接修正后只解析一次；
+    # 结尾逗号很少见，用正则查找它的成本比严格解析失败后再修正还高，只在解析失败时处理
+    if JS_UNDEFINED in text:
+        return _json_decoder.raw_decode(_fix_js_literal(text, undefined))[0]
+    try:
+        return _json_decoder.raw_decode(text)[0]
+    except json.JSONDecodeError:
+        return _json_decoder.raw_decode(_fix_js_literal(text, undefined))[0]
+
+
+def extract_page_state(html: str, marker: str, undefined: str = "null") -> Optional[Any]:
+    """
+    提取 marker 后面赋值的页面状态，例如 window.__INITIAL_STATE__={...}</script>
+    Args:
+        html: 网页内容
+        marker: 赋值语句的左边部分
+        undefined: undefined 替换成的 JSON 值
+
+    Returns: 没找到 marker 时返回 None
+
+    """
+    script_text = find_script_text(html, marker)
+    if script_text is None:
+        return None
+    return parse_js_literal(script_text, undefined)
+
+
+def extract_script_json_by_id(html: str, script_id: str) -> Optional[Any]:
+    """
+    提取 <script id="script_id"> 里的 JSON，例如知乎的 js-initialData
+    Args:
+        html: 网页内容
+        script_id: script 标签的 id
+
+    Returns: 没找到或者内容为空时返回 None
+
+    """
+    script_text = find_script_text_by_id(html, script_id)
+    if not script_text or not script_text.strip():
+        return None
+    return parse_js_literal(script_text)
@@ -0,0 +1,257 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 面向 asyncio 的采样分析器，--profile 开启
+#            后台线程定时采样事件循环线程的调用栈(CPU)和每个 asyncio 任务的 await 链(墙钟)，
+#            按调用栈里的函数归类到 sign / request / parse / store / media 等阶段，
+#            输出火焰图用的折叠栈文件(flamegraph.pl、speedscope 都可以直接打开)和耗时排行汇总。
+#            不开启时不会导入和启动任何东西，对正常爬取没有开销
+
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IDLE_STAGE = "idle"
+OTHER_STAGE = "other"
+
+# (阶段, 文件路径正则, 函数名正则)，调用栈里命中多个阶段时按这里的顺序取第一个，
+# 例如媒体下载里的 httpx 调用算 media，存储里的 json.dumps 算 store，
+# 词云都是从 store 的 save_data_to_json 里生成的，所以 wordcloud 要排在 store 前面
+STAGE_RULES: List[Tuple[str, str, str]] = [
+    ("media", r"", r"^(get_note_media|get_video_media|get_note_image|get_notice_media|get_note_images|"
+                   r"get_bilibili_video|store_image|store_video|save_image|save_video)$"),
+    ("wordcloud", r"(^|/)(tools/words\.py|jieba|wordcloud|matplotlib)", r""),
+    ("store", r"(^|/)(store|async_db\.py|db\.py|aiofiles|aiomysql)", r""),
+    ("sign", r"", r"(^|_|\.)(sign|_pre_headers|pre_request_data|get_a_bogus|get_wbi_keys|sign_with_playwright)"),
+    ("parse", r"(^|/)(parsel|lxml|tools/page_state\.py|media_platform/\w+/help\.py)", r""),
+    ("request", r"(^|/)(httpx|httpcore|h11|h2|anyio|ssl\.py)", r""),
+    ("request", r"(^|/)media_platform/\w+/client\.py", r"^(request|get|post)$"),
+    ("sleep", r"(^|/)asyncio/tasks\.py", r"^sleep$"),
+]
+_COMPILED_STAGE_RULES = [(stage, re.compile(path), re.compile(func)) for stage, path, func in STAGE_RULES]
+
+# 事件循环空闲等待 IO 时事件循环线程停留的函数
+IDLE_FUNCTIONS = {"select", "poll", "epoll", "_poll", "_run_once"}
+
+
+def frame_label(filename: str, function_name: str) -> str:
+    """
+    栈帧的显示名：项目内的文件用相对路径，第三方库只保留库名之后的路径
+    """
+    if filename.startswith(PROJECT_ROOT):
+        path = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        parts = filename.replace("\\", "/").split("/")
+        path = "/".join(parts[-2:])
+    return f"{path.replace(os.sep, '/')}:{function_name}"
+
+
+def classify_stack(stack: Tuple[str, ...]) -> str:
+    """
+    按 STAGE_RULES 的优先级把一个调用栈归到某个阶段
+    Args:
+        stack: 从外到内的栈帧显示名
+
+    Returns:
+
+    """
+    best_index, best_stage = len(_COMPILED_STAGE_RULES), OTHER_STAGE
+    for label in stack:
+        path, _, function_name = label.rpartition(":")
+        function_name = function_name.rpartition(".")[2]
+        for index, (stage, path_pattern, function_pattern) in enumerate(_COMPILED_STAGE_RULES[:best_index]):
+            if (not path_pattern.pattern or path_pattern.search(path)) and \
+                    (not function_pattern.pattern or function_pattern.search(function_name)):
+                best_index, best_stage = index, stage
+                break
+    return best_stage
+
+
+def _code_name(code) -> str:
+    return getattr(code, "co_qualname", code.co_name)
+
+
+def thread_stack(frame: Optional[FrameType]) -> Tuple[str, ...]:
+    """
+    线程当前的调用栈，从外到内
+    """
+    stack = []
+    while frame is not None:
+        stack.append(frame_label(frame.f_code.co_filename, _code_name(frame.f_code)))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def task_stack(task: asyncio.Task) -> Tuple[str, ...]:
+    """
+    asyncio 任务的 await 链，从任务的协程开始，沿着 cr_await 一直到正在等待的最内层协程
+    """
+    stack = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None) or \
+            getattr(awaitable, "ag_frame", None)
+        if frame is None:
+            break
+        stack.append(frame_label(frame.f_code.co_filename, _code_name(frame.f_code)))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None) or \
+            getattr(awaitable, "ag_await", None)
+    return tuple(stack)
+
+
+class AsyncioProfiler:
+    """
+    在后台线程按固定间隔采样：
+    - 事件循环线程的调用栈，权重为两次采样之间该线程消耗的 CPU 时间，用来看 CPU 花在哪
+    - 每个未完成任务的 await 链，权重为采样间隔的墙钟时间，用来看任务都在等什么(网络、限速 sleep、存储)
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.cpu_stacks: Counter = Counter()
+        self.wall_stacks: Counter = Counter()
+        self.stage_cpu: Counter = Counter()
+        self.stage_wall: Counter = Counter()
+        self.samples = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._cpu_clock_id: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        开始采样，需要在事件循环所在的线程调用
+        """
+        self._loop = loop or asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        try:
+            self._cpu_clock_id = time.pthread_getcpuclockid(self._thread_id)
+        except (AttributeError, OSError):
+            # 不支持按线程读取 CPU 时间的平台上，事件循环线程非空闲的采样按墙钟时间计
+            self._cpu_clock_id = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="asyncio-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _thread_cpu_time(self) -> float:
+        if self._cpu_clock_id is None:
+            return 0.0
+        return time.clock_gettime(self._cpu_clock_id)
+
+    def _run(self):
+        last_wall, last_cpu = time.perf_counter(), self._thread_cpu_time()
+        while not self._stop_event.wait(self.interval):
+            now_wall, now_cpu = time.perf_counter(), self._thread_cpu_time()
+            self.sample(now_wall - last_wall, now_cpu - last_cpu)
+            last_wall, last_cpu = now_wall, now_cpu
+
+    def sample(self, wall_delta: float, cpu_delta: float):
+        """
+        记录一次采样
+        Args:
+            wall_delta: 距离上次采样的墙钟时间
+            cpu_delta: 距离上次采样事件循环线程消耗的 CPU 时间
+
+        Returns:
+
+        """
+        self.samples += 1
+        self.wall_time += wall_delta
+        stack = thread_stack(sys._current_frames().get(self._thread_id))
+        idle = not stack or stack[-1].rpartition(":")[2].rpartition(".")[2] in IDLE_FUNCTIONS
+        if self._cpu_clock_id is None:
+            cpu_delta = 0.0 if idle else wall_delta
+        self.cpu_time += cpu_delta
+        if cpu_delta > 0:
+            self.cpu_stacks[stack] += cpu_delta
+            self.stage_cpu[IDLE_STAGE if idle else classify_stack(stack)] += cpu_delta
+
+        try:
+            tasks = [task for task in asyncio.all_tasks(self._loop) if not task.done()]
+        except RuntimeError:
+            return
+        for task in tasks:
+            stack = task_stack(task)
+            if stack:
+                self.wall_stacks[stack] += wall_delta
+                self.stage_wall[classify_stack(stack)] += wall_delta
+
+    @staticmethod
+    def write_collapsed(stacks: Counter, file_path: str):
+        """
+        折叠栈格式，每行 "外层;...;内层 权重"，权重单位为微秒
+        """
+        with open(file_path, "w", encoding="utf-8") as f:
+            for stack, weight in stacks.most_common():
+                weight_us = int(weight * 1_000_000)
+                if weight_us > 0:
+                    f.write(f"{';'.join(label.replace(';', ',') for label in stack)} {weight_us}\n")
+
+    def save(self, save_dir: str, prefix: str) -> Tuple[str, str]:
+        """
+        保存 CPU 和墙钟两份折叠栈文件
+        Returns: (cpu 折叠栈文件路径, 墙钟折叠栈文件路径)
+
+        """
+        os.makedirs(save_dir, exist_ok=True)
+        cpu_file = os.path.join(save_dir, f"{prefix}.cpu.collapsed")
+        wall_file = os.path.join(save_dir, f"{prefix}.wall.collapsed")
+        self.write_collapsed(self.cpu_stacks, cpu_file)
+        self.write_collapsed(self.wall_stacks, wall_file)
+        return cpu_file, wall_file
+
+    def top_functions(self, top_n: int) -> List[Tuple[str, float, float]]:
+        """
+        按事件循环线程 CPU 时间排序的函数，返回 (函数, 自身耗时, 包含子调用的耗时)
+        """
+        self_time: Counter = Counter()
+        total_time: Counter = Counter()
+        for stack, weight in self.cpu_stacks.items():
+            if not stack:
+                continue
+            self_time[stack[-1]] += weight
+            for label in set(stack):
+                total_time[label] += weight
+        return [(label, weight, total_time[label]) for label, weight in self_time.most_common(top_n)]
+
+    def format_summary(self, top_n: int = 20) -> List[str]:
+        """
+        阶段耗时和耗时最多的函数
+        """
+        lines = [f"[profile] duration={self.wall_time:.2f}s loop_cpu={self.cpu_time:.2f}s samples={self.samples}"]
+        stages = sorted(set(self.stage_cpu) | set(self.stage_wall),
+                        key=lambda stage: (-self.stage_cpu[stage], -self.stage_wall[stage]))
+        for stage in stages:
+            cpu_percent = self.stage_cpu[stage] / self.cpu_time * 100 if self.cpu_time else 0
+            lines.append(f"[profile] stage={stage} cpu={self.stage_cpu[stage]:.3f}s ({cpu_percent:.1f}%) "
+                         f"task_wall={self.stage_wall[stage]:.3f}s")
+        for label, self_weight, total_weight in self.top_functions(top_n):
+            lines.append(f"[profile] self={self_weight:.3f}s total={total_weight:.3f}s {label}")
+        return lines
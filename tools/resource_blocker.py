@@ -0,0 +1,120 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 浏览器资源拦截，登录完成后页面只用于签名和刷新cookie，不需要加载图片、视频、字体和统计上报
+
+from collections import Counter
+from typing import Dict, Optional
+
+from playwright.async_api import BrowserContext, Page, Request, Response, Route
+
+import config
+
+from . import utils
+
+# 被拦截请求的平均大小估算值(字节)，被中断的请求拿不到真实大小，只能用于估算节省的流量
+ESTIMATED_RESOURCE_BYTES = {
+    "image": 40 * 1024,
+    "media": 512 * 1024,
+    "font": 64 * 1024,
+    "analytics": 4 * 1024,
+}
+
+# 每拦截多少个请求打印一次统计信息
+LOG_STATS_INTERVAL = 500
+
+
+class BrowserResourceBlocker:
+    def __init__(self):
+        self.blocked_counter: Counter = Counter()
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+
+    def get_block_category(self, request: Request) -> Optional[str]:
+        """
+        判断请求是否需要拦截
+        Args:
+            request: playwright 请求对象
+
+        Returns: 拦截类别(资源类型或analytics)，不拦截返回None
+
+        """
+        if request.resource_type in config.BLOCK_RESOURCE_TYPES:
+            return request.resource_type
+        if any(keyword in request.url for keyword in config.BLOCK_URL_KEYWORDS):
+            return "analytics"
+        return None
+
+    async def handle_route(self, route: Route) -> None:
+        category = self.get_block_category(route.request)
+        if not category:
+            await route.continue_()
+            return
+
+        await route.abort()
+        self.blocked_counter[category] += 1
+        if sum(self.blocked_counter.values()) % LOG_STATS_INTERVAL == 0:
+            self.log_stats()
+
+    def handle_response(self, response: Response) -> None:
+        self.allowed_requests += 1
+        self.allowed_bytes += int(response.headers.get("content-length", 0) or 0)
+
+    @property
+    def estimated_saved_bytes(self) -> int:
+        return sum(
+            count * ESTIMATED_RESOURCE_BYTES.get(category, 0)
+            for category, count in self.blocked_counter.items()
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "blocked_requests": dict(self.blocked_counter),
+            "estimated_saved_bytes": self.estimated_saved_bytes,
+            "allowed_requests": self.allowed_requests,
+            "allowed_bytes": self.allowed_bytes,
+        }
+
+    def log_stats(self) -> None:
+        utils.logger.info(
+            f"[BrowserResourceBlocker.log_stats] blocked: {dict(self.blocked_counter)}, "
+            f"estimated saved: {self.estimated_saved_bytes / 1024 / 1024:.2f} MB, "
+            f"allowed: {self.allowed_requests} requests {self.allowed_bytes / 1024 / 1024:.2f} MB"
+        )
+
+    async def attach(self, browser_context: BrowserContext) -> None:
+        await browser_context.route("**/*", self.handle_route)
+        browser_context.on("response", self.handle_response)
+
+
+async def block_browser_resources(
+    browser_context: BrowserContext,
+    context_page: Page,
+    pin_url: Optional[str] = None,
+) -> BrowserResourceBlocker:
+    """
+    拦截浏览器上下文中不需要的资源请求，登录完成后调用
+    Args:
+        browser_context: 浏览器上下文
+        context_page: 用于签名和刷新cookie的页面
+        pin_url: 同源的轻量地址，页面的 localStorage、cookie 仍然可用；
+                 只有当前平台在 RESOURCE_BLOCKING_PIN_PLATFORMS 中时才固定，否则页面保持不变
+
+    Returns:
+
+    """
+    blocker = BrowserResourceBlocker()
+    await blocker.attach(browser_context)
+    if pin_url and config.PLATFORM in config.RESOURCE_BLOCKING_PIN_PLATFORMS:
+        utils.logger.info(f"[block_browser_resources] Pin context page to {pin_url}")
+        await context_page.goto(pin_url, wait_until="domcontentloaded")
+    return blocker
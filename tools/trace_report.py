@@ -0,0 +1,147 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 链路追踪报告：按阶段统计耗时和等待时间的分位数，列出端到端最慢的内容
+#            等待时间是某阶段开始时距离该内容上一个阶段结束的时间，等待长说明内容排在别的内容后面(队头阻塞)
+#            用法: python -m tools.trace_report data/trace/xhs_2025-01-01.jsonl [--top 10]
+
+import argparse
+import json
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# 报告里阶段的展示顺序，其他阶段排在后面
+STAGE_ORDER = ("discovered", "detail", "store", "media", "comments")
+
+PERCENTILES = (50, 90, 99)
+
+
+class ItemTimeline:
+    """
+    一条内容的所有 span，按开始时间排序
+    """
+
+    def __init__(self, platform: str, content_id: str):
+        self.platform = platform
+        self.content_id = content_id
+        self.spans: List[Dict] = []
+
+    @property
+    def start_ns(self) -> int:
+        return self.spans[0]["start_time_unix_nano"]
+
+    @property
+    def end_ns(self) -> int:
+        return max(span["end_time_unix_nano"] for span in self.spans)
+
+    @property
+    def total_seconds(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def stage_timings(self) -> List[Tuple[str, float, float, float]]:
+        """
+        每个顶层 span 的 (阶段, 距离第一个 span 的偏移, 等待时间, 耗时)，单位秒，
+        嵌套在其他 span 里的 span(例如评论里的存储)不单独计算等待
+        """
+        timings = []
+        last_end_ns = self.start_ns
+        for span in self.spans:
+            if span.get("parent_span_id"):
+                continue
+            start_ns, end_ns = span["start_time_unix_nano"], span["end_time_unix_nano"]
+            timings.append((span["name"], (start_ns - self.start_ns) / 1e9,
+                            max(start_ns - last_end_ns, 0) / 1e9, (end_ns - start_ns) / 1e9))
+            last_end_ns = max(last_end_ns, end_ns)
+        return timings
+
+
+def load_spans(file_paths: Iterable[str]) -> List[Dict]:
+    spans = []
+    for file_path in file_paths:
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    spans.append(json.loads(line))
+    return spans
+
+
+def build_timelines(spans: Iterable[Dict]) -> List[ItemTimeline]:
+    timelines: Dict[Tuple[str, str], ItemTimeline] = {}
+    for span in spans:
+        attributes = span["attributes"]
+        key = (attributes["platform"], attributes["content_id"])
+        if key not in timelines:
+            timelines[key] = ItemTimeline(*key)
+        timelines[key].spans.append(span)
+    for timeline in timelines.values():
+        timeline.spans.sort(key=lambda span: (span["start_time_unix_nano"], span["end_time_unix_nano"]))
+    return list(timelines.values())
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    最近秩法的分位数
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def stage_stats(timelines: Iterable[ItemTimeline]) -> Dict[str, Dict[str, List[float]]]:
+    """
+    阶段 -> {"duration": 各内容的耗时, "wait": 各内容的等待时间}
+    """
+    stats: Dict[str, Dict[str, List[float]]] = {}
+    for timeline in timelines:
+        for stage, _, wait, duration in timeline.stage_timings():
+            stage_values = stats.setdefault(stage, {"duration": [], "wait": []})
+            stage_values["duration"].append(duration)
+            stage_values["wait"].append(wait)
+    return stats
+
+
+def _stage_sort_key(stage: str) -> Tuple[int, str]:
+    return (STAGE_ORDER.index(stage) if stage in STAGE_ORDER else len(STAGE_ORDER), stage)
+
+
+def format_report(timelines: List[ItemTimeline], top_n: int = 10) -> List[str]:
+    stats = stage_stats(timelines)
+    header = f"{'stage':<12}{'count':>8}" + "".join(f"{f'p{p}':>10}" for p in PERCENTILES) + \
+             f"{'max':>10}" + "".join(f"{f'wait_p{p}':>12}" for p in PERCENTILES)
+    lines = [f"items: {len(timelines)}  (durations and waits in seconds)", header]
+    for stage in sorted(stats, key=_stage_sort_key):
+        durations, waits = stats[stage]["duration"], stats[stage]["wait"]
+        lines.append(f"{stage:<12}{len(durations):>8}" +
+                     "".join(f"{percentile(durations, p):>10.3f}" for p in PERCENTILES) +
+                     f"{max(durations):>10.3f}" +
+                     "".join(f"{percentile(waits, p):>12.3f}" for p in PERCENTILES))
+    lines.append("")
+    lines.append(f"slowest {top_n} items (stage +offset wait/duration):")
+    for timeline in sorted(timelines, key=lambda item: item.total_seconds, reverse=True)[:top_n]:
+        stages = " ".join(f"{stage}+{offset:.2f}s({wait:.2f}/{duration:.2f})"
+                          for stage, offset, wait, duration in timeline.stage_timings())
+        lines.append(f"{timeline.platform}:{timeline.content_id} total={timeline.total_seconds:.2f}s {stages}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-item trace report of the crawl stages")
+    parser.add_argument("files", nargs="+", help="trace jsonl files written with ENABLE_TRACE")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest items to print")
+    args = parser.parse_args()
+    for line in format_report(build_timelines(load_spans(args.files)), args.top):
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
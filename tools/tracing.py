@@ -0,0 +1,188 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 按内容 id 记录的轻量链路追踪
+#            每条笔记/视频从搜索命中(discovered)、获取详情(detail)、存储(store)、下载媒体(media)到评论爬完(comments)
+#            各记录一个 span，以 JSONL 写入本地文件，字段沿用 OTLP 的命名(trace_id、span_id、start_time_unix_nano 等)，
+#            当前内容 id 和父 span 通过 var.py 里的 contextvars 传递。汇总报告见 tools/trace_report.py
+
+import atexit
+import contextlib
+import functools
+import hashlib
+import inspect
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, TextIO, Union
+
+import config
+from var import trace_content_id_var, trace_span_id_var
+
+from .time_util import get_current_date
+
+# 存储的内容里表示内容 id 的字段，各平台命名不同
+CONTENT_ID_KEYS = ("note_id", "aweme_id", "video_id", "content_id")
+
+_trace_files: Dict[str, TextIO] = {}
+
+
+def is_enabled() -> bool:
+    return config.ENABLE_TRACE
+
+
+def item_content_id(item: Any) -> str:
+    """
+    从内容(dict 或存储记录)里取内容 id
+    """
+    for key in CONTENT_ID_KEYS:
+        content_id = item.get(key)
+        if content_id:
+            return str(content_id)
+    return ""
+
+
+def trace_id_of(platform: str, content_id: str) -> str:
+    """
+    同一平台同一内容的 span 使用相同的 trace_id，重启后继续爬取的 span 也能关联上
+    """
+    return hashlib.md5(f"{platform}:{content_id}".encode("utf-8")).hexdigest()
+
+
+def get_trace_file_path(platform: str) -> str:
+    return os.path.join(config.TRACE_SAVE_DIR, f"{platform}_{get_current_date()}.jsonl")
+
+
+def write_span(span: Dict):
+    """
+    追加一条 span，文件按平台和日期区分，使用文件自身的缓冲，进程退出或调用 flush 时落盘
+    """
+    file_path = get_trace_file_path(span["attributes"]["platform"])
+    trace_file = _trace_files.get(file_path)
+    if trace_file is None:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        trace_file = _trace_files[file_path] = open(file_path, "a", encoding="utf-8")
+    trace_file.write(json.dumps(span, ensure_ascii=False) + "\n")
+
+
+def flush():
+    for trace_file in _trace_files.values():
+        trace_file.flush()
+
+
+def close():
+    for trace_file in _trace_files.values():
+        trace_file.close()
+    _trace_files.clear()
+
+
+atexit.register(close)
+
+
+def _build_span(name: str, content_id: str, span_id: str, parent_span_id: str, start_ns: int, end_ns: int,
+                error: Optional[BaseException], attributes: Dict) -> Dict:
+    platform = config.PLATFORM
+    return {
+        "trace_id": trace_id_of(platform, content_id),
+        "span_id": span_id,
+        "parent_span_id": parent_span_id,
+        "name": name,
+        "start_time_unix_nano": start_ns,
+        "end_time_unix_nano": end_ns,
+        "status": {"code": "ERROR", "message": repr(error)} if error else {"code": "OK"},
+        "attributes": {"platform": platform, "content_id": content_id, **attributes},
+    }
+
+
+def event(name: str, content_id: Any, **attributes):
+    """
+    记录一个时间点，例如搜索结果里出现了某条内容
+    """
+    if not config.ENABLE_TRACE or not content_id:
+        return
+    now_ns = time.time_ns()
+    write_span(_build_span(name, str(content_id), os.urandom(8).hex(), "", now_ns, now_ns, None, attributes))
+
+
+@contextlib.contextmanager
+def span(name: str, content_id: Any = None, **attributes) -> Iterator[None]:
+    """
+    记录一段耗时，内容 id 不传时沿用外层 span 的内容 id，外层也没有时不记录
+    Args:
+        name: 阶段名，detail | store | media | comments
+        content_id: 内容 id
+        **attributes: 额外写入 span 的属性
+
+    Returns:
+
+    """
+    content_id = str(content_id) if content_id else trace_content_id_var.get()
+    if not config.ENABLE_TRACE or not content_id:
+        yield
+        return
+    span_id = os.urandom(8).hex()
+    parent_span_id = trace_span_id_var.get() if content_id == trace_content_id_var.get() else ""
+    content_id_token = trace_content_id_var.set(content_id)
+    span_id_token = trace_span_id_var.set(span_id)
+    start_ns = time.time_ns()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        trace_span_id_var.reset(span_id_token)
+        trace_content_id_var.reset(content_id_token)
+        write_span(_build_span(name, content_id, span_id, parent_span_id, start_ns, time.time_ns(), error,
+                               attributes))
+
+
+def _resolve_content_id(path: str, signature: inspect.Signature, args, kwargs) -> Any:
+    arg_name, *keys = path.split(".")
+    value = signature.bind_partial(*args, **kwargs).arguments.get(arg_name)
+    for key in keys:
+        if value is None:
+            break
+        value = value.get(key) if isinstance(value, Mapping) else getattr(value, key, None)
+    return value
+
+
+def trace_stage(name: str, content_id: Union[str, Callable[..., Any]]):
+    """
+    把一个异步方法记录为某个阶段的 span
+    Args:
+        name: 阶段名
+        content_id: 取内容 id 的方式，字符串为参数名，可以用点号继续取字段，例如 "note_detail.note_id"；
+                    也可以传入函数，以被装饰方法的参数调用
+
+    Returns:
+
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not config.ENABLE_TRACE:
+                return await func(*args, **kwargs)
+            if callable(content_id):
+                item_id = content_id(*args, **kwargs)
+            else:
+                item_id = _resolve_content_id(content_id, signature, args, kwargs)
+            with span(name, item_id):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -12,20 +12,29 @@
 import argparse
 import logging
 
+import config
+
 from .crawler_util import *
+from .log_util import *
 from .slider_util import *
 from .time_util import *
 
 
 def init_loging_config():
-    level = logging.INFO
     logging.basicConfig(
-        level=level,
-        format="%(asctime)s %(name)s %(levelname)s (%(filename)s:%(lineno)d) - %(message)s",
-        datefmt='%Y-%m-%d %H:%M:%S'
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        datefmt=LOG_DATE_FORMAT
     )
-    _logger = logging.getLogger("MediaCrawler")
-    _logger.setLevel(level)
+    _logger = logging.getLogger(LOGGER_NAME)
+    _logger.setLevel(config.LOG_LEVEL.upper())
+    handlers = create_log_handlers(config.LOG_OUTPUT_FORMAT, config.LOG_FILE)
+    if config.ENABLE_ASYNC_LOG:
+        setup_queue_logging(_logger, handlers)
+    else:
+        for handler in handlers:
+            _logger.addHandler(handler)
+        _logger.propagate = False
     return _logger
 
 
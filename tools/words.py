@@ -13,6 +13,7 @@ import asyncio
 import json
 import logging
 from collections import Counter
+from typing import Optional
 
 import aiofiles
 import jieba
@@ -80,4 +81,19 @@ class AsyncWordCloudGenerator:
         plt.savefig(f"{save_words_prefix}_word_cloud.png", format='png', dpi=300)
         plt.close()
 
-        plot_lock.release()
\ No newline at end of file
+        plot_lock.release()
+
+
+_word_cloud_generator: Optional[AsyncWordCloudGenerator] = None
+
+
+def get_word_cloud_generator() -> AsyncWordCloudGenerator:
+    """
+    获取全局共享的词云生成器，首次调用时才加载停用词和自定义词组
+    Returns:
+
+    """
+    global _word_cloud_generator
+    if not _word_cloud_generator:
+        _word_cloud_generator = AsyncWordCloudGenerator()
+    return _word_cloud_generator
@@ -22,4 +22,8 @@ crawler_type_var: ContextVar[str] = ContextVar("crawler_type", default="")
 comment_tasks_var: ContextVar[List[Task]] = ContextVar("comment_tasks", default=[])
 media_crawler_db_var: ContextVar[AsyncMysqlDB] = ContextVar("media_crawler_db_var")
 db_conn_pool_var: ContextVar[aiomysql.Pool] = ContextVar("db_conn_pool_var")
-source_keyword_var: ContextVar[str] = ContextVar("source_keyword", default="")
\ No newline at end of file
+source_keyword_var: ContextVar[str] = ContextVar("source_keyword", default="")
+
+# 链路追踪：当前处理的内容 id 和当前 span id，评论回调、存储等嵌套调用据此关联到同一条内容
+trace_content_id_var: ContextVar[str] = ContextVar("trace_content_id", default="")
+trace_span_id_var: ContextVar[str] = ContextVar("trace_span_id", default="")
@@ -0,0 +1,111 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 工作队列的抽象接口
+#            工作进程租用(lease)工作单元后在可见性超时内执行完并确认(ack)，超时未确认的单元重新回到队列，
+#            执行失败(nack)的单元重新排队，超过最大尝试次数后放入死信队列；
+#            所有工作进程共用一个去重集合和按平台划分的请求速率预算
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from .work_unit import WorkUnit
+
+__all__ = ["Lease", "AbstractWorkQueue"]
+
+
+class Lease:
+    def __init__(self, unit: WorkUnit, token: str, attempts: int):
+        """
+        Args:
+            unit: 租用的工作单元
+            token: 本次租用的凭证，超时后单元被别的进程重新租用，旧凭证的 ack / nack 不再生效
+            attempts: 这是该单元第几次被租用
+        """
+        self.unit = unit
+        self.token = token
+        self.attempts = attempts
+
+
+class AbstractWorkQueue(ABC):
+
+    def __init__(self, max_attempts: int, queue_name: str):
+        """
+        Args:
+            max_attempts: 单个工作单元最多被租用的次数，超过后放入死信队列
+            queue_name: 队列名，不同的爬取批次可以使用不同的队列
+        """
+        self.max_attempts = max_attempts
+        self.queue_name = queue_name
+
+    @abstractmethod
+    async def enqueue(self, units: List[WorkUnit]) -> int:
+        """
+        把工作单元加入所属平台的队列，已经加入过的单元(按 unit_id 去重)会被跳过
+        Returns: 实际加入的数量
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def lease(self, platform: str, visibility_timeout: int) -> Optional[Lease]:
+        """
+        租用一个平台的工作单元，同时把已经超时的租用重新放回队列
+        Returns: 队列为空时返回 None
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def extend(self, lease: Lease, visibility_timeout: int) -> bool:
+        """
+        延长租用时间，执行时间较长的单元定时调用
+        Returns: 租用已经超时被别的进程拿走时返回 False
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def ack(self, lease: Lease) -> bool:
+        """
+        确认工作单元执行完成
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def nack(self, lease: Lease) -> bool:
+        """
+        工作单元执行失败，未超过最大尝试次数时重新排队，否则放入死信队列
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def reserve_rate(self, platform: str, interval: float) -> float:
+        """
+        在平台的全局速率预算里预定下一个请求的时间，所有工作进程的请求按 interval 均匀排开
+        Args:
+            platform: 平台
+            interval: 两个请求之间的最小间隔(秒)
+
+        Returns: 需要等待多久才能发出请求
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def stats(self, platform: str) -> Dict[str, int]:
+        """
+        平台队列的统计：排队中、租用中、已完成、死信的数量
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
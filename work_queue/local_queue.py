@@ -0,0 +1,118 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 进程内的工作队列，接口与 RedisWorkQueue 一致，用于测试和单机运行
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from .base_queue import AbstractWorkQueue, Lease
+from .work_unit import WorkUnit
+
+__all__ = ["LocalWorkQueue"]
+
+
+class LocalWorkQueue(AbstractWorkQueue):
+
+    def __init__(self, max_attempts: int, queue_name: str = ""):
+        super().__init__(max_attempts, queue_name)
+        self._pending: Dict[str, Deque[str]] = {}
+        # unit_id -> (租用凭证, 超时时间)
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._units: Dict[str, WorkUnit] = {}
+        self._attempts: Dict[str, int] = {}
+        self._seen: Set[str] = set()
+        self._done: Dict[str, int] = {}
+        self._dead: Dict[str, List[str]] = {}
+        # 平台 -> 下一个请求可以发出的时间
+        self._rate_tat: Dict[str, float] = {}
+
+    def _requeue_expired(self, platform: str, now: float):
+        for unit_id, (_, deadline) in list(self._leases.items()):
+            if deadline <= now and self._units[unit_id].platform == platform:
+                del self._leases[unit_id]
+                self._pending[platform].append(unit_id)
+
+    async def enqueue(self, units: List[WorkUnit]) -> int:
+        added = 0
+        for unit in units:
+            unit_id = unit.unit_id
+            if unit_id in self._seen:
+                continue
+            self._seen.add(unit_id)
+            self._units[unit_id] = unit
+            self._pending.setdefault(unit.platform, deque()).append(unit_id)
+            added += 1
+        return added
+
+    async def lease(self, platform: str, visibility_timeout: int) -> Optional[Lease]:
+        now = time.time()
+        pending = self._pending.setdefault(platform, deque())
+        self._requeue_expired(platform, now)
+        while pending:
+            unit_id = pending.popleft()
+            attempts = self._attempts[unit_id] = self._attempts.get(unit_id, 0) + 1
+            if attempts > self.max_attempts:
+                self._attempts.pop(unit_id)
+                self._dead.setdefault(platform, []).append(unit_id)
+                continue
+            token = uuid.uuid4().hex
+            self._leases[unit_id] = (token, now + visibility_timeout)
+            return Lease(self._units[unit_id], token, attempts)
+        return None
+
+    def _owns(self, lease: Lease) -> bool:
+        leased = self._leases.get(lease.unit.unit_id)
+        return leased is not None and leased[0] == lease.token
+
+    async def extend(self, lease: Lease, visibility_timeout: int) -> bool:
+        if not self._owns(lease):
+            return False
+        self._leases[lease.unit.unit_id] = (lease.token, time.time() + visibility_timeout)
+        return True
+
+    async def ack(self, lease: Lease) -> bool:
+        if not self._owns(lease):
+            return False
+        unit_id = lease.unit.unit_id
+        del self._leases[unit_id]
+        self._attempts.pop(unit_id, None)
+        self._units.pop(unit_id)
+        self._done[lease.unit.platform] = self._done.get(lease.unit.platform, 0) + 1
+        return True
+
+    async def nack(self, lease: Lease) -> bool:
+        if not self._owns(lease):
+            return False
+        unit_id, platform = lease.unit.unit_id, lease.unit.platform
+        del self._leases[unit_id]
+        if self._attempts.get(unit_id, 0) >= self.max_attempts:
+            self._attempts.pop(unit_id)
+            self._dead.setdefault(platform, []).append(unit_id)
+        else:
+            self._pending.setdefault(platform, deque()).append(unit_id)
+        return True
+
+    async def reserve_rate(self, platform: str, interval: float) -> float:
+        now = time.time()
+        tat = max(self._rate_tat.get(platform, now), now)
+        self._rate_tat[platform] = tat + interval
+        return tat - now
+
+    async def stats(self, platform: str) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending.get(platform, ())),
+            "leased": sum(1 for unit_id in self._leases if self._units[unit_id].platform == platform),
+            "done": self._done.get(platform, 0),
+            "dead": len(self._dead.get(platform, ())),
+        }
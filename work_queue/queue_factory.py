@@ -0,0 +1,37 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 工作队列工厂，redis 的依赖只在使用时导入
+
+
+class WorkQueueFactory:
+    """
+    工作队列工厂类
+    """
+
+    @staticmethod
+    def create_work_queue(backend: str, *args, **kwargs):
+        """
+        创建工作队列
+        :param backend: 队列后端 redis | memory
+        :param args: 参数
+        :param kwargs: 关键字参数
+        :return:
+        """
+        if backend == 'redis':
+            from .redis_queue import RedisWorkQueue
+            return RedisWorkQueue(*args, **kwargs)
+        elif backend == 'memory':
+            from .local_queue import LocalWorkQueue
+            return LocalWorkQueue(*args, **kwargs)
+        else:
+            raise ValueError(f'Unknown work queue backend: {backend}')
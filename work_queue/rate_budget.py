@@ -0,0 +1,58 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 按平台划分的全局请求速率预算，所有工作进程的请求通过工作队列预定发出时间，
+#            client 的 request 方法用 limit_request_rate 装饰，只有在工作进程里设置了预算时才会等待
+import asyncio
+import functools
+from contextvars import ContextVar
+from typing import Optional
+
+from .base_queue import AbstractWorkQueue
+
+__all__ = ["RateBudget", "request_rate_budget_var", "limit_request_rate"]
+
+
+class RateBudget:
+    def __init__(self, work_queue: AbstractWorkQueue, platform: str, requests_per_second: float):
+        """
+        Args:
+            work_queue: 保存预算的工作队列
+            platform: 平台
+            requests_per_second: 该平台所有工作进程合计每秒最多发出的请求数
+        """
+        self.work_queue = work_queue
+        self.platform = platform
+        self.interval = 1 / requests_per_second
+
+    async def acquire(self) -> None:
+        wait_seconds = await self.work_queue.reserve_rate(self.platform, self.interval)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+
+request_rate_budget_var: ContextVar[Optional[RateBudget]] = ContextVar("request_rate_budget", default=None)
+
+
+def limit_request_rate(func):
+    """
+    client 请求方法的装饰器，放在 metrics.record_request 外层，等待预算的时间不计入请求耗时
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        rate_budget = request_rate_budget_var.get()
+        if rate_budget is not None:
+            await rate_budget.acquire()
+        return await func(*args, **kwargs)
+
+    return wrapper
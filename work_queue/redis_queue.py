@@ -0,0 +1,205 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 基于 Redis 的工作队列，多台机器上的工作进程共用同一个 Redis(连接配置见 config/db_config.py)
+#            每个平台一个排队列表和一个租用有序集合(分数为超时时间)，租用、确认等操作都用 Lua 脚本保证原子性，
+#            超时时间和速率预算都以 Redis 服务器的时间为准，不受各机器时钟偏差影响
+import uuid
+from typing import Dict, List, Optional
+
+from redis.asyncio import ConnectionPool, Redis
+
+from config import db_config
+
+from .base_queue import AbstractWorkQueue, Lease
+from .work_unit import WorkUnit
+
+__all__ = ["RedisWorkQueue"]
+
+_NOW = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+"""
+
+# KEYS: seen, units, pending  ARGV: unit_id1, unit_json1, unit_id2, unit_json2 ...
+ENQUEUE_SCRIPT = """
+local added = 0
+for i = 1, #ARGV, 2 do
+    if redis.call('SADD', KEYS[1], ARGV[i]) == 1 then
+        redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+        redis.call('RPUSH', KEYS[3], ARGV[i])
+        added = added + 1
+    end
+end
+return added
+"""
+
+# KEYS: pending, leases, units, tokens, attempts, dead  ARGV: visibility_timeout, token, max_attempts
+LEASE_SCRIPT = _NOW + """
+for _, unit_id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], unit_id)
+    redis.call('HDEL', KEYS[4], unit_id)
+    redis.call('RPUSH', KEYS[1], unit_id)
+end
+while true do
+    local unit_id = redis.call('LPOP', KEYS[1])
+    if not unit_id then
+        return false
+    end
+    local attempts = redis.call('HINCRBY', KEYS[5], unit_id, 1)
+    if attempts <= tonumber(ARGV[3]) then
+        redis.call('ZADD', KEYS[2], now + tonumber(ARGV[1]), unit_id)
+        redis.call('HSET', KEYS[4], unit_id, ARGV[2])
+        return {unit_id, redis.call('HGET', KEYS[3], unit_id), attempts}
+    end
+    redis.call('HDEL', KEYS[5], unit_id)
+    redis.call('RPUSH', KEYS[6], unit_id)
+end
+"""
+
+# KEYS: leases, tokens  ARGV: unit_id, token, visibility_timeout
+EXTEND_SCRIPT = _NOW + """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZADD', KEYS[1], 'XX', now + tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+# KEYS: leases, tokens, units, attempts, done  ARGV: unit_id, token
+ACK_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('HDEL', KEYS[4], ARGV[1])
+redis.call('INCR', KEYS[5])
+return 1
+"""
+
+# KEYS: leases, tokens, attempts, pending, dead  ARGV: unit_id, token, max_attempts
+NACK_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+if tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or 0) >= tonumber(ARGV[3]) then
+    redis.call('HDEL', KEYS[3], ARGV[1])
+    redis.call('RPUSH', KEYS[5], ARGV[1])
+else
+    redis.call('RPUSH', KEYS[4], ARGV[1])
+end
+return 1
+"""
+
+# GCRA: 保存下一个请求可以发出的时间，每次预定后往后推 interval
+# KEYS: rate  ARGV: interval
+RESERVE_RATE_SCRIPT = _NOW + """
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local next_tat = tat + tonumber(ARGV[1])
+redis.call('SET', KEYS[1], tostring(next_tat), 'PX', math.ceil((next_tat - now) * 1000) + 1000)
+return tostring(tat - now)
+"""
+
+
+class RedisWorkQueue(AbstractWorkQueue):
+
+    def __init__(self, max_attempts: int, queue_name: str):
+        """
+        Args:
+            max_attempts: 单个工作单元最多被租用的次数
+            queue_name: 队列名，作为所有 key 的前缀
+        """
+        super().__init__(max_attempts, queue_name)
+        self._pool = ConnectionPool(
+            host=db_config.REDIS_DB_HOST,
+            port=db_config.REDIS_DB_PORT,
+            db=db_config.REDIS_DB_NUM,
+            password=db_config.REDIS_DB_PWD,
+            max_connections=db_config.REDIS_MAX_CONNECTIONS,
+        )
+        self._redis_client = Redis(connection_pool=self._pool)
+        self._enqueue = self._redis_client.register_script(ENQUEUE_SCRIPT)
+        self._lease = self._redis_client.register_script(LEASE_SCRIPT)
+        self._extend = self._redis_client.register_script(EXTEND_SCRIPT)
+        self._ack = self._redis_client.register_script(ACK_SCRIPT)
+        self._nack = self._redis_client.register_script(NACK_SCRIPT)
+        self._reserve_rate = self._redis_client.register_script(RESERVE_RATE_SCRIPT)
+
+    def _key(self, name: str, platform: str = "") -> str:
+        return f"{self.queue_name}:{platform}:{name}" if platform else f"{self.queue_name}:{name}"
+
+    async def enqueue(self, units: List[WorkUnit]) -> int:
+        units_by_platform: Dict[str, List[str]] = {}
+        for unit in units:
+            units_by_platform.setdefault(unit.platform, []).extend([unit.unit_id, unit.model_dump_json()])
+        added = 0
+        for platform, args in units_by_platform.items():
+            added += await self._enqueue(
+                keys=[self._key("seen"), self._key("units"), self._key("pending", platform)], args=args
+            )
+        return added
+
+    async def lease(self, platform: str, visibility_timeout: int) -> Optional[Lease]:
+        token = uuid.uuid4().hex
+        result = await self._lease(
+            keys=[self._key("pending", platform), self._key("leases", platform), self._key("units"),
+                  self._key("tokens"), self._key("attempts"), self._key("dead", platform)],
+            args=[visibility_timeout, token, self.max_attempts],
+        )
+        if not result:
+            return None
+        _, unit_json, attempts = result
+        return Lease(WorkUnit.model_validate_json(unit_json), token, int(attempts))
+
+    async def extend(self, lease: Lease, visibility_timeout: int) -> bool:
+        return bool(await self._extend(
+            keys=[self._key("leases", lease.unit.platform), self._key("tokens")],
+            args=[lease.unit.unit_id, lease.token, visibility_timeout],
+        ))
+
+    async def ack(self, lease: Lease) -> bool:
+        return bool(await self._ack(
+            keys=[self._key("leases", lease.unit.platform), self._key("tokens"), self._key("units"),
+                  self._key("attempts"), self._key("done", lease.unit.platform)],
+            args=[lease.unit.unit_id, lease.token],
+        ))
+
+    async def nack(self, lease: Lease) -> bool:
+        platform = lease.unit.platform
+        return bool(await self._nack(
+            keys=[self._key("leases", platform), self._key("tokens"), self._key("attempts"),
+                  self._key("pending", platform), self._key("dead", platform)],
+            args=[lease.unit.unit_id, lease.token, self.max_attempts],
+        ))
+
+    async def reserve_rate(self, platform: str, interval: float) -> float:
+        return float(await self._reserve_rate(keys=[self._key("rate", platform)], args=[interval]))
+
+    async def stats(self, platform: str) -> Dict[str, int]:
+        async with self._redis_client.pipeline(transaction=False) as pipe:
+            pipe.llen(self._key("pending", platform))
+            pipe.zcard(self._key("leases", platform))
+            pipe.get(self._key("done", platform))
+            pipe.llen(self._key("dead", platform))
+            pending, leased, done, dead = await pipe.execute()
+        return {"pending": pending, "leased": leased, "done": int(done or 0), "dead": dead}
+
+    async def close(self) -> None:
+        await self._redis_client.close()
+        await self._pool.disconnect()
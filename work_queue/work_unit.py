@@ -0,0 +1,78 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 分布式爬取的工作单元：一个关键词的一页搜索结果、一条内容、一个创作者或一条内容的评论，
+#            工作进程执行时把工作单元转换成该任务上下文中的配置覆盖项，再调用平台爬虫的 crawl
+from typing import Dict
+
+from pydantic import BaseModel, Field
+
+from constant.config_keys import CREATOR_ID_CONFIGS, SEARCH_PAGE_SIZES, SPECIFIED_ID_CONFIGS
+
+__all__ = ["UnitType", "WorkUnit", "build_unit_overrides"]
+
+
+class UnitType:
+    SEARCH_PAGE = "search_page"
+    CONTENT = "content"
+    CREATOR = "creator"
+    COMMENTS = "comments"
+
+    ALL = (SEARCH_PAGE, CONTENT, CREATOR, COMMENTS)
+
+
+class WorkUnit(BaseModel):
+    platform: str = Field(title="平台, xhs | dy | ks | bili | wb | tieba | zhihu")
+    unit_type: str = Field(title="工作单元类型, search_page | content | creator | comments")
+    target: str = Field(title="search_page 为搜索关键词，其他类型为内容ID/URL或创作者ID/URL")
+    page: int = Field(default=0, title="search_page 的页码")
+
+    @property
+    def unit_id(self) -> str:
+        """
+        工作单元的唯一标识，同时用于全局去重，同一个关键词同一页只会被执行一次
+        """
+        if self.unit_type == UnitType.SEARCH_PAGE:
+            return f"{self.platform}:{self.unit_type}:{self.target}:{self.page}"
+        return f"{self.platform}:{self.unit_type}:{self.target}"
+
+
+def build_unit_overrides(unit: WorkUnit, enable_comments: bool) -> Dict:
+    """
+    把工作单元转换成配置覆盖项
+    Args:
+        unit: 工作单元
+        enable_comments: search_page、content、creator 单元是否同时爬取评论，comments 单元总是爬取评论
+
+    Returns:
+
+    """
+    # 续爬进度由工作队列负责，不再读写本地的断点文件
+    overrides = {"PLATFORM": unit.platform, "ENABLE_RESUME": False, "ENABLE_GET_COMMENTS": enable_comments}
+    if unit.unit_type == UnitType.SEARCH_PAGE:
+        overrides.update({
+            "CRAWLER_TYPE": "search",
+            "KEYWORDS": unit.target,
+            "START_PAGE": unit.page,
+            # 搜索循环只会执行从 START_PAGE 开始的一页
+            "CRAWLER_MAX_NOTES_COUNT": SEARCH_PAGE_SIZES[unit.platform],
+            # B站按发布时间窗口搜索时不使用 START_PAGE，每个页单元都会重复爬取整个关键词，只能按页搜索
+            "ALL_DAY": False,
+        })
+    elif unit.unit_type == UnitType.CREATOR:
+        overrides.update({"CRAWLER_TYPE": "creator", CREATOR_ID_CONFIGS[unit.platform]: [unit.target]})
+    else:
+        # 平台爬虫没有单独爬评论的入口，comments 单元按 detail 方式执行并打开评论
+        overrides.update({"CRAWLER_TYPE": "detail", SPECIFIED_ID_CONFIGS[unit.platform]: [unit.target]})
+        if unit.unit_type == UnitType.COMMENTS:
+            overrides["ENABLE_GET_COMMENTS"] = True
+    return overrides
@@ -0,0 +1,105 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 工作进程：复用一个已登录的平台会话，循环租用该平台的工作单元并执行，
+#            执行期间定时续租，成功后确认，失败后交还队列重试
+import asyncio
+from typing import Optional
+
+import config
+from base.base_crawler import AbstractCrawler
+from tools import utils
+
+from .base_queue import AbstractWorkQueue, Lease
+from .rate_budget import RateBudget, request_rate_budget_var
+from .work_unit import WorkUnit, build_unit_overrides
+
+__all__ = ["QueueWorker"]
+
+
+class QueueWorker:
+    def __init__(self, work_queue: AbstractWorkQueue, platform: str, crawler: AbstractCrawler, worker_id: str):
+        """
+        Args:
+            work_queue: 工作队列
+            platform: 只租用该平台的工作单元
+            crawler: 已经初始化好会话的平台爬虫
+            worker_id: 工作进程标识，用于日志
+        """
+        self.work_queue = work_queue
+        self.platform = platform
+        self.crawler = crawler
+        self.worker_id = worker_id
+        self.visibility_timeout = config.WORK_QUEUE_VISIBILITY_TIMEOUT
+        requests_per_second = config.WORK_QUEUE_RATE_BUDGETS.get(platform)
+        self.rate_budget: Optional[RateBudget] = RateBudget(
+            work_queue, platform, requests_per_second) if requests_per_second else None
+        self.succeeded = 0
+        self.failed = 0
+
+    async def run(self, exit_when_empty: bool = False) -> None:
+        """
+        循环执行工作单元
+        Args:
+            exit_when_empty: 队列里没有排队和租用中的单元时退出，否则一直轮询等待新的单元
+
+        Returns:
+
+        """
+        while True:
+            lease = await self.work_queue.lease(self.platform, self.visibility_timeout)
+            if lease is None:
+                # 别的进程租用中的单元可能超时回到队列，全部完成后才退出
+                if exit_when_empty and (await self.work_queue.stats(self.platform))["leased"] == 0:
+                    break
+                await asyncio.sleep(config.WORK_QUEUE_POLL_INTERVAL)
+                continue
+            await self.run_unit(lease)
+        utils.logger.info(
+            f"[QueueWorker.run] Worker {self.worker_id} finished, succeeded: {self.succeeded}, failed: {self.failed}"
+        )
+
+    async def run_unit(self, lease: Lease) -> None:
+        unit_id = lease.unit.unit_id
+        utils.logger.info(f"[QueueWorker.run_unit] Worker {self.worker_id} begin {unit_id}, attempt {lease.attempts}")
+        keep_lease_task = asyncio.create_task(self.keep_lease(lease))
+        try:
+            # 每个单元在独立的 task 中运行，单元内的配置修改和上下文变量不会带到下一个单元
+            await asyncio.create_task(self.execute(lease.unit))
+        except Exception as e:
+            self.failed += 1
+            utils.logger.error(f"[QueueWorker.run_unit] Worker {self.worker_id} run {unit_id} error: {e}")
+            await self.work_queue.nack(lease)
+        else:
+            self.succeeded += 1
+            if not await self.work_queue.ack(lease):
+                utils.logger.warning(
+                    f"[QueueWorker.run_unit] Lease of {unit_id} expired before ack, it may be executed again"
+                )
+        finally:
+            keep_lease_task.cancel()
+
+    async def execute(self, unit: WorkUnit) -> None:
+        config.enable_config_overrides()
+        config.config_overrides_var.set(build_unit_overrides(unit, config.ENABLE_GET_COMMENTS))
+        request_rate_budget_var.set(self.rate_budget)
+        await self.crawler.crawl()
+
+    async def keep_lease(self, lease: Lease) -> None:
+        """
+        每隔三分之一的可见性超时续租一次
+        """
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            if not await self.work_queue.extend(lease, self.visibility_timeout):
+                utils.logger.warning(f"[QueueWorker.keep_lease] Lease of {lease.unit.unit_id} was lost")
+                return